@@ -4,12 +4,30 @@ import { apiClient } from '../lib/api';
 import toast from 'react-hot-toast';
 import { generateInvoicePdf } from '../utils/pdfGenerator';
 
+// Ventas por página: GET /ventas pagina por cursor (máximo 100 por página)
+const VENTAS_POR_PAGINA = 100;
+
+interface VentasPagina {
+  data: Venta[];
+  pagination: { next_cursor: string | null; has_next: boolean };
+}
+
+const fetchVentasPagina = async (cursor: string): Promise<VentasPagina> => {
+  const response = await apiClient.get('/ventas', {
+    params: { cursor, limit: VENTAS_POR_PAGINA },
+  });
+  return response.data as VentasPagina;
+};
+
 interface UseVentasReturn {
   ventas: Venta[];
   productos: Producto[];
   loading: boolean;
   refreshing: boolean;
+  hasMore: boolean;
+  loadingMore: boolean;
   loadData: () => Promise<void>;
+  loadMore: () => Promise<void>;
   createVenta: (ventaData: { items: Array<{ producto_id: number; cantidad: number; precio_unitario: number }>; total: number }) => Promise<void>;
   deleteVenta: (venta: Venta) => Promise<void>;
   exportarPDF: (venta: Venta) => void;
@@ -20,6 +38,8 @@ export const useVentas = (): UseVentasReturn => {
   const [productos, setProductos] = useState<Producto[]>([]);
   const [loading, setLoading] = useState(true);
   const [refreshing, setRefreshing] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const loadData = useCallback(async () => {
     try {
@@ -30,13 +50,14 @@ export const useVentas = (): UseVentasReturn => {
         setRefreshing(true);
       }
 
-      const [productosData, ventasData] = await Promise.all([
+      const [productosData, ventasPagina] = await Promise.all([
         apiClient.getProductos(),
-        apiClient.getVentas(),
+        fetchVentasPagina(''),
       ]);
       
       setProductos(productosData as Producto[]);
-      setVentas(ventasData as Venta[]);
+      setVentas(ventasPagina.data);
+      setNextCursor(ventasPagina.pagination.next_cursor);
     } catch (error: any) {
       console.error('Error cargando datos:', error);
       toast.error(error?.message || 'Error al cargar los datos');
@@ -50,6 +71,21 @@ export const useVentas = (): UseVentasReturn => {
     loadData();
   }, []);
 
+  const loadMore = useCallback(async () => {
+    if (!nextCursor || loadingMore) return;
+    try {
+      setLoadingMore(true);
+      const ventasPagina = await fetchVentasPagina(nextCursor);
+      setVentas(prev => [...prev, ...ventasPagina.data]);
+      setNextCursor(ventasPagina.pagination.next_cursor);
+    } catch (error: any) {
+      console.error('Error cargando más ventas:', error);
+      toast.error(error?.message || 'Error al cargar más ventas');
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [nextCursor, loadingMore]);
+
   const createVenta = useCallback(async (ventaData: { 
     items: Array<{ producto_id: number; cantidad: number; precio_unitario: number }>; 
     total: number;
@@ -116,7 +152,10 @@ export const useVentas = (): UseVentasReturn => {
     productos,
     loading,
     refreshing,
+    hasMore: nextCursor !== null,
+    loadingMore,
     loadData,
+    loadMore,
     createVenta,
     deleteVenta,
     exportarPDF,
@@ -20,7 +20,9 @@ import { es } from 'date-fns/locale';
 import { useVentas } from '../hooks/useVentas';
 
 const Ventas: React.FC = () => {
-  const { ventas, productos, loading, createVenta, deleteVenta, exportarPDF } = useVentas();
+  const {
+    ventas, productos, loading, hasMore, loadingMore, loadMore, createVenta, deleteVenta, exportarPDF
+  } = useVentas();
   const [modalOpen, setModalOpen] = useState(false);
   const [exportModalOpen, setExportModalOpen] = useState(false);
   const [selectedVenta, setSelectedVenta] = useState<Venta | null>(null);
@@ -348,6 +350,15 @@ const Ventas: React.FC = () => {
           <div className="text-sm text-gray-600">
             Mostrando <span className="font-semibold text-gray-900">{filteredVentas.length}</span> de{' '}
             <span className="font-semibold text-gray-900">{ventas.length}</span> ventas
+            {hasMore && (
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="ml-3 text-blue-600 hover:text-blue-800 font-medium disabled:opacity-50"
+              >
+                {loadingMore ? 'Cargando...' : 'Cargar más antiguas'}
+              </button>
+            )}
           </div>
           {(searchTerm || dateFilter.desde || dateFilter.hasta) && (
             <button
@@ -22,6 +22,14 @@ def create_app(config_name=None):
     cache.init_app(app)
     limiter.init_app(app)
     
+    # Versionado de tablas para las cachés en memoria (catálogo de productos)
+    from .infrastructure.cache import init_app as init_cache_layer
+    init_cache_layer(app)
+    
+    # Índice de texto completo de productos (FTS5 en SQLite, FULLTEXT en MySQL)
+    from .infrastructure.search import init_app as init_search
+    init_search(app)
+    
     # Configurar CORS
     CORS(app, origins=app.config['CORS_ORIGINS'])
     
@@ -47,6 +55,15 @@ def create_app(config_name=None):
     # Importar modelos para SQLAlchemy (asegurar que se registren)
     from app.models import Usuario, Producto, Categoria, Venta, DetalleVenta, Compra, Proveedor
     from app.models.auditoria import AuditoriaLog
+    
+    # Precargar el catálogo en memoria (y sus índices) al arrancar
+    if app.config.get('CATALOG_PRELOAD'):
+        from .infrastructure.cache import catalog_store
+        with app.app_context():
+            try:
+                catalog_store.obtener()
+            except Exception as e:
+                app.logger.warning(f"No se pudo precargar el catálogo: {e}")
 
     return app
 
@@ -83,6 +100,9 @@ def register_blueprints(app):
     from .controllers.compra import compra_bp
     app.register_blueprint(compra_bp)
     
+    from .controllers.caja import caja_bp
+    app.register_blueprint(caja_bp)
+    
     # API Blueprint principal (legacy routes, registered after for backward compatibility)
     from .api_routes import api
     app.register_blueprint(api, url_prefix='/api')
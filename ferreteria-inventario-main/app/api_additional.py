@@ -3,11 +3,16 @@ Endpoints adicionales para la API
 """
 from datetime import datetime, timedelta
 from flask import Blueprint, request, jsonify
-from sqlalchemy import extract, func
+from sqlalchemy import extract
 from app import db
 from app.models import (
-    Categoria, Compra, DetalleVenta, Producto, Usuario, Venta, Proveedor
+    Compra, Producto, Usuario, Proveedor
 )
+from app.repositories.producto import ProductoRepository
+from app.repositories.venta_diaria import VentaDiariaRepository, ProductoVentaDiariaRepository
+from app.exceptions import BusinessLogicError
+from app.infrastructure.di import get_container
+from app.utils.pagination import get_pagination_params
 
 # Importar decoradores del archivo principal
 from app.api_routes import token_required, rol_requerido
@@ -24,9 +29,11 @@ def search_productos(current_user):
         if not query:
             return jsonify({'message': 'Parámetro de búsqueda requerido'}), 400
             
-        productos = Producto.query.filter(
-            Producto.nombre.like(f'%{query}%')
-        ).join(Categoria).all()
+        # Índice de texto completo, ordenado por relevancia y paginado
+        page, per_page = get_pagination_params(request)
+        productos = ProductoRepository.search_products(
+            query, limit=per_page, offset=(page - 1) * per_page
+        )
         
         return jsonify([{
             'id': p.id,
@@ -51,9 +58,7 @@ def search_productos(current_user):
 def get_productos_stock_bajo(current_user):
     """Obtener productos con stock bajo"""
     try:
-        productos = Producto.query.filter(
-            Producto.stock <= Producto.stock_minimo
-        ).join(Categoria).all()
+        productos = get_container().resolve('get_stock_bajo_use_case').entidades()
         
         return jsonify([{
             'id': p.id,
@@ -63,7 +68,7 @@ def get_productos_stock_bajo(current_user):
             'categoria': {
                 'id': p.categoria.id,
                 'nombre': p.categoria.nombre
-            },
+            } if p.categoria else None,
             'diferencia': p.stock_minimo - p.stock
         } for p in productos]), 200
         
@@ -326,8 +331,8 @@ def create_compra(current_user):
         
         db.session.add(nueva_compra)
         
-        # Actualizar stock del producto
-        producto.stock += int(data['cantidad'])
+        # Actualizar stock del producto (UPDATE atómico, se confirma con la compra)
+        ProductoRepository.ajustar_stock({producto.id: int(data['cantidad'])}, commit=False)
         
         db.session.commit()
         
@@ -343,6 +348,9 @@ def create_compra(current_user):
             'stock_actualizado': producto.stock
         }), 201
         
+    except BusinessLogicError as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), e.status_code
     except Exception as e:
         db.session.rollback()
         print(f"Error al crear compra: {str(e)}")
@@ -362,8 +370,9 @@ def update_compra(current_user, compra_id):
         data = request.get_json()
         
         # Si cambia la cantidad o el producto, ajustamos el stock
-        producto_anterior = compra.producto
+        producto_anterior_id = compra.producto_id
         cantidad_anterior = compra.cantidad
+        ajustes = {}
         
         # Actualizar campos
         if 'producto_id' in data:
@@ -373,19 +382,20 @@ def update_compra(current_user, compra_id):
                 if not producto_nuevo:
                     return jsonify({'message': 'Producto nuevo no encontrado'}), 404
                 
-                # Restar del producto anterior
-                producto_anterior.stock -= cantidad_anterior
-                # Sumar al nuevo
-                producto_nuevo.stock += cantidad_anterior
+                ajustes[producto_anterior_id] = -cantidad_anterior
+                ajustes[producto_nuevo.id] = cantidad_anterior
                 
                 compra.producto_id = data['producto_id']
         
         if 'cantidad' in data:
             # Ajustar stock por diferencia de cantidad
             diferencia = int(data['cantidad']) - cantidad_anterior
-            compra.producto.stock += diferencia
+            ajustes[compra.producto_id] = ajustes.get(compra.producto_id, 0) + diferencia
             compra.cantidad = data['cantidad']
         
+        # Un solo UPDATE condicional: falla si el stock ya vendido quedaría negativo
+        ProductoRepository.ajustar_stock(ajustes, commit=False)
+        
         if 'precio_unitario' in data:
             compra.precio_unitario = data['precio_unitario']
         
@@ -413,6 +423,9 @@ def update_compra(current_user, compra_id):
             }
         }), 200
         
+    except BusinessLogicError as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), e.status_code
     except Exception as e:
         db.session.rollback()
         print(f"❌ Error actualizando compra #{compra_id}: {str(e)}")
@@ -433,11 +446,8 @@ def delete_compra(current_user, compra_id):
         if not compra:
             return jsonify({'message': 'Compra no encontrada'}), 404
         
-        # Ajustar el stock del producto (restar la cantidad comprada)
-        producto = compra.producto
-        if producto:
-            producto.stock -= compra.cantidad
-            print(f"📦 Stock de '{producto.nombre}' ajustado: {producto.stock + compra.cantidad} -> {producto.stock}")
+        # Ajustar el stock del producto (restar la cantidad comprada, UPDATE atómico)
+        ProductoRepository.ajustar_stock({compra.producto_id: -compra.cantidad}, commit=False)
         
         db.session.delete(compra)
         db.session.commit()
@@ -445,6 +455,9 @@ def delete_compra(current_user, compra_id):
         print(f"✅ Compra #{compra_id} eliminada exitosamente")
         return jsonify({'message': 'Compra eliminada exitosamente'}), 200
         
+    except BusinessLogicError as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), e.status_code
     except Exception as e:
         db.session.rollback()
         print(f"❌ Error eliminando compra #{compra_id}: {str(e)}")
@@ -469,19 +482,13 @@ def get_ventas_por_fecha(current_user):
         fecha_inicio = datetime.fromisoformat(fecha_inicio)
         fecha_fin = datetime.fromisoformat(fecha_fin)
         
-        ventas = db.session.query(
-            func.date(Venta.fecha).label('fecha'),
-            func.sum(Venta.total).label('total'),
-            func.count(Venta.id).label('cantidad_ventas')
-        ).filter(
-            Venta.fecha >= fecha_inicio,
-            Venta.fecha <= fecha_fin
-        ).group_by(func.date(Venta.fecha)).all()
+        # Una fila por día desde el resumen diario, sin recorrer las ventas
+        ventas = VentaDiariaRepository.resumen_por_dia(fecha_inicio.date(), fecha_fin.date())
         
         return jsonify([{
-            'fecha': v.fecha.isoformat(),
-            'total': float(v.total),
-            'cantidad_ventas': v.cantidad_ventas
+            'fecha': v['fecha'].isoformat(),
+            'total': v['total'],
+            'cantidad_ventas': v['cantidad']
         } for v in ventas]), 200
         
     except Exception as e:
@@ -495,24 +502,13 @@ def get_productos_mas_vendidos(current_user):
     try:
         limite = request.args.get('limite', 10, type=int)
         
-        productos = db.session.query(
-            Producto.id,
-            Producto.nombre,
-            func.sum(DetalleVenta.cantidad).label('total_vendido'),
-            func.sum(DetalleVenta.subtotal).label('ingresos_totales')
-        ).join(
-            DetalleVenta, Producto.id == DetalleVenta.producto_id
-        ).group_by(
-            Producto.id, Producto.nombre
-        ).order_by(
-            func.sum(DetalleVenta.cantidad).desc()
-        ).limit(limite).all()
+        productos = ProductoVentaDiariaRepository.top_productos(limite)
         
         return jsonify([{
-            'producto_id': p.id,
-            'nombre': p.nombre,
-            'total_vendido': int(p.total_vendido),
-            'ingresos_totales': float(p.ingresos_totales)
+            'producto_id': p['id'],
+            'nombre': p['nombre'],
+            'total_vendido': p['total_vendido'],
+            'ingresos_totales': p['ingresos']
         } for p in productos]), 200
         
     except Exception as e:
@@ -119,11 +119,9 @@ def export_reporte_ventas(current_user):
 def export_stock_bajo(current_user):
     """Exportar productos con stock bajo"""
     try:
-        from app.models import Producto, Categoria
+        from app.infrastructure.di import get_container
         
-        productos_stock_bajo = Producto.query.filter(
-            Producto.stock <= Producto.stock_minimo
-        ).join(Categoria).all()
+        productos_stock_bajo = get_container().resolve('get_stock_bajo_use_case').entidades()
         
         import io
         import csv
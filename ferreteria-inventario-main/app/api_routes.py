@@ -1,15 +1,28 @@
 from datetime import datetime, timedelta, timezone
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from werkzeug.security import check_password_hash, generate_password_hash
 import jwt
 from functools import wraps
-from sqlalchemy import func, extract
+from sqlalchemy import case, func, extract
+from sqlalchemy.orm import joinedload, selectinload
 
 from app import db
 from app.models import (
-    Categoria, Compra, DetalleVenta, Producto, Usuario, Venta, Proveedor
+    Categoria, Compra, DetalleVenta, Producto, Usuario, Venta, VentaDiaria, Proveedor
 )
 from app.extensions import cache, limiter
+from app.repositories.producto import ProductoRepository
+from app.repositories.venta import VentaRepository
+from app.repositories.venta_diaria import (
+    VentaDiariaRepository, ProductoVentaDiariaRepository, ClienteResumenRepository
+)
+from app.exceptions import BusinessLogicError, StockError
+from app.infrastructure.di import get_container
+from app.infrastructure.cache import serie_ventas_cache
+from app.utils.fechas import ahora
+from app.utils.pagination import (
+    get_pagination_params, encode_fecha_cursor, decode_fecha_cursor, iter_json_array
+)
 
 # Crear el Blueprint para las rutas de API
 api = Blueprint('api', __name__)
@@ -334,9 +347,11 @@ def search_productos(current_user):
         if not query:
             return jsonify({'message': 'Parámetro de búsqueda requerido'}), 400
             
-        productos = Producto.query.filter(
-            Producto.nombre.like(f'%{query}%')
-        ).all()
+        # Índice de texto completo, ordenado por relevancia y paginado
+        page, per_page = get_pagination_params(request)
+        productos = ProductoRepository.search_products(
+            query, limit=per_page, offset=(page - 1) * per_page
+        )
         
         return jsonify([{
             'id': p.id,
@@ -359,9 +374,7 @@ def search_productos(current_user):
 def productos_stock_bajo(current_user):
     """Obtener productos con stock bajo"""
     try:
-        productos = Producto.query.filter(
-            Producto.stock <= Producto.stock_minimo
-        ).all()
+        productos = get_container().resolve('get_stock_bajo_use_case').entidades()
         
         return jsonify([{
             'id': p.id,
@@ -484,90 +497,102 @@ def delete_categoria(current_user, categoria_id):
         return jsonify({'message': f'Error al eliminar categoría: {str(e)}'}), 500
 
 # Rutas de dashboard
+
+# Tablas de las que dependen las estadísticas: cualquier commit que las
+# modifique (ventas, compras, productos, proveedores) invalida el valor
+_TABLAS_DASHBOARD = ('productos', 'proveedores', 'ventas_diarias', 'compras')
+
+
+def _calcular_dashboard_stats(inicio_mes, inicio_mes_anterior):
+    """
+    Estadísticas del dashboard en dos consultas agregadas
+
+    La primera resume el catálogo (productos y proveedores activos); la
+    segunda los movimientos de los dos meses, desde el resumen diario de
+    ventas (una fila por día y usuario) y compras.
+    """
+    inicio_dia_mes = inicio_mes.date()
+    catalogo = db.session.query(
+        func.count(Producto.id).label('total'),
+        func.sum(case((Producto.stock <= Producto.stock_minimo, 1), else_=0)).label('stock_bajo'),
+        func.sum(case((Producto.stock <= 0, 1), else_=0)).label('sin_stock'),
+        db.session.query(func.count(Proveedor.id)).filter(
+            Proveedor.estado == 'activo'
+        ).scalar_subquery().label('proveedores_activos')
+    ).one()
+
+    del_mes = VentaDiaria.fecha >= inicio_dia_mes
+    movimientos = db.session.query(
+        func.sum(case((del_mes, VentaDiaria.cantidad_ventas), else_=0)).label('ventas_mes'),
+        func.sum(case((del_mes, 0), else_=VentaDiaria.cantidad_ventas)).label('ventas_mes_anterior'),
+        func.sum(case((del_mes, VentaDiaria.total), else_=0)).label('ingresos_mes'),
+        func.sum(case((del_mes, 0), else_=VentaDiaria.total)).label('ingresos_mes_anterior'),
+        db.session.query(func.count(Compra.id)).filter(
+            Compra.fecha_compra >= inicio_mes
+        ).scalar_subquery().label('compras_mes'),
+        db.session.query(func.coalesce(func.sum(Compra.total), 0)).filter(
+            Compra.fecha_compra >= inicio_mes
+        ).scalar_subquery().label('gastos_mes')
+    ).filter(VentaDiaria.fecha >= inicio_mes_anterior.date()).one()
+
+    ventas_mes = int(movimientos.ventas_mes or 0)
+    ventas_mes_anterior = int(movimientos.ventas_mes_anterior or 0)
+    ingresos_mes = float(movimientos.ingresos_mes or 0)
+    ingresos_mes_anterior = float(movimientos.ingresos_mes_anterior or 0)
+    gastos_mes = float(movimientos.gastos_mes or 0)
+
+    # Calcular cambio porcentual de ventas e ingresos
+    if ventas_mes_anterior > 0:
+        cambio_ventas = ((ventas_mes - ventas_mes_anterior) / ventas_mes_anterior) * 100
+    else:
+        cambio_ventas = 100 if ventas_mes > 0 else 0
+    if ingresos_mes_anterior > 0:
+        cambio_ingresos = ((ingresos_mes - ingresos_mes_anterior) / ingresos_mes_anterior) * 100
+    else:
+        cambio_ingresos = 100 if ingresos_mes > 0 else 0
+
+    return {
+        'total_productos': int(catalogo.total or 0),
+        'productos_stock_bajo': int(catalogo.stock_bajo or 0),
+        'productos_sin_stock': int(catalogo.sin_stock or 0),
+        'ventas_mes': ventas_mes,
+        'ventas_mes_anterior': ventas_mes_anterior,
+        'cambio_ventas': round(cambio_ventas, 2),
+        'ingresos_mes': ingresos_mes,
+        'ingresos_mes_anterior': ingresos_mes_anterior,
+        'cambio_ingresos': round(cambio_ingresos, 2),
+        'compras_mes': int(movimientos.compras_mes or 0),
+        'gastos_mes': gastos_mes,
+        'proveedores_activos': int(catalogo.proveedores_activos or 0),
+        'margen_mes': ingresos_mes - gastos_mes
+    }
+
+
 @api.route('/dashboard/stats', methods=['GET'])
 @token_required
 def get_dashboard_stats(current_user):
-    """Obtener estadísticas completas del dashboard"""
+    """
+    Obtener estadísticas completas del dashboard
+
+    Se cachean por mes con un TTL corto (DASHBOARD_STATS_TTL) y se
+    invalidan al confirmar ventas, compras o cambios de productos y
+    proveedores. Si varios dashboards piden el valor a la vez tras una
+    invalidación, solo uno lo recalcula y los demás reciben el mismo.
+    """
     try:
         # Mes actual
-        inicio_mes = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        inicio_mes = ahora().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         
         # Mes anterior
-        if datetime.now().month == 1:
-            inicio_mes_anterior = datetime.now().replace(year=datetime.now().year - 1, month=12, day=1, hour=0, minute=0, second=0, microsecond=0)
-        else:
-            inicio_mes_anterior = datetime.now().replace(month=datetime.now().month - 1, day=1, hour=0, minute=0, second=0, microsecond=0)
-        
-        fin_mes_anterior = inicio_mes
-        
-        # Productos totales
-        total_productos = Producto.query.count()
-        
-        # Productos con stock bajo
-        productos_stock_bajo = Producto.query.filter(
-            Producto.stock <= Producto.stock_minimo
-        ).count()
-        
-        # Productos con stock crítico (0)
-        productos_sin_stock = Producto.query.filter(Producto.stock == 0).count()
-        
-        # Ventas del mes actual
-        ventas_mes = Venta.query.filter(Venta.fecha >= inicio_mes).count()
-        ventas_mes_anterior = Venta.query.filter(
-            Venta.fecha >= inicio_mes_anterior,
-            Venta.fecha < fin_mes_anterior
-        ).count()
-        
-        # Calcular cambio porcentual de ventas
-        if ventas_mes_anterior > 0:
-            cambio_ventas = ((ventas_mes - ventas_mes_anterior) / ventas_mes_anterior) * 100
-        else:
-            cambio_ventas = 100 if ventas_mes > 0 else 0
-        
-        # Ingresos del mes
-        ingresos_mes = db.session.query(func.sum(Venta.total)).filter(
-            Venta.fecha >= inicio_mes
-        ).scalar() or 0
+        inicio_mes_anterior = (inicio_mes - timedelta(days=1)).replace(day=1)
         
-        ingresos_mes_anterior = db.session.query(func.sum(Venta.total)).filter(
-            Venta.fecha >= inicio_mes_anterior,
-            Venta.fecha < fin_mes_anterior
-        ).scalar() or 0
-        
-        # Calcular cambio porcentual de ingresos
-        if ingresos_mes_anterior > 0:
-            cambio_ingresos = ((float(ingresos_mes) - float(ingresos_mes_anterior)) / float(ingresos_mes_anterior)) * 100
-        else:
-            cambio_ingresos = 100 if ingresos_mes > 0 else 0
-        
-        # Compras del mes
-        compras_mes = Compra.query.filter(Compra.fecha_compra >= inicio_mes).count()
-        
-        gastos_mes = db.session.query(func.sum(Compra.total)).filter(
-            Compra.fecha_compra >= inicio_mes
-        ).scalar() or 0
-        
-        # Proveedores activos (con manejo de error si no existe el campo activo)
-        try:
-            proveedores_activos = Proveedor.query.filter(Proveedor.activo == True).count()
-        except Exception:
-            proveedores_activos = Proveedor.query.count()
-        
-        return jsonify({
-            'total_productos': total_productos,
-            'productos_stock_bajo': productos_stock_bajo,
-            'productos_sin_stock': productos_sin_stock,
-            'ventas_mes': ventas_mes,
-            'ventas_mes_anterior': ventas_mes_anterior,
-            'cambio_ventas': round(cambio_ventas, 2),
-            'ingresos_mes': float(ingresos_mes),
-            'ingresos_mes_anterior': float(ingresos_mes_anterior),
-            'cambio_ingresos': round(cambio_ingresos, 2),
-            'compras_mes': compras_mes,
-            'gastos_mes': float(gastos_mes),
-            'proveedores_activos': proveedores_activos,
-            'margen_mes': float(ingresos_mes - gastos_mes)
-        }), 200
+        stats = get_container().resolve('versioned_cache').obtener(
+            f'dashboard:stats:{inicio_mes:%Y-%m}',
+            _TABLAS_DASHBOARD,
+            lambda: _calcular_dashboard_stats(inicio_mes, inicio_mes_anterior),
+            timeout=current_app.config.get('DASHBOARD_STATS_TTL', 30)
+        )
+        return jsonify(stats), 200
         
     except Exception as e:
         import traceback
@@ -608,25 +633,15 @@ def get_ventas_por_dia(current_user):
     """Obtener ventas de los últimos 7 días"""
     try:
         dias = int(request.args.get('dias', 7))
-        fecha_inicio = datetime.now() - timedelta(days=dias)
-        
-        # Obtener ventas por día
-        ventas_por_dia = db.session.query(
-            func.date(Venta.fecha).label('fecha'),
-            func.count(Venta.id).label('cantidad'),
-            func.sum(Venta.total).label('total')
-        ).filter(
-            Venta.fecha >= fecha_inicio
-        ).group_by(
-            func.date(Venta.fecha)
-        ).order_by(
-            func.date(Venta.fecha)
-        ).all()
+        fecha_inicio = ahora() - timedelta(days=dias)
+        
+        # Obtener ventas por día desde el resumen diario (una fila por día y usuario)
+        ventas_por_dia = VentaDiariaRepository.resumen_por_dia(desde=fecha_inicio.date())
         
         return jsonify([{
-            'fecha': v.fecha.isoformat() if hasattr(v.fecha, 'isoformat') else str(v.fecha),
-            'cantidad': v.cantidad,
-            'total': float(v.total) if v.total else 0
+            'fecha': v['fecha'].isoformat(),
+            'cantidad': v['cantidad'],
+            'total': v['total']
         } for v in ventas_por_dia]), 200
         
     except Exception as e:
@@ -642,33 +657,17 @@ def get_productos_mas_vendidos(current_user):
     try:
         limit = int(request.args.get('limit', 5))
         dias = int(request.args.get('dias', 30))
-        fecha_inicio = datetime.now() - timedelta(days=dias)
-        
-        # Obtener productos más vendidos
-        productos = db.session.query(
-            Producto.id,
-            Producto.nombre,
-            Producto.stock,
-            func.sum(DetalleVenta.cantidad).label('total_vendido'),
-            func.sum(DetalleVenta.subtotal).label('ingresos')
-        ).join(
-            DetalleVenta, Producto.id == DetalleVenta.producto_id
-        ).join(
-            Venta, DetalleVenta.venta_id == Venta.id
-        ).filter(
-            Venta.fecha >= fecha_inicio
-        ).group_by(
-            Producto.id, Producto.nombre, Producto.stock
-        ).order_by(
-            func.sum(DetalleVenta.cantidad).desc()
-        ).limit(limit).all()
+        fecha_inicio = ahora() - timedelta(days=dias)
+        
+        # Ranking desde los contadores diarios por producto (días x productos vendidos)
+        productos = ProductoVentaDiariaRepository.top_productos(limit, desde=fecha_inicio.date())
         
         return jsonify([{
-            'id': p.id,
-            'nombre': p.nombre,
-            'stock': p.stock,
-            'total_vendido': int(p.total_vendido),
-            'ingresos': float(p.ingresos)
+            'id': p['id'],
+            'nombre': p['nombre'],
+            'stock': p['stock'],
+            'total_vendido': p['total_vendido'],
+            'ingresos': p['ingresos']
         } for p in productos]), 200
         
     except Exception as e:
@@ -682,11 +681,7 @@ def get_productos_mas_vendidos(current_user):
 def get_stock_critico(current_user):
     """Obtener productos con stock crítico"""
     try:
-        productos = Producto.query.filter(
-            Producto.stock <= Producto.stock_minimo
-        ).order_by(
-            Producto.stock.asc()
-        ).limit(10).all()
+        productos = get_container().resolve('get_stock_bajo_use_case').entidades(limit=10)
         
         return jsonify([{
             'id': p.id,
@@ -892,80 +887,94 @@ def delete_usuario(current_user, usuario_id):
         db.session.rollback()
         return jsonify({'message': f'Error al eliminar usuario: {str(e)}'}), 500
 
+def _venta_a_dict(v):
+    """Formato de venta de la API original (con usuario y productos anidados)"""
+    return {
+        'id': v.id,
+        'fecha': v.fecha.isoformat() if v.fecha else None,
+        'total': float(v.total),
+        'cliente_nombre': v.cliente_nombre,
+        'cliente_documento': v.cliente_documento,
+        'cliente_telefono': v.cliente_telefono,
+        'usuario': {
+            'id': v.usuario.id,
+            'nombre': v.usuario.nombre
+        } if v.usuario else None,
+        'detalles': [{
+            'id': d.id,
+            'producto_id': d.producto_id,
+            'producto': {
+                'id': d.producto.id,
+                'nombre': d.producto.nombre
+            } if d.producto else None,
+            'cantidad': d.cantidad,
+            'precio_unitario': float(d.precio_unitario),
+            'subtotal': float(d.subtotal)
+        } for d in v.detalles]
+    }
+
 # Rutas de ventas
 @api.route('/ventas', methods=['GET'])
 @token_required
 def get_ventas(current_user):
-    """Obtener ventas"""
+    """
+    Obtener ventas, las más recientes primero
+    
+    Por defecto se pagina por (fecha, id) de a `per_page` ventas (máximo
+    100): la respuesta trae `pagination.next_cursor` para pedir la
+    siguiente con `cursor`. Con stream=true se escriben todas las ventas
+    como un arreglo JSON de a poco. Con `page` se mantiene la paginación
+    numerada.
+    """
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 100, type=int)  # Aumentado para mostrar más ventas
-        
-        ventas = Venta.query.order_by(
-            Venta.fecha.desc()
-        ).paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
-        
-        # Si no hay paginación solicitada, devolver todas
-        if page == 1 and per_page == 100:
-            all_ventas = Venta.query.order_by(Venta.fecha.desc()).all()
+        per_page = request.args.get('per_page', 100, type=int)
+        per_page = max(1, min(per_page, 100))
+        try:
+            despues_de = decode_fecha_cursor(request.args.get('cursor'))
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        
+        if request.args.get('stream', '').lower() in ('1', 'true'):
+            paginas = VentaRepository.iter_paginas_por_fecha(despues_de)
+            ventas = (_venta_a_dict(v) for pagina in paginas for v in pagina)
+            return Response(stream_with_context(iter_json_array(ventas)),
+                            mimetype='application/json')
+        
+        if 'page' in request.args:
+            page = request.args.get('page', 1, type=int)
+            ventas = Venta.query.options(
+                joinedload(Venta.usuario),
+                selectinload(Venta.detalles).joinedload(DetalleVenta.producto)
+                .lazyload(Producto.proveedor)
+            ).order_by(
+                Venta.fecha.desc(), Venta.id.desc()
+            ).paginate(
+                page=page, 
+                per_page=per_page, 
+                error_out=False
+            )
             return jsonify({
-                'data': [{
-                    'id': v.id,
-                    'fecha': v.fecha.isoformat() if v.fecha else None,
-                    'total': float(v.total),
-                    'cliente_nombre': v.cliente_nombre,
-                    'cliente_documento': v.cliente_documento,
-                    'cliente_telefono': v.cliente_telefono,
-                    'usuario': {
-                        'id': v.usuario.id,
-                        'nombre': v.usuario.nombre
-                    } if v.usuario else None,
-                    'detalles': [{
-                        'id': d.id,
-                        'producto_id': d.producto_id,
-                        'producto': {
-                            'id': d.producto.id,
-                            'nombre': d.producto.nombre
-                        } if d.producto else None,
-                        'cantidad': d.cantidad,
-                        'precio_unitario': float(d.precio_unitario),
-                        'subtotal': float(d.subtotal)
-                    } for d in v.detalles]
-                } for v in all_ventas]
+                'data': {
+                    'ventas': [_venta_a_dict(v) for v in ventas.items],
+                    'total': ventas.total,
+                    'pages': ventas.pages,
+                    'current_page': ventas.page
+                }
             }), 200
         
+        # Se pide un registro extra para saber si existe una página siguiente
+        ventas = VentaRepository.get_page_por_fecha(despues_de, per_page + 1)
+        next_cursor = None
+        if len(ventas) > per_page:
+            ventas = ventas[:per_page]
+            next_cursor = encode_fecha_cursor(ventas[-1].fecha, ventas[-1].id)
+        
         return jsonify({
-            'data': {
-                'ventas': [{
-                    'id': v.id,
-                    'fecha': v.fecha.isoformat() if v.fecha else None,
-                    'total': float(v.total),
-                    'cliente_nombre': v.cliente_nombre,
-                    'cliente_documento': v.cliente_documento,
-                    'cliente_telefono': v.cliente_telefono,
-                    'usuario': {
-                        'id': v.usuario.id,
-                        'nombre': v.usuario.nombre
-                    } if v.usuario else None,
-                    'detalles': [{
-                        'id': d.id,
-                        'producto_id': d.producto_id,
-                        'producto': {
-                            'id': d.producto.id,
-                            'nombre': d.producto.nombre
-                        } if d.producto else None,
-                        'cantidad': d.cantidad,
-                        'precio_unitario': float(d.precio_unitario),
-                        'subtotal': float(d.subtotal)
-                    } for d in v.detalles]
-                } for v in ventas.items],
-                'total': ventas.total,
-                'pages': ventas.pages,
-                'current_page': ventas.page
+            'data': [_venta_a_dict(v) for v in ventas],
+            'pagination': {
+                'limit': per_page,
+                'next_cursor': next_cursor,
+                'has_next': next_cursor is not None
             }
         }), 200
         
@@ -1023,7 +1032,7 @@ def create_venta(current_user):
         
         # Crear la venta
         nueva_venta = Venta(
-            fecha=datetime.now(timezone.utc),
+            fecha=ahora(),
             total=total,
             usuario_id=current_user.id,
             cliente_nombre=data.get('cliente_nombre'),
@@ -1035,6 +1044,8 @@ def create_venta(current_user):
         db.session.flush()  # Para obtener el ID
         
         # Agregar detalles de venta
+        cantidades = {}
+        lineas = []
         for detalle_data in data['detalles']:
             producto = Producto.query.get(detalle_data['producto_id'])
             cantidad = detalle_data['cantidad']
@@ -1048,16 +1059,24 @@ def create_venta(current_user):
                 precio_unitario=precio_unitario,
                 subtotal=subtotal
             )
-            
-            # Actualizar stock
-            producto.stock -= cantidad
+            cantidades[producto.id] = cantidades.get(producto.id, 0) - cantidad
+            lineas.append((nueva_venta.fecha, producto.id, cantidad, subtotal))
             
             db.session.add(detalle)
         
+        # Actualizar stock con un UPDATE condicional (no vende de más con cajas concurrentes)
+        ProductoRepository.ajustar_stock(cantidades, commit=False)
+        VentaDiariaRepository.acumular([(
+            nueva_venta.fecha, nueva_venta.usuario_id, total, -sum(cantidades.values())
+        )])
+        ProductoVentaDiariaRepository.acumular(lineas)
+        ClienteResumenRepository.acumular([(nueva_venta.cliente_documento, nueva_venta.fecha, total)])
+        
         db.session.commit()
         
         # Recargar venta con detalles para devolver respuesta completa
         venta_creada = Venta.query.get(nueva_venta.id)
+        serie_ventas_cache.invalidar_cerrados([venta_creada.fecha])
         
         return jsonify({
             'data': {
@@ -1079,6 +1098,13 @@ def create_venta(current_user):
             'message': 'Venta creada exitosamente'
         }), 201
         
+    except StockError as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
+    except BusinessLogicError as e:
+        # Caja del día cerrada (409)
+        db.session.rollback()
+        return jsonify({'message': str(e)}), e.status_code
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': 'Error al crear venta', 'detail': str(e)}), 500
@@ -1092,37 +1118,24 @@ def anular_venta(current_user, venta_id):
         print(f"🔍 DEBUG - Intentando anular venta {venta_id}")
         print(f"🔍 DEBUG - Usuario: {current_user.nombre}, Rol: {current_user.rol}")
         
-        venta = Venta.query.get_or_404(venta_id)
-        
-        # Restaurar el stock de todos los productos
-        for detalle in venta.detalles:
-            producto = Producto.query.get(detalle.producto_id)
-            if producto:
-                producto.stock += detalle.cantidad
-                print(f"✅ Stock restaurado: {producto.nombre} +{detalle.cantidad} = {producto.stock}")
-        
-        # Registrar en auditoría la anulación
-        from app.utils.auditoria import auditar_cambio_registro
-        auditar_cambio_registro(
-            usuario_id=current_user.id,
-            accion='ANULAR',
-            tabla_afectada='ventas',
-            registro_id=venta.id,
-            datos_anteriores={'total': float(venta.total), 'fecha': str(venta.fecha)}
+        # Stock, resúmenes, borrado y auditoría en una transacción con
+        # sentencias por conjunto (ver VentaRepository.anular)
+        resultado = get_container().resolve('anular_ventas_use_case').execute(
+            [venta_id],
+            current_user.id,
+            ip_address=request.environ.get('HTTP_X_FORWARDED_FOR', request.environ.get('REMOTE_ADDR')),
+            user_agent=request.environ.get('HTTP_USER_AGENT')
         )
-        
-        # Eliminar detalles de venta
-        for detalle in venta.detalles:
-            db.session.delete(detalle)
-        
-        # Eliminar la venta
-        db.session.delete(venta)
-        db.session.commit()
+        if not resultado['anuladas']:
+            return jsonify({'message': 'Venta no encontrada'}), 404
         
         return jsonify({
             'message': 'Venta anulada exitosamente y stock restaurado'
         }), 200
         
+    except BusinessLogicError as e:
+        # Caja del día de la venta cerrada (409)
+        return jsonify({'message': str(e)}), e.status_code
     except Exception as e:
         db.session.rollback()
         print(f"❌ Error anulando venta: {str(e)}")
@@ -1143,7 +1156,9 @@ def reporte_ventas_por_fecha(current_user):
         inicio = datetime.strptime(fecha_inicio, '%Y-%m-%d')
         fin = datetime.strptime(fecha_fin, '%Y-%m-%d')
         
-        ventas = Venta.query.filter(
+        # El listado es por venta: se leen las ventas del rango, con su usuario
+        # en el mismo SELECT. Los totales por día salen de /dashboard/ventas-por-dia
+        ventas = Venta.query.options(joinedload(Venta.usuario)).filter(
             Venta.fecha >= inicio,
             Venta.fecha <= fin
         ).all()
@@ -1172,24 +1187,14 @@ def reporte_productos_mas_vendidos(current_user):
     try:
         limit = request.args.get('limit', 10, type=int)
         
-        productos = db.session.query(
-            Producto.id,
-            Producto.nombre,
-            func.sum(DetalleVenta.cantidad).label('total_vendido'),
-            func.sum(DetalleVenta.subtotal).label('total_ingresos')
-        ).join(
-            DetalleVenta
-        ).group_by(
-            Producto.id, Producto.nombre
-        ).order_by(
-            func.sum(DetalleVenta.cantidad).desc()
-        ).limit(limit).all()
+        # Todo el historial: se suman los contadores diarios por producto
+        productos = ProductoVentaDiariaRepository.top_productos(limit)
         
         return jsonify([{
-            'id': p.id,
-            'nombre': p.nombre,
-            'total_vendido': int(p.total_vendido),
-            'total_ingresos': float(p.total_ingresos)
+            'id': p['id'],
+            'nombre': p['nombre'],
+            'total_vendido': p['total_vendido'],
+            'total_ingresos': p['ingresos']
         } for p in productos]), 200
         
     except Exception as e:
@@ -3,7 +3,9 @@ Application Layer - DTOs (Data Transfer Objects)
 Objetos para transferencia y validación de datos entre capas
 """
 from .proveedor_dto import CreateProveedorDTO, UpdateProveedorDTO, ProveedorResponseDTO
-from .producto_dto import CreateProductoDTO, UpdateProductoDTO, ProductoResponseDTO
+from .producto_dto import (
+    CreateProductoDTO, UpdateProductoDTO, ProductoResponseDTO, ProductoResumenDTO
+)
 from .base_dto import BaseDTO, ValidationError
 
 __all__ = [
@@ -14,5 +16,6 @@ __all__ = [
     'ProveedorResponseDTO',
     'CreateProductoDTO',
     'UpdateProductoDTO',
-    'ProductoResponseDTO'
+    'ProductoResponseDTO',
+    'ProductoResumenDTO'
 ]
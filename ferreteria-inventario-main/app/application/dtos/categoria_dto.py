@@ -71,12 +71,17 @@ class CategoriaResponseDTO(BaseDTO):
     created_at: Optional[str]
     updated_at: Optional[str]
     productos_count: Optional[int] = None  # Opcional: número de productos
+    valor_stock: Optional[float] = None  # Opcional: suma de precio * stock
+    productos_stock_bajo: Optional[int] = None  # Opcional: productos con stock <= stock_minimo
     
     @staticmethod
     def from_entity(entity) -> 'CategoriaResponseDTO':
         """
         Crea un DTO de respuesta desde una entidad Categoria
         
+        El conteo de productos solo se incluye si la relación ya está
+        cargada; nunca se dispara la carga de todos los productos.
+        
         Args:
             entity: Entidad Categoria del modelo
             
@@ -84,8 +89,9 @@ class CategoriaResponseDTO(BaseDTO):
             CategoriaResponseDTO con los datos de la entidad
         """
         productos_count = None
-        if hasattr(entity, 'productos'):
-            productos_count = len(entity.productos) if entity.productos else 0
+        productos = getattr(entity, '__dict__', {}).get('productos')
+        if productos is not None:
+            productos_count = len(productos)
         
         return CategoriaResponseDTO(
             id=entity.id,
@@ -96,6 +102,37 @@ class CategoriaResponseDTO(BaseDTO):
             productos_count=productos_count
         )
     
+    @staticmethod
+    def from_resumen(datos: Dict[str, Any], estadisticas: bool = True) -> 'CategoriaResponseDTO':
+        """
+        Crea un DTO desde una fila de CategoriaRepository.get_with_products_count
+        
+        Args:
+            datos: Diccionario con la categoría y sus estadísticas
+            estadisticas: Si incluir productos_count, valor_stock y productos_stock_bajo
+            
+        Returns:
+            CategoriaResponseDTO con los datos de la fila
+        """
+        if not estadisticas:
+            return CategoriaResponseDTO(
+                id=datos['id'],
+                nombre=datos['nombre'],
+                descripcion=datos['descripcion'],
+                created_at=datos['created_at'].isoformat() if datos['created_at'] else None,
+                updated_at=datos['updated_at'].isoformat() if datos['updated_at'] else None
+            )
+        return CategoriaResponseDTO(
+            id=datos['id'],
+            nombre=datos['nombre'],
+            descripcion=datos['descripcion'],
+            created_at=datos['created_at'].isoformat() if datos['created_at'] else None,
+            updated_at=datos['updated_at'].isoformat() if datos['updated_at'] else None,
+            productos_count=datos['productos_count'],
+            valor_stock=datos['valor_stock'],
+            productos_stock_bajo=datos['productos_stock_bajo']
+        )
+    
     def _get_validation_errors(self) -> Dict[str, List[str]]:
         """Los DTOs de respuesta no necesitan validación"""
         return {}
@@ -104,3 +104,24 @@ class ProductoResponseDTO(BaseDTO):
             data = entity.__dict__
             
         return cls(**{k: v for k, v in data.items() if k in cls.__annotations__})
+
+
+@dataclass
+class ProductoResumenDTO(BaseDTO):
+    """DTO compacto para lecturas de punto de venta (escaneo de código de barras)"""
+    id: int
+    nombre: str
+    precio: float
+    stock: int
+    categoria_id: int
+    codigo_barras: Optional[str] = None
+    
+    @classmethod
+    def from_entity(cls, entity: any) -> 'ProductoResumenDTO':
+        """Crea DTO desde entidad"""
+        if hasattr(entity, 'to_dict'):
+            data = entity.to_dict()
+        else:
+            data = entity.__dict__
+            
+        return cls(**{k: v for k, v in data.items() if k in cls.__annotations__})
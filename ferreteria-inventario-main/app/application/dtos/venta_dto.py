@@ -72,7 +72,7 @@ class CreateVentaDTO(BaseDTO):
         
         # Validar detalles (debe tener al menos un item)
         self._validate_required(self.detalles, 'detalles', errors)
-        if self.detalles:
+        if self.detalles is not None:
             if not isinstance(self.detalles, list):
                 errors.setdefault('detalles', []).append('Los detalles deben ser una lista')
             elif len(self.detalles) == 0:
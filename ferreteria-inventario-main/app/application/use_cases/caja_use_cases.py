@@ -0,0 +1,157 @@
+"""
+Casos de uso para el cierre de caja
+"""
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional
+from app.domain.interfaces.venta_diaria_repository_interface import IVentaDiariaRepository
+from app.domain.interfaces.cierre_caja_repository_interface import ICierreCajaRepository
+from app.exceptions import BusinessLogicError, ValidationError
+from app.utils.fechas import hoy
+
+
+def _parsear_fecha(valor: Optional[str], campo: str = 'fecha') -> Optional[date]:
+    if not valor:
+        return None
+    try:
+        return date.fromisoformat(valor)
+    except (TypeError, ValueError):
+        raise ValidationError(f"{campo} debe tener el formato YYYY-MM-DD", field=campo)
+
+
+class GetResumenCajaUseCase:
+    """
+    Caso de uso para el resumen de caja de un vendedor en un día
+
+    Si el día está cerrado devuelve la copia del cierre; si no, la fila
+    del resumen diario que se mantiene al vender y anular. En ambos casos
+    es una lectura por clave, sin recorrer las ventas.
+    """
+
+    def __init__(self, venta_diaria_repository: IVentaDiariaRepository,
+                 cierre_repository: ICierreCajaRepository):
+        self._diaria_repo = venta_diaria_repository
+        self._cierre_repo = cierre_repository
+
+    def execute(self, usuario_id: int, fecha: Optional[str] = None) -> Dict:
+        """
+        Obtiene el resumen de caja
+
+        Args:
+            usuario_id: ID del vendedor
+            fecha: Día en formato ISO (por defecto, hoy)
+
+        Returns:
+            Diccionario con fecha, usuario_id, cantidad_ventas, total, items,
+            anulaciones, total_anulado, cerrado y cierre (si está cerrado)
+
+        Raises:
+            ValidationError: Si la fecha es inválida
+        """
+        dia = _parsear_fecha(fecha) or hoy()
+
+        cierre = self._cierre_repo.get_cierre(dia, usuario_id)
+        if cierre is not None:
+            return {**self._valores(cierre, dia, usuario_id), 'cerrado': True,
+                    'cierre': cierre.to_dict()}
+
+        resumen = self._diaria_repo.get_dia(dia, usuario_id)
+        return {**self._valores(resumen, dia, usuario_id), 'cerrado': False, 'cierre': None}
+
+    @staticmethod
+    def _valores(fila, dia: date, usuario_id: int) -> Dict:
+        return {
+            'fecha': dia.isoformat(),
+            'usuario_id': usuario_id,
+            'cantidad_ventas': fila.cantidad_ventas if fila else 0,
+            'total': float(fila.total) if fila else 0.0,
+            'items': fila.items if fila else 0,
+            'anulaciones': fila.anulaciones if fila else 0,
+            'total_anulado': float(fila.total_anulado) if fila else 0.0
+        }
+
+
+class CerrarCajaUseCase:
+    """Caso de uso para cerrar la caja de un vendedor en un día"""
+
+    def __init__(self, cierre_repository: ICierreCajaRepository):
+        self._repository = cierre_repository
+
+    def execute(self, usuario_id: int, cerrado_por: int, fecha: Optional[str] = None,
+                monto_declarado=None, observaciones: Optional[str] = None) -> Dict:
+        """
+        Congela el resumen del día en un cierre
+
+        Args:
+            usuario_id: ID del vendedor cuya caja se cierra
+            cerrado_por: ID del usuario que ejecuta el cierre
+            fecha: Día en formato ISO (por defecto, hoy)
+            monto_declarado: Efectivo contado en la caja (opcional)
+            observaciones: Nota del cierre (opcional, máximo 255 caracteres)
+
+        Returns:
+            Diccionario del cierre creado (con la diferencia si se declaró monto)
+
+        Raises:
+            ValidationError: Si la fecha es futura o los datos son inválidos
+            BusinessLogicError: Si el día ya estaba cerrado (409)
+        """
+        dia = _parsear_fecha(fecha) or hoy()
+        if dia > hoy():
+            raise ValidationError("No se puede cerrar la caja de un día futuro", field='fecha')
+
+        if monto_declarado is not None:
+            if isinstance(monto_declarado, bool):
+                raise ValidationError("monto_declarado debe ser un número", field='monto_declarado')
+            try:
+                monto_declarado = Decimal(str(monto_declarado))
+            except InvalidOperation:
+                raise ValidationError("monto_declarado debe ser un número", field='monto_declarado')
+            if not monto_declarado.is_finite() or monto_declarado < 0:
+                raise ValidationError("monto_declarado no puede ser negativo", field='monto_declarado')
+
+        if observaciones is not None and len(str(observaciones)) > 255:
+            raise ValidationError("observaciones no puede superar 255 caracteres", field='observaciones')
+
+        cierre = self._repository.cerrar(dia, usuario_id, cerrado_por,
+                                         monto_declarado=monto_declarado,
+                                         observaciones=observaciones)
+        if cierre is None:
+            raise BusinessLogicError(f"La caja del {dia.isoformat()} ya está cerrada", 409)
+        return cierre.to_dict()
+
+
+class GetCierresCajaUseCase:
+    """Caso de uso para el historial de cierres de caja"""
+
+    MAX_CIERRES = 500
+
+    def __init__(self, cierre_repository: ICierreCajaRepository):
+        self._repository = cierre_repository
+
+    def execute(self, desde: Optional[str] = None, hasta: Optional[str] = None,
+                usuario_id: Optional[int] = None, limit: int = 100) -> List[Dict]:
+        """
+        Obtiene los cierres de un rango, los más recientes primero
+
+        Args:
+            desde: Primer día en formato ISO (opcional)
+            hasta: Último día en formato ISO, inclusive (opcional)
+            usuario_id: Solo los cierres de este vendedor (opcional)
+            limit: Máximo de cierres (1 a MAX_CIERRES)
+
+        Returns:
+            Lista de cierres
+
+        Raises:
+            ValidationError: Si las fechas o el límite son inválidos
+        """
+        inicio = _parsear_fecha(desde, 'desde')
+        fin = _parsear_fecha(hasta, 'hasta')
+        if inicio and fin and inicio > fin:
+            raise ValidationError("desde no puede ser posterior a hasta")
+        if limit < 1 or limit > self.MAX_CIERRES:
+            raise ValidationError(f"limit debe estar entre 1 y {self.MAX_CIERRES}", field='limit')
+
+        cierres = self._repository.get_cierres(inicio, fin, usuario_id=usuario_id, limit=limit)
+        return [cierre.to_dict() for cierre in cierres]
@@ -8,6 +8,17 @@ from app.application.dtos.categoria_dto import (
 )
 from app.exceptions import BusinessLogicError, NotFoundError
 
+# Las estadísticas por categoría dependen de ambas tablas
+CLAVE_RESUMEN = 'categorias:resumen'
+TABLAS_RESUMEN = ('categorias', 'productos')
+
+
+def _resumen_categorias(repository: ICategoriaRepository, cache=None) -> List[Dict]:
+    """Estadísticas de todas las categorías, cacheadas hasta la próxima escritura"""
+    if cache is None:
+        return repository.get_with_products_count()
+    return cache.obtener(CLAVE_RESUMEN, TABLAS_RESUMEN, repository.get_with_products_count)
+
 
 class CreateCategoriaUseCase:
     """Caso de uso para crear una categoría"""
@@ -121,10 +132,12 @@ class DeleteCategoriaUseCase:
         if not categoria:
             raise NotFoundError(f"Categoría con ID {id} no encontrada")
         
-        # 2. Verificar que no tenga productos asociados
-        if hasattr(categoria, 'productos') and categoria.productos and len(categoria.productos) > 0:
+        # 2. Verificar que no tenga productos asociados (conteo agregado, sin cargarlos)
+        resumen = self._repository.get_with_products_count(id)
+        productos_count = resumen[0]['productos_count'] if resumen else 0
+        if productos_count > 0:
             raise BusinessLogicError(
-                f"No se puede eliminar la categoría '{categoria.nombre}' porque tiene {len(categoria.productos)} producto(s) asociado(s)"
+                f"No se puede eliminar la categoría '{categoria.nombre}' porque tiene {productos_count} producto(s) asociado(s)"
             )
         
         # 3. Eliminar
@@ -134,8 +147,9 @@ class DeleteCategoriaUseCase:
 class GetCategoriaUseCase:
     """Caso de uso para obtener una categoría por ID"""
     
-    def __init__(self, repository: ICategoriaRepository):
+    def __init__(self, repository: ICategoriaRepository, cache=None):
         self._repository = repository
+        self._cache = cache
     
     def execute(self, id: int) -> CategoriaResponseDTO:
         """
@@ -145,47 +159,52 @@ class GetCategoriaUseCase:
             id: ID de la categoría
             
         Returns:
-            CategoriaResponseDTO con los datos de la categoría
+            CategoriaResponseDTO con los datos y estadísticas de la categoría
             
         Raises:
             NotFoundError: Si la categoría no existe
         """
-        categoria = self._repository.get_by_id(id)
-        if not categoria:
-            raise NotFoundError(f"Categoría con ID {id} no encontrada")
+        for datos in _resumen_categorias(self._repository, self._cache):
+            if datos['id'] == id:
+                return CategoriaResponseDTO.from_resumen(datos)
         
-        return CategoriaResponseDTO.from_entity(categoria)
+        raise NotFoundError(f"Categoría con ID {id} no encontrada")
 
 
 class GetAllCategoriasUseCase:
     """Caso de uso para obtener todas las categorías"""
     
-    def __init__(self, repository: ICategoriaRepository):
+    def __init__(self, repository: ICategoriaRepository, cache=None):
         self._repository = repository
+        self._cache = cache
     
     def execute(self, with_products_count: bool = False) -> List[CategoriaResponseDTO]:
         """
         Obtiene todas las categorías
         
+        Las filas salen de una sola consulta agregada cacheada hasta la
+        próxima escritura en categorías o productos; las estadísticas
+        (conteo de productos, valor del stock y productos con stock bajo)
+        solo se incluyen si se piden.
+        
         Args:
-            with_products_count: Si True, incluye el conteo de productos por categoría
+            with_products_count: Si incluir las estadísticas de productos
             
         Returns:
             Lista de CategoriaResponseDTO
         """
-        if with_products_count:
-            categorias = self._repository.get_with_products_count()
-        else:
-            categorias = self._repository.get_all()
-        
-        return [CategoriaResponseDTO.from_entity(c) for c in categorias]
+        return [
+            CategoriaResponseDTO.from_resumen(datos, estadisticas=with_products_count)
+            for datos in _resumen_categorias(self._repository, self._cache)
+        ]
 
 
 class SearchCategoriasUseCase:
     """Caso de uso para buscar categorías"""
     
-    def __init__(self, repository: ICategoriaRepository):
+    def __init__(self, repository: ICategoriaRepository, cache=None):
         self._repository = repository
+        self._cache = cache
     
     def execute(self, term: str) -> List[CategoriaResponseDTO]:
         """
@@ -206,4 +225,9 @@ class SearchCategoriasUseCase:
             )
         
         categorias = self._repository.search_categorias(term)
-        return [CategoriaResponseDTO.from_entity(c) for c in categorias]
+        resumen = {datos['id']: datos for datos in _resumen_categorias(self._repository, self._cache)}
+        return [
+            CategoriaResponseDTO.from_resumen(resumen[c.id]) if c.id in resumen
+            else CategoriaResponseDTO.from_entity(c)
+            for c in categorias
+        ]
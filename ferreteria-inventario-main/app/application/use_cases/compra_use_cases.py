@@ -7,13 +7,14 @@ Principios aplicados:
 - Dependency Inversion: Dependen de interfaces, no de implementaciones
 - Business Logic Isolation: Lógica de negocio separada de infraestructura
 """
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 from decimal import Decimal
 from app.domain.interfaces.compra_repository_interface import ICompraRepository
 from app.domain.interfaces.producto_repository_interface import IProductoRepository
 from app.application.dtos.compra_dto import CreateCompraDTO, CompraResponseDTO, ComprasSummaryDTO
 from app.exceptions import NotFoundError, ValidationError, BusinessLogicError
+from app.utils.fieldsets import proyectar
 
 
 class CreateCompraUseCase:
@@ -25,8 +26,8 @@ class CreateCompraUseCase:
     2. Verificar que el producto existe
     3. Verificar que el proveedor existe (si se proporcionó)
     4. Calcular el total
-    5. Crear la compra
-    6. Actualizar stock del producto (SUMAR cantidad)
+    5. Actualizar stock del producto (SUMAR cantidad, UPDATE atómico)
+    6. Crear la compra confirmando ambas escrituras en un único commit
     7. Retornar DTO de respuesta
     
     Nota: Requiere dos repositorios (Compra + Producto) para coordinar
@@ -84,12 +85,15 @@ class CreateCompraUseCase:
             'usuario_id': dto.usuario_id
         }
         
-        # 6. Crear la compra
-        compra = self.compra_repository.create(**compra_data)
+        # 6. Actualizar stock del producto (SUMAR) sin leer y escribir desde Python
+        try:
+            self.producto_repository.ajustar_stock({dto.producto_id: dto.cantidad}, commit=False)
+        except Exception:
+            self.producto_repository.rollback()
+            raise
         
-        # 7. Actualizar stock del producto (SUMAR)
-        nuevo_stock = producto.stock + dto.cantidad
-        self.producto_repository.update(dto.producto_id, {'stock': nuevo_stock})
+        # 7. Crear la compra (el commit incluye el ajuste de stock)
+        compra = self.compra_repository.create(compra_data)
         
         # 8. Retornar DTO de respuesta
         return CompraResponseDTO.from_entity(compra).to_dict()
@@ -127,16 +131,23 @@ class GetAllComprasUseCase:
     def __init__(self, compra_repository: ICompraRepository):
         self.compra_repository = compra_repository
     
-    def execute(self, limit: Optional[int] = None) -> List[Dict]:
+    def execute(self, limit: Optional[int] = None,
+                fields: Optional[Tuple[str, ...]] = None) -> List[Dict]:
         """
         Obtiene todas las compras
         
         Args:
             limit: Límite de resultados (opcional)
+            fields: Columnas a devolver (opcional). Con proyección no se
+                cargan producto, proveedor ni usuario
             
         Returns:
             Lista de diccionarios con las compras
         """
+        if fields:
+            filas = self.compra_repository.get_projection(fields, limit=limit if limit and limit > 0 else None)
+            return [proyectar(f, fields) for f in filas]
+        
         compras = self.compra_repository.get_all()
         
         # Aplicar límite si se especificó
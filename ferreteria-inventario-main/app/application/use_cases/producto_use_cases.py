@@ -1,13 +1,22 @@
 """
 Casos de uso para el módulo de Productos
 """
-from typing import Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from decimal import Decimal
 from app.domain.interfaces.producto_repository_interface import IProductoRepository
 from app.application.dtos.producto_dto import (
-    CreateProductoDTO, UpdateProductoDTO, ProductoResponseDTO
+    CreateProductoDTO, UpdateProductoDTO, ProductoResponseDTO, ProductoResumenDTO
 )
-from app.exceptions import BusinessLogicError, NotFoundError
+from app.application.dtos.base_dto import ValidationError
+from app.exceptions import BusinessLogicError, NotFoundError, DatabaseError
+from app.utils.pagination import CursorPaginatedResponse, encode_cursor, decode_cursor
+from app.utils.importacion import FilaImportacion, en_lotes
+from app.utils.fieldsets import proyectar
+
+
+def _catalogo_cubre(catalog, fields: Tuple[str, ...]) -> bool:
+    """Indica si el snapshot del catálogo tiene todas las columnas pedidas"""
+    return catalog is not None and set(fields) <= catalog.CAMPOS
 
 
 class CreateProductoUseCase:
@@ -145,8 +154,9 @@ class DeleteProductoUseCase:
 class GetProductoUseCase:
     """Caso de uso para obtener un producto por ID"""
     
-    def __init__(self, repository: IProductoRepository):
+    def __init__(self, repository: IProductoRepository, catalog=None):
         self._repository = repository
+        self._catalog = catalog
     
     def execute(self, id: int) -> ProductoResponseDTO:
         """
@@ -161,7 +171,10 @@ class GetProductoUseCase:
         Raises:
             NotFoundError: Si el producto no existe
         """
-        producto = self._repository.get_by_id(id)
+        if self._catalog is not None:
+            producto = self._catalog.obtener().get(id)
+        else:
+            producto = self._repository.get_by_id(id)
         if not producto:
             raise NotFoundError(f"Producto con ID {id} no encontrado")
         
@@ -171,20 +184,34 @@ class GetProductoUseCase:
 class GetAllProductosUseCase:
     """Caso de uso para obtener todos los productos"""
     
-    def __init__(self, repository: IProductoRepository):
+    def __init__(self, repository: IProductoRepository, catalog=None):
         self._repository = repository
+        self._catalog = catalog
     
-    def execute(self, categoria_id: int = None) -> List[ProductoResponseDTO]:
+    def execute(self, categoria_id: int = None,
+                fields: Optional[Tuple[str, ...]] = None) -> List[ProductoResponseDTO]:
         """
         Obtiene todos los productos, opcionalmente filtrados por categoría
         
         Args:
             categoria_id: ID de categoría para filtrar (opcional)
+            fields: Columnas a devolver (opcional). Con proyección se
+                devuelven diccionarios solo con esas claves
             
         Returns:
-            Lista de ProductoResponseDTO
+            Lista de ProductoResponseDTO (o de diccionarios si hay `fields`)
         """
-        if categoria_id:
+        if fields:
+            if _catalogo_cubre(self._catalog, fields):
+                productos = self._catalog.obtener().listar(categoria_id)
+            else:
+                filtros = {'categoria_id': categoria_id} if categoria_id else None
+                productos = self._repository.get_projection(fields, filtros=filtros)
+            return [proyectar(p, fields) for p in productos]
+        
+        if self._catalog is not None:
+            productos = self._catalog.obtener().listar(categoria_id)
+        elif categoria_id:
             productos = self._repository.get_by_categoria(categoria_id)
         else:
             productos = self._repository.get_all()
@@ -192,49 +219,286 @@ class GetAllProductosUseCase:
         return [ProductoResponseDTO.from_entity(p) for p in productos]
 
 
+class GetProductosPageUseCase:
+    """Caso de uso para obtener productos paginados por cursor (keyset)"""
+    
+    def __init__(self, repository: IProductoRepository, catalog=None):
+        self._repository = repository
+        self._catalog = catalog
+    
+    def execute(self, cursor: Optional[str] = None, limit: int = 20,
+                categoria_id: int = None,
+                include_total: bool = False,
+                fields: Optional[Tuple[str, ...]] = None) -> CursorPaginatedResponse:
+        """
+        Obtiene una página de productos a partir de un cursor opaco
+        
+        Args:
+            cursor: Cursor devuelto en la página anterior (None/vacío = primera página)
+            limit: Cantidad de productos por página
+            categoria_id: ID de categoría para filtrar (opcional)
+            include_total: Si True, calcula el total de productos (consulta adicional)
+            fields: Columnas a devolver (opcional)
+            
+        Returns:
+            CursorPaginatedResponse con ProductoResponseDTO (o diccionarios
+            si hay `fields`) y el siguiente cursor
+            
+        Raises:
+            BusinessLogicError: Si el cursor es inválido
+        """
+        try:
+            after_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise BusinessLogicError(str(e))
+        
+        # Se pide un registro extra para saber si existe una página siguiente
+        fuente = None
+        if self._catalog is not None and (not fields or _catalogo_cubre(self._catalog, fields)):
+            fuente = self._catalog.obtener()
+        if fuente is not None:
+            productos = fuente.pagina(after_id=after_id, limit=limit + 1,
+                                      categoria_id=categoria_id)
+        else:
+            productos = self._repository.get_page(
+                after_id=after_id,
+                limit=limit + 1,
+                categoria_id=categoria_id,
+                fields=fields
+            )
+        
+        next_cursor = None
+        if len(productos) > limit:
+            productos = productos[:limit]
+            next_cursor = encode_cursor(productos[-1].id)
+        
+        total_items = None
+        if include_total:
+            if fuente is not None:
+                total_items = fuente.count(categoria_id)
+            else:
+                total_items = self._repository.count_by_categoria(categoria_id)
+        
+        if fields:
+            items = [proyectar(p, fields) for p in productos]
+        else:
+            items = [ProductoResponseDTO.from_entity(p) for p in productos]
+        
+        return CursorPaginatedResponse(
+            items=items,
+            limit=limit,
+            next_cursor=next_cursor,
+            total_items=total_items
+        )
+
+
 class SearchProductosUseCase:
     """Caso de uso para buscar productos"""
     
-    def __init__(self, repository: IProductoRepository):
+    def __init__(self, repository: IProductoRepository, catalog=None, fuzzy_index=None):
         self._repository = repository
+        self._catalog = catalog
+        self._fuzzy_index = fuzzy_index
     
-    def execute(self, term: str) -> List[ProductoResponseDTO]:
+    def execute(self, term: str, page: int = 1, per_page: int = 20,
+                fuzzy: bool = False, umbral: float = 0.3) -> List[ProductoResponseDTO]:
         """
-        Busca productos por nombre
+        Busca productos por nombre, descripción o código de barras
         
         Args:
             term: Término de búsqueda (mínimo 2 caracteres)
+            page: Número de página
+            per_page: Resultados por página
+            fuzzy: Si True, búsqueda tolerante a errores de tipeo por
+                   similitud de trigramas sobre el nombre
+            umbral: Similitud mínima (0-1) en modo fuzzy
             
         Returns:
             Lista de ProductoResponseDTO con productos encontrados
             
         Raises:
-            BusinessLogicError: Si el término es muy corto
+            BusinessLogicError: Si el término es muy corto o el umbral inválido
         """
         if not term or len(term) < 2:
             raise BusinessLogicError(
                 "El término de búsqueda debe tener al menos 2 caracteres"
             )
         
-        productos = self._repository.search_products(term)
+        offset = (page - 1) * per_page
+        
+        if fuzzy and self._fuzzy_index is not None and self._catalog is not None:
+            if not 0 < umbral <= 1:
+                raise BusinessLogicError("El umbral de similitud debe estar entre 0 y 1")
+            # Sincroniza el catálogo (y con él el índice de trigramas)
+            snapshot = self._catalog.obtener()
+            coincidencias = self._fuzzy_index.buscar(term, umbral=umbral, limit=offset + per_page)
+            productos = [snapshot.get(pid) for pid, _ in coincidencias[offset:]]
+            return [ProductoResponseDTO.from_entity(p) for p in productos if p is not None]
+        
+        productos = self._repository.search_products(
+            term,
+            limit=per_page,
+            offset=offset
+        )
         return [ProductoResponseDTO.from_entity(p) for p in productos]
 
 
+class GetProductosByBarcodeUseCase:
+    """Caso de uso para resolver códigos de barras escaneados en caja"""
+    
+    MAX_CODIGOS = 500
+    
+    def __init__(self, repository: IProductoRepository, catalog=None, barcode_index=None):
+        self._repository = repository
+        self._catalog = catalog
+        self._barcode_index = barcode_index
+    
+    def execute(self, codigos: List[str]) -> Dict[str, ProductoResumenDTO]:
+        """
+        Resuelve uno o varios códigos de barras
+        
+        Args:
+            codigos: Lista de códigos de barras
+            
+        Returns:
+            Diccionario codigo -> ProductoResumenDTO (solo los encontrados)
+            
+        Raises:
+            BusinessLogicError: Si la lista está vacía o supera el máximo
+        """
+        codigos = [str(c).strip() for c in codigos if c is not None and str(c).strip()]
+        if not codigos:
+            raise BusinessLogicError("Debe indicar al menos un código de barras")
+        if len(codigos) > self.MAX_CODIGOS:
+            raise BusinessLogicError(
+                f"Máximo {self.MAX_CODIGOS} códigos por consulta (recibidos: {len(codigos)})"
+            )
+        
+        if self._catalog is not None and self._barcode_index is not None:
+            snapshot = self._catalog.obtener()
+            encontrados = {}
+            for codigo in codigos:
+                producto_id = self._barcode_index.buscar(codigo)
+                registro = snapshot.get(producto_id) if producto_id is not None else None
+                if registro is not None:
+                    encontrados[codigo] = ProductoResumenDTO.from_entity(registro)
+            return encontrados
+        
+        productos = self._repository.get_by_codigos_barras(list(set(codigos)))
+        por_codigo = {p.codigo_barras: p for p in productos}
+        return {
+            codigo: ProductoResumenDTO.from_entity(por_codigo[codigo])
+            for codigo in codigos if codigo in por_codigo
+        }
+
+
+class AutocompleteProductosUseCase:
+    """Caso de uso para sugerir productos por prefijo del nombre"""
+    
+    MAX_RESULTADOS = 50
+    
+    def __init__(self, repository: IProductoRepository, catalog=None, autocomplete_index=None):
+        self._repository = repository
+        self._catalog = catalog
+        self._autocomplete_index = autocomplete_index
+    
+    def execute(self, prefijo: str, limit: int = 10) -> List[ProductoResumenDTO]:
+        """
+        Obtiene los primeros productos (orden alfabético) cuyo nombre
+        empieza con el prefijo, sin distinguir mayúsculas ni acentos
+        
+        Args:
+            prefijo: Texto escrito por el usuario
+            limit: Cantidad máxima de sugerencias
+            
+        Returns:
+            Lista de ProductoResumenDTO
+            
+        Raises:
+            BusinessLogicError: Si el prefijo está vacío
+        """
+        prefijo = (prefijo or '').strip()
+        if not prefijo:
+            raise BusinessLogicError("Debe indicar un prefijo")
+        limit = max(1, min(limit, self.MAX_RESULTADOS))
+        
+        if self._catalog is not None and self._autocomplete_index is not None:
+            snapshot = self._catalog.obtener()
+            registros = (snapshot.get(i) for i in self._autocomplete_index.buscar(prefijo, limit))
+            return [ProductoResumenDTO.from_entity(r) for r in registros if r is not None]
+        
+        productos = self._repository.get_by_nombre_prefix(prefijo, limit=limit)
+        return [ProductoResumenDTO.from_entity(p) for p in productos]
+
+
 class GetStockBajoUseCase:
-    """Caso de uso para obtener productos con stock bajo"""
+    """
+    Caso de uso para obtener productos con stock bajo
     
-    def __init__(self, repository: IProductoRepository):
+    Con el índice de stock bajo en memoria, las lecturas cuestan O(k) y no
+    recorren la tabla productos.
+    """
+    
+    def __init__(self, repository: IProductoRepository, catalog=None, low_stock_index=None):
         self._repository = repository
+        self._catalog = catalog
+        self._low_stock_index = low_stock_index
+    
+    def _fuente(self):
+        """Índice vigente (sincroniza el catálogo) o None si no está disponible"""
+        if self._catalog is None or self._low_stock_index is None:
+            return None
+        snapshot = self._catalog.obtener()
+        return snapshot, self._low_stock_index
     
-    def execute(self) -> List[ProductoResponseDTO]:
+    def execute(self, limit: Optional[int] = None) -> List[ProductoResponseDTO]:
         """
         Obtiene productos con stock menor o igual al stock mínimo
         
+        Args:
+            limit: Cantidad máxima de productos (opcional)
+            
         Returns:
-            Lista de ProductoResponseDTO con productos con stock bajo
+            Lista de ProductoResponseDTO, los de menor stock primero
         """
-        productos = self._repository.get_stock_bajo()
+        fuente = self._fuente()
+        if fuente is not None:
+            snapshot, indice = fuente
+            registros = (snapshot.get(i) for i in indice.ids(limit))
+            return [ProductoResponseDTO.from_entity(r) for r in registros if r is not None]
+        
+        productos = self._repository.get_stock_bajo(limit)
         return [ProductoResponseDTO.from_entity(p) for p in productos]
+    
+    def entidades(self, limit: Optional[int] = None) -> List[Any]:
+        """
+        Productos con stock bajo como entidades (con categoría y proveedor),
+        para reportes y exportaciones. Solo se leen por clave primaria los
+        productos del índice.
+        """
+        fuente = self._fuente()
+        if fuente is not None:
+            _, indice = fuente
+            return self._repository.get_by_ids(indice.ids(limit))
+        return self._repository.get_stock_bajo(limit)
+    
+    def contar(self) -> Dict[str, int]:
+        """
+        Contadores para el dashboard
+        
+        Returns:
+            {"stock_bajo": n, "sin_stock": m}
+        """
+        fuente = self._fuente()
+        if fuente is not None:
+            _, indice = fuente
+            return {'stock_bajo': len(indice), 'sin_stock': indice.contar_sin_stock()}
+        
+        productos = self._repository.get_stock_bajo()
+        return {
+            'stock_bajo': len(productos),
+            'sin_stock': sum(1 for p in productos if p.stock <= 0)
+        }
 
 
 class UpdateStockUseCase:
@@ -283,3 +547,292 @@ class UpdateStockUseCase:
         
         # 6. Retornar DTO de respuesta
         return ProductoResponseDTO.from_entity(updated)
+
+
+class BulkUpdateProductosUseCase:
+    """
+    Caso de uso para ajustes masivos de precio y stock mínimo
+    (p. ej. aumento de lista de precios de un proveedor)
+    """
+    
+    TIPOS_AJUSTE = ('porcentaje', 'monto', 'fijo')
+    CAMPOS_AJUSTABLES = ('precio', 'stock_minimo')
+    MAX_IDS = 5000
+    
+    def __init__(self, repository: IProductoRepository):
+        self._repository = repository
+    
+    def execute(self, data: Dict, usuario_id: Optional[int] = None,
+                ip_address: Optional[str] = None, user_agent: Optional[str] = None) -> Dict:
+        """
+        Aplica un ajuste a todos los productos que cumplen el filtro
+        
+        Args:
+            data: Diccionario con
+                - filtro: {'ids': [...]} o {'categoria_id': n} y/o {'proveedor_id': m}
+                - precio: {'tipo': 'porcentaje'|'monto'|'fijo', 'valor': número} (opcional)
+                - stock_minimo: {'tipo': ..., 'valor': número} (opcional)
+            usuario_id: Usuario que realiza el ajuste (para auditoría)
+            ip_address: IP de origen (auditoría)
+            user_agent: User agent (auditoría)
+            
+        Returns:
+            {'actualizados': n}
+            
+        Raises:
+            BusinessLogicError: Si el filtro o los ajustes son inválidos
+        """
+        filtro = self._validar_filtro(data.get('filtro') or {})
+        ajustes = {
+            campo: self._validar_ajuste(campo, data[campo])
+            for campo in self.CAMPOS_AJUSTABLES if data.get(campo) is not None
+        }
+        if not ajustes:
+            raise BusinessLogicError("Debe indicar un ajuste de 'precio' y/o 'stock_minimo'")
+        
+        auditoria = None
+        if usuario_id:
+            auditoria = {
+                'usuario_id': usuario_id,
+                'accion': 'actualizacion_masiva_productos',
+                'tabla_afectada': 'productos',
+                'datos_nuevos': {'filtro': filtro, 'ajustes': ajustes},
+                'ip_address': ip_address,
+                'user_agent': user_agent
+            }
+        
+        actualizados = self._repository.bulk_adjust(filtro, ajustes, auditoria=auditoria)
+        return {'actualizados': actualizados}
+    
+    def _validar_filtro(self, filtro: Dict) -> Dict:
+        if filtro.get('ids') is not None:
+            ids = filtro['ids']
+            if not isinstance(ids, list) or not ids:
+                raise BusinessLogicError("'ids' debe ser una lista no vacía")
+            if len(ids) > self.MAX_IDS:
+                raise BusinessLogicError(f"Máximo {self.MAX_IDS} ids por operación")
+            try:
+                return {'ids': sorted({int(i) for i in ids})}
+            except (TypeError, ValueError):
+                raise BusinessLogicError("'ids' debe contener solo números enteros")
+        
+        resultado = {}
+        for campo in ('categoria_id', 'proveedor_id'):
+            if filtro.get(campo) is not None:
+                try:
+                    resultado[campo] = int(filtro[campo])
+                except (TypeError, ValueError):
+                    raise BusinessLogicError(f"'{campo}' debe ser un número entero")
+        if not resultado:
+            # Nunca actualizar todo el catálogo por omisión
+            raise BusinessLogicError(
+                "Debe indicar un filtro: 'ids', 'categoria_id' y/o 'proveedor_id'"
+            )
+        return resultado
+    
+    def _validar_ajuste(self, campo: str, ajuste: Dict) -> Dict:
+        if not isinstance(ajuste, dict) or ajuste.get('tipo') not in self.TIPOS_AJUSTE:
+            raise BusinessLogicError(
+                f"'{campo}.tipo' debe ser uno de: {', '.join(self.TIPOS_AJUSTE)}"
+            )
+        try:
+            valor = float(ajuste.get('valor'))
+        except (TypeError, ValueError):
+            raise BusinessLogicError(f"'{campo}.valor' debe ser un número")
+        if ajuste['tipo'] == 'porcentaje' and valor <= -100:
+            raise BusinessLogicError("Un ajuste porcentual debe ser mayor a -100%")
+        return {'tipo': ajuste['tipo'], 'valor': valor}
+
+
+class ImportProductosUseCase:
+    """
+    Caso de uso para importar productos en lote (lista de precios de proveedor)
+    
+    En lugar de un CreateProductoUseCase (consulta de duplicado + commit) por
+    fila, procesa el archivo por lotes: valida cada fila con las reglas de
+    CreateProductoDTO, resuelve duplicados con una consulta set-based por
+    lote e inserta/actualiza el lote en una sola transacción.
+    """
+    
+    CAMPOS_ENTEROS = ('categoria_id', 'stock', 'stock_minimo', 'proveedor_id')
+    CAMPOS_TEXTO = ('nombre', 'descripcion', 'codigo_barras')
+    
+    def __init__(self, repository: IProductoRepository):
+        self._repository = repository
+    
+    def execute(self, filas: Iterable[FilaImportacion], batch_size: int = 500,
+                actualizar_existentes: bool = True) -> Dict:
+        """
+        Importa todas las filas y devuelve el resumen final
+        
+        Args:
+            filas: Iterable de (número de fila, datos, error de lectura)
+            batch_size: Filas por lote (una transacción por lote)
+            actualizar_existentes: Si True, un producto existente (mismo nombre
+                                   y categoría) se actualiza; si False es un error
+            
+        Returns:
+            Resumen con contadores y el reporte de errores por fila
+        """
+        resumen = None
+        for evento in self.iter_progreso(filas, batch_size, actualizar_existentes):
+            resumen = evento
+        return resumen
+    
+    def iter_progreso(self, filas: Iterable[FilaImportacion], batch_size: int = 500,
+                      actualizar_existentes: bool = True) -> Iterator[Dict]:
+        """
+        Importa las filas por lotes emitiendo un evento de progreso por lote
+        
+        Yields:
+            {'tipo': 'progreso', ...} después de cada lote y
+            {'tipo': 'resumen', ..., 'errores': [...]} al finalizar
+        """
+        if batch_size < 1:
+            raise BusinessLogicError("El tamaño de lote debe ser mayor a 0")
+        
+        contadores = {'procesadas': 0, 'insertadas': 0, 'actualizadas': 0, 'con_errores': 0}
+        errores: List[Dict] = []
+        # Claves y códigos ya vistos en el archivo -> fila donde aparecieron
+        vistas: Dict[Any, int] = {}
+        
+        for lote in en_lotes(filas, batch_size):
+            insertadas, actualizadas, errores_lote = self._procesar_lote(
+                lote, vistas, actualizar_existentes
+            )
+            contadores['procesadas'] += len(lote)
+            contadores['insertadas'] += insertadas
+            contadores['actualizadas'] += actualizadas
+            contadores['con_errores'] += len(errores_lote)
+            errores.extend(errores_lote)
+            yield {'tipo': 'progreso', **contadores}
+        
+        yield {'tipo': 'resumen', **contadores, 'errores': errores}
+    
+    def _procesar_lote(self, lote: List[FilaImportacion], vistas: Dict[Any, int],
+                       actualizar_existentes: bool) -> Tuple[int, int, List[Dict]]:
+        errores: List[Dict] = []
+        validas: List[Tuple[int, Dict]] = []
+        
+        # 1. Lectura y validación fila a fila (sin consultas)
+        for numero, datos, error in lote:
+            if error:
+                errores.append({'fila': numero, 'errores': {'_fila': [error]}})
+                continue
+            valores, errores_fila = self._validar(datos)
+            if errores_fila:
+                errores.append({'fila': numero, 'errores': errores_fila})
+            else:
+                validas.append((numero, valores))
+        
+        # 2. Verificaciones set-based: una consulta por lote
+        existentes_cat = self._repository.get_existing_categoria_ids(
+            [v['categoria_id'] for _, v in validas]
+        )
+        coincidencias = self._repository.find_import_matches(
+            [(v['nombre'], v['categoria_id']) for _, v in validas],
+            [v['codigo_barras'] for _, v in validas if v.get('codigo_barras')]
+        )
+        
+        nuevos: List[Dict] = []
+        actualizaciones: List[Dict] = []
+        filas_lote: List[int] = []
+        for numero, valores in validas:
+            error = self._verificar(numero, valores, existentes_cat, coincidencias,
+                                    vistas, actualizar_existentes)
+            if error:
+                errores.append({'fila': numero, 'errores': error})
+                continue
+            
+            existente = coincidencias['por_clave'].get((valores['nombre'], valores['categoria_id']))
+            if existente is not None:
+                actualizaciones.append({'id': existente, **valores})
+            else:
+                nuevos.append(valores)
+            filas_lote.append(numero)
+        
+        # 3. Escritura del lote en una sola transacción
+        try:
+            self._repository.bulk_upsert(nuevos, actualizaciones)
+        except DatabaseError as e:
+            errores.extend({'fila': n, 'errores': {'_lote': [e.message]}} for n in filas_lote)
+            return 0, 0, errores
+        
+        return len(nuevos), len(actualizaciones), errores
+    
+    def _validar(self, datos: Dict) -> Tuple[Dict, Dict[str, List[str]]]:
+        """Convierte tipos y aplica las reglas de CreateProductoDTO"""
+        errores: Dict[str, List[str]] = {}
+        valores: Dict[str, Any] = {}
+        
+        for campo in self.CAMPOS_TEXTO:
+            valor = datos.get(campo)
+            if valor is not None and str(valor).strip():
+                valores[campo] = str(valor).strip()
+        
+        for campo in self.CAMPOS_ENTEROS:
+            valor = datos.get(campo)
+            if valor is None or valor == '':
+                continue
+            try:
+                valores[campo] = int(valor)
+            except (TypeError, ValueError):
+                errores.setdefault(campo, []).append(f"{campo} debe ser un número entero")
+        
+        precio = datos.get('precio')
+        if precio is not None and precio != '':
+            try:
+                valores['precio'] = float(str(precio).replace(',', '.'))
+            except ValueError:
+                errores.setdefault('precio', []).append("precio debe ser un número válido")
+        
+        if len(valores.get('codigo_barras') or '') > 13:
+            errores.setdefault('codigo_barras', []).append(
+                "codigo_barras debe tener como máximo 13 caracteres"
+            )
+        
+        if errores:
+            return valores, errores
+        
+        try:
+            CreateProductoDTO(
+                nombre=valores.get('nombre'),
+                categoria_id=valores.get('categoria_id'),
+                precio=valores.get('precio'),
+                stock=valores.get('stock', 0),
+                stock_minimo=valores.get('stock_minimo', 5),
+                descripcion=valores.get('descripcion')
+            ).validate()
+        except ValidationError as e:
+            return valores, e.errors
+        
+        return valores, {}
+    
+    @staticmethod
+    def _verificar(numero: int, valores: Dict, existentes_cat: set, coincidencias: Dict,
+                   vistas: Dict[Any, int], actualizar_existentes: bool) -> Optional[Dict]:
+        """Reglas que dependen de la base de datos o del resto del archivo"""
+        if valores['categoria_id'] not in existentes_cat:
+            return {'categoria_id': [f"La categoría {valores['categoria_id']} no existe"]}
+        
+        clave = (valores['nombre'], valores['categoria_id'])
+        if clave in vistas:
+            return {'nombre': [f"Producto duplicado en el archivo (fila {vistas[clave]})"]}
+        
+        existente = coincidencias['por_clave'].get(clave)
+        if existente is not None and not actualizar_existentes:
+            return {'nombre': [f"Ya existe un producto '{valores['nombre']}' en esta categoría"]}
+        
+        codigo = valores.get('codigo_barras')
+        if codigo:
+            if ('codigo', codigo) in vistas:
+                return {'codigo_barras': [
+                    f"Código de barras duplicado en el archivo (fila {vistas[('codigo', codigo)]})"
+                ]}
+            dueno = coincidencias['por_codigo'].get(codigo)
+            if dueno is not None and dueno != existente:
+                return {'codigo_barras': ["El código de barras ya está asignado a otro producto"]}
+            vistas[('codigo', codigo)] = numero
+        
+        vistas[clave] = numero
+        return None
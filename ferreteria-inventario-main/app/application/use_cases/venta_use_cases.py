@@ -1,15 +1,79 @@
 """
 Casos de uso para el módulo de Ventas
 """
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta
 from decimal import Decimal
 from app.domain.interfaces.venta_repository_interface import IVentaRepository
+from app.domain.interfaces.venta_diaria_repository_interface import (
+    IVentaDiariaRepository, IClienteResumenRepository
+)
 from app.domain.interfaces.producto_repository_interface import IProductoRepository
+from app.application.dtos.base_dto import ValidationError as DTOValidationError
 from app.application.dtos.venta_dto import (
     CreateVentaDTO, VentaResponseDTO, VentasSummaryDTO, DetalleVentaDTO
 )
-from app.exceptions import BusinessLogicError, NotFoundError
+from app.exceptions import BusinessLogicError, NotFoundError, StockError, ValidationError
+from app.utils import fechas
+from app.utils.fieldsets import proyectar
+from app.utils.pagination import CursorPaginatedResponse, encode_fecha_cursor, decode_fecha_cursor
+from app.utils.series_tiempo import (
+    GRANULARIDADES, RANGO_POR_DEFECTO, buckets_del_rango, inicio_bucket, siguiente_bucket
+)
+from app.infrastructure.cache.serie_ventas import SerieVentasCache
+
+
+def _preparar_detalles(detalles_dtos: List[DetalleVentaDTO], productos: Dict,
+                       disponible: Optional[Dict[int, int]] = None
+                       ) -> Tuple[List[Dict], Decimal, Dict[int, int]]:
+    """
+    Valida cada línea contra los productos bloqueados y calcula los
+    subtotales y la cantidad total a descontar por producto
+    
+    Un mismo producto puede aparecer en varias líneas: el stock se
+    valida contra la cantidad acumulada.
+    
+    Args:
+        detalles_dtos: Líneas de la venta
+        productos: {producto_id: producto} cargados con get_for_update
+        disponible: Stock disponible por producto si difiere del leído
+                    (p. ej. ya descontado por ventas anteriores del lote)
+    """
+    detalles_data = []
+    total_venta = Decimal('0.00')
+    cantidades: Dict[int, int] = {}
+    
+    for detalle_dto in detalles_dtos:
+        # Verificar que el producto existe
+        producto = productos.get(detalle_dto.producto_id)
+        if not producto:
+            raise NotFoundError(
+                f"Producto con ID {detalle_dto.producto_id} no encontrado"
+            )
+        
+        # Verificar stock disponible para la cantidad acumulada
+        stock = producto.stock if disponible is None else disponible[producto.id]
+        solicitado = cantidades.get(producto.id, 0) + detalle_dto.cantidad
+        if stock < solicitado:
+            raise StockError(
+                f"Stock insuficiente para '{producto.nombre}'. "
+                f"Disponible: {stock}, Solicitado: {solicitado}"
+            )
+        cantidades[producto.id] = solicitado
+        
+        # Usar precio del producto si no se especificó
+        precio = detalle_dto.precio_unitario or producto.precio
+        subtotal = detalle_dto.calculate_subtotal(precio)
+        total_venta += subtotal
+        
+        detalles_data.append({
+            'producto_id': detalle_dto.producto_id,
+            'cantidad': detalle_dto.cantidad,
+            'precio_unitario': float(precio),
+            'subtotal': float(subtotal)
+        })
+    
+    return detalles_data, total_venta, cantidades
 
 
 class CreateVentaUseCase:
@@ -26,11 +90,11 @@ class CreateVentaUseCase:
         
         Proceso:
         1. Validar datos de entrada
-        2. Validar existencia de productos
-        3. Validar stock disponible
+        2. Cargar todos los productos en una consulta, bloqueando sus filas
+        3. Validar existencia y stock disponible
         4. Calcular subtotales y total
-        5. Crear venta y detalles en transacción
-        6. Actualizar stock de productos
+        5. Descontar el stock con un UPDATE condicional atómico
+        6. Crear venta y detalles confirmando todo en un único commit
         
         Args:
             data: Diccionario con datos de la venta
@@ -46,7 +110,7 @@ class CreateVentaUseCase:
         Raises:
             ValidationError: Si los datos son inválidos
             NotFoundError: Si un producto no existe
-            BusinessLogicError: Si no hay stock suficiente
+            StockError: Si no hay stock suficiente
         """
         # 1. Validar datos con DTO
         dto = CreateVentaDTO(**data)
@@ -55,38 +119,33 @@ class CreateVentaUseCase:
         # 2. Obtener DTOs de detalles
         detalles_dtos = dto.get_detalles_dtos()
         
-        # 3. Validar productos y stock
-        productos_validados = []
-        total_venta = Decimal('0.00')
+        # 3. Cargar los productos de todas las líneas en una sola consulta.
+        # Las filas quedan bloqueadas hasta el commit, así otra venta
+        # concurrente no puede leer el mismo stock y vender de más.
+        productos = self._producto_repo.get_for_update(
+            sorted({d.producto_id for d in detalles_dtos})
+        )
         
-        for detalle_dto in detalles_dtos:
-            # Verificar que el producto existe
-            producto = self._producto_repo.get_by_id(detalle_dto.producto_id)
-            if not producto:
-                raise NotFoundError(
-                    f"Producto con ID {detalle_dto.producto_id} no encontrado"
-                )
-            
-            # Verificar stock disponible
-            if producto.stock < detalle_dto.cantidad:
-                raise BusinessLogicError(
-                    f"Stock insuficiente para '{producto.nombre}'. "
-                    f"Disponible: {producto.stock}, Solicitado: {detalle_dto.cantidad}"
-                )
-            
-            # Usar precio del producto si no se especificó
-            precio = detalle_dto.precio_unitario or producto.precio
-            subtotal = detalle_dto.calculate_subtotal(precio)
-            total_venta += subtotal
-            
-            productos_validados.append({
-                'producto': producto,
-                'detalle_dto': detalle_dto,
-                'precio': precio,
-                'subtotal': subtotal
-            })
+        try:
+            detalles_data, total_venta, cantidades = _preparar_detalles(
+                detalles_dtos, productos
+            )
+        except Exception:
+            self._producto_repo.rollback()
+            raise
         
-        # 4. Preparar datos de la venta
+        # 4. Descontar stock sin leer y escribir desde Python: el UPDATE
+        # verifica stock >= cantidad en la base de datos (sin commit todavía)
+        try:
+            self._producto_repo.ajustar_stock(
+                {producto_id: -cantidad for producto_id, cantidad in cantidades.items()},
+                commit=False
+            )
+        except Exception:
+            self._producto_repo.rollback()
+            raise
+        
+        # 5. Preparar datos de la venta
         venta_data = {
             'usuario_id': dto.usuario_id,
             'total': float(total_venta),
@@ -95,31 +154,230 @@ class CreateVentaUseCase:
             'cliente_telefono': dto.cliente_telefono
         }
         
-        # 5. Preparar detalles
-        detalles_data = []
-        for item in productos_validados:
-            detalles_data.append({
-                'producto_id': item['detalle_dto'].producto_id,
-                'cantidad': item['detalle_dto'].cantidad,
-                'precio_unitario': float(item['precio']),
-                'subtotal': float(item['subtotal'])
-            })
-        
-        # 6. Crear venta con detalles en transacción
+        # 6. Crear venta con detalles; el descuento de stock se confirma en el mismo commit
         venta = self._venta_repo.create_with_detalles(venta_data, detalles_data)
         
-        # 7. Actualizar stock de productos
-        for item in productos_validados:
-            self._producto_repo.update_stock(
-                item['producto'].id,
-                item['detalle_dto'].cantidad,
-                'subtract'
-            )
-        
-        # 8. Retornar DTO de respuesta
+        # 7. Retornar DTO de respuesta
         return VentaResponseDTO.from_entity(venta)
 
 
+class CreateVentasLoteUseCase:
+    """
+    Caso de uso para registrar un lote de ventas (sincronización de cajas
+    que trabajaron sin conexión)
+    
+    Todas las ventas del lote se validan juntas: los productos de todas
+    ellas se bloquean con una sola consulta, el stock se descuenta con un
+    único UPDATE y las ventas y sus detalles se insertan en bloque con un
+    solo commit. Cada venta se acepta o rechaza por separado: una venta
+    inválida o sin stock no impide registrar las demás.
+    """
+    
+    MAX_VENTAS = 500
+    # El UPDATE condicional puede fallar si otra transacción consumió stock
+    # entre la lectura y el descuento (bases sin SELECT ... FOR UPDATE)
+    MAX_REINTENTOS = 3
+    
+    def __init__(self, venta_repository: IVentaRepository,
+                 producto_repository: IProductoRepository):
+        self._venta_repo = venta_repository
+        self._producto_repo = producto_repository
+    
+    def execute(self, ventas: List[Dict], usuario_id: int) -> Dict:
+        """
+        Registra un lote de ventas
+        
+        Args:
+            ventas: Lista de ventas con el mismo formato que CreateVentaUseCase
+                    (sin usuario_id) y opcionalmente 'referencia', un
+                    identificador de la caja que se devuelve en el resultado
+            usuario_id: Usuario que sincroniza el lote
+            
+        Returns:
+            Diccionario con 'creadas', 'rechazadas' y 'resultados' (uno por
+            venta, en el orden recibido)
+            
+        Raises:
+            BusinessLogicError: Si el lote está vacío o excede MAX_VENTAS
+        """
+        if not isinstance(ventas, list) or not ventas:
+            raise BusinessLogicError("Debe incluir al menos una venta")
+        if len(ventas) > self.MAX_VENTAS:
+            raise BusinessLogicError(f"No puede incluir más de {self.MAX_VENTAS} ventas por lote")
+        
+        # 1. Validar cada venta por separado
+        resultados: List[Optional[Dict]] = [None] * len(ventas)
+        validas = []
+        for indice, data in enumerate(ventas):
+            referencia = data.get('referencia') if isinstance(data, dict) else None
+            try:
+                dto, detalles_dtos = self._validar(data, usuario_id)
+            except DTOValidationError as e:
+                resultados[indice] = _resultado_error(
+                    indice, referencia, 400, 'Datos de venta inválidos', e.errors
+                )
+            except (BusinessLogicError, TypeError) as e:
+                resultados[indice] = _resultado_error(indice, referencia, 400, str(e))
+            else:
+                validas.append((indice, referencia, dto, detalles_dtos))
+        
+        # 2. Registrar las válidas en una sola transacción
+        if validas:
+            for intento in range(self.MAX_REINTENTOS):
+                try:
+                    registradas = self._registrar(validas)
+                    break
+                except StockError:
+                    if intento == self.MAX_REINTENTOS - 1:
+                        raise
+            for indice, resultado in registradas.items():
+                resultados[indice] = resultado
+        
+        creadas = sum(1 for r in resultados if r['status'] == 'success')
+        return {
+            'creadas': creadas,
+            'rechazadas': len(resultados) - creadas,
+            'resultados': resultados
+        }
+    
+    @staticmethod
+    def _validar(data, usuario_id: int) -> Tuple[CreateVentaDTO, List[DetalleVentaDTO]]:
+        if not isinstance(data, dict):
+            raise BusinessLogicError("Cada venta debe ser un objeto")
+        datos = {k: v for k, v in data.items() if k not in ('referencia', 'usuario_id')}
+        dto = CreateVentaDTO(usuario_id=usuario_id, **datos)
+        dto.validate()
+        return dto, dto.get_detalles_dtos()
+    
+    def _registrar(self, validas: List[Tuple]) -> Dict[int, Dict]:
+        """
+        Asigna stock a las ventas en orden, descuenta y persiste las
+        aceptadas; devuelve el resultado de cada venta por índice
+        """
+        resultados = {}
+        productos = self._producto_repo.get_for_update(sorted({
+            d.producto_id for _, _, _, detalles_dtos in validas for d in detalles_dtos
+        }))
+        disponible = {producto_id: p.stock for producto_id, p in productos.items()}
+        
+        aceptadas = []
+        descuentos: Dict[int, int] = {}
+        for indice, referencia, dto, detalles_dtos in validas:
+            try:
+                detalles_data, total_venta, cantidades = _preparar_detalles(
+                    detalles_dtos, productos, disponible
+                )
+            except BusinessLogicError as e:
+                resultados[indice] = _resultado_error(indice, referencia, e.status_code, str(e))
+                continue
+            
+            for producto_id, cantidad in cantidades.items():
+                disponible[producto_id] -= cantidad
+                descuentos[producto_id] = descuentos.get(producto_id, 0) - cantidad
+            venta_data = {
+                'usuario_id': dto.usuario_id,
+                'total': float(total_venta),
+                'cliente_nombre': dto.cliente_nombre,
+                'cliente_documento': dto.cliente_documento,
+                'cliente_telefono': dto.cliente_telefono
+            }
+            aceptadas.append((indice, referencia, venta_data, detalles_data))
+        
+        if not aceptadas:
+            self._producto_repo.rollback()
+            return resultados
+        
+        # Un UPDATE para todo el stock y un INSERT en bloque por tabla, un commit
+        try:
+            self._producto_repo.ajustar_stock(descuentos, commit=False)
+        except Exception:
+            self._producto_repo.rollback()
+            raise
+        venta_ids = self._venta_repo.create_lote(
+            [(venta_data, detalles_data) for _, _, venta_data, detalles_data in aceptadas]
+        )
+        
+        for (indice, referencia, venta_data, _), venta_id in zip(aceptadas, venta_ids):
+            resultados[indice] = _resultado(indice, referencia, {
+                'status': 'success',
+                'venta_id': venta_id,
+                'total': venta_data['total']
+            })
+        return resultados
+
+
+class AnularVentasUseCase:
+    """
+    Caso de uso para anular ventas (una o un lote cargado por error)
+    
+    Todas las ventas se anulan en una sola transacción: el stock se
+    restaura con un UPDATE por conjunto desde las líneas de detalle, los
+    detalles y las ventas se borran con un DELETE cada uno y la auditoría
+    se confirma en el mismo commit.
+    """
+    
+    MAX_VENTAS = 500
+    
+    def __init__(self, venta_repository: IVentaRepository):
+        self._venta_repo = venta_repository
+    
+    def execute(self, venta_ids: List[int], usuario_id: int,
+                ip_address: Optional[str] = None, user_agent: Optional[str] = None) -> Dict:
+        """
+        Anula las ventas indicadas
+        
+        Args:
+            venta_ids: IDs de las ventas a anular
+            usuario_id: Usuario que anula (queda en la auditoría)
+            ip_address: IP de la petición (auditoría)
+            user_agent: User-Agent de la petición (auditoría)
+            
+        Returns:
+            Diccionario con 'anuladas' y 'no_encontradas' (listas de IDs)
+            
+        Raises:
+            ValidationError: Si la lista está vacía, no son enteros o excede MAX_VENTAS
+        """
+        if not isinstance(venta_ids, list) or not venta_ids:
+            raise ValidationError("Debe indicar al menos una venta")
+        if any(isinstance(v, bool) or not isinstance(v, int) for v in venta_ids):
+            raise ValidationError("Los IDs de venta deben ser números enteros")
+        if len(venta_ids) > self.MAX_VENTAS:
+            raise ValidationError(f"No puede anular más de {self.MAX_VENTAS} ventas a la vez")
+        
+        anuladas = self._venta_repo.anular(venta_ids, auditoria={
+            'usuario_id': usuario_id,
+            'ip_address': ip_address,
+            'user_agent': user_agent
+        })
+        encontradas = set(anuladas)
+        return {
+            'anuladas': anuladas,
+            'no_encontradas': sorted({v for v in venta_ids if v not in encontradas})
+        }
+
+
+def _resultado(indice: int, referencia, datos: Dict) -> Dict:
+    resultado = {'indice': indice, **datos}
+    if referencia is not None:
+        resultado['referencia'] = referencia
+    return resultado
+
+
+def _resultado_error(indice: int, referencia, status_code: int, message: str,
+                     errors: Optional[Dict] = None) -> Dict:
+    datos = {'status': 'error', 'status_code': status_code, 'message': message}
+    if errors:
+        datos['errors'] = errors
+    return _resultado(indice, referencia, datos)
+
+
+def _paginacion(limit: Optional[int], offset: Optional[int]) -> Tuple[Optional[int], int]:
+    """Normaliza limit/offset: valores no positivos significan sin límite / desde el inicio"""
+    return (limit if limit and limit > 0 else None,
+            offset if offset and offset > 0 else 0)
+
+
 class GetVentaUseCase:
     """Caso de uso para obtener una venta por ID"""
     
@@ -139,7 +397,7 @@ class GetVentaUseCase:
         Raises:
             NotFoundError: Si la venta no existe
         """
-        venta = self._repository.get_by_id(id)
+        venta = self._repository.get_with_detalles(id)
         if not venta:
             raise NotFoundError(f"Venta con ID {id} no encontrada")
         
@@ -152,23 +410,89 @@ class GetAllVentasUseCase:
     def __init__(self, repository: IVentaRepository):
         self._repository = repository
     
-    def execute(self, limit: Optional[int] = None) -> List[VentaResponseDTO]:
+    def execute(self, limit: Optional[int] = None,
+                fields: Optional[Tuple[str, ...]] = None,
+                offset: int = 0) -> List[VentaResponseDTO]:
         """
         Obtiene todas las ventas
         
         Args:
             limit: Número máximo de ventas a retornar (opcional)
+            fields: Columnas a devolver (opcional). Con proyección no se
+                cargan usuario ni detalles y se devuelven diccionarios
+            offset: Ventas a saltar
             
         Returns:
-            Lista de VentaResponseDTO
+            Lista de VentaResponseDTO (o de diccionarios si hay `fields`)
         """
-        ventas = self._repository.get_all()
+        limit, offset = _paginacion(limit, offset)
+        if fields:
+            filas = self._repository.get_projection(fields, limit=limit, offset=offset)
+            return [proyectar(f, fields) for f in filas]
         
-        # Aplicar límite si se especifica
-        if limit and limit > 0:
+        ventas = self._repository.get_all_con_detalles(limit=limit, offset=offset)
+        return [VentaResponseDTO.from_entity(v) for v in ventas]
+
+
+class GetVentasPageUseCase:
+    """Caso de uso para recorrer ventas por cursor (keyset), las más recientes primero"""
+    
+    def __init__(self, repository: IVentaRepository):
+        self._repository = repository
+    
+    def execute(self, cursor: Optional[str] = None, limit: int = 100) -> CursorPaginatedResponse:
+        """
+        Obtiene una página de ventas a partir de un cursor opaco
+        
+        Args:
+            cursor: Cursor devuelto en la página anterior (None/vacío = primera página)
+            limit: Cantidad de ventas por página
+            
+        Returns:
+            CursorPaginatedResponse con VentaResponseDTO y el siguiente cursor
+            
+        Raises:
+            BusinessLogicError: Si el cursor es inválido
+        """
+        despues_de = _decodificar_cursor(cursor)
+        
+        # Se pide un registro extra para saber si existe una página siguiente
+        ventas = self._repository.get_page_por_fecha(despues_de, limit + 1)
+        next_cursor = None
+        if len(ventas) > limit:
             ventas = ventas[:limit]
+            next_cursor = encode_fecha_cursor(ventas[-1].fecha, ventas[-1].id)
         
-        return [VentaResponseDTO.from_entity(v) for v in ventas]
+        return CursorPaginatedResponse(
+            items=[VentaResponseDTO.from_entity(v) for v in ventas],
+            limit=limit,
+            next_cursor=next_cursor
+        )
+    
+    def iter_ventas(self, cursor: Optional[str] = None,
+                    tamano: int = 200) -> Iterator[VentaResponseDTO]:
+        """
+        Recorre todas las ventas (desde el cursor) sin cargarlas juntas
+        
+        Args:
+            cursor: Cursor desde donde continuar (None/vacío = desde la más reciente)
+            tamano: Ventas leídas por consulta
+            
+        Yields:
+            VentaResponseDTO, las más recientes primero
+            
+        Raises:
+            BusinessLogicError: Si el cursor es inválido (al crear el generador)
+        """
+        paginas = self._repository.iter_paginas_por_fecha(_decodificar_cursor(cursor), tamano)
+        return (VentaResponseDTO.from_entity(v) for pagina in paginas for v in pagina)
+
+
+def _decodificar_cursor(cursor: Optional[str]):
+    try:
+        return decode_fecha_cursor(cursor)
+    except ValueError as e:
+        raise BusinessLogicError(str(e))
 
 
 class GetVentasByDateRangeUseCase:
@@ -177,13 +501,16 @@ class GetVentasByDateRangeUseCase:
     def __init__(self, repository: IVentaRepository):
         self._repository = repository
     
-    def execute(self, fecha_inicio: str, fecha_fin: str) -> List[VentaResponseDTO]:
+    def execute(self, fecha_inicio: str, fecha_fin: str, limit: Optional[int] = None,
+                offset: int = 0) -> List[VentaResponseDTO]:
         """
         Obtiene ventas en un rango de fechas
         
         Args:
             fecha_inicio: Fecha de inicio en formato ISO (YYYY-MM-DD)
             fecha_fin: Fecha de fin en formato ISO (YYYY-MM-DD)
+            limit: Número máximo de ventas a retornar (opcional)
+            offset: Ventas a saltar
             
         Returns:
             Lista de VentaResponseDTO en el rango
@@ -204,7 +531,8 @@ class GetVentasByDateRangeUseCase:
                 "La fecha de inicio no puede ser posterior a la fecha de fin"
             )
         
-        ventas = self._repository.get_by_date_range(inicio, fin)
+        limit, offset = _paginacion(limit, offset)
+        ventas = self._repository.get_by_date_range(inicio, fin, limit=limit, offset=offset)
         return [VentaResponseDTO.from_entity(v) for v in ventas]
 
 
@@ -214,12 +542,15 @@ class GetVentasByUsuarioUseCase:
     def __init__(self, repository: IVentaRepository):
         self._repository = repository
     
-    def execute(self, usuario_id: int) -> List[VentaResponseDTO]:
+    def execute(self, usuario_id: int, limit: Optional[int] = None,
+                offset: int = 0) -> List[VentaResponseDTO]:
         """
         Obtiene todas las ventas de un usuario
         
         Args:
             usuario_id: ID del usuario
+            limit: Número máximo de ventas a retornar (opcional)
+            offset: Ventas a saltar
             
         Returns:
             Lista de VentaResponseDTO del usuario
@@ -227,7 +558,8 @@ class GetVentasByUsuarioUseCase:
         if usuario_id <= 0:
             raise BusinessLogicError("El ID del usuario debe ser mayor a 0")
         
-        ventas = self._repository.get_by_usuario(usuario_id)
+        limit, offset = _paginacion(limit, offset)
+        ventas = self._repository.get_by_usuario(usuario_id, limit=limit, offset=offset)
         return [VentaResponseDTO.from_entity(v) for v in ventas]
 
 
@@ -237,25 +569,98 @@ class GetVentasByClienteUseCase:
     def __init__(self, repository: IVentaRepository):
         self._repository = repository
     
-    def execute(self, cliente_documento: str) -> List[VentaResponseDTO]:
+    def pagina(self, cliente_documento: str, cursor: Optional[str] = None,
+               limit: int = 20) -> CursorPaginatedResponse:
+        """
+        Obtiene una página del historial del cliente por cursor (keyset)
+        
+        Args:
+            cliente_documento: Documento del cliente
+            cursor: Cursor devuelto en la página anterior (None/vacío = primera página)
+            limit: Cantidad de ventas por página
+            
+        Returns:
+            CursorPaginatedResponse con VentaResponseDTO y el siguiente cursor
+            
+        Raises:
+            BusinessLogicError: Si el documento o el cursor son inválidos
+        """
+        _validar_documento(cliente_documento)
+        despues_de = _decodificar_cursor(cursor)
+        
+        ventas = self._repository.get_page_por_fecha(despues_de, limit + 1,
+                                                     cliente_documento=cliente_documento)
+        next_cursor = None
+        if len(ventas) > limit:
+            ventas = ventas[:limit]
+            next_cursor = encode_fecha_cursor(ventas[-1].fecha, ventas[-1].id)
+        
+        return CursorPaginatedResponse(
+            items=[VentaResponseDTO.from_entity(v) for v in ventas],
+            limit=limit,
+            next_cursor=next_cursor
+        )
+    
+    def execute(self, cliente_documento: str, limit: Optional[int] = None,
+                offset: int = 0) -> List[VentaResponseDTO]:
         """
         Obtiene todas las ventas de un cliente
         
         Args:
             cliente_documento: Documento del cliente
+            limit: Número máximo de ventas a retornar (opcional)
+            offset: Ventas a saltar
             
         Returns:
             Lista de VentaResponseDTO del cliente
         """
-        if not cliente_documento or len(cliente_documento) < 5:
-            raise BusinessLogicError(
-                "El documento del cliente debe tener al menos 5 caracteres"
-            )
+        _validar_documento(cliente_documento)
         
-        ventas = self._repository.get_by_cliente(cliente_documento)
+        limit, offset = _paginacion(limit, offset)
+        ventas = self._repository.get_by_cliente(cliente_documento, limit=limit, offset=offset)
         return [VentaResponseDTO.from_entity(v) for v in ventas]
 
 
+def _validar_documento(cliente_documento: Optional[str]):
+    if not cliente_documento or len(cliente_documento) < 5:
+        raise BusinessLogicError(
+            "El documento del cliente debe tener al menos 5 caracteres"
+        )
+
+
+class GetResumenClienteUseCase:
+    """
+    Caso de uso para el resumen de compras de un cliente
+    
+    Lee la fila que se mantiene al crear y anular ventas (clientes_resumen)
+    en lugar de recorrer el historial del cliente.
+    """
+    
+    def __init__(self, repository: IClienteResumenRepository):
+        self._repository = repository
+    
+    def execute(self, cliente_documento: str) -> Dict:
+        """
+        Obtiene el resumen del cliente
+        
+        Args:
+            cliente_documento: Documento del cliente
+            
+        Returns:
+            Diccionario con total (valor de por vida), cantidad_ventas
+            (visitas), ticket_promedio y ultima_compra
+            
+        Raises:
+            BusinessLogicError: Si el documento es inválido
+            NotFoundError: Si el cliente no tiene ventas
+        """
+        _validar_documento(cliente_documento)
+        resumen = self._repository.get_by_documento(cliente_documento)
+        if resumen is None:
+            raise NotFoundError(f"El cliente {cliente_documento} no tiene ventas registradas")
+        return resumen.to_dict()
+
+
 class GetVentasStatisticsUseCase:
     """Caso de uso para obtener estadísticas de ventas"""
     
@@ -303,3 +708,109 @@ class GetVentasStatisticsUseCase:
             fecha_inicio=fecha_inicio,
             fecha_fin=fecha_fin
         )
+
+
+class GetSerieVentasUseCase:
+    """
+    Caso de uso para la serie de ventas por hora, día, semana o mes
+    
+    Los intervalos cerrados se leen de la caché compartida y solo los que
+    faltan se calculan, todos juntos en una consulta. El intervalo en curso
+    se calcula en cada petición. Las horas se agrupan desde las ventas;
+    días, semanas y meses desde el resumen diario (ventas_diarias).
+    
+    MAX_BUCKETS acota las claves que una petición agrega a la caché, muy
+    por debajo de CACHE_THRESHOLD: al superarlo SimpleCache descarta
+    primero las claves sin vencimiento (versiones de tablas, generación).
+    """
+    
+    MAX_BUCKETS = 400
+    
+    def __init__(self, venta_repository: IVentaRepository,
+                 venta_diaria_repository: IVentaDiariaRepository,
+                 cache: SerieVentasCache):
+        self._venta_repo = venta_repository
+        self._diaria_repo = venta_diaria_repository
+        self._cache = cache
+    
+    def execute(self, granularidad: str = 'day', rango: Optional[str] = None,
+                ahora: Optional[datetime] = None) -> Dict:
+        """
+        Obtiene la serie de ventas
+        
+        Args:
+            granularidad: 'hour', 'day', 'week' o 'month'
+            rango: Período hacia atrás desde ahora ('24h', '30d', '12w', '6m');
+                   por defecto depende de la granularidad
+            ahora: Momento de referencia (por defecto, ahora)
+            
+        Returns:
+            Diccionario con la granularidad, el rango y los intervalos
+            ({inicio, fin, cantidad, total, cerrado}) en orden
+            
+        Raises:
+            ValidationError: Si la granularidad o el rango son inválidos
+        """
+        if granularidad not in GRANULARIDADES:
+            raise ValidationError(
+                f"Granularidad inválida, use una de: {', '.join(GRANULARIDADES)}"
+            )
+        rango = rango or RANGO_POR_DEFECTO[granularidad]
+        try:
+            buckets = buckets_del_rango(ahora or fechas.ahora(), granularidad, rango,
+                                        maximo=self.MAX_BUCKETS)
+        except ValueError as e:
+            raise ValidationError(str(e))
+        
+        cerrados, abierto = buckets[:-1], buckets[-1]
+        # La generación se lee antes de consultar: lo que se calcule con
+        # datos previos a una anulación queda bajo la generación descartada
+        generacion = self._cache.generacion()
+        valores = self._cache.obtener(granularidad, cerrados, generacion)
+        faltantes = [inicio for inicio in cerrados if inicio not in valores]
+        if faltantes:
+            calculados = self._calcular(granularidad, faltantes[0],
+                                        siguiente_bucket(faltantes[-1], granularidad))
+            nuevos = {inicio: calculados[inicio] for inicio in faltantes}
+            self._cache.guardar(granularidad, nuevos, generacion)
+            valores.update(nuevos)
+        fin = siguiente_bucket(abierto, granularidad)
+        valores[abierto] = self._calcular(granularidad, abierto, fin)[abierto]
+        
+        return {
+            'granularity': granularidad,
+            'range': rango,
+            'desde': buckets[0].isoformat(),
+            'hasta': fin.isoformat(),
+            'buckets': [{
+                'inicio': inicio.isoformat(),
+                'fin': siguiente_bucket(inicio, granularidad).isoformat(),
+                'cantidad': valores[inicio]['cantidad'],
+                'total': valores[inicio]['total'],
+                'cerrado': inicio != abierto
+            } for inicio in buckets]
+        }
+    
+    def _calcular(self, granularidad: str, desde: datetime, hasta: datetime) -> Dict[datetime, Dict]:
+        """Agrega las ventas de [desde, hasta) por intervalo (con ceros en los vacíos)"""
+        cantidades: Dict[datetime, int] = {}
+        totales: Dict[datetime, Decimal] = {}
+        inicio = desde
+        while inicio < hasta:
+            cantidades[inicio], totales[inicio] = 0, Decimal('0')
+            inicio = siguiente_bucket(inicio, granularidad)
+        
+        if granularidad == 'hour':
+            filas = ((fecha, 1, total) for fecha, total in self._venta_repo.get_importes(desde, hasta))
+        else:
+            filas = ((dia['fecha'], dia['cantidad'], dia['total'])
+                     for dia in self._diaria_repo.resumen_por_dia(
+                         desde.date(), (hasta - timedelta(days=1)).date()))
+        for fecha, cantidad, total in filas:
+            inicio = inicio_bucket(fecha, granularidad)
+            if inicio in cantidades:
+                cantidades[inicio] += cantidad
+                totales[inicio] += Decimal(str(total))
+        
+        return {inicio: {'cantidad': cantidades[inicio], 'total': float(round(totales[inicio], 2))}
+                for inicio in cantidades}
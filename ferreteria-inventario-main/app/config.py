@@ -18,6 +18,27 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', SECRET_KEY)
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     
+    # Caché (ver app/extensions.py). SimpleCache es propia de cada proceso:
+    # solo sirve con un único worker. Las claves sin vencimiento (versiones
+    # por tabla) son las primeras que descarta al superar CACHE_THRESHOLD
+    CACHE_TYPE = os.environ.get('CACHE_TYPE', 'SimpleCache')
+    CACHE_DEFAULT_TIMEOUT = 300
+    CACHE_THRESHOLD = int(os.environ.get('CACHE_THRESHOLD', '5000'))
+    
+    # Catálogo de productos en memoria
+    CATALOG_PRELOAD = os.environ.get('CATALOG_PRELOAD', 'false').lower() == 'true'
+    # Similitud mínima (0-1) de la búsqueda tolerante a errores (fuzzy=1)
+    FUZZY_SEARCH_THRESHOLD = float(os.environ.get('FUZZY_SEARCH_THRESHOLD', '0.3'))
+    # Filas por transacción en la importación masiva de productos
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', '500'))
+    # Idempotency-Key: segundos que se conserva la respuesta y espera máxima de un duplicado
+    IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL', '86400'))
+    IDEMPOTENCY_WAIT = float(os.environ.get('IDEMPOTENCY_WAIT', '10'))
+    # Segundos de vida de las estadísticas del dashboard (además se invalidan al escribir)
+    DASHBOARD_STATS_TTL = int(os.environ.get('DASHBOARD_STATS_TTL', '30'))
+    # Segundos de vida de los intervalos cerrados de la serie de ventas
+    SERIE_VENTAS_TTL = int(os.environ.get('SERIE_VENTAS_TTL', '3600'))
+    
     # CORS Configuration (permite override por env CORS_ORIGINS separadas por comas)
     _cors_env = os.environ.get('CORS_ORIGINS')
     if _cors_env:
@@ -36,10 +57,6 @@ class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_ECHO = True
     
-    # Cache
-    CACHE_TYPE = 'SimpleCache'
-    CACHE_DEFAULT_TIMEOUT = 300
-    
     # Rate Limiting
     RATELIMIT_STORAGE_URL = 'memory://'
 
@@ -48,10 +65,14 @@ class ProductionConfig(Config):
     DEBUG = False
     SQLALCHEMY_ECHO = False
     
-    # En producción usar Redis
-    CACHE_TYPE = 'RedisCache'
+    # Varios workers (gunicorn -w N): la caché y las versiones por tabla
+    # tienen que ser compartidas
+    CACHE_TYPE = os.environ.get('CACHE_TYPE', 'RedisCache')
     CACHE_REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
     RATELIMIT_STORAGE_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/1')
+    
+    # Construir el catálogo y sus índices al arrancar, no en la primera lectura
+    CATALOG_PRELOAD = os.environ.get('CATALOG_PRELOAD', 'true').lower() == 'true'
 
 class TestingConfig(Config):
     """Configuración para testing"""
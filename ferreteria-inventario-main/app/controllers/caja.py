@@ -0,0 +1,168 @@
+"""
+Controlador de Caja - Clean Architecture
+Resumen diario y cierre de caja de cada vendedor
+
+Los vendedores consultan y cierran su propia caja; un admin puede indicar
+cualquier vendedor con `usuario_id`.
+"""
+from flask import Blueprint, request, jsonify
+from app.infrastructure.di.container import get_container
+from app.exceptions import BusinessLogicError, ForbiddenError
+from app.utils import token_required
+
+caja_bp = Blueprint('caja', __name__, url_prefix='/api/caja')
+
+
+def _usuario_objetivo(current_user, usuario_id):
+    """Vendedor consultado: el propio, o cualquiera si quien pide es admin"""
+    if usuario_id is None or usuario_id == current_user.id:
+        return current_user.id
+    if current_user.rol != 'admin':
+        raise ForbiddenError("Solo un admin puede consultar la caja de otro usuario")
+    return usuario_id
+
+
+@caja_bp.route('/resumen', methods=['GET'])
+@token_required
+def get_resumen_caja(current_user):
+    """
+    Obtiene el resumen de caja de un vendedor en un día
+
+    Query Params:
+        fecha: Día en formato ISO (YYYY-MM-DD, por defecto hoy)
+        usuario_id: Vendedor (solo admin; por defecto el usuario autenticado)
+
+    Returns:
+        200: Ventas, total, items y anulaciones del día; si la caja está
+             cerrada, los valores congelados y el cierre
+        400: Fecha inválida
+        403: Caja de otro usuario sin ser admin
+        500: Error del servidor
+    """
+    try:
+        container = get_container()
+        use_case = container.resolve('get_resumen_caja_use_case')
+
+        usuario_id = _usuario_objetivo(current_user, request.args.get('usuario_id', type=int))
+        result = use_case.execute(usuario_id, request.args.get('fecha'))
+
+        return jsonify({
+            'status': 'success',
+            'data': result
+        }), 200
+
+    except BusinessLogicError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), e.status_code
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Error al obtener resumen de caja: {str(e)}'
+        }), 500
+
+
+@caja_bp.route('/cierre', methods=['POST'])
+@token_required
+def cerrar_caja(current_user):
+    """
+    Cierra la caja de un vendedor: congela el resumen del día en un
+    registro que no se modifica
+
+    Request Body (todo opcional):
+    {
+        "fecha": "2026-10-17",        // Por defecto hoy
+        "usuario_id": 3,              // Solo admin
+        "monto_declarado": 1520.50,   // Efectivo contado
+        "observaciones": "Faltan 2 monedas"
+    }
+
+    Returns:
+        201: Cierre creado (con la diferencia si se declaró monto)
+        400: Datos inválidos o fecha futura
+        403: Caja de otro usuario sin ser admin
+        409: El día ya está cerrado
+        500: Error del servidor
+    """
+    try:
+        container = get_container()
+        use_case = container.resolve('cerrar_caja_use_case')
+
+        data = request.get_json(silent=True) or {}
+        usuario_id = _usuario_objetivo(current_user, data.get('usuario_id'))
+        result = use_case.execute(
+            usuario_id,
+            current_user.id,
+            fecha=data.get('fecha'),
+            monto_declarado=data.get('monto_declarado'),
+            observaciones=data.get('observaciones')
+        )
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Caja cerrada exitosamente',
+            'data': result
+        }), 201
+
+    except BusinessLogicError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), e.status_code
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Error al cerrar caja: {str(e)}'
+        }), 500
+
+
+@caja_bp.route('/cierres', methods=['GET'])
+@token_required
+def get_cierres_caja(current_user):
+    """
+    Obtiene el historial de cierres de caja, los más recientes primero
+
+    Query Params:
+        desde: Primer día (YYYY-MM-DD, opcional)
+        hasta: Último día, inclusive (YYYY-MM-DD, opcional)
+        usuario_id: Vendedor (admin: opcional, sin él lista todos;
+            vendedor: siempre los propios)
+        limit: Máximo de cierres (default 100, máximo 500)
+
+    Returns:
+        200: Lista de cierres
+        400: Fechas o límite inválidos
+        403: Cierres de otro usuario sin ser admin
+        500: Error del servidor
+    """
+    try:
+        container = get_container()
+        use_case = container.resolve('get_cierres_caja_use_case')
+
+        usuario_id = request.args.get('usuario_id', type=int)
+        if current_user.rol != 'admin':
+            usuario_id = _usuario_objetivo(current_user, usuario_id)
+        result = use_case.execute(
+            request.args.get('desde'),
+            request.args.get('hasta'),
+            usuario_id=usuario_id,
+            limit=request.args.get('limit', 100, type=int)
+        )
+
+        return jsonify({
+            'status': 'success',
+            'data': result,
+            'count': len(result)
+        }), 200
+
+    except BusinessLogicError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), e.status_code
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Error al obtener cierres de caja: {str(e)}'
+        }), 500
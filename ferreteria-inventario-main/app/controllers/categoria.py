@@ -5,7 +5,7 @@ from flask import Blueprint, request
 from app.infrastructure.di import get_container
 from app.application.dtos.base_dto import ValidationError
 from app.exceptions import BusinessLogicError, NotFoundError
-from app.utils import create_response, handle_error, token_required, rol_requerido
+from app.utils import create_response, handle_error, token_required, rol_requerido, conditional_get
 
 categoria_bp = Blueprint('categorias', __name__, url_prefix='/api/categorias')
 
@@ -15,15 +15,18 @@ container = get_container()
 
 @categoria_bp.route('', methods=['GET'])
 @token_required
+@conditional_get('categorias', 'productos')
 def get_categorias(current_user):
     """
     Obtiene todas las categorías
     
     Query Parameters:
-        - with_count: bool (opcional) - Incluir conteo de productos
+        - with_count: bool (opcional) - Incluir productos_count, valor_stock y
+          productos_stock_bajo
         
     Returns:
         200: Lista de categorías
+        304: Sin cambios respecto al ETag (If-None-Match) o fecha (If-Modified-Since) enviados
     """
     try:
         with_count = request.args.get('with_count', 'false').lower() == 'true'
@@ -38,6 +41,7 @@ def get_categorias(current_user):
 
 @categoria_bp.route('/<int:categoria_id>', methods=['GET'])
 @token_required
+@conditional_get('categorias', 'productos')
 def get_categoria(current_user, categoria_id):
     """
     Obtiene una categoría por ID
@@ -10,13 +10,16 @@ Principios aplicados:
 from flask import Blueprint, request, jsonify
 from app.infrastructure.di.container import get_container
 from app.exceptions import NotFoundError, ValidationError, BusinessLogicError, DatabaseError
-from app.utils import token_required
+from app.utils import token_required, idempotente
+from app.utils.fieldsets import get_fields_param, campos_de_modelo
+from app.models import Compra
 
 compra_bp = Blueprint('compras', __name__, url_prefix='/api/compras')
 
 
 @compra_bp.route('', methods=['POST'])
 @token_required
+@idempotente
 def create_compra(current_user):
     """
     Crea una nueva compra y actualiza el stock del producto
@@ -29,6 +32,11 @@ def create_compra(current_user):
         "proveedor_id": 1  // Opcional
     }
     
+    Headers:
+        Idempotency-Key: Clave única del intento (opcional). Los reintentos
+            con la misma clave devuelven la respuesta original sin registrar
+            otra compra.
+    
     Returns:
         201: Compra creada exitosamente, stock actualizado
         400: Error de validación
@@ -41,7 +49,7 @@ def create_compra(current_user):
         
         data = request.get_json()
         # Usar el usuario autenticado
-        data['usuario_id'] = current_user['id']
+        data['usuario_id'] = current_user.id
         
         result = use_case.execute(data)
         
@@ -114,9 +122,12 @@ def get_all_compras(current_user):
     
     Query Params:
         limit: Número máximo de compras a devolver (opcional)
+        fields: Columnas a devolver, separadas por coma (opcional).
+            Solo se consultan esas columnas, sin relaciones.
         
     Returns:
         200: Lista de compras
+        400: Campo desconocido en fields
         500: Error del servidor
     """
     try:
@@ -124,8 +135,15 @@ def get_all_compras(current_user):
         use_case = container.resolve('get_all_compras_use_case')
         
         limit = request.args.get('limit', type=int)
+        try:
+            fields = get_fields_param(request, campos_de_modelo(Compra))
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
         
-        result = use_case.execute(limit)
+        result = use_case.execute(limit, fields=fields)
         
         return jsonify({
             'status': 'success',
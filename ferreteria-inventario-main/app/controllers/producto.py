@@ -1,11 +1,12 @@
 """
 Controlador de productos - Clean Architecture
 """
-from flask import Blueprint, request
+import json
+from flask import Blueprint, Response, request, current_app, stream_with_context
 from app.infrastructure.di import get_container
 from app.application.dtos.base_dto import ValidationError
 from app.exceptions import BusinessLogicError, NotFoundError
-from app.utils import create_response, handle_error, token_required, rol_requerido
+from app.utils import create_response, handle_error, token_required, rol_requerido, conditional_get
 
 producto_bp = Blueprint('productos', __name__, url_prefix='/api/productos')
 
@@ -13,9 +14,41 @@ producto_bp = Blueprint('productos', __name__, url_prefix='/api/productos')
 container = get_container()
 
 
+@producto_bp.after_request
+def agregar_version_catalogo(response):
+    """
+    Expone la versión del catálogo en las lecturas para que los clientes
+    (y otros workers) detecten datos obsoletos sin descargar el catálogo
+    """
+    if request.method == 'GET' and response.status_code == 200:
+        catalog = container.resolve('catalog_store')
+        response.headers['X-Catalog-Version'] = str(catalog.version())
+    return response
+
+
+@producto_bp.route('/version', methods=['GET'])
+@token_required
+def get_catalog_version(current_user):
+    """
+    Obtiene la versión actual del catálogo de productos
+    
+    La versión crece de forma monótona con cada commit que modifica
+    productos, en cualquier worker.
+    
+    Returns:
+        200: {"version": 1718000000123}
+    """
+    try:
+        catalog = container.resolve('catalog_store')
+        return create_response(data={'version': catalog.version()})
+    except Exception as e:
+        return handle_error(e)
+
+
 # --- PRODUCTOS ---
 @producto_bp.route('', methods=['GET'])
 @token_required
+@conditional_get('productos', 'categorias')
 def get_productos(current_user):
     """
     Obtiene todos los productos con paginación
@@ -24,6 +57,12 @@ def get_productos(current_user):
         - categoria_id: int (opcional) - Filtrar por categoría
         - page: int (default: 1) - Número de página
         - per_page: int (default: 20, max: 100) - Items por página
+        - cursor: str (opcional) - Activa la paginación por cursor (keyset).
+          Vacío para la primera página; luego el `next_cursor` recibido.
+        - limit: int (default: 20, max: 100) - Items por página en modo cursor
+        - include_total: bool (default: false) - Calcular total en modo cursor
+        - fields: str (opcional) - Columnas a devolver, p. ej. "id,nombre,precio,stock".
+          Solo se consultan esas columnas y no se incluye `categoria`.
         
     Returns:
         200: {
@@ -37,20 +76,61 @@ def get_productos(current_user):
                 "has_next": true
             }
         }
+        200 (modo cursor): {
+            "items": [...],
+            "pagination": {
+                "limit": 20,
+                "next_cursor": "eyJpZCI6IDIwfQ",
+                "has_next": true,
+                "total_items": null
+            }
+        }
+        304: Sin cambios respecto al ETag (If-None-Match) o fecha (If-Modified-Since) enviados
     """
     try:
-        from app.utils.pagination import get_pagination_params, paginate_list
+        from app.utils.pagination import get_pagination_params, get_cursor_params, paginate_list
+        from app.utils.fieldsets import get_fields_param, campos_de_modelo
         from app.utils.logger import log_business_operation
+        from app.models import Producto
+        
+        categoria_id = request.args.get('categoria_id', type=int)
+        try:
+            fields = get_fields_param(request, campos_de_modelo(Producto))
+        except ValueError as e:
+            return create_response(message=str(e), status_code=400)
+        serializar = (lambda p: p) if fields else (lambda p: p.to_dict())
+        
+        # Paginación por cursor: el filtro y el LIMIT se resuelven en SQL
+        if 'cursor' in request.args:
+            cursor, limit, include_total = get_cursor_params(request)
+            
+            use_case = container.resolve('get_productos_page_use_case')
+            pagina = use_case.execute(
+                cursor=cursor,
+                limit=limit,
+                categoria_id=categoria_id,
+                include_total=include_total,
+                fields=fields
+            )
+            pagina.items = [serializar(p) for p in pagina.items]
+            
+            log_business_operation(
+                "READ",
+                "Productos",
+                user=current_user.nombre,
+                details=f"Cursor '{cursor}', {len(pagina.items)} items"
+            )
+            
+            return create_response(data=pagina.to_dict())
         
         # Obtener parámetros de paginación
         page, per_page = get_pagination_params(request)
-        categoria_id = request.args.get('categoria_id', type=int)
         
         use_case = container.resolve('get_all_productos_use_case')
-        productos = use_case.execute(categoria_id=categoria_id)
+        productos = use_case.execute(categoria_id=categoria_id, fields=fields)
         
         # Convertir a dict antes de paginar
-        productos_dict = [p.to_dict() for p in productos]
+        productos_dict = [serializar(p) for p in productos]
         
         # Aplicar paginación
         paginated = paginate_list(productos_dict, page=page, per_page=per_page)
@@ -64,6 +144,8 @@ def get_productos(current_user):
         )
         
         return create_response(data=paginated.to_dict())
+    except BusinessLogicError as e:
+        return create_response(message=str(e), status_code=400)
     except Exception as e:
         from app.utils.logger import log_error
         log_error(e, context="get_productos", user=current_user.nombre)
@@ -72,6 +154,7 @@ def get_productos(current_user):
 
 @producto_bp.route('/<int:producto_id>', methods=['GET'])
 @token_required
+@conditional_get('productos', 'categorias')
 def get_producto(current_user, producto_id):
     """
     Obtiene un producto por ID
@@ -178,6 +261,130 @@ def create_producto(current_user):
         return handle_error(e)
 
 
+@producto_bp.route('/import', methods=['POST'])
+@token_required
+@rol_requerido('admin')
+def import_productos(current_user):
+    """
+    Importa productos en lote desde CSV o NDJSON (lectura incremental)
+    
+    El archivo se envía como multipart (campo `archivo`) o como cuerpo de la
+    petición. Columnas: nombre, categoria_id, precio, stock, stock_minimo,
+    descripcion, codigo_barras, proveedor_id.
+    
+    Query Parameters:
+        - formato: 'csv' | 'ndjson' (opcional, se detecta por extensión/content type)
+        - batch_size: int (default: IMPORT_BATCH_SIZE, max: 5000) - Filas por transacción
+        - actualizar: bool (default: true) - Actualizar productos existentes
+          (mismo nombre y categoría) en lugar de reportarlos como error
+        - stream: bool (default: false) - Responder NDJSON con un evento de
+          progreso por lote y el resumen al final
+        
+    Returns:
+        200: {"procesadas", "insertadas", "actualizadas", "con_errores",
+              "errores": [{"fila": 3, "errores": {"precio": [...]}}]}
+        400: Formato o parámetros inválidos
+    """
+    try:
+        from app.utils.importacion import detectar_formato, iter_filas
+        
+        archivo = request.files.get('archivo')
+        stream = archivo.stream if archivo else request.stream
+        formato = detectar_formato(
+            request.args.get('formato'),
+            content_type=request.content_type,
+            filename=archivo.filename if archivo else None
+        )
+        batch_size = request.args.get('batch_size', type=int,
+                                      default=current_app.config.get('IMPORT_BATCH_SIZE', 500))
+        batch_size = min(max(batch_size, 1), 5000)
+        actualizar = request.args.get('actualizar', 'true').lower() != 'false'
+        usuario = current_user.nombre
+        
+        use_case = container.resolve('import_productos_use_case')
+        eventos = use_case.iter_progreso(
+            iter_filas(stream, formato),
+            batch_size=batch_size,
+            actualizar_existentes=actualizar
+        )
+        
+        def registrar(resumen):
+            from app.utils.logger import log_business_operation
+            log_business_operation(
+                "IMPORT",
+                "Productos",
+                user=usuario,
+                details=(f"{resumen['insertadas']} insertados, {resumen['actualizadas']} "
+                         f"actualizados, {resumen['con_errores']} con errores")
+            )
+        
+        if request.args.get('stream', '').lower() in ('1', 'true'):
+            def generar():
+                for evento in eventos:
+                    if evento['tipo'] == 'resumen':
+                        registrar(evento)
+                    yield json.dumps(evento, ensure_ascii=False) + '\n'
+            return Response(stream_with_context(generar()), mimetype='application/x-ndjson')
+        
+        resumen = None
+        for resumen in eventos:
+            pass
+        registrar(resumen)
+        resumen.pop('tipo')
+        return create_response(data=resumen)
+    except ValueError as e:
+        return create_response(message=str(e), status_code=400)
+    except BusinessLogicError as e:
+        return create_response(message=str(e), status_code=400)
+    except Exception as e:
+        return handle_error(e)
+
+
+@producto_bp.route('/bulk', methods=['PATCH'])
+@token_required
+@rol_requerido('admin')
+def bulk_update_productos(current_user):
+    """
+    Ajuste masivo de precio y/o stock mínimo con un solo UPDATE
+    
+    Body:
+        - filtro: {"ids": [1, 2, 3]} o {"categoria_id": 1} y/o {"proveedor_id": 2}
+        - precio: {"tipo": "porcentaje" | "monto" | "fijo", "valor": 10} (opcional)
+        - stock_minimo: {"tipo": "porcentaje" | "monto" | "fijo", "valor": 5} (opcional)
+        
+    Ejemplo: aumentar 8% los productos de un proveedor
+        {"filtro": {"proveedor_id": 3}, "precio": {"tipo": "porcentaje", "valor": 8}}
+        
+    Returns:
+        200: {"actualizados": 120}
+        400: Filtro o ajuste inválido, o precio resultante <= 0
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not data:
+            return create_response(
+                message="No se proporcionaron datos",
+                status_code=400
+            )
+        
+        use_case = container.resolve('bulk_update_productos_use_case')
+        resultado = use_case.execute(
+            data,
+            usuario_id=current_user.id,
+            ip_address=request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr),
+            user_agent=request.headers.get('User-Agent')
+        )
+        
+        return create_response(
+            message=f"{resultado['actualizados']} productos actualizados",
+            data=resultado
+        )
+    except BusinessLogicError as e:
+        return create_response(message=str(e), status_code=e.status_code)
+    except Exception as e:
+        return handle_error(e)
+
+
 @producto_bp.route('/<int:producto_id>', methods=['PUT'])
 @token_required
 @rol_requerido('admin')
@@ -256,20 +463,34 @@ def delete_producto(current_user, producto_id):
 @token_required
 def search_productos(current_user):
     """
-    Busca productos por nombre
+    Busca productos por nombre, descripción o código de barras
+    (índice de texto completo, resultados ordenados por relevancia)
     
     Query Parameters:
         - q: str - Término de búsqueda (mínimo 2 caracteres)
+        - page: int (default: 1) - Número de página
+        - per_page: int (default: 20, max: 100) - Resultados por página
+        - fuzzy: 1 (opcional) - Búsqueda tolerante a errores de tipeo
+          ("tornilo" -> "tornillo"), ordenada por similitud
+        - threshold: float (opcional) - Similitud mínima 0-1 en modo fuzzy
+          (default: FUZZY_SEARCH_THRESHOLD)
         
     Returns:
         200: Lista de productos encontrados
-        400: Término inválido
+        400: Término o umbral inválido
     """
     try:
+        from app.utils.pagination import get_pagination_params
+        
         term = request.args.get('q', '')
+        page, per_page = get_pagination_params(request)
+        fuzzy = request.args.get('fuzzy', '').lower() in ('1', 'true')
+        umbral = request.args.get('threshold', type=float,
+                                  default=current_app.config.get('FUZZY_SEARCH_THRESHOLD', 0.3))
         
         use_case = container.resolve('search_productos_use_case')
-        productos = use_case.execute(term)
+        productos = use_case.execute(term, page=page, per_page=per_page,
+                                     fuzzy=fuzzy, umbral=umbral)
         
         return create_response(data=[p.to_dict() for p in productos])
     except BusinessLogicError as e:
@@ -278,18 +499,123 @@ def search_productos(current_user):
         return handle_error(e)
 
 
+@producto_bp.route('/autocomplete', methods=['GET'])
+@token_required
+def autocomplete_productos(current_user):
+    """
+    Sugiere productos cuyo nombre empieza con el texto escrito
+    (índice ordenado en memoria, sin consultar la base de datos)
+    
+    Query Parameters:
+        - prefix: str - Inicio del nombre (sin distinguir mayúsculas ni acentos)
+        - limit: int (default: 10, max: 50) - Cantidad de sugerencias
+        
+    Returns:
+        200: [{"id", "nombre", "precio", "stock", "categoria_id", "codigo_barras"}, ...]
+        400: Prefijo vacío
+    """
+    try:
+        prefijo = request.args.get('prefix', '')
+        limit = request.args.get('limit', 10, type=int)
+        
+        use_case = container.resolve('autocomplete_productos_use_case')
+        productos = use_case.execute(prefijo, limit=limit)
+        
+        return create_response(data=[p.to_dict() for p in productos])
+    except BusinessLogicError as e:
+        return create_response(message=str(e), status_code=400)
+    except Exception as e:
+        return handle_error(e)
+
+
+@producto_bp.route('/barcode/<string:codigo>', methods=['GET'])
+@token_required
+def get_producto_by_barcode(current_user, codigo):
+    """
+    Obtiene el resumen de un producto por código de barras (escaneo en caja)
+    
+    Path Parameters:
+        - codigo: str - Código de barras (EAN-13)
+        
+    Returns:
+        200: {"id", "nombre", "precio", "stock", "categoria_id", "codigo_barras"}
+        404: Código no registrado
+    """
+    try:
+        use_case = container.resolve('get_productos_by_barcode_use_case')
+        encontrados = use_case.execute([codigo])
+        
+        producto = next(iter(encontrados.values()), None)
+        if producto is None:
+            return create_response(
+                message=f"No existe un producto con código de barras {codigo}",
+                status_code=404
+            )
+        return create_response(data=producto.to_dict())
+    except BusinessLogicError as e:
+        return create_response(message=str(e), status_code=400)
+    except Exception as e:
+        return handle_error(e)
+
+
+@producto_bp.route('/barcode/batch', methods=['POST'])
+@token_required
+def get_productos_by_barcodes(current_user):
+    """
+    Resuelve varios códigos de barras en una sola llamada
+    
+    Body:
+        - codigos: list[str] (requerido, máximo 500)
+        
+    Returns:
+        200: {
+            "encontrados": {"7701234567890": {...}, ...},
+            "no_encontrados": ["0000000000000"]
+        }
+        400: Lista vacía o demasiado grande
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        codigos = data.get('codigos')
+        if not isinstance(codigos, list):
+            return create_response(
+                message="Se requiere una lista 'codigos'",
+                status_code=400
+            )
+        
+        use_case = container.resolve('get_productos_by_barcode_use_case')
+        encontrados = use_case.execute(codigos)
+        
+        return create_response(data={
+            'encontrados': {codigo: p.to_dict() for codigo, p in encontrados.items()},
+            'no_encontrados': [
+                c for c in dict.fromkeys(str(c).strip() for c in codigos if c is not None)
+                if c and c not in encontrados
+            ]
+        })
+    except BusinessLogicError as e:
+        return create_response(message=str(e), status_code=400)
+    except Exception as e:
+        return handle_error(e)
+
+
 @producto_bp.route('/stock-bajo', methods=['GET'])
 @token_required
 def get_stock_bajo(current_user):
     """
     Obtiene productos con stock bajo (stock <= stock_minimo)
     
+    Query Parameters:
+        - limit: int (opcional) - Cantidad máxima de productos
+        
     Returns:
-        200: Lista de productos con stock bajo
+        200: Lista de productos con stock bajo, los de menor stock primero
     """
     try:
+        limit = request.args.get('limit', type=int)
+        
         use_case = container.resolve('get_stock_bajo_use_case')
-        productos = use_case.execute()
+        productos = use_case.execute(limit=limit)
         
         return create_response(data=[p.to_dict() for p in productos])
     except Exception as e:
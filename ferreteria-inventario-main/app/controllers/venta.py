@@ -7,16 +7,31 @@ Principios aplicados:
 - Dependency Inversion: Depende de abstracciones (use cases)
 - Open/Closed: Extensible sin modificar el código existente
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from app.infrastructure.di.container import get_container
 from app.exceptions import NotFoundError, ValidationError, BusinessLogicError, DatabaseError
-from app.utils import token_required
+from app.utils import token_required, rol_requerido, idempotente
+from app.utils.fieldsets import get_fields_param, campos_de_modelo
+from app.utils.pagination import get_cursor_params, iter_json_array
+from app.models import Venta
 
 venta_bp = Blueprint('ventas', __name__, url_prefix='/api/ventas')
 
 
+# Máximo de ventas por respuesta en el listado por limit/offset
+MAX_LIMIT_VENTAS = 100
+
+
+def _get_paginacion():
+    """Lee limit (1 a MAX_LIMIT_VENTAS) y offset de la query string (se aplican en SQL)"""
+    limit = request.args.get('limit', MAX_LIMIT_VENTAS, type=int)
+    limit = max(1, min(limit, MAX_LIMIT_VENTAS))
+    return limit, max(0, request.args.get('offset', 0, type=int))
+
+
 @venta_bp.route('', methods=['POST'])
 @token_required
+@idempotente
 def create_venta(current_user):
     """
     Crea una nueva venta con sus detalles
@@ -36,9 +51,16 @@ def create_venta(current_user):
         "cliente_telefono": "555-1234"    // Opcional
     }
     
+    Headers:
+        Idempotency-Key: Clave única del intento (opcional). Los reintentos
+            con la misma clave devuelven la respuesta original sin crear
+            otra venta.
+    
     Returns:
         201: Venta creada exitosamente con sus detalles
         400: Error de validación (datos inválidos, stock insuficiente)
+        404: Producto no encontrado
+        409: La caja del día del vendedor ya está cerrada
         500: Error del servidor
     """
     try:
@@ -47,7 +69,7 @@ def create_venta(current_user):
         
         data = request.get_json()
         # Usar el usuario autenticado
-        data['usuario_id'] = current_user['id']
+        data['usuario_id'] = current_user.id
         
         result = use_case.execute(data)
         
@@ -63,11 +85,16 @@ def create_venta(current_user):
             'message': str(e),
             'errors': e.errors if hasattr(e, 'errors') else None
         }), 400
+    except NotFoundError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 404
     except BusinessLogicError as e:
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 400
+        }), e.status_code
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -75,6 +102,114 @@ def create_venta(current_user):
         }), 500
 
 
+@venta_bp.route('/lote', methods=['POST'])
+@token_required
+@idempotente
+def create_ventas_lote(current_user):
+    """
+    Registra un lote de ventas (sincronización de cajas sin conexión)
+    
+    Las ventas se validan, descuentan stock y se insertan juntas; cada una
+    se acepta o rechaza por separado (un rechazo no revierte las demás).
+    
+    Request Body:
+    {
+        "ventas": [
+            {
+                "referencia": "caja2-000123",  // Opcional, se devuelve en el resultado
+                "detalles": [{"producto_id": 1, "cantidad": 5}],
+                "cliente_nombre": "Juan Pérez"  // Opcional
+            }
+        ]
+    }
+    
+    Headers:
+        Idempotency-Key: Clave única del lote (opcional), ver create_venta
+    
+    Returns:
+        200: Resultado por venta (status success con venta_id, o error con status_code y message)
+        400: Lote vacío, no es una lista o excede el máximo de ventas
+        409: La caja del día del vendedor ya está cerrada
+        500: Error del servidor
+    """
+    try:
+        container = get_container()
+        use_case = container.resolve('create_ventas_lote_use_case')
+        
+        data = request.get_json(silent=True) or {}
+        result = use_case.execute(data.get('ventas'), current_user.id)
+        
+        return jsonify({
+            'status': 'success',
+            'message': f"{result['creadas']} venta(s) creada(s), {result['rechazadas']} rechazada(s)",
+            'data': result
+        }), 200
+        
+    except BusinessLogicError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), e.status_code
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Error al registrar lote de ventas: {str(e)}'
+        }), 500
+
+
+@venta_bp.route('/anular', methods=['POST'])
+@token_required
+@rol_requerido('admin')
+def anular_ventas(current_user):
+    """
+    Anula varias ventas en una transacción (cierre de lotes cargados por error)
+    
+    Restaura el stock de todas las líneas, descuenta los resúmenes diarios,
+    elimina ventas y detalles y registra la auditoría en un solo commit.
+    Los IDs inexistentes (o ya anulados) se informan sin error.
+    
+    Request Body:
+    {
+        "venta_ids": [101, 102, 103]
+    }
+    
+    Returns:
+        200: IDs anulados y no encontrados
+        400: Lista vacía, con valores no enteros o que excede el máximo
+        403: El usuario no es admin
+        409: La caja del día de alguna venta ya está cerrada (no se anula ninguna)
+        500: Error del servidor
+    """
+    try:
+        container = get_container()
+        use_case = container.resolve('anular_ventas_use_case')
+        
+        data = request.get_json(silent=True) or {}
+        result = use_case.execute(
+            data.get('venta_ids'),
+            current_user.id,
+            ip_address=request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr),
+            user_agent=request.headers.get('User-Agent')
+        )
+        
+        return jsonify({
+            'status': 'success',
+            'message': f"{len(result['anuladas'])} venta(s) anulada(s)",
+            'data': result
+        }), 200
+        
+    except BusinessLogicError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), e.status_code
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Error al anular ventas: {str(e)}'
+        }), 500
+
+
 @venta_bp.route('/<int:id>', methods=['GET'])
 @token_required
 def get_venta(current_user, id):
@@ -116,22 +251,63 @@ def get_venta(current_user, id):
 @token_required
 def get_all_ventas(current_user):
     """
-    Obtiene todas las ventas con paginación opcional
+    Obtiene las ventas paginadas, las más recientes primero
+    
+    Por defecto se pagina por cursor (keyset): la respuesta trae
+    `pagination.next_cursor` para pedir la página siguiente. El historial
+    completo solo se obtiene con stream.
     
     Query Params:
-        limit: Número máximo de ventas a devolver (opcional)
+        cursor: `next_cursor` de la página anterior (vacío u omitido para
+            la primera página)
+        limit: Ventas por página, de 1 a 100 (default 20; 100 con offset
+            o fields)
+        offset: Ventas a saltar; activa la paginación numerada por
+            limit/offset (opcional)
+        fields: Columnas a devolver, separadas por coma (opcional).
+            Solo se consultan esas columnas, sin relaciones; usa
+            limit/offset.
+        stream: 'true'/'1' para recibir todas las ventas (desde `cursor`
+            si se indica) como un arreglo JSON escrito de a poco
         
     Returns:
-        200: Lista de ventas
+        200: Lista de ventas (con `pagination` en modo cursor)
+        400: Campo desconocido en fields o cursor inválido
         500: Error del servidor
     """
     try:
         container = get_container()
+        
+        # Historial completo sin cargarlo en memoria: páginas keyset en streaming
+        if request.args.get('stream', '').lower() in ('1', 'true'):
+            ventas = container.resolve('get_ventas_page_use_case').iter_ventas(
+                request.args.get('cursor')
+            )
+            return Response(stream_with_context(iter_json_array(ventas)),
+                            mimetype='application/json')
+        
+        if 'offset' not in request.args and 'fields' not in request.args:
+            cursor, limit, _ = get_cursor_params(request)
+            pagina = container.resolve('get_ventas_page_use_case').execute(cursor, limit)
+            return jsonify({
+                'status': 'success',
+                'data': pagina.items,
+                'count': len(pagina.items),
+                'pagination': pagina.to_dict()['pagination']
+            }), 200
+        
         use_case = container.resolve('get_all_ventas_use_case')
         
-        limit = request.args.get('limit', type=int)
+        limit, offset = _get_paginacion()
+        try:
+            fields = get_fields_param(request, campos_de_modelo(Venta))
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
         
-        result = use_case.execute(limit)
+        result = use_case.execute(limit, fields=fields, offset=offset)
         
         return jsonify({
             'status': 'success',
@@ -139,6 +315,11 @@ def get_all_ventas(current_user):
             'count': len(result)
         }), 200
         
+    except BusinessLogicError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), e.status_code
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -155,6 +336,8 @@ def get_ventas_by_date_range(current_user):
     Query Params:
         fecha_inicio: Fecha de inicio en formato ISO (YYYY-MM-DD)
         fecha_fin: Fecha de fin en formato ISO (YYYY-MM-DD)
+        limit: Número máximo de ventas a devolver (opcional)
+        offset: Ventas a saltar (opcional)
         
     Returns:
         200: Lista de ventas en el rango
@@ -174,10 +357,8 @@ def get_ventas_by_date_range(current_user):
                 'message': 'Se requieren fecha_inicio y fecha_fin'
             }), 400
         
-        result = use_case.execute({
-            'fecha_inicio': fecha_inicio,
-            'fecha_fin': fecha_fin
-        })
+        limit, offset = _get_paginacion()
+        result = use_case.execute(fecha_inicio, fecha_fin, limit=limit, offset=offset)
         
         return jsonify({
             'status': 'success',
@@ -185,11 +366,11 @@ def get_ventas_by_date_range(current_user):
             'count': len(result)
         }), 200
         
-    except ValidationError as e:
+    except BusinessLogicError as e:
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 400
+        }), e.status_code
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -206,6 +387,10 @@ def get_ventas_by_usuario(current_user, usuario_id):
     Args:
         usuario_id: ID del usuario
         
+    Query Params:
+        limit: Número máximo de ventas a devolver (opcional)
+        offset: Ventas a saltar (opcional)
+        
     Returns:
         200: Lista de ventas del usuario
         400: Error de validación
@@ -215,7 +400,8 @@ def get_ventas_by_usuario(current_user, usuario_id):
         container = get_container()
         use_case = container.resolve('get_ventas_by_usuario_use_case')
         
-        result = use_case.execute(usuario_id)
+        limit, offset = _get_paginacion()
+        result = use_case.execute(usuario_id, limit=limit, offset=offset)
         
         return jsonify({
             'status': 'success',
@@ -223,11 +409,11 @@ def get_ventas_by_usuario(current_user, usuario_id):
             'count': len(result)
         }), 200
         
-    except ValidationError as e:
+    except BusinessLogicError as e:
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 400
+        }), e.status_code
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -244,16 +430,34 @@ def get_ventas_by_cliente(current_user, cliente_documento):
     Args:
         cliente_documento: Documento del cliente
         
+    Query Params:
+        limit: Número máximo de ventas a devolver (opcional)
+        offset: Ventas a saltar (opcional)
+        cursor: Activa la paginación por cursor (keyset), las más recientes
+            primero. Vacío para la primera página; luego el `next_cursor`
+            recibido. En este modo limit es de 1 a 100 (default 20).
+        
     Returns:
-        200: Lista de ventas del cliente
-        400: Error de validación
+        200: Lista de ventas del cliente (con `pagination` en modo cursor)
+        400: Error de validación o cursor inválido
         500: Error del servidor
     """
     try:
         container = get_container()
         use_case = container.resolve('get_ventas_by_cliente_use_case')
         
-        result = use_case.execute(cliente_documento)
+        if 'cursor' in request.args:
+            cursor, limit, _ = get_cursor_params(request)
+            pagina = use_case.pagina(cliente_documento, cursor, limit)
+            return jsonify({
+                'status': 'success',
+                'data': pagina.items,
+                'count': len(pagina.items),
+                'pagination': pagina.to_dict()['pagination']
+            }), 200
+        
+        limit, offset = _get_paginacion()
+        result = use_case.execute(cliente_documento, limit=limit, offset=offset)
         
         return jsonify({
             'status': 'success',
@@ -261,11 +465,11 @@ def get_ventas_by_cliente(current_user, cliente_documento):
             'count': len(result)
         }), 200
         
-    except ValidationError as e:
+    except BusinessLogicError as e:
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 400
+        }), e.status_code
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -273,6 +477,43 @@ def get_ventas_by_cliente(current_user, cliente_documento):
         }), 500
 
 
+@venta_bp.route('/cliente/<cliente_documento>/resumen', methods=['GET'])
+@token_required
+def get_resumen_cliente(current_user, cliente_documento):
+    """
+    Obtiene el resumen de compras de un cliente
+    
+    Args:
+        cliente_documento: Documento del cliente
+        
+    Returns:
+        200: {total, cantidad_ventas, ticket_promedio, ultima_compra}
+        400: Documento inválido
+        404: El cliente no tiene ventas
+        500: Error del servidor
+    """
+    try:
+        container = get_container()
+        use_case = container.resolve('get_resumen_cliente_use_case')
+        result = use_case.execute(cliente_documento)
+        
+        return jsonify({
+            'status': 'success',
+            'data': result
+        }), 200
+        
+    except BusinessLogicError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), e.status_code
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Error al obtener resumen del cliente: {str(e)}'
+        }), 500
+
+
 @venta_bp.route('/estadisticas', methods=['GET'])
 @token_required
 def get_ventas_statistics(current_user):
@@ -292,29 +533,68 @@ def get_ventas_statistics(current_user):
         container = get_container()
         use_case = container.resolve('get_ventas_statistics_use_case')
         
-        fecha_inicio = request.args.get('fecha_inicio')
-        fecha_fin = request.args.get('fecha_fin')
+        result = use_case.execute(
+            request.args.get('fecha_inicio'),
+            request.args.get('fecha_fin')
+        )
         
-        data = {}
-        if fecha_inicio:
-            data['fecha_inicio'] = fecha_inicio
-        if fecha_fin:
-            data['fecha_fin'] = fecha_fin
+        return jsonify({
+            'status': 'success',
+            'data': result
+        }), 200
         
-        result = use_case.execute(data)
+    except BusinessLogicError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), e.status_code
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Error al obtener estadísticas: {str(e)}'
+        }), 500
+
+@venta_bp.route('/serie', methods=['GET'])
+@token_required
+def get_serie_ventas(current_user):
+    """
+    Serie de ventas (cantidad y total) por hora, día, semana o mes
+    
+    Los intervalos ya cerrados se calculan una vez y quedan en caché (la
+    anulación de una venta invalida los intervalos que la contenían); el
+    intervalo en curso se calcula en cada petición.
+    
+    Query Params:
+        granularity: hour, day, week o month (default: day)
+        range: Período hasta ahora, p. ej. 24h, 30d, 12w, 6m
+               (default: 24h, 30d, 12w o 12m según la granularidad)
+        
+    Returns:
+        200: Intervalos en orden con inicio, fin, cantidad, total y cerrado
+        400: Granularidad o rango inválidos
+        500: Error del servidor
+    """
+    try:
+        container = get_container()
+        use_case = container.resolve('get_serie_ventas_use_case')
+        
+        result = use_case.execute(
+            request.args.get('granularity', 'day'),
+            request.args.get('range')
+        )
         
         return jsonify({
             'status': 'success',
             'data': result
         }), 200
         
-    except ValidationError as e:
+    except BusinessLogicError as e:
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 400
+        }), e.status_code
     except Exception as e:
         return jsonify({
             'status': 'error',
-            'message': f'Error al obtener estadísticas: {str(e)}'
-        }), 500
\ No newline at end of file
+            'message': f'Error al obtener serie de ventas: {str(e)}'
+        }), 500
@@ -3,7 +3,7 @@ Interfaz del repositorio de Categoría
 Define el contrato para las operaciones de persistencia de categorías
 """
 from abc import abstractmethod
-from typing import Optional, List
+from typing import Dict, Optional, List
 from app.domain.interfaces.repository_interface import IRepository
 
 
@@ -43,11 +43,16 @@ class ICategoriaRepository(IRepository):
         pass
     
     @abstractmethod
-    def get_with_products_count(self) -> List[any]:
+    def get_with_products_count(self, categoria_id: Optional[int] = None) -> List[Dict]:
         """
-        Obtiene todas las categorías con el conteo de productos
+        Obtiene las categorías con estadísticas de sus productos
+        (conteo, valor del stock y cantidad con stock bajo)
         
+        Args:
+            categoria_id: Limitar a una categoría (opcional)
+            
         Returns:
-            Lista de categorías con información de cantidad de productos
+            Lista de diccionarios con los datos de cada categoría y
+            productos_count, valor_stock y productos_stock_bajo
         """
         pass
@@ -0,0 +1,33 @@
+"""
+Interfaz del repositorio de cierres de caja
+"""
+from abc import abstractmethod
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+from .repository_interface import IRepository
+
+
+class ICierreCajaRepository(IRepository):
+    """
+    Interfaz para los cierres de caja (copias inmutables del resumen diario
+    de cada vendedor)
+    """
+
+    @abstractmethod
+    def get_cierre(self, fecha: date, usuario_id: int) -> Optional[any]:
+        """Cierre del vendedor en el día o None si no cerró"""
+        pass
+
+    @abstractmethod
+    def cerrar(self, fecha: date, usuario_id: int, cerrado_por: int,
+               monto_declarado: Optional[Decimal] = None,
+               observaciones: Optional[str] = None) -> Optional[any]:
+        """Copia el resumen del día en un cierre; None si el día ya estaba cerrado"""
+        pass
+
+    @abstractmethod
+    def get_cierres(self, desde: Optional[date] = None, hasta: Optional[date] = None,
+                    usuario_id: Optional[int] = None, limit: int = 100) -> List[any]:
+        """Cierres del rango, los más recientes primero"""
+        pass
@@ -3,7 +3,7 @@ Interfaz de repositorio de Producto
 Define las operaciones específicas del dominio Producto
 """
 from abc import abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from .repository_interface import IRepository
 
 class IProductoRepository(IRepository):
@@ -17,8 +17,13 @@ class IProductoRepository(IRepository):
         pass
     
     @abstractmethod
-    def search_products(self, term: str) -> List[any]:
-        """Buscar productos por término"""
+    def search_products(self, term: str, limit: int = 20, offset: int = 0) -> List[any]:
+        """Buscar productos por término, ordenados por relevancia"""
+        pass
+    
+    @abstractmethod
+    def get_by_nombre_prefix(self, prefijo: str, limit: int = 10) -> List[any]:
+        """Productos cuyo nombre empieza con el prefijo, en orden alfabético"""
         pass
     
     @abstractmethod
@@ -27,13 +32,70 @@ class IProductoRepository(IRepository):
         pass
     
     @abstractmethod
-    def get_stock_bajo(self) -> List[any]:
+    def get_by_codigos_barras(self, codigos: List[str]) -> List[any]:
+        """Obtener productos por códigos de barras"""
+        pass
+    
+    @abstractmethod
+    def get_page(self, after_id: Optional[int] = None, limit: int = 20,
+                 categoria_id: Optional[int] = None,
+                 fields: Optional[Sequence[str]] = None) -> List[any]:
         """
-        Obtener productos con stock bajo o agotado.
+        Obtener una página de productos por keyset (id > after_id, ordenado por id)
+        
+        Args:
+            after_id: Último ID de la página anterior (None = primera página)
+            limit: Cantidad máxima de productos
+            categoria_id: Filtrar por categoría (opcional)
+            fields: Seleccionar solo estas columnas (opcional)
+        """
+        pass
+    
+    @abstractmethod
+    def count_by_categoria(self, categoria_id: Optional[int] = None) -> int:
+        """Contar productos, opcionalmente de una categoría"""
+        pass
+    
+    @abstractmethod
+    def get_stock_bajo(self, limit: Optional[int] = None) -> List[any]:
+        """
+        Obtener productos con stock bajo o agotado, los de menor stock primero.
         Stock bajo: stock <= stock_minimo
         """
         pass
     
+    @abstractmethod
+    def get_by_ids(self, ids: List[int]) -> List[any]:
+        """Obtener productos por ID conservando el orden recibido"""
+        pass
+    
+    @abstractmethod
+    def get_for_update(self, ids: List[int]) -> dict:
+        """
+        Obtener productos por ID en una sola consulta bloqueando sus filas
+        (SELECT ... FOR UPDATE) hasta el commit o rollback de la transacción
+        
+        Returns:
+            Diccionario {producto_id: producto} (se omiten los ids inexistentes)
+        """
+        pass
+    
+    @abstractmethod
+    def ajustar_stock(self, cantidades: dict, commit: bool = True) -> None:
+        """
+        Sumar o restar stock de forma atómica (UPDATE condicional, sin
+        leer y escribir desde Python)
+        
+        Args:
+            cantidades: {producto_id: delta} (positivo suma, negativo resta)
+            commit: Confirmar la transacción
+        
+        Raises:
+            NotFoundError: Si un producto no existe
+            StockError: Si un producto no tiene stock suficiente
+        """
+        pass
+    
     @abstractmethod
     def update_stock(self, producto_id: int, cantidad: int, operacion: str) -> bool:
         """
@@ -53,3 +115,28 @@ class IProductoRepository(IRepository):
     def exists_by_name_and_categoria(self, nombre: str, categoria_id: int, exclude_id: Optional[int] = None) -> bool:
         """Verificar si existe producto con nombre y categoría (para evitar duplicados)"""
         pass
+    
+    @abstractmethod
+    def find_import_matches(self, claves: List[tuple], codigos: List[str]) -> dict:
+        """
+        Buscar en una sola consulta los productos existentes de un lote a importar
+        
+        Returns:
+            {'por_clave': {(nombre, categoria_id): id}, 'por_codigo': {codigo: id}}
+        """
+        pass
+    
+    @abstractmethod
+    def get_existing_categoria_ids(self, categoria_ids: List[int]) -> set:
+        """Obtener cuáles de los IDs de categoría existen"""
+        pass
+    
+    @abstractmethod
+    def bulk_upsert(self, nuevos: List[dict], actualizaciones: List[dict]) -> None:
+        """Insertar y actualizar un lote de productos en una sola transacción"""
+        pass
+    
+    @abstractmethod
+    def bulk_adjust(self, filtro: dict, ajustes: dict, auditoria: Optional[dict] = None) -> int:
+        """Ajustar precio / stock mínimo de muchos productos con un UPDATE set-based"""
+        pass
@@ -3,7 +3,7 @@ Interfaz base de repositorio (patrón Repository)
 Principio: Dependency Inversion (SOLID)
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional, TypeVar, Generic
+from typing import Dict, List, Optional, Sequence, TypeVar, Generic
 
 T = TypeVar('T')
 
@@ -23,6 +23,13 @@ class IRepository(ABC, Generic[T]):
         """Obtener entidad por ID"""
         pass
     
+    @abstractmethod
+    def get_projection(self, fields: Sequence[str], filtros: Optional[Dict] = None,
+                       limit: Optional[int] = None, descendente: bool = False,
+                       offset: int = 0) -> List:
+        """Obtener solo las columnas indicadas, sin cargar entidades"""
+        pass
+    
     @abstractmethod
     def create(self, data: dict) -> T:
         """Crear nueva entidad"""
@@ -42,3 +49,8 @@ class IRepository(ABC, Generic[T]):
     def exists(self, entity_id: int) -> bool:
         """Verificar si existe una entidad"""
         pass
+    
+    @abstractmethod
+    def rollback(self) -> None:
+        """Descartar la transacción en curso"""
+        pass
@@ -0,0 +1,94 @@
+"""
+Interfaz del repositorio del resumen diario de ventas
+"""
+from abc import abstractmethod
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from .repository_interface import IRepository
+
+# (fecha de la venta, usuario_id, total, unidades vendidas)
+MovimientoVenta = Tuple[datetime, int, Decimal, int]
+
+
+class IVentaDiariaRepository(IRepository):
+    """
+    Interfaz para el resumen de ventas por día y usuario
+    """
+
+    @abstractmethod
+    def acumular(self, movimientos: Iterable[MovimientoVenta], signo: int = 1) -> None:
+        """Suma (o resta con signo=-1) ventas al resumen, sin confirmar la transacción"""
+        pass
+
+    @abstractmethod
+    def reconstruir(self, desde: Optional[date] = None, hasta: Optional[date] = None) -> int:
+        """Recalcula el resumen del rango desde las ventas; devuelve las filas generadas"""
+        pass
+
+    @abstractmethod
+    def get_dia(self, fecha: date, usuario_id: int):
+        """Resumen de un usuario en un día o None si no vendió"""
+        pass
+
+    @abstractmethod
+    def resumen_por_dia(self, desde: Optional[date] = None,
+                        hasta: Optional[date] = None) -> List[Dict]:
+        """Totales por día del rango (todos los usuarios), ordenados por fecha"""
+        pass
+
+    @abstractmethod
+    def totales(self, desde: Optional[date] = None, hasta: Optional[date] = None) -> Dict:
+        """Totales del rango: total, cantidad e items"""
+        pass
+
+
+# (fecha de la venta, producto_id, unidades, subtotal)
+MovimientoProducto = Tuple[datetime, int, int, Decimal]
+
+
+class IProductoVentaDiariaRepository(IRepository):
+    """
+    Interfaz para las ventas por día y producto
+    """
+
+    @abstractmethod
+    def acumular(self, movimientos: Iterable[MovimientoProducto], signo: int = 1) -> None:
+        """Suma (o resta con signo=-1) líneas de venta, sin confirmar la transacción"""
+        pass
+
+    @abstractmethod
+    def reconstruir(self, desde: Optional[date] = None, hasta: Optional[date] = None) -> int:
+        """Recalcula los días del rango desde detalle_venta; devuelve las filas generadas"""
+        pass
+
+    @abstractmethod
+    def top_productos(self, limite: int, desde: Optional[date] = None,
+                      hasta: Optional[date] = None) -> List[Dict]:
+        """Productos con más unidades vendidas en el rango"""
+        pass
+
+
+# (cliente_documento, fecha de la venta, total)
+MovimientoCliente = Tuple[str, datetime, Decimal]
+
+
+class IClienteResumenRepository(IRepository):
+    """
+    Interfaz para el resumen de compras por cliente
+    """
+
+    @abstractmethod
+    def acumular(self, movimientos: Iterable[MovimientoCliente], signo: int = 1) -> None:
+        """Suma (o resta con signo=-1) ventas al resumen de sus clientes, sin confirmar"""
+        pass
+
+    @abstractmethod
+    def reconstruir(self) -> int:
+        """Recalcula el resumen de todos los clientes; devuelve la cantidad de clientes"""
+        pass
+
+    @abstractmethod
+    def get_by_documento(self, cliente_documento: str):
+        """Resumen del cliente o None si no tiene ventas"""
+        pass
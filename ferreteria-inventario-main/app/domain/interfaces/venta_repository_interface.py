@@ -3,7 +3,7 @@ Interfaz del repositorio de Venta
 Define el contrato para las operaciones de persistencia de ventas
 """
 from abc import abstractmethod
-from typing import Optional, List, Tuple
+from typing import Iterator, Optional, List, Tuple
 from datetime import datetime
 from app.domain.interfaces.repository_interface import IRepository
 
@@ -18,13 +18,49 @@ class IVentaRepository(IRepository):
     """
     
     @abstractmethod
-    def get_by_date_range(self, fecha_inicio: datetime, fecha_fin: datetime) -> List[any]:
+    def get_all_con_detalles(self, limit: Optional[int] = None, offset: int = 0) -> List[any]:
+        """
+        Obtiene ventas ordenadas por id con usuario, detalles y productos
+        precargados (LIMIT/OFFSET en SQL)
+        """
+        pass
+    
+    @abstractmethod
+    def get_page_por_fecha(self, despues_de: Optional[Tuple[datetime, int]] = None,
+                           limit: int = 100,
+                           cliente_documento: Optional[str] = None) -> List[any]:
+        """
+        Obtiene una página keyset de ventas ordenadas por (fecha, id) descendente
+        
+        Args:
+            despues_de: (fecha, id) de la última venta entregada (None = primera página)
+            limit: Cantidad máxima de ventas a retornar
+            cliente_documento: Solo las ventas de este cliente (opcional)
+            
+        Returns:
+            Lista de ventas con detalles precargados
+        """
+        pass
+    
+    @abstractmethod
+    def iter_paginas_por_fecha(self, despues_de: Optional[Tuple[datetime, int]] = None,
+                               tamano: int = 200) -> Iterator[List[any]]:
+        """
+        Recorre todas las ventas en páginas keyset de `tamano` registros
+        """
+        pass
+    
+    @abstractmethod
+    def get_by_date_range(self, fecha_inicio: datetime, fecha_fin: datetime,
+                          limit: Optional[int] = None, offset: int = 0) -> List[any]:
         """
         Obtiene ventas en un rango de fechas
         
         Args:
             fecha_inicio: Fecha de inicio del rango
             fecha_fin: Fecha de fin del rango
+            limit: Máximo de ventas (opcional)
+            offset: Ventas a saltar
             
         Returns:
             Lista de ventas en el rango especificado
@@ -32,12 +68,15 @@ class IVentaRepository(IRepository):
         pass
     
     @abstractmethod
-    def get_by_usuario(self, usuario_id: int) -> List[any]:
+    def get_by_usuario(self, usuario_id: int, limit: Optional[int] = None,
+                       offset: int = 0) -> List[any]:
         """
-        Obtiene todas las ventas de un usuario
+        Obtiene las ventas de un usuario
         
         Args:
             usuario_id: ID del usuario
+            limit: Máximo de ventas (opcional)
+            offset: Ventas a saltar
             
         Returns:
             Lista de ventas del usuario
@@ -45,12 +84,15 @@ class IVentaRepository(IRepository):
         pass
     
     @abstractmethod
-    def get_by_cliente(self, cliente_documento: str) -> List[any]:
+    def get_by_cliente(self, cliente_documento: str, limit: Optional[int] = None,
+                       offset: int = 0) -> List[any]:
         """
-        Obtiene todas las ventas de un cliente
+        Obtiene las ventas de un cliente
         
         Args:
             cliente_documento: Documento del cliente
+            limit: Máximo de ventas (opcional)
+            offset: Ventas a saltar
             
         Returns:
             Lista de ventas del cliente
@@ -86,6 +128,52 @@ class IVentaRepository(IRepository):
         """
         pass
     
+    @abstractmethod
+    def create_lote(self, ventas: List[Tuple[dict, List[dict]]]) -> List[int]:
+        """
+        Crea varias ventas con sus detalles en una transacción con
+        inserciones en bloque
+        
+        Args:
+            ventas: Lista de tuplas (datos de la venta, detalles de la venta)
+            
+        Returns:
+            IDs de las ventas creadas, en el mismo orden
+        """
+        pass
+    
+    @abstractmethod
+    def get_importes(self, desde: datetime, hasta: datetime) -> List[Tuple[datetime, any]]:
+        """
+        Fecha y total de cada venta en [desde, hasta), sin cargar entidades
+        
+        Args:
+            desde: Inicio del rango (incluido)
+            hasta: Fin del rango (excluido)
+        """
+        pass
+    
+    @abstractmethod
+    def anular(self, venta_ids: List[int], auditoria: Optional[dict] = None) -> List[int]:
+        """
+        Anula ventas en una transacción: restaura el stock, descuenta los
+        resúmenes diarios, elimina ventas y detalles y registra la auditoría
+        
+        Args:
+            venta_ids: IDs de las ventas a anular
+            auditoria: Datos del registro de auditoría (usuario_id,
+                       ip_address, user_agent); sin él no se audita
+            
+        Returns:
+            IDs de las ventas anuladas (las inexistentes se omiten)
+        """
+        pass
+    
+    @abstractmethod
+    def get_with_detalles(self, venta_id: int) -> Optional[any]:
+        """Obtener una venta con usuario, detalles y productos precargados"""
+        pass
+    
     @abstractmethod
     def get_ventas_statistics(self, fecha_inicio: Optional[datetime] = None,
                               fecha_fin: Optional[datetime] = None) -> dict:
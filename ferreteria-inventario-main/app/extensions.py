@@ -6,11 +6,10 @@ from flask_caching import Cache
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 
-# Configuración de caché
-cache = Cache(config={
-    'CACHE_TYPE': 'SimpleCache',  # En producción usar Redis
-    'CACHE_DEFAULT_TIMEOUT': 300  # 5 minutos por defecto
-})
+# Caché: el backend se lee de la configuración de la app (CACHE_TYPE...).
+# Las versiones por tabla viven aquí, así que con varios workers el
+# backend debe ser compartido (Redis en producción)
+cache = Cache()
 
 # Configuración de rate limiting
 limiter = Limiter(
@@ -0,0 +1,35 @@
+"""
+Infrastructure - Caché en memoria y seguimiento de cambios
+"""
+from .change_tracker import ChangeTracker, change_tracker
+from .catalog_snapshot import (
+    CatalogSnapshot, CatalogSnapshotStore, ProductoRecord, catalog_store
+)
+from .barcode_index import BarcodeIndex, barcode_index
+from .low_stock_index import LowStockIndex, low_stock_index
+from .versioned_cache import VersionedCache, versioned_cache
+from .idempotency_store import IdempotencyStore, idempotency_store
+from .serie_ventas import SerieVentasCache, serie_ventas_cache
+
+
+def init_app(app):
+    """
+    Conecta los eventos de SQLAlchemy que mantienen las versiones por tabla
+    y registra los índices derivados del catálogo
+    """
+    from app import db
+    change_tracker.registrar_eventos(db.metadata)
+    catalog_store.registrar_indice(barcode_index)
+    catalog_store.registrar_indice(low_stock_index)
+
+
+__all__ = [
+    'ChangeTracker', 'change_tracker',
+    'CatalogSnapshot', 'CatalogSnapshotStore', 'ProductoRecord', 'catalog_store',
+    'BarcodeIndex', 'barcode_index',
+    'LowStockIndex', 'low_stock_index',
+    'VersionedCache', 'versioned_cache',
+    'IdempotencyStore', 'idempotency_store',
+    'SerieVentasCache', 'serie_ventas_cache',
+    'init_app'
+]
@@ -0,0 +1,62 @@
+"""
+Índice hash de códigos de barras
+
+Traduce `codigo_barras -> id de producto` en O(1) para el escaneo en
+caja. Es un índice derivado del snapshot del catálogo: el resumen del
+producto se lee del snapshot vigente, por lo que el precio y el stock
+siempre corresponden a la misma versión del catálogo.
+
+Solo guarda el id (no el registro), así un cambio de stock o precio no
+requiere tocar el índice; únicamente se actualiza cuando un producto se
+crea, se elimina o cambia su código.
+"""
+from typing import Dict, Iterable, Optional
+
+
+def normalizar_codigo(codigo: Optional[str]) -> str:
+    """Quita espacios que agregan algunos lectores de códigos"""
+    return (codigo or '').strip()
+
+
+class BarcodeIndex:
+    """Índice codigo_barras -> producto_id"""
+
+    def __init__(self):
+        self._id_por_codigo: Dict[str, int] = {}
+        self._codigo_por_id: Dict[int, str] = {}
+
+    def reconstruir(self, snapshot):
+        """Construye el índice completo desde un snapshot del catálogo"""
+        id_por_codigo = {}
+        codigo_por_id = {}
+        for registro in snapshot.registros:
+            codigo = normalizar_codigo(registro.codigo_barras)
+            if codigo:
+                id_por_codigo[codigo] = registro.id
+                codigo_por_id[registro.id] = codigo
+        self._id_por_codigo = id_por_codigo
+        self._codigo_por_id = codigo_por_id
+
+    def actualizar(self, snapshot, ids: Iterable[int]):
+        """Actualiza solo los productos modificados"""
+        for producto_id in ids:
+            registro = snapshot.get(producto_id)
+            nuevo = normalizar_codigo(registro.codigo_barras) if registro else ''
+            anterior = self._codigo_por_id.get(producto_id, '')
+            if nuevo == anterior:
+                continue
+            if anterior and self._id_por_codigo.get(anterior) == producto_id:
+                self._id_por_codigo.pop(anterior, None)
+            if nuevo:
+                self._id_por_codigo[nuevo] = producto_id
+                self._codigo_por_id[producto_id] = nuevo
+            else:
+                self._codigo_por_id.pop(producto_id, None)
+
+    def buscar(self, codigo: str) -> Optional[int]:
+        """Obtener el id del producto con ese código"""
+        return self._id_por_codigo.get(normalizar_codigo(codigo))
+
+
+# Instancia global, registrada en el catálogo por app.infrastructure.cache.init_app
+barcode_index = BarcodeIndex()
@@ -0,0 +1,289 @@
+"""
+Snapshot inmutable y versionado del catálogo de productos
+
+Las terminales de venta leen el catálogo miles de veces por minuto y las
+escrituras son escasas. En lugar de consultar la base de datos en cada
+lectura, cada proceso mantiene una copia inmutable del catálogo con
+registros compactos. Tras un commit que modifica productos la copia se
+reconstruye copy-on-write: se crea un snapshot nuevo y se reemplaza la
+referencia, nunca se muta uno publicado, así los lectores concurrentes
+no necesitan bloqueos.
+"""
+import bisect
+import threading
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.pool import StaticPool
+
+from app.infrastructure.cache.change_tracker import change_tracker
+
+TABLA_PRODUCTOS = 'productos'
+
+
+class ProductoRecord(NamedTuple):
+    """Registro compacto e inmutable de un producto"""
+    id: int
+    nombre: str
+    precio: float
+    stock: int
+    stock_minimo: int
+    categoria_id: int
+    proveedor_id: Optional[int]
+    codigo_barras: Optional[str]
+    descripcion: Optional[str]
+
+    def to_dict(self) -> Dict:
+        """Convertir a diccionario (mismas claves que Producto.to_dict)"""
+        return self._asdict()
+
+
+class CatalogSnapshot:
+    """
+    Vista inmutable del catálogo en una versión concreta.
+
+    Los registros están ordenados por id, lo que permite paginar por
+    cursor con búsqueda binaria.
+    """
+
+    __slots__ = ('version', 'construido_en', 'registros', '_ids', 'por_id',
+                 '_por_categoria', '_ids_por_categoria')
+
+    def __init__(self, version: int, registros: Tuple[ProductoRecord, ...],
+                 por_id: Dict[int, ProductoRecord]):
+        self.version = version
+        self.construido_en = datetime.now(timezone.utc)
+        self.registros = registros
+        self._ids = tuple(r.id for r in registros)
+        self.por_id: Mapping[int, ProductoRecord] = MappingProxyType(por_id)
+
+        por_categoria: Dict[int, List[ProductoRecord]] = {}
+        for registro in registros:
+            por_categoria.setdefault(registro.categoria_id, []).append(registro)
+        self._por_categoria = {k: tuple(v) for k, v in por_categoria.items()}
+        self._ids_por_categoria = {
+            k: tuple(r.id for r in v) for k, v in self._por_categoria.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.registros)
+
+    def get(self, producto_id: int) -> Optional[ProductoRecord]:
+        """Obtener un producto por ID"""
+        return self.por_id.get(producto_id)
+
+    def listar(self, categoria_id: int = None) -> Tuple[ProductoRecord, ...]:
+        """Listar productos ordenados por id, opcionalmente por categoría"""
+        if categoria_id:
+            return self._por_categoria.get(categoria_id, ())
+        return self.registros
+
+    def pagina(self, after_id: Optional[int] = None, limit: int = 20,
+               categoria_id: int = None) -> Tuple[ProductoRecord, ...]:
+        """Página keyset: productos con id > after_id, ordenados por id"""
+        registros = self.listar(categoria_id)
+        if after_id is None:
+            return registros[:limit]
+        if categoria_id:
+            ids = self._ids_por_categoria.get(categoria_id, ())
+        else:
+            ids = self._ids
+        inicio = bisect.bisect_right(ids, after_id)
+        return registros[inicio:inicio + limit]
+
+    def count(self, categoria_id: int = None) -> int:
+        """Contar productos, opcionalmente por categoría"""
+        return len(self.listar(categoria_id))
+
+
+class CatalogSnapshotStore:
+    """
+    Mantiene el snapshot vigente del proceso.
+
+    - Lectura sin bloqueo si la versión compartida coincide con la del snapshot.
+    - Si solo hubo commits de este proceso desde la última construcción,
+      se recargan únicamente los productos modificados (copy-on-write).
+    - Si otro worker escribió (la versión avanzó sin aviso local), se
+      recargan los ids que el change_tracker registró para esas versiones;
+      solo si no están disponibles se reconstruye el catálogo completo.
+    """
+
+    # Columnas disponibles en los registros (para proyecciones `fields=`)
+    CAMPOS = frozenset(ProductoRecord._fields)
+
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+        # Versión hasta la que se conocen todos los cambios y los ids pendientes.
+        # _pendientes = None fuerza reconstrucción completa.
+        self._version_conocida: Optional[int] = None
+        self._pendientes: Optional[Set[int]] = None
+        # Índices derivados (trigramas, códigos de barras...) sincronizados con el snapshot
+        self._indices: List = []
+        change_tracker.suscribir(TABLA_PRODUCTOS, self._on_commit)
+
+    def registrar_indice(self, indice):
+        """
+        Registra un índice derivado del catálogo.
+
+        El índice debe implementar `reconstruir(snapshot)` y
+        `actualizar(snapshot, ids)`; se invocan al publicar cada snapshot
+        nuevo, con todos los productos o solo con los ids modificados.
+        """
+        with self._lock:
+            if indice in self._indices:
+                return
+            self._indices.append(indice)
+            if self._snapshot is not None:
+                indice.reconstruir(self._snapshot)
+
+    def version(self) -> int:
+        """Versión actual del catálogo (compartida entre workers)"""
+        return change_tracker.version(TABLA_PRODUCTOS)
+
+    def obtener(self) -> CatalogSnapshot:
+        """Obtener el snapshot vigente, reconstruyéndolo si quedó obsoleto"""
+        version = self.version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        from app import db
+        # Una sesión con escrituras sin confirmar vería datos que podrían
+        # revertirse: se construye una copia de un solo uso sin publicarla,
+        # recargando sobre el snapshot publicado solo las filas afectadas.
+        if change_tracker.tiene_pendientes(db.session, TABLA_PRODUCTOS):
+            propios = change_tracker.ids_pendientes(db.session, TABLA_PRODUCTOS)
+            with self._lock:
+                snapshot = self._snapshot
+                ids = self._ids_desde(snapshot, version)
+            if ids is None or propios is None:
+                return self._construir_completo(version, en_sesion=True)
+            return self._aplicar_cambios(snapshot, ids | propios, version, en_sesion=True)
+
+        with self._lock:
+            snapshot = self._snapshot
+            version = self.version()
+            if snapshot is not None and snapshot.version == version:
+                return snapshot
+
+            ids = self._ids_desde(snapshot, version)
+            if ids is not None:
+                nuevo = self._aplicar_cambios(snapshot, ids, version)
+                for indice in self._indices:
+                    indice.actualizar(nuevo, ids)
+            else:
+                nuevo = self._construir_completo(version)
+                for indice in self._indices:
+                    indice.reconstruir(nuevo)
+
+            self._snapshot = nuevo
+            self._version_conocida = version
+            self._pendientes = set()
+            return nuevo
+
+    def _ids_desde(self, snapshot: Optional[CatalogSnapshot], version: int) -> Optional[Set[int]]:
+        """
+        Ids modificados entre el snapshot y `version` (requiere el lock);
+        None si hay que reconstruir todo
+        """
+        if snapshot is None:
+            return None
+        if snapshot.version == version:
+            return set()
+        if self._pendientes is not None and self._version_conocida == version:
+            return set(self._pendientes)
+        return change_tracker.cambios(TABLA_PRODUCTOS, snapshot.version, version)
+
+    def invalidar(self):
+        """Descartar el snapshot vigente (p. ej. en tests)"""
+        with self._lock:
+            self._snapshot = None
+            self._pendientes = None
+
+    def _on_commit(self, ids: Optional[Set[int]], version: int):
+        """Acumula los ids confirmados mientras la cadena de versiones sea continua"""
+        with self._lock:
+            continua = (self._version_conocida is not None
+                        and version == self._version_conocida + 1)
+            if continua and ids is not None and self._pendientes is not None:
+                self._pendientes |= ids
+            else:
+                self._pendientes = None
+            self._version_conocida = version
+
+    @staticmethod
+    def _consultar(ids: Optional[Set[int]] = None, en_sesion: bool = False) -> List[ProductoRecord]:
+        """
+        Lee los productos (todos o los ids indicados).
+
+        Lo que se publica se lee en una transacción propia, abierta después
+        de leer la versión: con REPEATABLE READ la transacción del request
+        puede tener una vista anterior al commit que movió la versión y el
+        snapshot quedaría con filas viejas bajo una versión nueva. Con
+        en_sesion=True se lee en la sesión del request, para ver sus
+        escrituras sin confirmar.
+        """
+        from app import db
+        from app.models import Producto
+
+        consulta = select(
+            Producto.id, Producto.nombre, Producto.precio, Producto.stock,
+            Producto.stock_minimo, Producto.categoria_id, Producto.proveedor_id,
+            Producto.codigo_barras, Producto.descripcion
+        ).order_by(Producto.id)
+        if ids is not None:
+            consulta = consulta.where(Producto.id.in_(ids))
+        # Con una única conexión compartida (SQLite en memoria) no hay otra
+        # transacción que abrir
+        if en_sesion or isinstance(db.engine.pool, StaticPool):
+            filas = db.session.execute(consulta).all()
+        else:
+            with db.engine.connect() as conexion:
+                filas = conexion.execute(consulta).all()
+        return [
+            ProductoRecord(
+                id=row.id,
+                nombre=row.nombre,
+                precio=float(row.precio) if row.precio is not None else None,
+                stock=row.stock,
+                stock_minimo=row.stock_minimo,
+                categoria_id=row.categoria_id,
+                proveedor_id=row.proveedor_id,
+                codigo_barras=row.codigo_barras,
+                descripcion=row.descripcion
+            )
+            for row in filas
+        ]
+
+    def _construir_completo(self, version: int, en_sesion: bool = False) -> CatalogSnapshot:
+        registros = self._consultar(en_sesion=en_sesion)
+        return CatalogSnapshot(version, tuple(registros), {r.id: r for r in registros})
+
+    def _aplicar_cambios(self, actual: CatalogSnapshot, ids: Set[int],
+                         version: int, en_sesion: bool = False) -> CatalogSnapshot:
+        por_id = dict(actual.por_id)
+        if ids:
+            recargados = {r.id: r for r in self._consultar(ids, en_sesion=en_sesion)}
+            altas_o_bajas = False
+            for producto_id in ids:
+                registro = recargados.get(producto_id)
+                if registro is None:
+                    altas_o_bajas |= por_id.pop(producto_id, None) is not None
+                else:
+                    altas_o_bajas |= producto_id not in por_id
+                    por_id[producto_id] = registro
+            if altas_o_bajas:
+                registros = tuple(por_id[k] for k in sorted(por_id))
+            else:
+                # Mismo conjunto de ids: se conserva el orden sin reordenar
+                registros = tuple(por_id[r.id] for r in actual.registros)
+        else:
+            registros = actual.registros
+        return CatalogSnapshot(version, registros, por_id)
+
+
+# Instancia global del proceso
+catalog_store = CatalogSnapshotStore()
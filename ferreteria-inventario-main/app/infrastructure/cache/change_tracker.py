@@ -0,0 +1,267 @@
+"""
+Seguimiento de cambios confirmados por tabla
+
+Registra, mediante eventos de la sesión de SQLAlchemy, qué filas de las
+tablas rastreadas se modifican en cada transacción. Solo al confirmar
+(commit) se incrementa la versión de cada tabla afectada y se notifica a
+los suscriptores; un rollback descarta los cambios pendientes.
+
+La versión se guarda en la caché de Flask (Redis en producción), de modo
+que todos los workers comparten el mismo contador y pueden detectar que
+sus datos en memoria quedaron obsoletos con una sola lectura. Cada versión
+guarda además, por un tiempo, los ids que cambió: un worker que no hizo el
+commit puede actualizar solo esas filas en lugar de recargar la tabla.
+"""
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from flask import has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Clave en session.info donde se acumulan los ids modificados por tabla.
+# Un valor None significa "toda la tabla" (p. ej. UPDATE masivo sin ids).
+_PENDIENTES_KEY = 'cambios_pendientes'
+_VERSION_KEY = 'tabla_version:{}'
+_MODIFICADA_KEY = 'tabla_modificada:{}'
+_CAMBIOS_KEY = 'tabla_cambios:{}:{}'
+# Marca de una versión que cambió toda la tabla (sin ids)
+_TODA_LA_TABLA = '*'
+
+# Firma de los suscriptores: (ids modificados o None, nueva versión)
+Suscriptor = Callable[[Optional[Set[int]], int], None]
+
+
+class ChangeTracker:
+    """
+    Rastreador de cambios por tabla con versión monótona compartida.
+
+    Uso:
+        change_tracker.suscribir('productos', callback)
+        change_tracker.version('productos')
+        change_tracker.ultima_modificacion('productos')
+        change_tracker.marcar(db.session, 'productos', ids)  # SQL masivo
+    """
+
+    def __init__(self, tablas: Iterable[str], ttl_cambios: int = 3600,
+                 max_versiones: int = 500):
+        self._tablas = set(tablas)
+        # Cuánto se guardan los ids de cada versión y cuántas versiones se
+        # leen como máximo antes de preferir una recarga completa
+        self._ttl_cambios = ttl_cambios
+        self._max_versiones = max_versiones
+        self._suscriptores: Dict[str, List[Suscriptor]] = defaultdict(list)
+        self._versiones_locales: Dict[str, int] = {}
+        self._modificadas_locales: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+    def rastrear(self, tabla: str):
+        """Agrega una tabla al conjunto de tablas rastreadas"""
+        self._tablas.add(tabla)
+
+    def rastreada(self, tabla: str) -> bool:
+        """Indica si los commits sobre la tabla avanzan su versión"""
+        return tabla in self._tablas
+
+    def suscribir(self, tabla: str, callback: Suscriptor):
+        """Registra un callback que se ejecuta tras cada commit que modifica la tabla"""
+        self.rastrear(tabla)
+        if callback not in self._suscriptores[tabla]:
+            self._suscriptores[tabla].append(callback)
+
+    def version(self, tabla: str) -> int:
+        """
+        Obtiene la versión actual de una tabla.
+
+        La versión se inicializa con el reloj en milisegundos, así sigue
+        siendo creciente aunque la caché se reinicie o la clave expire.
+        """
+        if not has_app_context():
+            with self._lock:
+                return self._versiones_locales.setdefault(tabla, _ahora_ms())
+
+        from app.extensions import cache
+        clave = _VERSION_KEY.format(tabla)
+        version = cache.get(clave)
+        if version is None:
+            cache.add(clave, _ahora_ms(), timeout=0)
+            version = cache.get(clave)
+        return int(version)
+
+    def ultima_modificacion(self, tabla: str) -> float:
+        """
+        Momento (epoch en segundos) del último commit que modificó la tabla.
+
+        Si no hay registro (caché reiniciada) se toma el momento actual:
+        es conservador, los clientes revalidan en lugar de usar datos viejos.
+        """
+        if not has_app_context():
+            with self._lock:
+                return self._modificadas_locales.setdefault(tabla, time.time())
+
+        from app.extensions import cache
+        clave = _MODIFICADA_KEY.format(tabla)
+        modificada = cache.get(clave)
+        if modificada is None:
+            cache.add(clave, time.time(), timeout=0)
+            modificada = cache.get(clave)
+        return float(modificada)
+
+    def marcar(self, session: Session, tabla: str, ids: Optional[Iterable[int]] = None):
+        """
+        Marca filas como modificadas en la transacción actual.
+
+        Necesario para sentencias SQL masivas (Core) que no pasan por el
+        unit of work del ORM. Con ids=None se invalida la tabla completa.
+        """
+        self.rastrear(tabla)
+        pendientes = session.info.setdefault(_PENDIENTES_KEY, {})
+        if ids is None:
+            pendientes[tabla] = None
+        elif tabla not in pendientes or pendientes[tabla] is not None:
+            pendientes.setdefault(tabla, set()).update(ids)
+
+    def tiene_pendientes(self, session: Session, tabla: str) -> bool:
+        """Indica si la sesión tiene cambios sin confirmar sobre la tabla"""
+        return tabla in session.info.get(_PENDIENTES_KEY, {})
+
+    def ids_pendientes(self, session: Session, tabla: str) -> Optional[Set[int]]:
+        """
+        Ids con cambios sin confirmar en la sesión (conjunto vacío si no hay);
+        None si la transacción modificó la tabla completa
+        """
+        ids = session.info.get(_PENDIENTES_KEY, {}).get(tabla, set())
+        return set(ids) if ids is not None else None
+
+    def cambios(self, tabla: str, desde: int, hasta: int) -> Optional[Set[int]]:
+        """
+        Ids modificados por los commits de las versiones (desde, hasta]
+
+        Returns:
+            Conjunto de ids, o None si alguna versión cambió la tabla
+            completa, ya no está registrada (caché reiniciada o vencida) o
+            son más de `max_versiones`: en esos casos hay que recargar todo
+        """
+        if hasta <= desde or hasta - desde > self._max_versiones or not has_app_context():
+            return None
+        from app.extensions import cache
+        registros = cache.get_many(*(
+            _CAMBIOS_KEY.format(tabla, version) for version in range(desde + 1, hasta + 1)
+        ))
+        ids: Set[int] = set()
+        for registro in registros:
+            if registro is None or registro == _TODA_LA_TABLA:
+                return None
+            ids.update(registro)
+        return ids
+
+    def invalidar(self, tablas: Optional[Iterable[str]] = None):
+        """Incrementa la versión de las tablas indicadas (todas por defecto) sin ids"""
+        for tabla in list(tablas or self._tablas):
+            self._publicar(tabla, None)
+
+    # ------------------------------------------------------------------
+    # Registro de eventos
+    # ------------------------------------------------------------------
+    def registrar_eventos(self, metadata):
+        """Conecta los eventos de sesión y de DDL (idempotente)"""
+        for nombre, handler in (
+            ('after_flush', self._after_flush),
+            ('after_commit', self._after_commit),
+            ('after_soft_rollback', self._after_rollback),
+        ):
+            if not event.contains(Session, nombre, handler):
+                event.listen(Session, nombre, handler)
+
+        # create_all/drop_all reinician los datos: cualquier copia en memoria queda obsoleta
+        for nombre in ('after_create', 'after_drop'):
+            if not event.contains(metadata, nombre, self._after_ddl):
+                event.listen(metadata, nombre, self._after_ddl)
+
+    def _after_flush(self, session, flush_context):
+        """Acumula los ids de las filas rastreadas escritas en el flush"""
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            tabla = getattr(obj, '__tablename__', None)
+            if tabla not in self._tablas:
+                continue
+            if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+                continue
+            self.marcar(session, tabla, [obj.id])
+
+    def _after_commit(self, session):
+        """Publica una nueva versión por cada tabla modificada en la transacción"""
+        # Confirmar un savepoint (begin_nested) también dispara after_commit,
+        # pero los cambios solo son visibles al confirmar la transacción externa
+        if session.in_nested_transaction():
+            return
+        pendientes = session.info.pop(_PENDIENTES_KEY, None)
+        if not pendientes:
+            return
+        for tabla, ids in pendientes.items():
+            self._publicar(tabla, ids)
+
+    def _after_rollback(self, session, previous_transaction):
+        """Descarta los cambios pendientes si se revierte la transacción externa"""
+        if previous_transaction.parent is None:
+            session.info.pop(_PENDIENTES_KEY, None)
+
+    def _after_ddl(self, target, connection, **kw):
+        tablas = {t.name for t in kw.get('tables') or []} & self._tablas
+        self.invalidar(tablas or None)
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _incrementar(self, tabla: str) -> int:
+        if not has_app_context():
+            with self._lock:
+                nueva = self._versiones_locales.setdefault(tabla, _ahora_ms()) + 1
+                self._versiones_locales[tabla] = nueva
+                return nueva
+
+        from app.extensions import cache
+        self.version(tabla)  # asegura que la clave esté inicializada
+        nueva = cache.cache.inc(_VERSION_KEY.format(tabla))
+        return int(nueva) if nueva is not None else self.version(tabla)
+
+    def _registrar_modificacion(self, tabla: str):
+        if not has_app_context():
+            with self._lock:
+                self._modificadas_locales[tabla] = time.time()
+            return
+
+        from app.extensions import cache
+        cache.set(_MODIFICADA_KEY.format(tabla), time.time(), timeout=0)
+
+    def _registrar_cambios(self, tabla: str, version: int, ids: Optional[Set[int]]):
+        if not has_app_context():
+            return
+        from app.extensions import cache
+        cache.set(_CAMBIOS_KEY.format(tabla, version),
+                  sorted(ids) if ids is not None else _TODA_LA_TABLA,
+                  timeout=self._ttl_cambios)
+
+    def _publicar(self, tabla: str, ids: Optional[Set[int]]):
+        nueva = self._incrementar(tabla)
+        self._registrar_cambios(tabla, nueva, ids)
+        self._registrar_modificacion(tabla)
+        for callback in list(self._suscriptores.get(tabla, ())):
+            callback(set(ids) if ids is not None else None, nueva)
+
+
+def _ahora_ms() -> int:
+    return int(time.time() * 1000)
+
+
+# Instancia global: productos y categorías alimentan el catálogo en memoria;
+# proveedores, compras y ventas_diarias, las estadísticas del dashboard.
+# Se registran al importar, no en la primera lectura: un worker que todavía
+# no sirvió el dashboard también debe publicar sus escrituras en esas tablas.
+change_tracker = ChangeTracker(
+    tablas=('productos', 'categorias', 'proveedores', 'compras', 'ventas_diarias')
+)
@@ -0,0 +1,158 @@
+"""
+Almacén de claves de idempotencia (tabla claves_idempotencia)
+
+Guarda, por usuario y clave, el resultado de una petición POST para que
+los reintentos del cliente (cajas con conexión inestable) reciban la
+misma respuesta sin volver a ejecutarla. La tabla es compartida por todos
+los workers: la restricción única (usuario_id, clave) decide quién
+ejecuta y los duplicados concurrentes esperan a que termine.
+
+Usa su propia conexión (no la sesión del request) para que reservar o
+completar una clave no confirme ni expire objetos de la vista.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+EN_PROCESO = 'en_proceso'
+COMPLETADA = 'completada'
+
+
+class IdempotencyStore:
+    """
+    Uso:
+        reserva, fila = idempotency_store.reservar(usuario_id, clave, ruta, huella, ttl)
+        if reserva is None: ... fila ya existe (completada o en proceso)
+        idempotency_store.completar(reserva, 201, 'application/json', cuerpo)
+    """
+
+    def __init__(self, abandono: int = 120, intervalo_purga: int = 300,
+                 intervalo_espera: float = 0.05):
+        """
+        Args:
+            abandono: Segundos tras los cuales una reserva en proceso se da
+                por abandonada (el worker murió sin completarla ni liberarla)
+            intervalo_purga: Segundos mínimos entre borrados de filas vencidas
+            intervalo_espera: Segundos entre lecturas al esperar otra petición
+        """
+        self._abandono = timedelta(seconds=abandono)
+        self._intervalo_purga = intervalo_purga
+        self._intervalo_espera = intervalo_espera
+        self._ultima_purga = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def _tabla(self):
+        from app.models import ClaveIdempotencia
+        return ClaveIdempotencia.__table__
+
+    @staticmethod
+    def _engine():
+        from app import db
+        return db.engine
+
+    def reservar(self, usuario_id: int, clave: str, ruta: str, huella: str,
+                 ttl: int) -> Tuple[Optional[int], Optional[dict]]:
+        """
+        Intenta reservar la clave para ejecutar la petición
+
+        Args:
+            usuario_id: Usuario autenticado (las claves son por usuario)
+            clave: Valor del header Idempotency-Key
+            ruta: Ruta de la petición
+            huella: Hash del cuerpo de la petición
+            ttl: Segundos que se conserva el resultado
+
+        Returns:
+            (id de la reserva, None) si esta petición debe ejecutarse, o
+            (None, fila existente) si la clave ya está en uso
+        """
+        self._purgar_si_corresponde()
+        tabla = self._tabla
+        for _ in range(3):
+            ahora = datetime.now()
+            try:
+                with self._engine().begin() as conn:
+                    resultado = conn.execute(insert(tabla).values(
+                        usuario_id=usuario_id, clave=clave, ruta=ruta, huella=huella,
+                        estado=EN_PROCESO, expira_en=ahora + timedelta(seconds=ttl),
+                        created_at=ahora, updated_at=ahora
+                    ))
+                    return resultado.inserted_primary_key[0], None
+            except IntegrityError:
+                pass
+
+            with self._engine().begin() as conn:
+                fila = conn.execute(select(tabla).where(
+                    tabla.c.usuario_id == usuario_id, tabla.c.clave == clave
+                )).mappings().first()
+                if fila is None:
+                    continue  # se liberó entre el INSERT y la lectura
+                reemplazable = or_(
+                    tabla.c.expira_en <= ahora,
+                    and_(tabla.c.estado == EN_PROCESO, tabla.c.updated_at <= ahora - self._abandono)
+                )
+                # La condición se vuelve a evaluar en el DELETE: si otra petición
+                # ya completó o reemplazó la fila, no se borra
+                if conn.execute(delete(tabla).where(tabla.c.id == fila['id'], reemplazable)).rowcount:
+                    continue
+                return None, dict(fila)
+        return None, None
+
+    def completar(self, reserva: int, status_code: int, content_type: str, respuesta: str):
+        """Guarda la respuesta de la petición ejecutada"""
+        tabla = self._tabla
+        with self._engine().begin() as conn:
+            conn.execute(update(tabla).where(tabla.c.id == reserva).values(
+                estado=COMPLETADA, status_code=status_code, content_type=content_type,
+                respuesta=respuesta, updated_at=datetime.now()
+            ))
+
+    def liberar(self, reserva: int):
+        """Elimina la reserva para que un reintento vuelva a ejecutar la petición"""
+        tabla = self._tabla
+        with self._engine().begin() as conn:
+            conn.execute(delete(tabla).where(tabla.c.id == reserva))
+
+    def obtener(self, id_fila: int) -> Optional[dict]:
+        """Lee una fila por id (None si ya no existe)"""
+        tabla = self._tabla
+        with self._engine().connect() as conn:
+            fila = conn.execute(select(tabla).where(tabla.c.id == id_fila)).mappings().first()
+        return dict(fila) if fila else None
+
+    def esperar(self, id_fila: int, timeout: float) -> Optional[dict]:
+        """
+        Espera a que la petición que tiene la clave termine
+
+        Returns:
+            La fila completada, None si fue liberada (la original falló), o
+            la fila aún en proceso si se agotó el tiempo
+        """
+        limite = time.monotonic() + max(timeout, 0)
+        while True:
+            fila = self.obtener(id_fila)
+            if fila is None or fila['estado'] == COMPLETADA or time.monotonic() >= limite:
+                return fila
+            time.sleep(self._intervalo_espera)
+
+    def purgar_vencidas(self) -> int:
+        """Elimina las filas vencidas; devuelve cuántas se borraron"""
+        tabla = self._tabla
+        with self._engine().begin() as conn:
+            return conn.execute(delete(tabla).where(tabla.c.expira_en <= datetime.now())).rowcount
+
+    def _purgar_si_corresponde(self):
+        with self._lock:
+            if time.monotonic() - self._ultima_purga < self._intervalo_purga:
+                return
+            self._ultima_purga = time.monotonic()
+        self.purgar_vencidas()
+
+
+# Instancia global compartida por las vistas con @idempotente
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,85 @@
+"""
+Conjunto de productos con stock bajo (stock <= stock_minimo)
+
+La comparación entre dos columnas no puede resolverse con un índice
+normal: cada consulta de stock bajo recorre la tabla completa. Este
+índice mantiene en memoria solo los productos con stock bajo, ordenados
+por (stock, id) (los más críticos primero), así listar los k primeros o
+contarlos cuesta O(k) / O(1) sin consultar la base de datos.
+
+Es un índice derivado del snapshot del catálogo: toda mutación de stock
+(ventas, compras, anulaciones, ediciones, importaciones y ajustes
+masivos) se confirma con un commit que publica los ids modificados, y el
+índice se actualiza solo con esos productos. Las actualizaciones son
+copy-on-write, igual que el resto de los índices del catálogo.
+"""
+import bisect
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# (stock, producto_id)
+Entrada = Tuple[int, int]
+
+
+def es_stock_bajo(registro) -> bool:
+    """Regla de negocio de stock bajo"""
+    return registro.stock <= registro.stock_minimo
+
+
+class LowStockIndex:
+    """Productos con stock bajo ordenados por (stock, id)"""
+
+    def __init__(self):
+        self._entradas: List[Entrada] = []
+        self._stock_por_id: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def __contains__(self, producto_id: int) -> bool:
+        return producto_id in self._stock_por_id
+
+    def reconstruir(self, snapshot):
+        """Construye el índice completo desde un snapshot del catálogo"""
+        stock_por_id = {r.id: r.stock for r in snapshot.registros if es_stock_bajo(r)}
+        self._entradas = sorted((stock, pid) for pid, stock in stock_por_id.items())
+        self._stock_por_id = stock_por_id
+
+    def actualizar(self, snapshot, ids: Iterable[int]):
+        """Aplica solo los productos modificados sobre una copia del índice"""
+        cambios = []
+        for producto_id in ids:
+            registro = snapshot.get(producto_id)
+            nuevo = registro.stock if registro is not None and es_stock_bajo(registro) else None
+            anterior = self._stock_por_id.get(producto_id)
+            if nuevo != anterior:
+                cambios.append((producto_id, anterior, nuevo))
+        if not cambios:
+            return
+
+        entradas = list(self._entradas)
+        stock_por_id = dict(self._stock_por_id)
+        for producto_id, anterior, nuevo in cambios:
+            if anterior is not None:
+                posicion = bisect.bisect_left(entradas, (anterior, producto_id))
+                if posicion < len(entradas) and entradas[posicion] == (anterior, producto_id):
+                    del entradas[posicion]
+                stock_por_id.pop(producto_id, None)
+            if nuevo is not None:
+                bisect.insort(entradas, (nuevo, producto_id))
+                stock_por_id[producto_id] = nuevo
+
+        self._entradas = entradas
+        self._stock_por_id = stock_por_id
+
+    def ids(self, limit: Optional[int] = None) -> List[int]:
+        """Ids con stock bajo, los de menor stock primero"""
+        entradas = self._entradas if limit is None else self._entradas[:limit]
+        return [producto_id for _, producto_id in entradas]
+
+    def contar_sin_stock(self) -> int:
+        """Cantidad de productos con stock 0 (o negativo)"""
+        return bisect.bisect_left(self._entradas, (1,))
+
+
+# Instancia global, registrada en el catálogo por app.infrastructure.cache.init_app
+low_stock_index = LowStockIndex()
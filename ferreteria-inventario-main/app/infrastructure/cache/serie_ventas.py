@@ -0,0 +1,114 @@
+"""
+Caché de intervalos cerrados de la serie de ventas
+
+Una hora, día, semana o mes que ya terminó casi nunca vuelve a cambiar:
+las ventas se fechan con el reloj de la aplicación (app/utils/fechas.py),
+el mismo con el que se decide qué intervalos están cerrados. Por eso los
+intervalos cerrados se guardan en la caché compartida y solo el intervalo
+en curso se calcula en cada consulta. Las excepciones descartan la serie
+guardada:
+
+- la anulación de una venta;
+- una venta confirmada cuando su intervalo ya cerró (fecha explícita, o
+  fechada justo antes del cambio de hora y confirmada después);
+- la reconstrucción de los resúmenes (backfill).
+
+Las claves incluyen una generación y descartar es incrementarla. Quien
+calcula la serie lee la generación antes de consultar y guarda bajo esa
+misma generación: si una anulación se confirma mientras tanto, lo que
+guarde con datos previos queda bajo una generación que ya nadie lee. Los
+intervalos además vencen (SERIE_VENTAS_TTL), así nada de lo guardado
+perdura indefinidamente.
+"""
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from flask import current_app, has_app_context
+
+from app.utils.fechas import ahora
+from app.utils.series_tiempo import inicio_bucket
+
+_GENERACION_KEY = 'serie_ventas:generacion'
+_CLAVE = 'serie_ventas:{}:{}:{:%Y%m%d%H}'
+
+
+class SerieVentasCache:
+    """
+    Uso:
+        generacion = serie_ventas_cache.generacion()  # antes de consultar
+        guardados = serie_ventas_cache.obtener('day', inicios, generacion)
+        serie_ventas_cache.guardar('day', {inicio: {'cantidad': 3, 'total': 120.0}}, generacion)
+        serie_ventas_cache.invalidar([venta.fecha])
+        serie_ventas_cache.invalidar_cerrados([venta.fecha])  # tras crear
+    """
+
+    def generacion(self) -> Optional[int]:
+        """Generación vigente de la serie (None sin contexto de aplicación)"""
+        if not has_app_context():
+            return None
+        from app.extensions import cache
+        generacion = cache.get(_GENERACION_KEY)
+        if generacion is None:
+            cache.add(_GENERACION_KEY, int(time.time() * 1000), timeout=0)
+            generacion = cache.get(_GENERACION_KEY)
+        return int(generacion)
+
+    def obtener(self, granularidad: str, inicios: List[datetime],
+                generacion: Optional[int] = None) -> Dict[datetime, dict]:
+        """Intervalos guardados de la lista (los faltantes no aparecen)"""
+        if not has_app_context() or not inicios:
+            return {}
+        from app.extensions import cache
+        if generacion is None:
+            generacion = self.generacion()
+        valores = cache.get_many(*(_CLAVE.format(generacion, granularidad, i) for i in inicios))
+        return {inicio: valor for inicio, valor in zip(inicios, valores) if valor is not None}
+
+    def guardar(self, granularidad: str, valores: Dict[datetime, dict],
+                generacion: Optional[int] = None):
+        """
+        Guarda intervalos cerrados por SERIE_VENTAS_TTL segundos bajo la
+        generación leída antes de calcularlos
+        """
+        if not has_app_context() or not valores:
+            return
+        from app.extensions import cache
+        if generacion is None:
+            generacion = self.generacion()
+        cache.set_many({
+            _CLAVE.format(generacion, granularidad, inicio): valor
+            for inicio, valor in valores.items()
+        }, timeout=current_app.config.get('SERIE_VENTAS_TTL', 3600))
+
+    def invalidar(self, fechas: Iterable[datetime]):
+        """Descarta la serie guardada si alguna fecha cae en un intervalo guardable"""
+        if any(fecha is not None for fecha in fechas):
+            self.invalidar_todo()
+
+    def invalidar_cerrados(self, fechas: Iterable[datetime]):
+        """
+        Descarta la serie si alguna de las fechas está en un intervalo ya
+        cerrado (llamar después del commit de ventas nuevas). Si la hora de
+        la venta sigue en curso, ningún intervalo que la contiene pudo
+        guardarse: las ventas del momento no tocan la caché.
+        """
+        hora_actual = inicio_bucket(ahora(), 'hour')
+        self.invalidar([
+            fecha for fecha in fechas
+            if fecha is not None and inicio_bucket(fecha, 'hour') < hora_actual
+        ])
+
+    def invalidar_todo(self):
+        """Descarta toda la serie guardada incrementando la generación"""
+        if not has_app_context():
+            return
+        from app.extensions import cache
+        self.generacion()  # asegura que la clave esté inicializada
+        # Incremento atómico en el backend compartido (INCR en Redis)
+        if cache.cache.inc(_GENERACION_KEY) is None:
+            cache.set(_GENERACION_KEY, int(time.time() * 1000), timeout=0)
+
+
+# Instancia global compartida
+serie_ventas_cache = SerieVentasCache()
@@ -0,0 +1,124 @@
+"""
+Caché de resultados derivados invalidada por versión de tabla
+
+Para agregados costosos (conteos por categoría, estadísticas) que solo
+cambian cuando se escriben ciertas tablas. La clave incluye la versión
+actual de cada tabla de la que depende el valor (ver change_tracker):
+tras un commit que modifica una de ellas la versión avanza, la clave
+cambia y el valor se recalcula. No hace falta borrar nada explícitamente.
+Las versiones viven en el backend de caché configurado (CACHE_TYPE): la
+invalidación es compartida entre workers solo si ese backend lo es
+(RedisCache en ProductionConfig); con SimpleCache cada proceso tiene las
+suyas.
+
+Los fallos de caché concurrentes sobre la misma clave se agrupan: dentro
+del proceso un candado por clave deja pasar un solo cálculo, y entre
+workers una marca temporal en la caché (cache.add) hace que los demás
+esperen el valor en lugar de recalcularlo todos a la vez.
+"""
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+from flask import has_app_context
+
+from app.infrastructure.cache.change_tracker import ChangeTracker, change_tracker
+
+_CLAVE = 'vcache:{}:{}'
+_CALCULANDO = '{}:calculando'
+
+
+class VersionedCache:
+    """
+    Uso:
+        versioned_cache.obtener('categorias:resumen', ('categorias', 'productos'),
+                                CategoriaRepository.get_with_products_count)
+    """
+
+    def __init__(self, tracker: ChangeTracker, timeout: int = 300, espera: float = 5.0,
+                 intervalo_espera: float = 0.05, candados: int = 64):
+        """
+        Args:
+            tracker: Rastreador de versiones por tabla
+            timeout: Segundos de vida por defecto de cada valor
+            espera: Segundos máximos que se espera el cálculo de otro worker
+                antes de calcular por cuenta propia
+            intervalo_espera: Segundos entre lecturas mientras se espera
+            candados: Cantidad de candados del proceso (las claves se reparten
+                entre ellos, así la memoria no crece con las versiones)
+        """
+        self._tracker = tracker
+        self._timeout = timeout
+        self._espera = espera
+        self._intervalo_espera = intervalo_espera
+        self._candados = [threading.Lock() for _ in range(candados)]
+
+    def obtener(self, clave: str, tablas: Iterable[str], calcular: Callable[[], Any],
+                timeout: int = None) -> Any:
+        """
+        Devuelve el valor cacheado para la versión vigente de las tablas o
+        lo calcula y lo guarda
+
+        Args:
+            clave: Nombre del valor (incluir aquí los parámetros)
+            tablas: Tablas de las que depende el valor
+            calcular: Función sin argumentos que calcula el valor
+            timeout: Segundos de vida (por defecto el del constructor)
+
+        Raises:
+            ValueError: Si alguna tabla no está rastreada (su versión no
+                avanzaría y el valor no se invalidaría nunca)
+        """
+        tablas = tuple(tablas)
+        no_rastreadas = [tabla for tabla in tablas if not self._tracker.rastreada(tabla)]
+        if no_rastreadas:
+            raise ValueError(f"Tablas sin rastrear: {', '.join(no_rastreadas)}")
+        if not has_app_context():
+            return calcular()
+
+        from app import db
+        from app.extensions import cache
+
+        # Con escrituras sin confirmar la sesión ve datos que aún no tienen versión
+        if any(self._tracker.tiene_pendientes(db.session, tabla) for tabla in tablas):
+            return calcular()
+
+        versiones = ':'.join(f'{tabla}={self._tracker.version(tabla)}' for tabla in tablas)
+        clave_cache = _CLAVE.format(clave, versiones)
+
+        valor = cache.get(clave_cache)
+        if valor is not None:
+            return valor
+
+        with self._candados[hash(clave_cache) % len(self._candados)]:
+            # Otro hilo pudo haberlo calculado mientras se esperaba el candado
+            valor = cache.get(clave_cache)
+            if valor is None:
+                valor = self._calcular_una_vez(cache, clave_cache, calcular,
+                                               timeout or self._timeout)
+        return valor
+
+    def _calcular_una_vez(self, cache, clave_cache: str, calcular: Callable[[], Any],
+                          timeout: int) -> Any:
+        """Calcula el valor salvo que otro worker ya lo esté calculando"""
+        marca = _CALCULANDO.format(clave_cache)
+        propia = cache.add(marca, 1, timeout=max(int(self._espera), 1))
+        if not propia:
+            limite = time.monotonic() + self._espera
+            while time.monotonic() < limite:
+                time.sleep(self._intervalo_espera)
+                valor = cache.get(clave_cache)
+                if valor is not None:
+                    return valor
+            # El otro worker no terminó a tiempo: se calcula igual
+        try:
+            valor = calcular()
+            cache.set(clave_cache, valor, timeout=timeout)
+            return valor
+        finally:
+            if propia:
+                cache.delete(marca)
+
+
+# Instancia global sobre el rastreador de cambios compartido
+versioned_cache = VersionedCache(change_tracker)
@@ -14,8 +14,14 @@ from app.domain.interfaces.usuario_repository_interface import IUsuarioRepositor
 from app.repositories import ProveedorRepository, ProductoRepository
 from app.repositories.producto import CategoriaRepository
 from app.repositories.venta import VentaRepository
+from app.repositories.venta_diaria import VentaDiariaRepository, ClienteResumenRepository
+from app.repositories.cierre_caja import CierreCajaRepository
 from app.repositories.compra import CompraRepository
 from app.repositories.usuario import UsuarioRepository
+from app.infrastructure.cache import (
+    catalog_store, barcode_index, low_stock_index, versioned_cache, serie_ventas_cache
+)
+from app.infrastructure.search import trigram_index, autocomplete_index
 from app.application.use_cases import (
     CreateProveedorUseCase,
     UpdateProveedorUseCase,
@@ -30,6 +36,11 @@ from app.application.use_cases.producto_use_cases import (
     DeleteProductoUseCase,
     GetProductoUseCase,
     GetAllProductosUseCase,
+    GetProductosPageUseCase,
+    GetProductosByBarcodeUseCase,
+    AutocompleteProductosUseCase,
+    ImportProductosUseCase,
+    BulkUpdateProductosUseCase,
     SearchProductosUseCase,
     GetStockBajoUseCase,
     UpdateStockUseCase
@@ -44,12 +55,22 @@ from app.application.use_cases.categoria_use_cases import (
 )
 from app.application.use_cases.venta_use_cases import (
     CreateVentaUseCase,
+    CreateVentasLoteUseCase,
+    AnularVentasUseCase,
     GetVentaUseCase,
     GetAllVentasUseCase,
+    GetVentasPageUseCase,
     GetVentasByDateRangeUseCase,
     GetVentasByUsuarioUseCase,
     GetVentasByClienteUseCase,
-    GetVentasStatisticsUseCase
+    GetResumenClienteUseCase,
+    GetVentasStatisticsUseCase,
+    GetSerieVentasUseCase
+)
+from app.application.use_cases.caja_use_cases import (
+    GetResumenCajaUseCase,
+    CerrarCajaUseCase,
+    GetCierresCajaUseCase
 )
 from app.application.use_cases.compra_use_cases import (
     CreateCompraUseCase,
@@ -92,8 +113,18 @@ class DIContainer:
         # Registrar Repositorios (Singleton - una sola instancia)
         self.register_singleton('proveedor_repository', ProveedorRepository)
         self.register_singleton('producto_repository', ProductoRepository)
+        self.register_singleton('catalog_store', catalog_store)
+        self.register_singleton('trigram_index', trigram_index)
+        self.register_singleton('barcode_index', barcode_index)
+        self.register_singleton('low_stock_index', low_stock_index)
+        self.register_singleton('versioned_cache', versioned_cache)
+        self.register_singleton('autocomplete_index', autocomplete_index)
         self.register_singleton('categoria_repository', CategoriaRepository)
         self.register_singleton('venta_repository', VentaRepository)
+        self.register_singleton('venta_diaria_repository', VentaDiariaRepository)
+        self.register_singleton('serie_ventas_cache', serie_ventas_cache)
+        self.register_singleton('cliente_resumen_repository', ClienteResumenRepository)
+        self.register_singleton('cierre_caja_repository', CierreCajaRepository)
         self.register_singleton('compra_repository', CompraRepository)
         self.register_singleton('usuario_repository', UsuarioRepository)
         
@@ -119,13 +150,48 @@ class DIContainer:
         self.register_factory('delete_producto_use_case',
                             lambda: DeleteProductoUseCase(self.resolve('producto_repository')))
         self.register_factory('get_producto_use_case',
-                            lambda: GetProductoUseCase(self.resolve('producto_repository')))
+                            lambda: GetProductoUseCase(
+                                self.resolve('producto_repository'),
+                                self.resolve('catalog_store')
+                            ))
         self.register_factory('get_all_productos_use_case',
-                            lambda: GetAllProductosUseCase(self.resolve('producto_repository')))
+                            lambda: GetAllProductosUseCase(
+                                self.resolve('producto_repository'),
+                                self.resolve('catalog_store')
+                            ))
+        self.register_factory('get_productos_page_use_case',
+                            lambda: GetProductosPageUseCase(
+                                self.resolve('producto_repository'),
+                                self.resolve('catalog_store')
+                            ))
+        self.register_factory('get_productos_by_barcode_use_case',
+                            lambda: GetProductosByBarcodeUseCase(
+                                self.resolve('producto_repository'),
+                                self.resolve('catalog_store'),
+                                self.resolve('barcode_index')
+                            ))
+        self.register_factory('import_productos_use_case',
+                            lambda: ImportProductosUseCase(self.resolve('producto_repository')))
+        self.register_factory('bulk_update_productos_use_case',
+                            lambda: BulkUpdateProductosUseCase(self.resolve('producto_repository')))
         self.register_factory('search_productos_use_case',
-                            lambda: SearchProductosUseCase(self.resolve('producto_repository')))
+                            lambda: SearchProductosUseCase(
+                                self.resolve('producto_repository'),
+                                self.resolve('catalog_store'),
+                                self.resolve('trigram_index')
+                            ))
+        self.register_factory('autocomplete_productos_use_case',
+                            lambda: AutocompleteProductosUseCase(
+                                self.resolve('producto_repository'),
+                                self.resolve('catalog_store'),
+                                self.resolve('autocomplete_index')
+                            ))
         self.register_factory('get_stock_bajo_use_case',
-                            lambda: GetStockBajoUseCase(self.resolve('producto_repository')))
+                            lambda: GetStockBajoUseCase(
+                                self.resolve('producto_repository'),
+                                self.resolve('catalog_store'),
+                                self.resolve('low_stock_index')
+                            ))
         self.register_factory('update_stock_use_case',
                             lambda: UpdateStockUseCase(self.resolve('producto_repository')))
         
@@ -137,11 +203,20 @@ class DIContainer:
         self.register_factory('delete_categoria_use_case',
                             lambda: DeleteCategoriaUseCase(self.resolve('categoria_repository')))
         self.register_factory('get_categoria_use_case',
-                            lambda: GetCategoriaUseCase(self.resolve('categoria_repository')))
+                            lambda: GetCategoriaUseCase(
+                                self.resolve('categoria_repository'),
+                                self.resolve('versioned_cache')
+                            ))
         self.register_factory('get_all_categorias_use_case',
-                            lambda: GetAllCategoriasUseCase(self.resolve('categoria_repository')))
+                            lambda: GetAllCategoriasUseCase(
+                                self.resolve('categoria_repository'),
+                                self.resolve('versioned_cache')
+                            ))
         self.register_factory('search_categorias_use_case',
-                            lambda: SearchCategoriasUseCase(self.resolve('categoria_repository')))
+                            lambda: SearchCategoriasUseCase(
+                                self.resolve('categoria_repository'),
+                                self.resolve('versioned_cache')
+                            ))
         
         # ===== VENTA USE CASES =====
         # CreateVentaUseCase necesita dos repositorios
@@ -150,18 +225,46 @@ class DIContainer:
                                 self.resolve('venta_repository'),
                                 self.resolve('producto_repository')
                             ))
+        self.register_factory('create_ventas_lote_use_case',
+                            lambda: CreateVentasLoteUseCase(
+                                self.resolve('venta_repository'),
+                                self.resolve('producto_repository')
+                            ))
+        self.register_factory('anular_ventas_use_case',
+                            lambda: AnularVentasUseCase(self.resolve('venta_repository')))
         self.register_factory('get_venta_use_case',
                             lambda: GetVentaUseCase(self.resolve('venta_repository')))
         self.register_factory('get_all_ventas_use_case',
                             lambda: GetAllVentasUseCase(self.resolve('venta_repository')))
+        self.register_factory('get_ventas_page_use_case',
+                            lambda: GetVentasPageUseCase(self.resolve('venta_repository')))
         self.register_factory('get_ventas_by_date_range_use_case',
                             lambda: GetVentasByDateRangeUseCase(self.resolve('venta_repository')))
         self.register_factory('get_ventas_by_usuario_use_case',
                             lambda: GetVentasByUsuarioUseCase(self.resolve('venta_repository')))
         self.register_factory('get_ventas_by_cliente_use_case',
                             lambda: GetVentasByClienteUseCase(self.resolve('venta_repository')))
+        self.register_factory('get_resumen_cliente_use_case',
+                            lambda: GetResumenClienteUseCase(self.resolve('cliente_resumen_repository')))
         self.register_factory('get_ventas_statistics_use_case',
                             lambda: GetVentasStatisticsUseCase(self.resolve('venta_repository')))
+        self.register_factory('get_serie_ventas_use_case',
+                            lambda: GetSerieVentasUseCase(
+                                self.resolve('venta_repository'),
+                                self.resolve('venta_diaria_repository'),
+                                self.resolve('serie_ventas_cache')
+                            ))
+        
+        # ===== CAJA USE CASES =====
+        self.register_factory('get_resumen_caja_use_case',
+                            lambda: GetResumenCajaUseCase(
+                                self.resolve('venta_diaria_repository'),
+                                self.resolve('cierre_caja_repository')
+                            ))
+        self.register_factory('cerrar_caja_use_case',
+                            lambda: CerrarCajaUseCase(self.resolve('cierre_caja_repository')))
+        self.register_factory('get_cierres_caja_use_case',
+                            lambda: GetCierresCajaUseCase(self.resolve('cierre_caja_repository')))
         
         # ===== COMPRA USE CASES =====
         # CreateCompraUseCase necesita dos repositorios (similar a Venta)
@@ -0,0 +1,27 @@
+"""
+Infrastructure - Búsqueda de texto completo y tolerante a errores
+"""
+from .producto_fulltext import ProductoFullTextIndex, producto_fulltext
+from .trigram_index import TrigramIndex, trigram_index
+from .autocomplete_index import AutocompleteIndex, autocomplete_index
+
+
+def init_app(app):
+    """
+    Registra la creación del índice de texto completo junto con la tabla
+    productos y los índices de trigramas y de autocompletado como índices
+    derivados del catálogo
+    """
+    from app.models import Producto
+    from app.infrastructure.cache import catalog_store
+    producto_fulltext.registrar_eventos(Producto.__table__)
+    catalog_store.registrar_indice(trigram_index)
+    catalog_store.registrar_indice(autocomplete_index)
+
+
+__all__ = [
+    'ProductoFullTextIndex', 'producto_fulltext',
+    'TrigramIndex', 'trigram_index',
+    'AutocompleteIndex', 'autocomplete_index',
+    'init_app'
+]
@@ -0,0 +1,95 @@
+"""
+Índice ordenado de nombres para autocompletado por prefijo
+
+El selector de productos consulta en cada tecla. Este índice guarda los
+nombres normalizados (minúsculas, sin acentos, espacios colapsados) en
+un arreglo ordenado de tuplas (nombre, id): todos los nombres que
+empiezan con un prefijo quedan contiguos, así una consulta es una
+búsqueda binaria (bisect) más la lectura de k elementos, sin tocar la
+base de datos.
+
+Es un índice derivado del snapshot del catálogo (ver
+app/infrastructure/cache/catalog_snapshot.py). Las actualizaciones son
+copy-on-write: se copia el arreglo, se aplican los cambios con bisect y
+se publica la referencia nueva, así las lecturas concurrentes nunca ven
+un arreglo a medio modificar.
+"""
+import bisect
+from typing import Dict, Iterable, List, Tuple
+
+from app.infrastructure.search.trigram_index import normalizar
+
+
+def normalizar_nombre(texto: str) -> str:
+    """Minúsculas, sin acentos y con espacios simples ("  Llave  Inglésa" -> "llave inglesa")"""
+    return ' '.join(normalizar(texto).split())
+
+
+class AutocompleteIndex:
+    """Arreglo ordenado (nombre normalizado, producto_id)"""
+
+    def __init__(self):
+        self._entradas: List[Tuple[str, int]] = []
+        self._nombre_por_id: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def reconstruir(self, snapshot):
+        """Construye el índice completo desde un snapshot del catálogo"""
+        nombre_por_id = {r.id: normalizar_nombre(r.nombre) for r in snapshot.registros}
+        entradas = sorted((nombre, pid) for pid, nombre in nombre_por_id.items())
+        self._entradas = entradas
+        self._nombre_por_id = nombre_por_id
+
+    def actualizar(self, snapshot, ids: Iterable[int]):
+        """Aplica solo los productos modificados sobre una copia del arreglo"""
+        cambios = []
+        for producto_id in ids:
+            registro = snapshot.get(producto_id)
+            nuevo = normalizar_nombre(registro.nombre) if registro else None
+            anterior = self._nombre_por_id.get(producto_id)
+            if nuevo != anterior:
+                cambios.append((producto_id, anterior, nuevo))
+        if not cambios:
+            return
+
+        entradas = list(self._entradas)
+        nombre_por_id = dict(self._nombre_por_id)
+        for producto_id, anterior, nuevo in cambios:
+            if anterior is not None:
+                posicion = bisect.bisect_left(entradas, (anterior, producto_id))
+                if posicion < len(entradas) and entradas[posicion] == (anterior, producto_id):
+                    del entradas[posicion]
+                nombre_por_id.pop(producto_id, None)
+            if nuevo is not None:
+                bisect.insort(entradas, (nuevo, producto_id))
+                nombre_por_id[producto_id] = nuevo
+
+        self._entradas = entradas
+        self._nombre_por_id = nombre_por_id
+
+    def buscar(self, prefijo: str, limit: int = 10) -> List[int]:
+        """
+        Ids de los productos cuyo nombre empieza con el prefijo
+
+        Returns:
+            Hasta `limit` ids en orden alfabético del nombre
+        """
+        prefijo = normalizar_nombre(prefijo)
+        if not prefijo:
+            return []
+
+        entradas = self._entradas  # referencia estable durante la consulta
+        # (prefijo,) es menor que cualquier (prefijo + ..., id)
+        inicio = bisect.bisect_left(entradas, (prefijo,))
+        resultado = []
+        for nombre, producto_id in entradas[inicio:inicio + limit]:
+            if not nombre.startswith(prefijo):
+                break
+            resultado.append(producto_id)
+        return resultado
+
+
+# Instancia global, registrada en el catálogo por app.infrastructure.search.init_app
+autocomplete_index = AutocompleteIndex()
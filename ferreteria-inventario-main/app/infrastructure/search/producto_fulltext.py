@@ -0,0 +1,145 @@
+"""
+Índice de texto completo para productos
+
+Reemplaza el `nombre LIKE '%term%'` (que no puede usar índices) por un
+índice de texto completo sobre nombre, descripción y código de barras:
+
+- SQLite (tests e instalaciones de un solo nodo): tabla virtual FTS5 con
+  contenido externo, sincronizada con triggers y ordenada por bm25.
+- MySQL (producción): índice FULLTEXT y MATCH ... AGAINST en modo booleano.
+  Ver migrations/add_fulltext_search_index.sql.
+
+Si el índice no existe (p. ej. una base de datos antigua sin migrar) se
+devuelve None y el repositorio usa la búsqueda LIKE como respaldo.
+"""
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, text
+
+FTS_TABLE = 'productos_fts'
+MYSQL_INDEX = 'ft_producto_busqueda'
+
+# Pesos bm25 por columna: nombre, descripcion, codigo_barras (menor = mejor)
+_BM25_PESOS = (10.0, 1.0, 5.0)
+
+_SQLITE_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        nombre, descripcion, codigo_barras,
+        content='productos', content_rowid='id',
+        tokenize="unicode61 remove_diacritics 2"
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS productos_fts_ai AFTER INSERT ON productos BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, nombre, descripcion, codigo_barras)
+        VALUES (new.id, new.nombre, new.descripcion, new.codigo_barras);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS productos_fts_ad AFTER DELETE ON productos BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, nombre, descripcion, codigo_barras)
+        VALUES ('delete', old.id, old.nombre, old.descripcion, old.codigo_barras);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS productos_fts_au
+        AFTER UPDATE OF nombre, descripcion, codigo_barras ON productos BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, nombre, descripcion, codigo_barras)
+        VALUES ('delete', old.id, old.nombre, old.descripcion, old.codigo_barras);
+        INSERT INTO {FTS_TABLE}(rowid, nombre, descripcion, codigo_barras)
+        VALUES (new.id, new.nombre, new.descripcion, new.codigo_barras);
+    END""",
+)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class ProductoFullTextIndex:
+    """Creación y consulta del índice de texto completo de productos"""
+
+    def __init__(self):
+        # Disponibilidad del índice por engine (se limpia con cada DDL)
+        self._disponible: Dict[int, bool] = {}
+
+    def registrar_eventos(self, table):
+        """Crea/elimina el índice junto con la tabla productos (idempotente)"""
+        if not event.contains(table, 'after_create', self._after_create):
+            event.listen(table, 'after_create', self._after_create)
+        if not event.contains(table, 'after_drop', self._after_drop):
+            event.listen(table, 'after_drop', self._after_drop)
+
+    def crear(self, connection):
+        """Crea el índice en la conexión dada (también indexa filas existentes)"""
+        dialecto = connection.dialect.name
+        if dialecto == 'sqlite':
+            for sentencia in _SQLITE_DDL:
+                connection.execute(text(sentencia))
+            connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        elif dialecto == 'mysql':
+            connection.execute(text(
+                f"ALTER TABLE productos ADD FULLTEXT INDEX {MYSQL_INDEX} "
+                "(nombre, descripcion, codigo_barras)"
+            ))
+        self._disponible.clear()
+
+    def disponible(self, session) -> bool:
+        """Indica si el índice existe en la base de datos de la sesión"""
+        engine = session.get_bind()
+        clave = id(engine)
+        if clave not in self._disponible:
+            dialecto = engine.dialect.name
+            if dialecto == 'sqlite':
+                existe = session.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :n"
+                ), {'n': FTS_TABLE}).first()
+            elif dialecto == 'mysql':
+                existe = session.execute(text(
+                    "SELECT 1 FROM information_schema.statistics "
+                    "WHERE table_schema = DATABASE() AND table_name = 'productos' "
+                    "AND index_name = :n"
+                ), {'n': MYSQL_INDEX}).first()
+            else:
+                existe = None
+            self._disponible[clave] = existe is not None
+        return self._disponible[clave]
+
+    def buscar_ids(self, session, term: str, limit: int = 20,
+                   offset: int = 0) -> Optional[List[int]]:
+        """
+        Busca productos y devuelve sus ids ordenados por relevancia.
+
+        Cada palabra del término se busca como prefijo y todas deben
+        aparecer (AND). Devuelve None si el índice no está disponible.
+        """
+        if not self.disponible(session):
+            return None
+
+        tokens = _TOKEN_RE.findall(term.lower())
+        if not tokens:
+            return []
+
+        params = {'limit': limit, 'offset': offset}
+        if session.get_bind().dialect.name == 'sqlite':
+            params['q'] = ' AND '.join(f'"{t}"*' for t in tokens)
+            pesos = ', '.join(str(p) for p in _BM25_PESOS)
+            sql = (
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :q "
+                f"ORDER BY bm25({FTS_TABLE}, {pesos}), rowid "
+                "LIMIT :limit OFFSET :offset"
+            )
+        else:
+            params['q'] = ' '.join(f'+{t}*' for t in tokens)
+            sql = (
+                "SELECT id FROM productos "
+                "WHERE MATCH(nombre, descripcion, codigo_barras) AGAINST (:q IN BOOLEAN MODE) "
+                "ORDER BY MATCH(nombre, descripcion, codigo_barras) AGAINST (:q IN BOOLEAN MODE) DESC, id "
+                "LIMIT :limit OFFSET :offset"
+            )
+        return [row[0] for row in session.execute(text(sql), params)]
+
+    def _after_create(self, target, connection, **kw):
+        self.crear(connection)
+
+    def _after_drop(self, target, connection, **kw):
+        if connection.dialect.name == 'sqlite':
+            connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+        self._disponible.clear()
+
+
+# Instancia global
+producto_fulltext = ProductoFullTextIndex()
@@ -0,0 +1,240 @@
+"""
+Índice invertido de trigramas para búsqueda tolerante a errores
+
+Los cajeros escriben "tornilo" o "martiyo"; la búsqueda exacta o por
+prefijo no encuentra nada. Este índice descompone cada palabra de los
+nombres de producto en trigramas (como pg_trgm) y compara por similitud
+de Jaccard:
+
+    similitud(a, b) = |T(a) ∩ T(b)| / |T(a) ∪ T(b)|
+
+El índice se construye sobre el vocabulario (palabras distintas), no
+sobre los productos: el vocabulario crece mucho más lento que el
+catálogo, así una consulta cuesta unos pocos milisegundos aun con
+100k productos.
+
+Es un índice derivado del snapshot del catálogo (ver
+app/infrastructure/cache/catalog_snapshot.py): se reconstruye con el
+catálogo completo y se actualiza solo con los productos modificados.
+Las estructuras publicadas nunca se mutan (se reemplazan frozensets),
+por lo que las lecturas concurrentes no requieren bloqueo.
+"""
+import heapq
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+_PALABRA_RE = re.compile(r'[a-z0-9]+')
+_VACIO: FrozenSet = frozenset()
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin acentos ("Eléctrico" -> "electrico")"""
+    descompuesto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c)).lower()
+
+
+def palabras(texto: str) -> List[str]:
+    """Palabras alfanuméricas normalizadas de un texto"""
+    return _PALABRA_RE.findall(normalizar(texto))
+
+
+def trigramas(palabra: str) -> FrozenSet[str]:
+    """Trigramas de una palabra con relleno (dos espacios al inicio, uno al final)"""
+    relleno = f'  {palabra} '
+    return frozenset(relleno[i:i + 3] for i in range(len(relleno) - 2))
+
+
+class TrigramIndex:
+    """Índice de trigramas sobre los nombres de producto"""
+
+    def __init__(self):
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self._palabras_producto: Dict[int, FrozenSet[str]] = {}
+        self._productos_palabra: Dict[str, FrozenSet[int]] = {}
+        self._palabras_trigrama: Dict[str, FrozenSet[str]] = {}
+        self._trigramas_palabra: Dict[str, FrozenSet[str]] = {}
+
+    # ------------------------------------------------------------------
+    # Mantenimiento (invocado por CatalogSnapshotStore)
+    # ------------------------------------------------------------------
+    def reconstruir(self, snapshot):
+        """Construye el índice completo desde un snapshot del catálogo"""
+        palabras_producto: Dict[int, FrozenSet[str]] = {}
+        productos_palabra: Dict[str, set] = {}
+        for registro in snapshot.registros:
+            conjunto = frozenset(palabras(registro.nombre))
+            palabras_producto[registro.id] = conjunto
+            for palabra in conjunto:
+                productos_palabra.setdefault(palabra, set()).add(registro.id)
+
+        palabras_trigrama: Dict[str, set] = {}
+        trigramas_palabra: Dict[str, FrozenSet[str]] = {}
+        for palabra in productos_palabra:
+            tris = trigramas(palabra)
+            trigramas_palabra[palabra] = tris
+            for tri in tris:
+                palabras_trigrama.setdefault(tri, set()).add(palabra)
+
+        # Publicación atómica: se reemplazan los diccionarios completos
+        self._palabras_producto = palabras_producto
+        self._productos_palabra = {k: frozenset(v) for k, v in productos_palabra.items()}
+        self._palabras_trigrama = {k: frozenset(v) for k, v in palabras_trigrama.items()}
+        self._trigramas_palabra = trigramas_palabra
+
+    def actualizar(self, snapshot, ids: Iterable[int]):
+        """Reindexa solo los productos modificados (copy-on-write por entrada)"""
+        for producto_id in ids:
+            registro = snapshot.get(producto_id)
+            nuevas = frozenset(palabras(registro.nombre)) if registro else _VACIO
+            anteriores = self._palabras_producto.get(producto_id, _VACIO)
+
+            for palabra in anteriores - nuevas:
+                restantes = self._productos_palabra.get(palabra, _VACIO) - {producto_id}
+                if restantes:
+                    self._productos_palabra[palabra] = restantes
+                else:
+                    self._quitar_palabra(palabra)
+
+            for palabra in nuevas - anteriores:
+                if palabra not in self._productos_palabra:
+                    self._agregar_palabra(palabra)
+                self._productos_palabra[palabra] = (
+                    self._productos_palabra.get(palabra, _VACIO) | {producto_id}
+                )
+
+            if registro:
+                self._palabras_producto[producto_id] = nuevas
+            else:
+                self._palabras_producto.pop(producto_id, None)
+
+    def _agregar_palabra(self, palabra: str):
+        tris = trigramas(palabra)
+        self._trigramas_palabra[palabra] = tris
+        for tri in tris:
+            self._palabras_trigrama[tri] = self._palabras_trigrama.get(tri, _VACIO) | {palabra}
+
+    def _quitar_palabra(self, palabra: str):
+        self._productos_palabra.pop(palabra, None)
+        for tri in self._trigramas_palabra.pop(palabra, _VACIO):
+            restantes = self._palabras_trigrama.get(tri, _VACIO) - {palabra}
+            if restantes:
+                self._palabras_trigrama[tri] = restantes
+            else:
+                self._palabras_trigrama.pop(tri, None)
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+    def palabras_similares(self, palabra: str, umbral: float) -> Dict[str, float]:
+        """Palabras del vocabulario con similitud >= umbral"""
+        tris_q = trigramas(palabra)
+        compartidos = Counter()
+        for tri in tris_q:
+            compartidos.update(self._palabras_trigrama.get(tri, _VACIO))
+
+        similares = {}
+        for candidata, comunes in compartidos.items():
+            tris_c = self._trigramas_palabra.get(candidata)
+            if tris_c is None:
+                continue
+            similitud = comunes / (len(tris_q) + len(tris_c) - comunes)
+            if similitud >= umbral:
+                similares[candidata] = similitud
+        return similares
+
+    def buscar(self, term: str, umbral: float = 0.3, limit: int = 20) -> List[Tuple[int, float]]:
+        """
+        Busca productos cuyo nombre se parezca al término.
+
+        Cada palabra del término debe parecerse a alguna palabra del
+        nombre; la puntuación es el promedio de las mejores similitudes.
+
+        Returns:
+            Lista de (producto_id, puntuación) ordenada por puntuación desc
+        """
+        consulta = palabras(term)
+        if not consulta:
+            return []
+
+        similares = [self.palabras_similares(palabra, umbral) for palabra in consulta]
+        if not all(similares):
+            return []
+
+        if len(similares) == 1:
+            return self._mejores_por_palabra(similares[0], limit)
+
+        # La palabra más selectiva define los candidatos; el resto solo se
+        # evalúa sobre ellos, sin recorrer sus listas de productos
+        similares.sort(key=self._costo)
+        puntuaciones = self._puntuar_productos(similares[0])
+
+        for otras in similares[1:]:
+            if self._costo(otras) <= 4 * len(puntuaciones):
+                mejores = self._puntuar_productos(otras)
+            else:
+                mejores = self._puntuar_candidatos(otras, puntuaciones)
+            # Todas las palabras del término deben coincidir (AND)
+            puntuaciones = {
+                pid: total + mejores[pid]
+                for pid, total in puntuaciones.items() if pid in mejores
+            }
+            if not puntuaciones:
+                return []
+
+        n = len(similares)
+        return heapq.nsmallest(
+            limit,
+            ((pid, total / n) for pid, total in puntuaciones.items()),
+            key=lambda item: (-item[1], item[0])
+        )
+
+    def _costo(self, similares: Dict[str, float]) -> int:
+        return sum(len(self._productos_palabra.get(p, _VACIO)) for p in similares)
+
+    def _puntuar_productos(self, similares: Dict[str, float]) -> Dict[int, float]:
+        """Mejor similitud por producto recorriendo las palabras similares"""
+        mejores: Dict[int, float] = {}
+        for similar, similitud in similares.items():
+            for producto_id in self._productos_palabra.get(similar, _VACIO):
+                if similitud > mejores.get(producto_id, 0.0):
+                    mejores[producto_id] = similitud
+        return mejores
+
+    def _puntuar_candidatos(self, similares: Dict[str, float],
+                            candidatos: Dict[int, float]) -> Dict[int, float]:
+        """Mejor similitud solo para los candidatos, mirando sus palabras"""
+        mejores: Dict[int, float] = {}
+        for producto_id in candidatos:
+            mejor = 0.0
+            for palabra in self._palabras_producto.get(producto_id, _VACIO):
+                similitud = similares.get(palabra)
+                if similitud is not None and similitud > mejor:
+                    mejor = similitud
+            if mejor:
+                mejores[producto_id] = mejor
+        return mejores
+
+    def _mejores_por_palabra(self, similares: Dict[str, float], limit: int) -> List[Tuple[int, float]]:
+        """
+        Top-N para una sola palabra: se recorren las palabras similares de
+        mayor a menor similitud y se corta al completar el límite (incluyendo
+        empates), sin visitar los productos de palabras menos parecidas.
+        """
+        puntuaciones: Dict[int, float] = {}
+        corte = None
+        for similar, similitud in sorted(similares.items(), key=lambda kv: -kv[1]):
+            if corte is not None and similitud < corte:
+                break
+            for producto_id in self._productos_palabra.get(similar, _VACIO):
+                puntuaciones.setdefault(producto_id, similitud)
+            if corte is None and len(puntuaciones) >= limit:
+                corte = similitud
+        return heapq.nsmallest(limit, puntuaciones.items(), key=lambda item: (-item[1], item[0]))
+
+
+# Instancia global, registrada en el catálogo por app.infrastructure.search.init_app
+trigram_index = TrigramIndex()
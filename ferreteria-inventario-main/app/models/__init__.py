@@ -5,8 +5,12 @@ from .base import BaseModel
 from .usuario import Usuario
 from .producto import Categoria, Producto
 from .venta import Venta, DetalleVenta
+from .venta_diaria import VentaDiaria, ProductoVentaDiaria
+from .cliente_resumen import ClienteResumen
+from .cierre_caja import CierreCaja
 from .compra import Compra
 from .proveedor import Proveedor
+from .idempotencia import ClaveIdempotencia
 
 __all__ = [
     'BaseModel',
@@ -15,6 +19,11 @@ __all__ = [
     'Producto',
     'Venta',
     'DetalleVenta',
+    'VentaDiaria',
+    'ProductoVentaDiaria',
+    'ClienteResumen',
+    'CierreCaja',
     'Compra',
-    'Proveedor'
+    'Proveedor',
+    'ClaveIdempotencia'
 ]
\ No newline at end of file
@@ -36,8 +36,13 @@ class AuditoriaLog(BaseModel):
     @classmethod
     def registrar_accion(cls, usuario_id, accion, tabla_afectada, registro_id=None, 
                          datos_anteriores=None, datos_nuevos=None, ip_address=None, 
-                         user_agent=None, detalles_adicionales=None):
-        """Registrar una acción en el log de auditoría"""
+                         user_agent=None, detalles_adicionales=None, commit=True):
+        """
+        Registrar una acción en el log de auditoría
+        
+        Con commit=False el registro solo se agrega a la sesión, para que
+        quede en la misma transacción que la operación auditada.
+        """
         try:
             log = cls(
                 usuario_id=usuario_id,
@@ -51,9 +56,12 @@ class AuditoriaLog(BaseModel):
                 detalles_adicionales=detalles_adicionales
             )
             db.session.add(log)
-            db.session.commit()
+            if commit:
+                db.session.commit()
             return log
         except Exception as e:
+            if not commit:
+                raise
             db.session.rollback()
             print(f"Error al registrar auditoría: {e}")
             return None
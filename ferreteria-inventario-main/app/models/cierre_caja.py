@@ -0,0 +1,38 @@
+"""
+Modelo de cierre de caja
+"""
+from app import db
+from .base import BaseModel
+
+class CierreCaja(BaseModel):
+    """
+    Cierre de caja de un vendedor en un día
+
+    Copia el resumen del día (ventas_diarias) al momento de cerrar y no se
+    modifica después: el repositorio no expone actualización ni borrado.
+    Las anulaciones posteriores cambian el resumen vivo, no el cierre.
+    """
+    __tablename__ = 'cierres_caja'
+    __table_args__ = (
+        db.UniqueConstraint('fecha', 'usuario_id', name='uq_cierres_caja_fecha_usuario'),
+    )
+
+    fecha = db.Column(db.Date, nullable=False)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False)
+    cantidad_ventas = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    items = db.Column(db.Integer, nullable=False, default=0)
+    anulaciones = db.Column(db.Integer, nullable=False, default=0)
+    total_anulado = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    monto_declarado = db.Column(db.Numeric(14, 2), nullable=True)  # efectivo contado
+    observaciones = db.Column(db.String(255), nullable=True)
+    cerrado_por = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False)
+
+    def to_dict(self):
+        """Cierre con la diferencia entre lo declarado y lo vendido"""
+        data = super().to_dict()
+        data['diferencia'] = (
+            round(float(self.monto_declarado) - float(self.total), 2)
+            if self.monto_declarado is not None else None
+        )
+        return data
@@ -0,0 +1,36 @@
+"""
+Modelo de resumen de compras por cliente
+"""
+from app import db
+from .base import BaseModel
+
+class ClienteResumen(BaseModel):
+    """
+    Compras acumuladas de cada cliente (por documento)
+
+    Se actualiza en la misma transacción que crea o anula cada venta con
+    documento de cliente (ver ClienteResumenRepository.acumular), así el
+    resumen del cliente se lee de una fila en lugar de recorrer su
+    historial. Se puede reconstruir con reconstruir_agregados.py.
+    """
+    __tablename__ = 'clientes_resumen'
+    __table_args__ = (
+        db.UniqueConstraint('cliente_documento', name='uq_clientes_resumen_documento'),
+    )
+
+    cliente_documento = db.Column(db.String(50), nullable=False)
+    cantidad_ventas = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    ultima_compra = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        """Resumen con ticket promedio"""
+        cantidad = self.cantidad_ventas or 0
+        total = float(self.total or 0)
+        return {
+            'cliente_documento': self.cliente_documento,
+            'total': total,
+            'cantidad_ventas': cantidad,
+            'ticket_promedio': round(total / cantidad, 2) if cantidad else 0.0,
+            'ultima_compra': self.ultima_compra.isoformat() if self.ultima_compra else None
+        }
@@ -0,0 +1,28 @@
+"""
+Modelo de claves de idempotencia
+"""
+from app import db
+from .base import BaseModel
+
+class ClaveIdempotencia(BaseModel):
+    """
+    Resultado de una petición POST enviada con Idempotency-Key
+
+    Mientras la petición original se ejecuta el estado es 'en_proceso';
+    al terminar se guarda la respuesta para devolverla a los reintentos.
+    Las filas vencidas se eliminan (ver IdempotencyStore).
+    """
+    __tablename__ = 'claves_idempotencia'
+    __table_args__ = (
+        db.UniqueConstraint('usuario_id', 'clave', name='uq_idempotencia_usuario_clave'),
+    )
+
+    usuario_id = db.Column(db.Integer, nullable=False)
+    clave = db.Column(db.String(100), nullable=False)
+    ruta = db.Column(db.String(200), nullable=False)
+    huella = db.Column(db.String(64), nullable=False)  # sha256 del cuerpo
+    estado = db.Column(db.String(20), nullable=False, default='en_proceso')
+    status_code = db.Column(db.Integer, nullable=True)
+    content_type = db.Column(db.String(100), nullable=True)
+    respuesta = db.Column(db.Text(length=16777215), nullable=True)  # MEDIUMTEXT en MySQL
+    expira_en = db.Column(db.DateTime, nullable=False, index=True)
@@ -75,16 +75,15 @@ class Producto(BaseModel):
         return self.stock >= cantidad
     
     def update_stock(self, cantidad, operation='add'):
-        """Actualizar stock del producto"""
-        if operation == 'add':
-            self.stock += cantidad
-        elif operation == 'subtract':
-            if self.stock >= cantidad:
-                self.stock -= cantidad
-            else:
-                raise ValueError("Stock insuficiente")
-        else:
+        """Actualizar stock del producto (UPDATE condicional atómico, ver ProductoRepository.ajustar_stock)"""
+        from app.repositories.producto import ProductoRepository
+        from app.exceptions import StockError
+        
+        if operation not in ('add', 'subtract'):
             raise ValueError("Operación debe ser 'add' o 'subtract'")
         
-        self.save()
+        try:
+            ProductoRepository.ajustar_stock({self.id: cantidad if operation == 'add' else -cantidad})
+        except StockError:
+            raise ValueError("Stock insuficiente")
         return self
\ No newline at end of file
@@ -3,13 +3,20 @@ Modelos de Venta y DetalleVenta
 """
 from app import db
 from sqlalchemy import func
+from app.utils.fechas import ahora
 from .base import BaseModel
 
 class Venta(BaseModel):
     """Modelo de venta"""
     __tablename__ = 'ventas'
+    __table_args__ = (
+        # Historial del cliente por keyset: WHERE cliente_documento = ? ORDER BY fecha, id
+        db.Index('idx_venta_cliente_fecha', 'cliente_documento', 'fecha', 'id'),
+    )
     
-    fecha = db.Column(db.DateTime, default=db.func.current_timestamp())
+    # Reloj de la aplicación (no CURRENT_TIMESTAMP de la base): el mismo que
+    # usan los resúmenes diarios para decidir a qué día pertenece la venta
+    fecha = db.Column(db.DateTime, default=ahora)
     total = db.Column(db.Numeric(10, 2), nullable=False)
     usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False)
     
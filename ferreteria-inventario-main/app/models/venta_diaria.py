@@ -0,0 +1,48 @@
+"""
+Modelo de resumen diario de ventas
+"""
+from app import db
+from .base import BaseModel
+
+class VentaDiaria(BaseModel):
+    """
+    Ventas agregadas por día y usuario
+
+    Se actualiza en la misma transacción que crea o anula cada venta (ver
+    VentaDiariaRepository.acumular), así los reportes por período leen una
+    fila por día y usuario en lugar de recorrer las ventas. Es también el
+    resumen de caja del vendedor (ver CierreCaja). Se puede reconstruir
+    desde ventas y detalle_venta con reconstruir_agregados.py.
+    """
+    __tablename__ = 'ventas_diarias'
+    __table_args__ = (
+        db.UniqueConstraint('fecha', 'usuario_id', name='uq_ventas_diarias_fecha_usuario'),
+    )
+
+    fecha = db.Column(db.Date, nullable=False)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False)
+    cantidad_ventas = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    items = db.Column(db.Integer, nullable=False, default=0)  # unidades vendidas
+    # Ventas anuladas (ya descontadas de las columnas anteriores)
+    anulaciones = db.Column(db.Integer, nullable=False, default=0)
+    total_anulado = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+
+
+class ProductoVentaDiaria(BaseModel):
+    """
+    Unidades vendidas e ingresos por día y producto
+
+    Igual que VentaDiaria, se actualiza al crear y anular ventas. El
+    ranking de productos más vendidos de cualquier ventana suma los días
+    de la ventana en lugar de agrupar detalle_venta en cada consulta.
+    """
+    __tablename__ = 'productos_ventas_diarias'
+    __table_args__ = (
+        db.UniqueConstraint('fecha', 'producto_id', name='uq_productos_ventas_diarias_fecha_producto'),
+    )
+
+    fecha = db.Column(db.Date, nullable=False)
+    producto_id = db.Column(db.Integer, db.ForeignKey('productos.id'), nullable=False)
+    cantidad = db.Column(db.Integer, nullable=False, default=0)
+    ingresos = db.Column(db.Numeric(14, 2), nullable=False, default=0)
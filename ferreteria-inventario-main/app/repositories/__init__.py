@@ -6,6 +6,8 @@ from .proveedor import ProveedorRepository
 from .usuario import UsuarioRepository
 from .producto import ProductoRepository, CategoriaRepository
 from .venta import VentaRepository
+from .venta_diaria import VentaDiariaRepository, ProductoVentaDiariaRepository, ClienteResumenRepository
+from .cierre_caja import CierreCajaRepository
 from .compra import CompraRepository
 
 __all__ = [
@@ -15,5 +17,9 @@ __all__ = [
     'ProductoRepository',
     'CategoriaRepository', 
     'VentaRepository',
+    'VentaDiariaRepository',
+    'ProductoVentaDiariaRepository',
+    'ClienteResumenRepository',
+    'CierreCajaRepository',
     'CompraRepository'
 ]
\ No newline at end of file
@@ -8,7 +8,7 @@ Principios aplicados:
 - Single Responsibility: Solo maneja operaciones de persistencia
 """
 from abc import ABC
-from typing import List, Optional, TypeVar, Generic
+from typing import Dict, List, Optional, Sequence, TypeVar, Generic
 from app import db
 from app.exceptions import NotFoundError, DatabaseError
 
@@ -50,6 +50,39 @@ class BaseRepository(ABC, Generic[T]):
         except Exception as e:
             raise DatabaseError(f"Error al obtener {cls.model.__name__}: {str(e)}")
     
+    @classmethod
+    def get_projection(cls, fields: Sequence[str], filtros: Optional[Dict] = None,
+                       limit: Optional[int] = None, descendente: bool = False,
+                       offset: int = 0) -> List:
+        """
+        Obtener solo algunas columnas (sparse fieldsets)
+        
+        Selecciona únicamente las columnas pedidas (with_entities): no se
+        hidratan entidades ni se cargan relaciones, aunque estén
+        configuradas como lazy='joined'.
+        
+        Args:
+            fields: Nombres de columnas del modelo
+            filtros: Igualdades columna -> valor (opcional)
+            limit: Máximo de filas, aplicado en SQL (opcional)
+            descendente: Ordenar por id descendente (por defecto ascendente)
+            offset: Filas a saltar, aplicado en SQL
+            
+        Returns:
+            Lista de filas con atributos por columna (Row)
+        """
+        try:
+            columnas = [getattr(cls.model, campo) for campo in fields]
+            query = cls.model.query.filter_by(**(filtros or {})).with_entities(*columnas)
+            query = query.order_by(cls.model.id.desc() if descendente else cls.model.id)
+            if offset:
+                query = query.offset(offset)
+            if limit:
+                query = query.limit(limit)
+            return query.all()
+        except Exception as e:
+            raise DatabaseError(f"Error al obtener {cls.model.__name__}: {str(e)}")
+    
     @classmethod
     def create(cls, data: dict) -> T:
         """
@@ -172,3 +205,8 @@ class BaseRepository(ABC, Generic[T]):
             return cls.model.query.count()
         except Exception as e:
             raise DatabaseError(f"Error al contar {cls.model.__name__}: {str(e)}")
+    
+    @classmethod
+    def rollback(cls) -> None:
+        """Descartar la transacción en curso (libera los bloqueos de filas tomados)"""
+        db.session.rollback()
@@ -0,0 +1,118 @@
+"""
+Repositorio de cierres de caja - Implementación Clean Architecture
+"""
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import CierreCaja, VentaDiaria
+from app.exceptions import DatabaseError
+from app.repositories.base import BaseRepository
+from app.domain.interfaces.cierre_caja_repository_interface import ICierreCajaRepository
+
+
+class CierreCajaRepository(BaseRepository, ICierreCajaRepository):
+    """Implementación del repositorio de cierres de caja"""
+    
+    model = CierreCaja
+    
+    @classmethod
+    def get_cierre(cls, fecha: date, usuario_id: int) -> Optional[CierreCaja]:
+        """
+        Obtiene el cierre de un vendedor en un día
+        
+        Args:
+            fecha: Día del cierre
+            usuario_id: ID del vendedor
+            
+        Returns:
+            Cierre o None si el día no se cerró
+        """
+        try:
+            return cls.model.query.filter_by(fecha=fecha, usuario_id=usuario_id).first()
+        except Exception as e:
+            raise DatabaseError(f"Error al obtener cierre de caja: {str(e)}")
+    
+    @classmethod
+    def cerrar(cls, fecha: date, usuario_id: int, cerrado_por: int,
+               monto_declarado: Optional[Decimal] = None,
+               observaciones: Optional[str] = None) -> Optional[CierreCaja]:
+        """
+        Copia el resumen del día del vendedor en un cierre y confirma
+        
+        La fila de ventas_diarias se lee con bloqueo: una venta o anulación
+        simultánea del mismo vendedor espera al cierre y no queda a medias
+        entre la copia y el resumen. Sin ventas en el día el cierre queda
+        en cero.
+        
+        Args:
+            fecha: Día a cerrar
+            usuario_id: ID del vendedor
+            cerrado_por: ID del usuario que ejecuta el cierre
+            monto_declarado: Efectivo contado en la caja (opcional)
+            observaciones: Nota del cierre (opcional)
+            
+        Returns:
+            Cierre creado o None si el día ya estaba cerrado
+        """
+        try:
+            resumen = db.session.execute(
+                select(VentaDiaria.cantidad_ventas, VentaDiaria.total, VentaDiaria.items,
+                       VentaDiaria.anulaciones, VentaDiaria.total_anulado)
+                .where(VentaDiaria.fecha == fecha, VentaDiaria.usuario_id == usuario_id)
+                .with_for_update()
+            ).first()
+            
+            cierre = cls.model(
+                fecha=fecha,
+                usuario_id=usuario_id,
+                cantidad_ventas=resumen.cantidad_ventas if resumen else 0,
+                total=resumen.total if resumen else 0,
+                items=resumen.items if resumen else 0,
+                anulaciones=resumen.anulaciones if resumen else 0,
+                total_anulado=resumen.total_anulado if resumen else 0,
+                monto_declarado=monto_declarado,
+                observaciones=observaciones,
+                cerrado_por=cerrado_por
+            )
+            db.session.add(cierre)
+            db.session.commit()
+            return cierre
+        except IntegrityError:
+            # Otro cierre del mismo día y vendedor se confirmó antes
+            db.session.rollback()
+            return None
+        except Exception as e:
+            db.session.rollback()
+            raise DatabaseError(f"Error al cerrar caja: {str(e)}")
+    
+    @classmethod
+    def get_cierres(cls, desde: Optional[date] = None, hasta: Optional[date] = None,
+                    usuario_id: Optional[int] = None, limit: int = 100) -> List[CierreCaja]:
+        """
+        Obtiene los cierres de un rango, los más recientes primero
+        
+        Args:
+            desde: Primer día (opcional)
+            hasta: Último día, inclusive (opcional)
+            usuario_id: Solo los cierres de este vendedor (opcional)
+            limit: Máximo de cierres
+            
+        Returns:
+            Lista de cierres
+        """
+        try:
+            query = cls.model.query
+            if desde:
+                query = query.filter(cls.model.fecha >= desde)
+            if hasta:
+                query = query.filter(cls.model.fecha <= hasta)
+            if usuario_id is not None:
+                query = query.filter(cls.model.usuario_id == usuario_id)
+            return query.order_by(
+                cls.model.fecha.desc(), cls.model.usuario_id
+            ).limit(limit).all()
+        except Exception as e:
+            raise DatabaseError(f"Error al obtener cierres de caja: {str(e)}")
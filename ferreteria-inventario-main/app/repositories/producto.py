@@ -1,11 +1,19 @@
 """
 Repositorio de Producto - Implementación Clean Architecture
 """
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
+from decimal import Decimal
+from sqlalchemy import Integer, and_, case, cast, func, insert, literal, or_, update
+from sqlalchemy.orm import lazyload, selectinload
+from app import db
 from app.models import Producto, Categoria
-from app.exceptions import DatabaseError
+from app.models.auditoria import AuditoriaLog
+from app.exceptions import BusinessLogicError, DatabaseError, NotFoundError, StockError
 from app.repositories.base import BaseRepository
 from app.domain.interfaces.producto_repository_interface import IProductoRepository
+from app.domain.interfaces.categoria_repository_interface import ICategoriaRepository
+from app.infrastructure.search import producto_fulltext
+from app.infrastructure.cache import change_tracker
 
 
 class ProductoRepository(BaseRepository, IProductoRepository):
@@ -30,23 +38,62 @@ class ProductoRepository(BaseRepository, IProductoRepository):
             raise DatabaseError(f"Error al buscar producto por nombre: {str(e)}")
     
     @classmethod
-    def search_products(cls, term: str) -> List[Producto]:
+    def search_products(cls, term: str, limit: int = 20, offset: int = 0) -> List[Producto]:
         """
-        Busca productos por término (búsqueda parcial en nombre)
+        Busca productos por término en nombre, descripción y código de barras
+        
+        Usa el índice de texto completo (FTS5 / FULLTEXT) y devuelve los
+        resultados ordenados por relevancia. Si el índice no existe en la
+        base de datos, recurre a LIKE.
         
         Args:
             term: Término de búsqueda
+            limit: Cantidad máxima de resultados
+            offset: Resultados a omitir (paginación)
             
         Returns:
             Lista de productos que coinciden con el término
         """
         try:
-            return cls.model.query.filter(
-                cls.model.nombre.ilike(f'%{term}%')
-            ).all()
+            session = db.session
+            ids = producto_fulltext.buscar_ids(session, term, limit=limit, offset=offset)
+            
+            if ids is None:
+                patron = f'%{term}%'
+                return cls.model.query.filter(or_(
+                    cls.model.nombre.ilike(patron),
+                    cls.model.descripcion.ilike(patron),
+                    cls.model.codigo_barras.ilike(patron)
+                )).order_by(cls.model.nombre).offset(offset).limit(limit).all()
+            
+            if not ids:
+                return []
+            
+            # Cargar en una sola consulta y conservar el orden por relevancia
+            productos = {p.id: p for p in cls.model.query.filter(cls.model.id.in_(ids)).all()}
+            return [productos[i] for i in ids if i in productos]
         except Exception as e:
             raise DatabaseError(f"Error al buscar productos: {str(e)}")
     
+    @classmethod
+    def get_by_nombre_prefix(cls, prefijo: str, limit: int = 10) -> List[Producto]:
+        """
+        Productos cuyo nombre empieza con el prefijo, en orden alfabético
+        
+        Args:
+            prefijo: Inicio del nombre (sin distinguir mayúsculas)
+            limit: Cantidad máxima de resultados
+            
+        Returns:
+            Lista de productos
+        """
+        try:
+            return cls.model.query.filter(
+                cls.model.nombre.istartswith(prefijo, autoescape=True)
+            ).order_by(cls.model.nombre, cls.model.id).limit(limit).all()
+        except Exception as e:
+            raise DatabaseError(f"Error al autocompletar productos: {str(e)}")
+    
     @classmethod
     def get_all_with_categoria(cls) -> List[Producto]:
         """
@@ -83,24 +130,245 @@ class ProductoRepository(BaseRepository, IProductoRepository):
             raise DatabaseError(f"Error al obtener productos por categoría: {str(e)}")
     
     @classmethod
-    def get_stock_bajo(cls) -> List[Producto]:
+    def get_by_codigos_barras(cls, codigos: List[str]) -> List[Producto]:
+        """
+        Obtiene los productos con alguno de los códigos de barras dados
+        (una sola consulta con IN)
+        
+        Args:
+            codigos: Lista de códigos de barras
+            
+        Returns:
+            Lista de productos encontrados
+        """
+        try:
+            if not codigos:
+                return []
+            return cls.model.query.filter(cls.model.codigo_barras.in_(codigos)).all()
+        except Exception as e:
+            raise DatabaseError(f"Error al buscar productos por código de barras: {str(e)}")
+    
+    @classmethod
+    def get_page(cls, after_id: Optional[int] = None, limit: int = 20,
+                 categoria_id: Optional[int] = None,
+                 fields: Optional[Sequence[str]] = None) -> List[Producto]:
+        """
+        Obtiene una página de productos por keyset (WHERE id > :cursor ORDER BY id LIMIT n)
+        
+        A diferencia de OFFSET, el costo no crece con el número de página:
+        la consulta usa la clave primaria para saltar directo al inicio de la página.
+        
+        Args:
+            after_id: Último ID entregado en la página anterior (None = primera página)
+            limit: Cantidad máxima de productos a retornar
+            categoria_id: ID de categoría para filtrar (opcional)
+            fields: Seleccionar solo estas columnas, sin cargar relaciones (opcional)
+            
+        Returns:
+            Lista de productos (o filas con las columnas pedidas) ordenados por ID
+        """
+        try:
+            query = cls.model.query
+            if fields:
+                query = query.with_entities(*[getattr(cls.model, campo) for campo in fields])
+            if categoria_id:
+                query = query.filter(cls.model.categoria_id == categoria_id)
+            if after_id is not None:
+                query = query.filter(cls.model.id > after_id)
+            return query.order_by(cls.model.id).limit(limit).all()
+        except Exception as e:
+            raise DatabaseError(f"Error al obtener página de productos: {str(e)}")
+    
+    @classmethod
+    def count_by_categoria(cls, categoria_id: Optional[int] = None) -> int:
+        """
+        Cuenta productos, opcionalmente filtrados por categoría
+        
+        Args:
+            categoria_id: ID de categoría para filtrar (opcional)
+            
+        Returns:
+            Cantidad de productos
+        """
+        try:
+            query = cls.model.query
+            if categoria_id:
+                query = query.filter(cls.model.categoria_id == categoria_id)
+            return query.count()
+        except Exception as e:
+            raise DatabaseError(f"Error al contar productos: {str(e)}")
+    
+    @classmethod
+    def get_stock_bajo(cls, limit: Optional[int] = None) -> List[Producto]:
         """
         Obtiene productos con stock menor o igual al stock mínimo
         
+        Recorre la tabla completa; las lecturas frecuentes usan el índice
+        en memoria (app/infrastructure/cache/low_stock_index.py).
+        
+        Args:
+            limit: Cantidad máxima de productos (opcional)
+            
         Returns:
-            Lista de productos con stock bajo
+            Lista de productos con stock bajo, los de menor stock primero
         """
         try:
-            return cls.model.query.filter(
+            query = cls.model.query.filter(
                 cls.model.stock <= cls.model.stock_minimo
-            ).all()
+            ).order_by(cls.model.stock, cls.model.id)
+            if limit:
+                query = query.limit(limit)
+            return query.all()
         except Exception as e:
             raise DatabaseError(f"Error al obtener productos con stock bajo: {str(e)}")
     
+    @classmethod
+    def get_by_ids(cls, ids: List[int]) -> List[Producto]:
+        """
+        Obtiene productos por clave primaria conservando el orden de `ids`
+        
+        Args:
+            ids: IDs de los productos
+            
+        Returns:
+            Lista de productos (se omiten los ids inexistentes)
+        """
+        if not ids:
+            return []
+        try:
+            productos = {
+                p.id: p for p in cls.model.query.options(
+                    selectinload(cls.model.categoria)
+                ).filter(cls.model.id.in_(ids)).all()
+            }
+            return [productos[i] for i in ids if i in productos]
+        except Exception as e:
+            raise DatabaseError(f"Error al obtener productos: {str(e)}")
+    
+    @classmethod
+    def get_for_update(cls, ids: List[int]) -> Dict[int, Producto]:
+        """
+        Obtiene productos por ID en una sola consulta bloqueando sus filas
+        
+        Las filas se leen en orden de id para que dos transacciones que
+        bloquean productos en común lo hagan siempre en el mismo orden y no
+        se produzcan deadlocks. Los bloqueos se mantienen hasta el commit o
+        rollback de la transacción en curso.
+        
+        Args:
+            ids: IDs de los productos
+            
+        Returns:
+            Diccionario {producto_id: producto} (se omiten los ids inexistentes)
+        """
+        if not ids:
+            return {}
+        try:
+            # Sin el JOIN del proveedor (lazy='joined'): solo se bloquean productos
+            productos = cls.model.query.options(
+                lazyload(cls.model.proveedor)
+            ).filter(
+                cls.model.id.in_(ids)
+            ).order_by(cls.model.id).with_for_update().all()
+            return {p.id: p for p in productos}
+        except Exception as e:
+            raise DatabaseError(f"Error al obtener productos: {str(e)}")
+    
+    @classmethod
+    def ajustar_stock(cls, cantidades: Dict[int, int], commit: bool = True) -> None:
+        """
+        Suma o resta stock de forma atómica en la base de datos
+        
+        Una sola sentencia para todos los productos:
+            UPDATE productos SET stock = stock + :delta
+            WHERE id IN (...) AND stock + :delta >= 0
+        La condición se evalúa sobre la fila bloqueada por el propio UPDATE,
+        así dos cajas que venden el mismo producto a la vez nunca dejan el
+        stock negativo ni pisan la actualización de la otra. Si rowcount no
+        coincide con la cantidad de productos, algún producto no existe o no
+        tiene stock suficiente: con commit=True se descarta la transacción
+        completa; con commit=False solo se deshace el UPDATE (savepoint) y
+        el rollback queda a cargo del llamador, dueño de la transacción.
+        
+        Args:
+            cantidades: {producto_id: delta} (positivo suma, negativo resta)
+            commit: Confirmar la transacción (False para confirmarla junto
+                    con otras escrituras del llamador)
+        
+        Raises:
+            NotFoundError: Si un producto no existe
+            StockError: Si un producto no tiene stock suficiente
+        """
+        cantidades = {pid: delta for pid, delta in cantidades.items() if delta}
+        if not cantidades:
+            return
+        # Sin commit propio, un UPDATE parcial se deshace con un savepoint
+        # para no descartar las escrituras pendientes del llamador
+        savepoint = None if commit else db.session.begin_nested()
+        try:
+            ids = list(cantidades)
+            delta = case(cantidades, value=cls.model.id)
+            resultado = db.session.execute(
+                update(cls.model)
+                .where(cls.model.id.in_(ids), cls.model.stock + delta >= 0)
+                .values(stock=cls.model.stock + delta)
+                .execution_options(synchronize_session=False)
+            )
+            if resultado.rowcount != len(ids):
+                cls._deshacer(savepoint)
+                cls._error_de_stock(cantidades)
+            if savepoint is not None:
+                savepoint.commit()
+            
+            # Las entidades ya cargadas en la sesión releen el stock al usarse
+            for producto_id in ids:
+                producto = db.session.identity_map.get(
+                    db.session.identity_key(cls.model, producto_id)
+                )
+                if producto is not None:
+                    db.session.expire(producto, ['stock', 'updated_at'])
+            # La sentencia masiva no pasa por el unit of work del ORM
+            change_tracker.marcar(db.session, cls.model.__tablename__, ids)
+            if commit:
+                db.session.commit()
+        except BusinessLogicError:
+            raise
+        except Exception as e:
+            cls._deshacer(savepoint)
+            raise DatabaseError(f"Error al ajustar stock: {str(e)}")
+    
+    @staticmethod
+    def _deshacer(savepoint):
+        """Revierte el savepoint del ajuste o, si no hay, la transacción completa"""
+        if savepoint is None:
+            db.session.rollback()
+        elif savepoint.is_active:
+            savepoint.rollback()
+    
+    @classmethod
+    def _error_de_stock(cls, cantidades: Dict[int, int]):
+        """Identifica el producto que impidió el ajuste y lanza el error correspondiente"""
+        filas = {
+            fila.id: fila for fila in db.session.query(
+                cls.model.id, cls.model.nombre, cls.model.stock
+            ).filter(cls.model.id.in_(list(cantidades)))
+        }
+        for producto_id, delta in cantidades.items():
+            fila = filas.get(producto_id)
+            if fila is None:
+                raise NotFoundError(f"Producto con ID {producto_id} no encontrado")
+            if fila.stock + delta < 0:
+                raise StockError(
+                    f"Stock insuficiente para '{fila.nombre}'. "
+                    f"Disponible: {fila.stock}, Solicitado: {-delta}"
+                )
+        # Otra transacción repuso stock entre el UPDATE y esta lectura
+        raise StockError("El stock cambió durante la operación, intente nuevamente")
+    
     @classmethod
     def update_stock(cls, producto_id: int, cantidad: int, operacion: str = 'add') -> Producto:
         """
-        Actualiza el stock de un producto
+        Actualiza el stock de un producto (ver ajustar_stock)
         
         Args:
             producto_id: ID del producto
@@ -110,27 +378,11 @@ class ProductoRepository(BaseRepository, IProductoRepository):
         Returns:
             Producto con stock actualizado
         """
-        try:
-            producto = cls.get_by_id(producto_id)
-            if not producto:
-                raise DatabaseError(f"Producto con ID {producto_id} no encontrado")
-            
-            if operacion == 'add':
-                producto.stock += cantidad
-            elif operacion == 'subtract':
-                if producto.stock >= cantidad:
-                    producto.stock -= cantidad
-                else:
-                    raise DatabaseError("Stock insuficiente")
-            else:
-                raise DatabaseError("Operación debe ser 'add' o 'subtract'")
-            
-            producto.save()
-            return producto
-        except Exception as e:
-            if isinstance(e, DatabaseError):
-                raise
-            raise DatabaseError(f"Error al actualizar stock: {str(e)}")
+        if operacion not in ('add', 'subtract'):
+            raise DatabaseError("Operación debe ser 'add' o 'subtract'")
+        
+        cls.ajustar_stock({producto_id: cantidad if operacion == 'add' else -cantidad})
+        return cls.get_by_id(producto_id)
     
     @classmethod
     def exists_by_name_and_categoria(cls, nombre: str, categoria_id: int) -> Optional[Producto]:
@@ -152,8 +404,192 @@ class ProductoRepository(BaseRepository, IProductoRepository):
         except Exception as e:
             raise DatabaseError(f"Error al verificar producto: {str(e)}")
 
+    
+    @classmethod
+    def find_import_matches(cls, claves: List[tuple], codigos: List[str]) -> dict:
+        """
+        Busca de forma set-based los productos que coinciden con un lote a importar
+        
+        Una sola consulta por lote: filtra por nombres, categorías y códigos de
+        barras con IN y resuelve las combinaciones exactas en memoria.
+        
+        Args:
+            claves: Lista de tuplas (nombre, categoria_id)
+            codigos: Lista de códigos de barras del lote
+            
+        Returns:
+            {'por_clave': {(nombre, categoria_id): id}, 'por_codigo': {codigo: id}}
+        """
+        try:
+            nombres = {nombre for nombre, _ in claves}
+            categorias = {categoria_id for _, categoria_id in claves}
+            condiciones = []
+            if nombres:
+                condiciones.append(and_(
+                    cls.model.nombre.in_(nombres),
+                    cls.model.categoria_id.in_(categorias)
+                ))
+            if codigos:
+                condiciones.append(cls.model.codigo_barras.in_(set(codigos)))
+            if not condiciones:
+                return {'por_clave': {}, 'por_codigo': {}}
+            
+            filas = db.session.query(
+                cls.model.id, cls.model.nombre, cls.model.categoria_id, cls.model.codigo_barras
+            ).filter(or_(*condiciones)).all()
+            
+            buscadas = set(claves)
+            return {
+                'por_clave': {
+                    (f.nombre, f.categoria_id): f.id
+                    for f in filas if (f.nombre, f.categoria_id) in buscadas
+                },
+                'por_codigo': {f.codigo_barras: f.id for f in filas if f.codigo_barras}
+            }
+        except Exception as e:
+            raise DatabaseError(f"Error al buscar productos existentes: {str(e)}")
+    
+    @classmethod
+    def get_existing_categoria_ids(cls, categoria_ids: List[int]) -> set:
+        """
+        Obtiene cuáles de los IDs de categoría existen (una consulta con IN)
+        
+        Args:
+            categoria_ids: IDs de categoría a verificar
+            
+        Returns:
+            Conjunto de IDs existentes
+        """
+        try:
+            if not categoria_ids:
+                return set()
+            return {
+                fila.id for fila in db.session.query(Categoria.id).filter(
+                    Categoria.id.in_(set(categoria_ids))
+                )
+            }
+        except Exception as e:
+            raise DatabaseError(f"Error al verificar categorías: {str(e)}")
+    
+    @classmethod
+    def bulk_upsert(cls, nuevos: List[dict], actualizaciones: List[dict]) -> None:
+        """
+        Inserta y actualiza un lote de productos en una sola transacción
+        
+        Usa INSERT/UPDATE masivos (executemany) en lugar de un commit por
+        producto. Las actualizaciones deben incluir la clave 'id'.
+        
+        Args:
+            nuevos: Diccionarios con columnas de productos a insertar
+            actualizaciones: Diccionarios con 'id' y columnas a actualizar
+        """
+        try:
+            if nuevos:
+                db.session.execute(insert(cls.model), nuevos)
+            if actualizaciones:
+                db.session.execute(update(cls.model), actualizaciones)
+            # Las sentencias masivas no pasan por el unit of work del ORM
+            change_tracker.marcar(
+                db.session, cls.model.__tablename__,
+                None if nuevos else [a['id'] for a in actualizaciones]
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise DatabaseError(f"Error en la importación masiva de productos: {str(e)}")
+    
+    @classmethod
+    def bulk_adjust(cls, filtro: dict, ajustes: dict, auditoria: Optional[dict] = None) -> int:
+        """
+        Ajusta precio y/o stock mínimo de muchos productos con un solo UPDATE
+        
+        Todo ocurre en una transacción: verificación de valores resultantes,
+        UPDATE set-based, invalidación de cachés (una vez) y registro de
+        auditoría resumido.
+        
+        Args:
+            filtro: {'ids': [...]} o {'categoria_id': n, 'proveedor_id': m}
+            ajustes: {'precio': {'tipo': 'porcentaje'|'monto'|'fijo', 'valor': x},
+                      'stock_minimo': {...}} (al menos uno)
+            auditoria: Argumentos para AuditoriaLog.registrar_accion (opcional);
+                       se agrega 'productos_afectados' a datos_nuevos
+            
+        Returns:
+            Cantidad de productos actualizados
+            
+        Raises:
+            BusinessLogicError: Si algún valor resultante es inválido
+        """
+        condiciones = []
+        if filtro.get('ids'):
+            condiciones.append(cls.model.id.in_(filtro['ids']))
+        if filtro.get('categoria_id') is not None:
+            condiciones.append(cls.model.categoria_id == filtro['categoria_id'])
+        if filtro.get('proveedor_id') is not None:
+            condiciones.append(cls.model.proveedor_id == filtro['proveedor_id'])
+        
+        valores = {}
+        invalidos = []
+        if 'precio' in ajustes:
+            valores['precio'] = cls._expresion_ajuste(cls.model.precio, ajustes['precio'], decimales=2)
+            invalidos.append(valores['precio'] <= 0)
+        if 'stock_minimo' in ajustes:
+            valores['stock_minimo'] = cls._expresion_ajuste(cls.model.stock_minimo, ajustes['stock_minimo'])
+            invalidos.append(valores['stock_minimo'] < 0)
+        
+        try:
+            where = and_(*condiciones)
+            # Verificación previa set-based: ningún valor resultante inválido
+            conflictos = db.session.query(func.count(cls.model.id)).filter(
+                where, or_(*invalidos)
+            ).scalar()
+            if conflictos:
+                raise BusinessLogicError(
+                    f"El ajuste dejaría {conflictos} producto(s) con precio <= 0 "
+                    "o stock mínimo negativo"
+                )
+            
+            resultado = db.session.execute(
+                update(cls.model).where(where).values(**valores)
+                .execution_options(synchronize_session=False)
+            )
+            afectados = resultado.rowcount
+            
+            # Una sola invalidación del catálogo en memoria (al confirmar)
+            change_tracker.marcar(db.session, cls.model.__tablename__, filtro.get('ids'))
+            
+            if auditoria is not None:
+                auditoria = dict(auditoria)
+                auditoria['datos_nuevos'] = {
+                    **(auditoria.get('datos_nuevos') or {}),
+                    'productos_afectados': afectados
+                }
+                AuditoriaLog.registrar_accion(**auditoria, commit=False)
+            
+            db.session.commit()
+            return afectados
+        except BusinessLogicError:
+            db.session.rollback()
+            raise
+        except Exception as e:
+            db.session.rollback()
+            raise DatabaseError(f"Error en la actualización masiva de productos: {str(e)}")
+    
+    @staticmethod
+    def _expresion_ajuste(columna, ajuste: dict, decimales: int = 0):
+        """Expresión SQL del nuevo valor de una columna según el tipo de ajuste"""
+        valor = Decimal(str(ajuste['valor']))
+        if ajuste['tipo'] == 'porcentaje':
+            expresion = func.round(columna * ((Decimal(100) + valor) / Decimal(100)), decimales)
+        elif ajuste['tipo'] == 'monto':
+            expresion = columna + valor
+        else:
+            expresion = literal(valor)
+        if decimales == 0:
+            expresion = cast(func.round(expresion), Integer)
+        return expresion
 
-class CategoriaRepository(BaseRepository):
+class CategoriaRepository(BaseRepository, ICategoriaRepository):
     """
     Repositorio de Categoría - Implementación Clean Architecture
     """
@@ -195,33 +631,45 @@ class CategoriaRepository(BaseRepository):
             raise DatabaseError(f"Error al buscar categorías: {str(e)}")
     
     @classmethod
-    def get_with_products_count(cls) -> List[Categoria]:
+    def get_with_products_count(cls, categoria_id: Optional[int] = None) -> List[Dict]:
         """
-        Obtiene todas las categorías con productos cargados (para conteo)
+        Obtiene las categorías con estadísticas de sus productos
         
+        Una sola consulta agregada (GROUP BY categoria_id) unida a
+        categorías: no se cargan los productos en memoria.
+        
+        Args:
+            categoria_id: Limitar a una categoría (opcional)
+            
         Returns:
-            Lista de categorías con relación productos cargada
+            Lista de diccionarios con los datos de la categoría y
+            productos_count, valor_stock y productos_stock_bajo
         """
         try:
-            from sqlalchemy.orm import joinedload
-            return cls.model.query.options(joinedload(cls.model.productos)).all()
+            stats = db.session.query(
+                Producto.categoria_id.label('categoria_id'),
+                func.count(Producto.id).label('productos_count'),
+                func.sum(Producto.precio * Producto.stock).label('valor_stock'),
+                func.sum(case((Producto.stock <= Producto.stock_minimo, 1), else_=0)).label('stock_bajo')
+            ).group_by(Producto.categoria_id).subquery()
+            
+            query = db.session.query(
+                cls.model.id, cls.model.nombre, cls.model.descripcion,
+                cls.model.created_at, cls.model.updated_at,
+                stats.c.productos_count, stats.c.valor_stock, stats.c.stock_bajo
+            ).outerjoin(stats, stats.c.categoria_id == cls.model.id)
+            if categoria_id is not None:
+                query = query.filter(cls.model.id == categoria_id)
+            
+            return [{
+                'id': fila.id,
+                'nombre': fila.nombre,
+                'descripcion': fila.descripcion,
+                'created_at': fila.created_at,
+                'updated_at': fila.updated_at,
+                'productos_count': int(fila.productos_count or 0),
+                'valor_stock': round(float(fila.valor_stock or 0), 2),
+                'productos_stock_bajo': int(fila.stock_bajo or 0)
+            } for fila in query.order_by(cls.model.id).all()]
         except Exception as e:
             raise DatabaseError(f"Error al obtener categorías con conteo: {str(e)}")
-
-
-class CategoriaRepository(BaseRepository):
-    """
-    Repositorio para operaciones de Categoria
-    
-    TODO: Migrar a Clean Architecture cuando se implemente el módulo Categoría
-    """
-    
-    model = Categoria
-    
-    @classmethod
-    def find_by_name(cls, nombre: str):
-        """Buscar categoría por nombre"""
-        try:
-            return cls.model.query.filter_by(nombre=nombre).first()
-        except Exception as e:
-            raise DatabaseError(f"Error al buscar categoría: {str(e)}")
\ No newline at end of file
@@ -2,13 +2,20 @@
 Repositorio de Venta - Implementación Clean Architecture
 """
 from datetime import datetime
-from typing import List, Optional, Dict
-from sqlalchemy import func
+from typing import Iterator, List, Optional, Dict, Tuple
+from sqlalchemy import and_, delete, func, insert, inspect, or_, select, update
+from sqlalchemy.orm import joinedload, selectinload
 from app import db
-from app.models import Venta, DetalleVenta
-from app.exceptions import DatabaseError
+from app.models import Venta, DetalleVenta, Producto
+from app.models.auditoria import AuditoriaLog
+from app.exceptions import BusinessLogicError, DatabaseError
+from app.utils.fechas import ahora
 from app.repositories.base import BaseRepository
+from app.repositories.venta_diaria import (
+    VentaDiariaRepository, ProductoVentaDiariaRepository, ClienteResumenRepository
+)
 from app.domain.interfaces.venta_repository_interface import IVentaRepository
+from app.infrastructure.cache import change_tracker, serie_ventas_cache
 
 
 class VentaRepository(BaseRepository, IVentaRepository):
@@ -17,58 +24,174 @@ class VentaRepository(BaseRepository, IVentaRepository):
     model = Venta
     
     @classmethod
-    def get_by_date_range(cls, fecha_inicio: datetime, fecha_fin: datetime) -> List[Venta]:
+    def _con_detalles(cls):
         """
-        Obtiene ventas en un rango de fechas
+        Perfil de carga para armar VentaResponseDTO sin consultas perezosas:
+        usuario en el mismo SELECT (JOIN), detalles y sus productos en una
+        consulta adicional (SELECT ... IN) sin importar cuántas ventas haya.
+        El proveedor del producto no se usa, así que no se une.
+        """
+        return cls.model.query.options(
+            joinedload(cls.model.usuario),
+            selectinload(cls.model.detalles)
+            .joinedload(DetalleVenta.producto)
+            .lazyload(Producto.proveedor)
+        )
+    
+    @staticmethod
+    def _paginar(query, limit: Optional[int] = None, offset: int = 0):
+        """Aplica LIMIT/OFFSET en SQL"""
+        if offset:
+            query = query.offset(offset)
+        if limit:
+            query = query.limit(limit)
+        return query
+    
+    @classmethod
+    def get_all_con_detalles(cls, limit: Optional[int] = None, offset: int = 0) -> List[Venta]:
+        """
+        Obtiene ventas ordenadas por id con usuario, detalles y productos
+        
+        Args:
+            limit: Máximo de ventas (opcional, en SQL)
+            offset: Ventas a saltar (en SQL)
+            
+        Returns:
+            Lista de ventas
+        """
+        try:
+            query = cls._con_detalles().order_by(cls.model.id)
+            return cls._paginar(query, limit, offset).all()
+        except Exception as e:
+            raise DatabaseError(f"Error al obtener ventas: {str(e)}")
+    
+    @classmethod
+    def get_page_por_fecha(cls, despues_de: Optional[Tuple[datetime, int]] = None,
+                           limit: int = 100,
+                           cliente_documento: Optional[str] = None) -> List[Venta]:
+        """
+        Obtiene una página de ventas por keyset, las más recientes primero
+        
+        Ordena por (fecha, id) descendente y continúa desde la clave del
+        último registro entregado: el costo no crece con la antigüedad de la
+        página (el índice de fecha incluye la clave primaria en InnoDB; el
+        historial de un cliente usa idx_venta_cliente_fecha).
+        
+        Args:
+            despues_de: (fecha, id) de la última venta entregada (None = primera página)
+            limit: Cantidad máxima de ventas a retornar
+            cliente_documento: Solo las ventas de este cliente (opcional)
+            
+        Returns:
+            Lista de ventas con usuario, detalles y productos precargados
+        """
+        try:
+            query = cls._con_detalles()
+            if cliente_documento is not None:
+                query = query.filter(cls.model.cliente_documento == cliente_documento)
+            if despues_de is not None:
+                fecha, ultimo_id = despues_de
+                query = query.filter(or_(
+                    cls.model.fecha < fecha,
+                    and_(cls.model.fecha == fecha, cls.model.id < ultimo_id)
+                ))
+            return query.order_by(cls.model.fecha.desc(), cls.model.id.desc()).limit(limit).all()
+        except Exception as e:
+            raise DatabaseError(f"Error al obtener página de ventas: {str(e)}")
+    
+    @classmethod
+    def iter_paginas_por_fecha(cls, despues_de: Optional[Tuple[datetime, int]] = None,
+                               tamano: int = 200) -> Iterator[List[Venta]]:
+        """
+        Recorre todas las ventas en páginas keyset de `tamano` registros
+        
+        Cada página es una consulta acotada con carga anticipada, así que la
+        memoria depende del tamaño de página y no del historial. No se usa un
+        único cursor de servidor abierto durante todo el recorrido: las
+        consultas de detalles necesitan la conexión entre página y página
+        (un cursor sin buffer de MySQL no admite sentencias intercaladas).
+        
+        Args:
+            despues_de: (fecha, id) desde donde continuar (None = desde la más reciente)
+            tamano: Ventas por página
+            
+        Yields:
+            Listas de ventas, las más recientes primero
+        """
+        while True:
+            ventas = cls.get_page_por_fecha(despues_de, tamano)
+            if not ventas:
+                return
+            yield ventas
+            if len(ventas) < tamano:
+                return
+            despues_de = (ventas[-1].fecha, ventas[-1].id)
+    
+    @classmethod
+    def get_by_date_range(cls, fecha_inicio: datetime, fecha_fin: datetime,
+                          limit: Optional[int] = None, offset: int = 0) -> List[Venta]:
+        """
+        Obtiene ventas en un rango de fechas, las más recientes primero
         
         Args:
             fecha_inicio: Fecha de inicio del rango
             fecha_fin: Fecha de fin del rango
+            limit: Máximo de ventas (opcional, en SQL)
+            offset: Ventas a saltar (en SQL)
             
         Returns:
             Lista de ventas en el rango especificado
         """
         try:
-            return cls.model.query.filter(
+            query = cls._con_detalles().filter(
                 cls.model.created_at >= fecha_inicio,
                 cls.model.created_at <= fecha_fin
-            ).order_by(cls.model.created_at.desc()).all()
+            ).order_by(cls.model.created_at.desc(), cls.model.id.desc())
+            return cls._paginar(query, limit, offset).all()
         except Exception as e:
             raise DatabaseError(f"Error al obtener ventas por rango de fechas: {str(e)}")
     
     @classmethod
-    def get_by_usuario(cls, usuario_id: int) -> List[Venta]:
+    def get_by_usuario(cls, usuario_id: int, limit: Optional[int] = None,
+                       offset: int = 0) -> List[Venta]:
         """
-        Obtiene todas las ventas de un usuario
+        Obtiene las ventas de un usuario, las más recientes primero
         
         Args:
             usuario_id: ID del usuario
+            limit: Máximo de ventas (opcional, en SQL)
+            offset: Ventas a saltar (en SQL)
             
         Returns:
             Lista de ventas del usuario
         """
         try:
-            return cls.model.query.filter_by(
+            query = cls._con_detalles().filter_by(
                 usuario_id=usuario_id
-            ).order_by(cls.model.created_at.desc()).all()
+            ).order_by(cls.model.created_at.desc(), cls.model.id.desc())
+            return cls._paginar(query, limit, offset).all()
         except Exception as e:
             raise DatabaseError(f"Error al obtener ventas por usuario: {str(e)}")
     
     @classmethod
-    def get_by_cliente(cls, cliente_documento: str) -> List[Venta]:
+    def get_by_cliente(cls, cliente_documento: str, limit: Optional[int] = None,
+                       offset: int = 0) -> List[Venta]:
         """
-        Obtiene todas las ventas de un cliente
+        Obtiene las ventas de un cliente, las más recientes primero
         
         Args:
             cliente_documento: Documento del cliente
+            limit: Máximo de ventas (opcional, en SQL)
+            offset: Ventas a saltar (en SQL)
             
         Returns:
             Lista de ventas del cliente
         """
         try:
-            return cls.model.query.filter_by(
+            query = cls._con_detalles().filter_by(
                 cliente_documento=cliente_documento
-            ).order_by(cls.model.created_at.desc()).all()
+            ).order_by(cls.model.created_at.desc(), cls.model.id.desc())
+            return cls._paginar(query, limit, offset).all()
         except Exception as e:
             raise DatabaseError(f"Error al obtener ventas por cliente: {str(e)}")
     
@@ -103,11 +226,42 @@ class VentaRepository(BaseRepository, IVentaRepository):
         except Exception as e:
             raise DatabaseError(f"Error al calcular total de ventas: {str(e)}")
     
+    @staticmethod
+    def _con_fecha(venta_data: dict) -> dict:
+        """
+        Fija la fecha de la venta en Python (en lugar del DEFAULT de la
+        base) para conocer el día del resumen diario sin releer la fila
+        """
+        if venta_data.get('fecha'):
+            return venta_data
+        return {**venta_data, 'fecha': ahora()}
+    
+    @staticmethod
+    def _movimiento(venta_data: dict, detalles: List[dict]) -> Tuple:
+        """(fecha, usuario_id, total, unidades) para VentaDiariaRepository.acumular"""
+        return (venta_data['fecha'], venta_data['usuario_id'], venta_data['total'],
+                sum(detalle['cantidad'] for detalle in detalles))
+    
+    @staticmethod
+    def _lineas(venta_data: dict, detalles: List[dict]) -> List[Tuple]:
+        """(fecha, producto_id, cantidad, subtotal) para ProductoVentaDiariaRepository.acumular"""
+        return [(venta_data['fecha'], detalle['producto_id'], detalle['cantidad'], detalle['subtotal'])
+                for detalle in detalles]
+    
+    @staticmethod
+    def _compra_cliente(venta_data: dict) -> Tuple:
+        """(cliente_documento, fecha, total) para ClienteResumenRepository.acumular"""
+        return (venta_data.get('cliente_documento'), venta_data['fecha'], venta_data['total'])
+    
     @classmethod
     def create_with_detalles(cls, venta_data: dict, detalles: List[dict]) -> Venta:
         """
         Crea una venta con sus detalles en una transacción
         
+        Los cambios pendientes de la sesión (por ejemplo, el descuento de
+        stock de los productos vendidos) y los resúmenes diarios se
+        confirman en el mismo commit.
+        
         Args:
             venta_data: Datos de la venta
             detalles: Lista de detalles de la venta
@@ -117,63 +271,289 @@ class VentaRepository(BaseRepository, IVentaRepository):
         """
         try:
             # Crear la venta principal
+            venta_data = cls._con_fecha(venta_data)
             venta = cls.model(**venta_data)
             db.session.add(venta)
             db.session.flush()  # Para obtener el ID de la venta
+            venta_id = venta.id
             
-            # Crear los detalles
-            for detalle_data in detalles:
-                detalle_data['venta_id'] = venta.id
-                detalle = DetalleVenta(**detalle_data)
-                db.session.add(detalle)
+            # Crear los detalles en un único INSERT (executemany)
+            db.session.execute(
+                insert(DetalleVenta),
+                [{**detalle_data, 'venta_id': venta_id} for detalle_data in detalles]
+            )
+            # La sentencia masiva no pasa por el unit of work del ORM
+            change_tracker.marcar(db.session, DetalleVenta.__tablename__)
+            VentaDiariaRepository.acumular([cls._movimiento(venta_data, detalles)])
+            ProductoVentaDiariaRepository.acumular(cls._lineas(venta_data, detalles))
+            ClienteResumenRepository.acumular([cls._compra_cliente(venta_data)])
             
             # Commit de la transacción
             db.session.commit()
+            serie_ventas_cache.invalidar_cerrados([venta_data['fecha']])
             
-            # Recargar la venta con sus relaciones
-            db.session.refresh(venta)
-            return venta
+            # Recargar la venta con sus relaciones en consultas acotadas
+            return cls.get_with_detalles(venta_id)
             
+        except BusinessLogicError:
+            db.session.rollback()
+            raise
         except Exception as e:
             db.session.rollback()
             raise DatabaseError(f"Error al crear venta con detalles: {str(e)}")
     
     @classmethod
-    def get_ventas_statistics(cls, fecha_inicio: Optional[datetime] = None,
-                              fecha_fin: Optional[datetime] = None) -> Dict:
+    def create_lote(cls, ventas: List[Tuple[dict, List[dict]]]) -> List[int]:
         """
-        Obtiene estadísticas de ventas
+        Crea varias ventas con sus detalles en una transacción
+        
+        Todos los detalles se insertan con un único INSERT executemany. Las
+        cabeceras se agregan juntas a la sesión: el ORM las inserta en un
+        INSERT multi-fila cuando el motor puede devolver los ids en orden
+        (RETURNING ordenado); en MySQL y SQLite emite un INSERT por venta
+        dentro de la misma transacción. Igual que create_with_detalles, los
+        cambios pendientes de la sesión se confirman en el mismo commit.
         
         Args:
-            fecha_inicio: Fecha de inicio (opcional)
-            fecha_fin: Fecha de fin (opcional)
+            ventas: Lista de tuplas (datos de la venta, detalles de la venta)
             
         Returns:
-            Diccionario con estadísticas (total, cantidad, promedio)
+            IDs de las ventas creadas, en el mismo orden
         """
         try:
-            query = db.session.query(
-                func.sum(cls.model.total).label('total'),
-                func.count(cls.model.id).label('cantidad'),
-                func.avg(cls.model.total).label('promedio')
+            ventas = [(cls._con_fecha(venta_data), detalles) for venta_data, detalles in ventas]
+            registros = [cls.model(**venta_data) for venta_data, _ in ventas]
+            db.session.add_all(registros)
+            db.session.flush()
+            venta_ids = [venta.id for venta in registros]
+            
+            db.session.execute(insert(DetalleVenta), [
+                {**detalle_data, 'venta_id': venta_id}
+                for venta_id, (_, detalles) in zip(venta_ids, ventas)
+                for detalle_data in detalles
+            ])
+            change_tracker.marcar(db.session, DetalleVenta.__tablename__)
+            VentaDiariaRepository.acumular(
+                cls._movimiento(venta_data, detalles) for venta_data, detalles in ventas
+            )
+            ProductoVentaDiariaRepository.acumular(
+                linea for venta_data, detalles in ventas for linea in cls._lineas(venta_data, detalles)
+            )
+            ClienteResumenRepository.acumular(
+                cls._compra_cliente(venta_data) for venta_data, _ in ventas
             )
             
-            if fecha_inicio and fecha_fin:
-                query = query.filter(
-                    cls.model.created_at >= fecha_inicio,
-                    cls.model.created_at <= fecha_fin
+            db.session.commit()
+            serie_ventas_cache.invalidar_cerrados(venta_data['fecha'] for venta_data, _ in ventas)
+            return venta_ids
+        except BusinessLogicError:
+            db.session.rollback()
+            raise
+        except Exception as e:
+            db.session.rollback()
+            raise DatabaseError(f"Error al crear lote de ventas: {str(e)}")
+    
+    @classmethod
+    def get_importes(cls, desde: datetime, hasta: datetime) -> List[Tuple[datetime, any]]:
+        """
+        Fecha y total de cada venta en [desde, hasta), para agrupar por hora
+        
+        Args:
+            desde: Inicio del rango (incluido)
+            hasta: Fin del rango (excluido)
+            
+        Returns:
+            Lista de tuplas (fecha, total)
+        """
+        try:
+            return [tuple(fila) for fila in db.session.execute(
+                select(cls.model.fecha, cls.model.total)
+                .where(cls.model.fecha >= desde, cls.model.fecha < hasta)
+            )]
+        except Exception as e:
+            raise DatabaseError(f"Error al obtener importes de ventas: {str(e)}")
+    
+    @classmethod
+    def anular(cls, venta_ids: List[int], auditoria: Optional[dict] = None) -> List[int]:
+        """
+        Anula ventas con sentencias por conjunto, en una sola transacción
+        
+        La cantidad de sentencias no depende de cuántas ventas o líneas se
+        anulan:
+            SELECT ... FROM ventas WHERE id IN (...) FOR UPDATE
+            SELECT ... FROM detalle_venta WHERE venta_id IN (...)
+            UPDATE productos SET stock = stock + (SELECT SUM(cantidad)
+                FROM detalle_venta WHERE producto_id = productos.id
+                AND venta_id IN (...)) WHERE id IN (...)
+            upserts de ventas_diarias y productos_ventas_diarias
+            DELETE FROM detalle_venta WHERE venta_id IN (...)
+            DELETE FROM ventas WHERE id IN (...)
+            upsert y UPDATE de clientes_resumen (si hay ventas con documento)
+            INSERT INTO auditoria_logs ... (una fila por venta)
+        Bloquear las ventas evita que dos anulaciones simultáneas de la
+        misma venta restauren el stock dos veces.
+        
+        Args:
+            venta_ids: IDs de las ventas a anular
+            auditoria: {usuario_id, ip_address, user_agent} para registrar
+                       cada anulación en la misma transacción (opcional)
+            
+        Returns:
+            IDs de las ventas anuladas, en orden ascendente
+        """
+        ids = sorted(set(venta_ids))
+        if not ids:
+            return []
+        try:
+            ventas = db.session.execute(
+                select(Venta.id, Venta.fecha, Venta.usuario_id, Venta.total,
+                       Venta.cliente_documento)
+                .where(Venta.id.in_(ids))
+                .order_by(Venta.id)
+                .with_for_update()
+            ).all()
+            ids = [venta.id for venta in ventas]
+            if not ids:
+                db.session.rollback()
+                return []
+            
+            detalles = db.session.execute(
+                select(DetalleVenta.venta_id, DetalleVenta.producto_id,
+                       DetalleVenta.cantidad, DetalleVenta.subtotal)
+                .where(DetalleVenta.venta_id.in_(ids))
+            ).all()
+            producto_ids = sorted({detalle.producto_id for detalle in detalles})
+            
+            # Restaurar stock desde las propias líneas de detalle
+            if producto_ids:
+                devuelto = (
+                    select(func.sum(DetalleVenta.cantidad))
+                    .where(DetalleVenta.producto_id == Producto.id, DetalleVenta.venta_id.in_(ids))
+                    .scalar_subquery()
                 )
-            elif fecha_inicio:
-                query = query.filter(cls.model.created_at >= fecha_inicio)
-            elif fecha_fin:
-                query = query.filter(cls.model.created_at <= fecha_fin)
+                db.session.execute(
+                    update(Producto)
+                    .where(Producto.id.in_(producto_ids))
+                    .values(stock=Producto.stock + devuelto)
+                    .execution_options(synchronize_session=False)
+                )
+            
+            unidades = {}
+            for detalle in detalles:
+                unidades[detalle.venta_id] = unidades.get(detalle.venta_id, 0) + detalle.cantidad
+            VentaDiariaRepository.acumular([
+                (venta.fecha, venta.usuario_id, venta.total, unidades.get(venta.id, 0))
+                for venta in ventas
+            ], signo=-1)
+            fechas = {venta.id: venta.fecha for venta in ventas}
+            ProductoVentaDiariaRepository.acumular([
+                (fechas[detalle.venta_id], detalle.producto_id, detalle.cantidad, detalle.subtotal)
+                for detalle in detalles
+            ], signo=-1)
+            
+            db.session.execute(
+                delete(DetalleVenta).where(DetalleVenta.venta_id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            db.session.execute(
+                delete(Venta).where(Venta.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            # Después del DELETE: la última compra se recalcula con las ventas que quedan
+            ClienteResumenRepository.acumular([
+                (venta.cliente_documento, venta.fecha, venta.total) for venta in ventas
+            ], signo=-1)
+            cls._olvidar(ids, producto_ids)
+            
+            if auditoria:
+                for venta in ventas:
+                    AuditoriaLog.registrar_accion(
+                        accion='ANULAR',
+                        tabla_afectada='ventas',
+                        registro_id=venta.id,
+                        datos_anteriores={'total': float(venta.total), 'fecha': str(venta.fecha)},
+                        commit=False,
+                        **auditoria
+                    )
             
-            result = query.one()
+            # Las sentencias masivas no pasan por el unit of work del ORM
+            change_tracker.marcar(db.session, Producto.__tablename__, producto_ids)
+            change_tracker.marcar(db.session, DetalleVenta.__tablename__)
+            change_tracker.marcar(db.session, Venta.__tablename__, ids)
+            db.session.commit()
+            # Los intervalos ya cerrados de la serie de ventas incluían estas ventas
+            serie_ventas_cache.invalidar(fechas.values())
+            return ids
+        except BusinessLogicError:
+            db.session.rollback()
+            raise
+        except Exception as e:
+            db.session.rollback()
+            raise DatabaseError(f"Error al anular ventas: {str(e)}")
+    
+    @staticmethod
+    def _olvidar(venta_ids: List[int], producto_ids: List[int]) -> None:
+        """
+        Saca de la sesión las ventas y detalles borrados por SQL y hace que
+        los productos cargados relean el stock
+        """
+        ventas = set(venta_ids)
+        # Sin leer atributos: en un objeto vencido (p. ej. tras un commit)
+        # leerlos lo recargaría y su fila ya fue borrada
+        for clave, objeto in list(db.session.identity_map.items()):
+            if isinstance(objeto, Venta) and clave[1][0] in ventas:
+                db.session.expunge(objeto)
+            elif isinstance(objeto, DetalleVenta):
+                venta_id = inspect(objeto).dict.get('venta_id')
+                if venta_id is None or venta_id in ventas:
+                    db.session.expunge(objeto)
+        for producto_id in producto_ids:
+            producto = db.session.identity_map.get(db.session.identity_key(Producto, producto_id))
+            if producto is not None:
+                db.session.expire(producto, ['stock', 'updated_at'])
+    
+    @classmethod
+    def get_with_detalles(cls, venta_id: int) -> Optional[Venta]:
+        """
+        Obtiene una venta con su usuario, detalles y productos cargados
+        
+        La cantidad de consultas no depende de la cantidad de detalles.
+        
+        Args:
+            venta_id: ID de la venta
             
-            return {
-                'total': float(result.total) if result.total else 0.0,
-                'cantidad': int(result.cantidad) if result.cantidad else 0,
-                'promedio': float(result.promedio) if result.promedio else 0.0
-            }
+        Returns:
+            Venta o None si no existe
+        """
+        try:
+            return cls._con_detalles().filter_by(id=venta_id).first()
         except Exception as e:
-            raise DatabaseError(f"Error al obtener estadísticas de ventas: {str(e)}")
\ No newline at end of file
+            raise DatabaseError(f"Error al obtener venta: {str(e)}")
+    
+    @classmethod
+    def get_ventas_statistics(cls, fecha_inicio: Optional[datetime] = None,
+                              fecha_fin: Optional[datetime] = None) -> Dict:
+        """
+        Obtiene estadísticas de ventas
+        
+        Se leen del resumen diario (ventas_diarias): el costo depende de la
+        cantidad de días del rango y no de la cantidad de ventas. El rango
+        se toma por días completos, incluido el día de fecha_fin.
+        
+        Args:
+            fecha_inicio: Fecha de inicio (opcional)
+            fecha_fin: Fecha de fin (opcional)
+            
+        Returns:
+            Diccionario con estadísticas (total, cantidad, promedio)
+        """
+        totales = VentaDiariaRepository.totales(
+            fecha_inicio.date() if fecha_inicio else None,
+            fecha_fin.date() if fecha_fin else None
+        )
+        cantidad = totales['cantidad']
+        return {
+            'total': totales['total'],
+            'cantidad': cantidad,
+            'promedio': totales['total'] / cantidad if cantidad else 0.0
+        }
\ No newline at end of file
@@ -0,0 +1,532 @@
+"""
+Repositorios de los resúmenes de ventas (por día y por cliente) - Implementación Clean Architecture
+"""
+import heapq
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, func, insert, or_, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from app import db
+from app.models import (
+    VentaDiaria, ProductoVentaDiaria, ClienteResumen, Venta, DetalleVenta, Producto, CierreCaja
+)
+from app.exceptions import BusinessLogicError, DatabaseError
+from app.repositories.base import BaseRepository
+from app.domain.interfaces.venta_diaria_repository_interface import (
+    IVentaDiariaRepository, IProductoVentaDiariaRepository, IClienteResumenRepository,
+    MovimientoVenta, MovimientoProducto, MovimientoCliente
+)
+from app.infrastructure.cache import change_tracker, serie_ventas_cache
+
+
+def _como_fecha(valor) -> date:
+    return valor.date() if isinstance(valor, datetime) else valor
+
+
+def _sumar_filas(tabla, filas: List[Dict], claves: Tuple[str, ...],
+                 acumuladas: Tuple[str, ...], maximas: Tuple[str, ...] = ()) -> None:
+    """
+    Upsert que suma las columnas acumuladas sobre la fila existente
+
+    El incremento se calcula en SQL (col = col + nuevo): dos cajas que
+    escriben la misma fila a la vez no se pisan. Las columnas `maximas`
+    conservan el mayor valor entre el guardado y el nuevo.
+    """
+    def mayor(col, nuevo):
+        return case((tabla.c[col] >= nuevo, tabla.c[col]), else_=nuevo)
+
+    dialecto = db.session.get_bind().dialect.name
+    
+    if dialecto == 'mysql':
+        stmt = mysql.insert(tabla).values(filas)
+        stmt = stmt.on_duplicate_key_update({
+            **{col: tabla.c[col] + stmt.inserted[col] for col in acumuladas},
+            **{col: mayor(col, stmt.inserted[col]) for col in maximas}
+        })
+        db.session.execute(stmt)
+    elif dialecto in ('sqlite', 'postgresql'):
+        modulo = sqlite if dialecto == 'sqlite' else postgresql
+        stmt = modulo.insert(tabla).values(filas)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(claves),
+            set_={
+                **{col: tabla.c[col] + stmt.excluded[col] for col in acumuladas},
+                **{col: mayor(col, stmt.excluded[col]) for col in maximas}
+            }
+        )
+        db.session.execute(stmt)
+    else:
+        for fila in filas:
+            resultado = db.session.execute(
+                update(tabla)
+                .where(*(tabla.c[clave] == fila[clave] for clave in claves))
+                .values({
+                    **{col: tabla.c[col] + fila[col] for col in acumuladas},
+                    **{col: mayor(col, fila[col]) for col in maximas}
+                })
+            )
+            if not resultado.rowcount:
+                db.session.execute(insert(tabla).values(fila))
+
+
+def _borrar_rango(tabla, desde: Optional[date], hasta: Optional[date]) -> None:
+    borrar = delete(tabla)
+    if desde:
+        borrar = borrar.where(tabla.c.fecha >= desde)
+    if hasta:
+        borrar = borrar.where(tabla.c.fecha <= hasta)
+    db.session.execute(borrar)
+
+
+def _dias_en_rango(consulta, modelo, desde: Optional[date], hasta: Optional[date]):
+    if desde:
+        consulta = consulta.filter(modelo.fecha >= desde)
+    if hasta:
+        consulta = consulta.filter(modelo.fecha <= hasta)
+    return consulta
+
+
+def _ventas_en_rango(consulta, desde: Optional[date], hasta: Optional[date]):
+    # Rango sobre la columna (no sobre DATE(fecha)) para usar el índice
+    if desde:
+        consulta = consulta.where(Venta.fecha >= datetime.combine(desde, time.min))
+    if hasta:
+        consulta = consulta.where(Venta.fecha < datetime.combine(hasta + timedelta(days=1), time.min))
+    return consulta
+
+
+class VentaDiariaRepository(BaseRepository, IVentaDiariaRepository):
+    """Implementación del repositorio del resumen diario de ventas"""
+    
+    model = VentaDiaria
+    
+    @classmethod
+    def acumular(cls, movimientos: Iterable[MovimientoVenta], signo: int = 1) -> None:
+        """
+        Suma ventas al resumen (o las resta con signo=-1, al anular)
+        
+        Se ejecuta dentro de la transacción del llamador, sin commit, para
+        que el resumen y las ventas se confirmen o se descarten juntos. Las
+        filas se agrupan por (día, usuario) y se escriben con un único
+        upsert que incrementa en SQL: dos cajas que venden a la vez el
+        mismo día no se pisan. Al anular también se cuentan las anulaciones
+        y su importe, para el resumen de caja del vendedor.
+        
+        Un día con la caja del vendedor cerrada ya no admite ventas ni
+        anulaciones: el cierre copió el resumen y no se volvería a conciliar.
+        El cierre se busca después del upsert, con la fila del resumen ya
+        bloqueada: un cierre simultáneo (que bloquea la misma fila) o bien
+        termina antes y se ve aquí, o bien espera y copia este movimiento.
+        
+        Args:
+            movimientos: Tuplas (fecha de la venta, usuario_id, total, unidades)
+            signo: 1 al crear ventas, -1 al anularlas
+            
+        Raises:
+            BusinessLogicError: Si la caja de algún día y vendedor está cerrada (409)
+        """
+        acumulado = defaultdict(lambda: [0, Decimal('0'), 0, 0, Decimal('0')])
+        for fecha, usuario_id, total, items in movimientos:
+            fila = acumulado[(_como_fecha(fecha), usuario_id)]
+            fila[0] += signo
+            fila[1] += Decimal(str(total)) * signo
+            fila[2] += int(items) * signo
+            if signo < 0:
+                fila[3] += 1
+                fila[4] += Decimal(str(total))
+        if not acumulado:
+            return
+        
+        filas = [
+            {'fecha': dia, 'usuario_id': usuario_id,
+             'cantidad_ventas': cantidad, 'total': total, 'items': items,
+             'anulaciones': anulaciones, 'total_anulado': total_anulado}
+            for (dia, usuario_id), (cantidad, total, items, anulaciones, total_anulado)
+            in acumulado.items()
+        ]
+        _sumar_filas(cls.model.__table__, filas, ('fecha', 'usuario_id'),
+                     ('cantidad_ventas', 'total', 'items', 'anulaciones', 'total_anulado'))
+        cerrado = db.session.execute(
+            select(CierreCaja.fecha)
+            .where(or_(*(and_(CierreCaja.fecha == dia, CierreCaja.usuario_id == usuario_id)
+                         for dia, usuario_id in acumulado)))
+            .order_by(CierreCaja.fecha)
+            .limit(1)
+            .with_for_update()
+        ).scalar()
+        if cerrado is not None:
+            raise BusinessLogicError(f"La caja del {cerrado.isoformat()} ya está cerrada", 409)
+        change_tracker.marcar(db.session, cls.model.__tablename__)
+    
+    @classmethod
+    def reconstruir(cls, desde: Optional[date] = None, hasta: Optional[date] = None) -> int:
+        """
+        Recalcula el resumen desde ventas y detalle_venta y confirma
+        
+        Borra las filas del rango y las vuelve a generar con un único
+        INSERT ... SELECT agrupado. Sin rango reconstruye todo el historial.
+        Las anulaciones no se pueden recalcular (las ventas anuladas se
+        borran), así que se conservan las registradas.
+        
+        Args:
+            desde: Primer día a reconstruir (opcional)
+            hasta: Último día a reconstruir, inclusive (opcional)
+            
+        Returns:
+            Cantidad de filas (día, usuario) generadas
+        """
+        try:
+            tabla = cls.model.__table__
+            anuladas = [
+                {'fecha': fila.fecha, 'usuario_id': fila.usuario_id,
+                 'cantidad_ventas': 0, 'total': 0, 'items': 0,
+                 'anulaciones': fila.anulaciones, 'total_anulado': fila.total_anulado}
+                for fila in _dias_en_rango(db.session.query(
+                    cls.model.fecha, cls.model.usuario_id,
+                    cls.model.anulaciones, cls.model.total_anulado
+                ), cls.model, desde, hasta).filter(cls.model.anulaciones > 0)
+            ]
+            _borrar_rango(tabla, desde, hasta)
+            
+            unidades = (
+                select(DetalleVenta.venta_id, func.sum(DetalleVenta.cantidad).label('unidades'))
+                .group_by(DetalleVenta.venta_id)
+                .subquery()
+            )
+            dia = func.date(Venta.fecha)
+            origen = _ventas_en_rango(
+                select(
+                    dia,
+                    Venta.usuario_id,
+                    func.count(Venta.id),
+                    func.coalesce(func.sum(Venta.total), 0),
+                    func.coalesce(func.sum(unidades.c.unidades), 0)
+                )
+                .select_from(Venta)
+                .outerjoin(unidades, unidades.c.venta_id == Venta.id)
+                .where(Venta.fecha.isnot(None))
+                .group_by(dia, Venta.usuario_id),
+                desde, hasta
+            )
+            
+            db.session.execute(insert(tabla).from_select(
+                ['fecha', 'usuario_id', 'cantidad_ventas', 'total', 'items'], origen
+            ))
+            if anuladas:
+                _sumar_filas(tabla, anuladas, ('fecha', 'usuario_id'),
+                             ('anulaciones', 'total_anulado'))
+            change_tracker.marcar(db.session, cls.model.__tablename__)
+            db.session.commit()
+            # La serie de ventas guardada pudo calcularse con el resumen anterior
+            serie_ventas_cache.invalidar_todo()
+            
+            return _dias_en_rango(cls.model.query, cls.model, desde, hasta).count()
+        except Exception as e:
+            db.session.rollback()
+            raise DatabaseError(f"Error al reconstruir resumen diario de ventas: {str(e)}")
+    
+    @classmethod
+    def get_dia(cls, fecha: date, usuario_id: int) -> Optional[VentaDiaria]:
+        """
+        Resumen de un usuario en un día (una fila por la clave única)
+        
+        Args:
+            fecha: Día
+            usuario_id: ID del usuario
+            
+        Returns:
+            Fila del resumen o None si el usuario no vendió ese día
+        """
+        try:
+            return cls.model.query.filter_by(fecha=fecha, usuario_id=usuario_id).first()
+        except Exception as e:
+            raise DatabaseError(f"Error al obtener resumen del día: {str(e)}")
+    
+    @classmethod
+    def resumen_por_dia(cls, desde: Optional[date] = None,
+                        hasta: Optional[date] = None) -> List[Dict]:
+        """
+        Totales por día del rango, sumando todos los usuarios
+        
+        Args:
+            desde: Primer día (opcional)
+            hasta: Último día, inclusive (opcional)
+            
+        Returns:
+            Lista de {fecha, cantidad, total, items} ordenada por fecha
+        """
+        try:
+            consulta = _dias_en_rango(db.session.query(
+                cls.model.fecha,
+                func.sum(cls.model.cantidad_ventas).label('cantidad'),
+                func.sum(cls.model.total).label('total'),
+                func.sum(cls.model.items).label('items')
+            ), cls.model, desde, hasta).group_by(cls.model.fecha).having(
+                func.sum(cls.model.cantidad_ventas) > 0
+            ).order_by(cls.model.fecha)
+            return [{
+                'fecha': fila.fecha,
+                'cantidad': int(fila.cantidad or 0),
+                'total': float(fila.total or 0),
+                'items': int(fila.items or 0)
+            } for fila in consulta.all()]
+        except Exception as e:
+            raise DatabaseError(f"Error al obtener ventas por día: {str(e)}")
+    
+    @classmethod
+    def totales(cls, desde: Optional[date] = None, hasta: Optional[date] = None) -> Dict:
+        """
+        Totales del rango
+        
+        Args:
+            desde: Primer día (opcional)
+            hasta: Último día, inclusive (opcional)
+            
+        Returns:
+            Diccionario con total, cantidad e items
+        """
+        try:
+            fila = _dias_en_rango(db.session.query(
+                func.sum(cls.model.total).label('total'),
+                func.sum(cls.model.cantidad_ventas).label('cantidad'),
+                func.sum(cls.model.items).label('items')
+            ), cls.model, desde, hasta).one()
+            return {
+                'total': float(fila.total or 0),
+                'cantidad': int(fila.cantidad or 0),
+                'items': int(fila.items or 0)
+            }
+        except Exception as e:
+            raise DatabaseError(f"Error al obtener totales de ventas: {str(e)}")
+
+
+
+class ProductoVentaDiariaRepository(BaseRepository, IProductoVentaDiariaRepository):
+    """Implementación del repositorio de ventas por día y producto"""
+    
+    model = ProductoVentaDiaria
+    
+    @classmethod
+    def acumular(cls, movimientos: Iterable[MovimientoProducto], signo: int = 1) -> None:
+        """
+        Suma líneas de venta a los contadores por producto (o las resta con
+        signo=-1, al anular), dentro de la transacción del llamador
+        
+        Args:
+            movimientos: Tuplas (fecha de la venta, producto_id, unidades, subtotal)
+            signo: 1 al crear ventas, -1 al anularlas
+        """
+        acumulado = defaultdict(lambda: [0, Decimal('0')])
+        for fecha, producto_id, cantidad, subtotal in movimientos:
+            fila = acumulado[(_como_fecha(fecha), producto_id)]
+            fila[0] += int(cantidad) * signo
+            fila[1] += Decimal(str(subtotal)) * signo
+        if not acumulado:
+            return
+        
+        filas = [
+            {'fecha': dia, 'producto_id': producto_id, 'cantidad': cantidad, 'ingresos': ingresos}
+            for (dia, producto_id), (cantidad, ingresos) in acumulado.items()
+        ]
+        _sumar_filas(cls.model.__table__, filas, ('fecha', 'producto_id'), ('cantidad', 'ingresos'))
+        change_tracker.marcar(db.session, cls.model.__tablename__)
+    
+    @classmethod
+    def reconstruir(cls, desde: Optional[date] = None, hasta: Optional[date] = None) -> int:
+        """
+        Recalcula los contadores desde ventas y detalle_venta y confirma
+        
+        Args:
+            desde: Primer día a reconstruir (opcional)
+            hasta: Último día a reconstruir, inclusive (opcional)
+            
+        Returns:
+            Cantidad de filas (día, producto) generadas
+        """
+        try:
+            tabla = cls.model.__table__
+            _borrar_rango(tabla, desde, hasta)
+            
+            dia = func.date(Venta.fecha)
+            origen = _ventas_en_rango(
+                select(
+                    dia,
+                    DetalleVenta.producto_id,
+                    func.sum(DetalleVenta.cantidad),
+                    func.sum(DetalleVenta.subtotal)
+                )
+                .select_from(DetalleVenta)
+                .join(Venta, Venta.id == DetalleVenta.venta_id)
+                .where(Venta.fecha.isnot(None))
+                .group_by(dia, DetalleVenta.producto_id),
+                desde, hasta
+            )
+            db.session.execute(insert(tabla).from_select(
+                ['fecha', 'producto_id', 'cantidad', 'ingresos'], origen
+            ))
+            change_tracker.marcar(db.session, cls.model.__tablename__)
+            db.session.commit()
+            
+            return _dias_en_rango(cls.model.query, cls.model, desde, hasta).count()
+        except Exception as e:
+            db.session.rollback()
+            raise DatabaseError(f"Error al reconstruir ventas por producto: {str(e)}")
+    
+    @classmethod
+    def top_productos(cls, limite: int, desde: Optional[date] = None,
+                      hasta: Optional[date] = None) -> List[Dict]:
+        """
+        Productos con más unidades vendidas en el rango
+        
+        La base suma los contadores diarios de la ventana por producto
+        (SUM ... GROUP BY sobre productos_ventas_diarias, sin tocar
+        detalle_venta): a Python llega una fila por producto vendido y un
+        heap de tamaño `limite` elige los primeros. Los empates se ordenan
+        por ingresos y luego por id. Los datos del producto se leen solo
+        para el top.
+        
+        Args:
+            limite: Cantidad de productos a devolver
+            desde: Primer día de la ventana (opcional)
+            hasta: Último día de la ventana, inclusive (opcional)
+            
+        Returns:
+            Lista de {id, nombre, stock, total_vendido, ingresos}
+        """
+        try:
+            unidades = func.sum(cls.model.cantidad)
+            consulta = _dias_en_rango(db.session.query(
+                cls.model.producto_id, unidades, func.sum(cls.model.ingresos)
+            ), cls.model, desde, hasta).group_by(cls.model.producto_id).having(unidades > 0)
+            
+            top = heapq.nlargest(
+                max(limite, 0),
+                ((producto_id, cantidad, Decimal(ingresos or 0))
+                 for producto_id, cantidad, ingresos in consulta),
+                key=lambda fila: (fila[1], fila[2], -fila[0])
+            )
+            if not top:
+                return []
+            
+            productos = {p.id: p for p in db.session.query(
+                Producto.id, Producto.nombre, Producto.stock
+            ).filter(Producto.id.in_([producto_id for producto_id, _, _ in top]))}
+            return [{
+                'id': producto_id,
+                'nombre': productos[producto_id].nombre if producto_id in productos else None,
+                'stock': productos[producto_id].stock if producto_id in productos else None,
+                'total_vendido': int(cantidad),
+                'ingresos': float(ingresos)
+            } for producto_id, cantidad, ingresos in top]
+        except Exception as e:
+            raise DatabaseError(f"Error al obtener productos más vendidos: {str(e)}")
+
+
+class ClienteResumenRepository(BaseRepository, IClienteResumenRepository):
+    """Implementación del repositorio del resumen de compras por cliente"""
+    
+    model = ClienteResumen
+    
+    @classmethod
+    def acumular(cls, movimientos: Iterable[MovimientoCliente], signo: int = 1) -> None:
+        """
+        Suma ventas al resumen de sus clientes (o las resta con signo=-1)
+        
+        Igual que los resúmenes diarios, escribe dentro de la transacción
+        del llamador con un único upsert; las ventas sin documento se
+        ignoran. Al anular, la última compra se recalcula desde las ventas
+        que quedan (por el índice cliente_documento, fecha), así que debe
+        llamarse después de borrar las ventas anuladas.
+        
+        Args:
+            movimientos: Tuplas (cliente_documento, fecha de la venta, total)
+            signo: 1 al crear ventas, -1 al anularlas
+        """
+        acumulado = defaultdict(lambda: [0, Decimal('0'), None])
+        for documento, fecha, total in movimientos:
+            if not documento:
+                continue
+            fila = acumulado[documento]
+            fila[0] += signo
+            fila[1] += Decimal(str(total)) * signo
+            if signo > 0 and fecha is not None and (fila[2] is None or fecha > fila[2]):
+                fila[2] = fecha
+        if not acumulado:
+            return
+        
+        tabla = cls.model.__table__
+        filas = [
+            {'cliente_documento': documento, 'cantidad_ventas': cantidad,
+             'total': total, 'ultima_compra': ultima}
+            for documento, (cantidad, total, ultima) in acumulado.items()
+        ]
+        if signo > 0:
+            _sumar_filas(tabla, filas, ('cliente_documento',), ('cantidad_ventas', 'total'),
+                         maximas=('ultima_compra',))
+        else:
+            _sumar_filas(tabla, filas, ('cliente_documento',), ('cantidad_ventas', 'total'))
+            db.session.execute(
+                update(tabla)
+                .where(tabla.c.cliente_documento.in_(list(acumulado)))
+                .values(ultima_compra=(
+                    select(func.max(Venta.fecha))
+                    .where(Venta.cliente_documento == tabla.c.cliente_documento)
+                    .scalar_subquery()
+                ))
+            )
+        change_tracker.marcar(db.session, cls.model.__tablename__)
+    
+    @classmethod
+    def reconstruir(cls) -> int:
+        """
+        Recalcula el resumen de todos los clientes desde ventas y confirma
+        
+        Returns:
+            Cantidad de clientes en el resumen
+        """
+        try:
+            tabla = cls.model.__table__
+            db.session.execute(delete(tabla))
+            origen = (
+                select(
+                    Venta.cliente_documento,
+                    func.count(Venta.id),
+                    func.coalesce(func.sum(Venta.total), 0),
+                    func.max(Venta.fecha)
+                )
+                .where(Venta.cliente_documento.isnot(None), Venta.cliente_documento != '')
+                .group_by(Venta.cliente_documento)
+            )
+            db.session.execute(insert(tabla).from_select(
+                ['cliente_documento', 'cantidad_ventas', 'total', 'ultima_compra'], origen
+            ))
+            change_tracker.marcar(db.session, cls.model.__tablename__)
+            db.session.commit()
+            
+            return cls.model.query.count()
+        except Exception as e:
+            db.session.rollback()
+            raise DatabaseError(f"Error al reconstruir resumen de clientes: {str(e)}")
+    
+    @classmethod
+    def get_by_documento(cls, cliente_documento: str) -> Optional[ClienteResumen]:
+        """
+        Obtiene el resumen de un cliente
+        
+        Args:
+            cliente_documento: Documento del cliente
+            
+        Returns:
+            Resumen del cliente o None si no tiene ventas
+        """
+        try:
+            return cls.model.query.filter(
+                cls.model.cliente_documento == cliente_documento,
+                cls.model.cantidad_ventas > 0
+            ).first()
+        except Exception as e:
+            raise DatabaseError(f"Error al obtener resumen del cliente: {str(e)}")
@@ -3,12 +3,18 @@ Paquete de utilidades
 """
 from .auth import JWTManager, token_required, rol_requerido
 from .helpers import create_response, handle_error, paginate_query
+from .http_cache import conditional_get
+from .idempotencia import idempotente
 from .logger import setup_logger, log_request, log_business_operation, log_error
 from .pagination import (
     PaginatedResponse, 
+    CursorPaginatedResponse,
     paginate_query as paginate_db_query,
     paginate_list, 
-    get_pagination_params
+    get_pagination_params,
+    get_cursor_params,
+    encode_cursor,
+    decode_cursor
 )
 
 __all__ = [
@@ -17,6 +23,8 @@ __all__ = [
     'rol_requerido',
     'create_response',
     'handle_error',
+    'conditional_get',
+    'idempotente',
     'paginate_query',
     'setup_logger',
     'log_request',
@@ -25,5 +33,9 @@ __all__ = [
     'PaginatedResponse',
     'paginate_db_query',
     'paginate_list',
-    'get_pagination_params'
+    'get_pagination_params',
+    'CursorPaginatedResponse',
+    'get_cursor_params',
+    'encode_cursor',
+    'decode_cursor'
 ]
\ No newline at end of file
@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 from functools import wraps
 import jwt
 from flask import request, jsonify, current_app
-from app.exceptions import UnauthorizedError, ForbiddenError
+from app.exceptions import UnauthorizedError
 
 class JWTManager:
     """Gestor de tokens JWT"""
@@ -74,8 +74,9 @@ def rol_requerido(*roles):
     def decorator(f):
         @wraps(f)
         def decorated_function(current_user, *args, **kwargs):
-            if current_user['rol'] not in roles:
-                raise ForbiddenError('Acceso no autorizado para este rol')
+            # current_user es el modelo Usuario que inyecta token_required
+            if getattr(current_user, 'rol', None) not in roles:
+                return jsonify({'message': 'Acceso no autorizado para este rol'}), 403
             return f(current_user, *args, **kwargs)
         return decorated_function
     return decorator
\ No newline at end of file
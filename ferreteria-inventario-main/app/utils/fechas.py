@@ -0,0 +1,20 @@
+"""
+Reloj de las ventas
+
+Las ventas se fechan con la hora local del servidor de la aplicación, sin
+zona horaria (ventas.fecha es DATETIME), y con el mismo reloj se calcula
+"hoy" o "ahora" al consultar los resúmenes (ventas_diarias,
+productos_ventas_diarias, clientes_resumen). Así el día con el que se
+acumula una venta es el mismo con el que después se la busca.
+"""
+from datetime import date, datetime
+
+
+def ahora() -> datetime:
+    """Fecha y hora local actual, sin zona horaria"""
+    return datetime.now()
+
+
+def hoy() -> date:
+    """Fecha local actual"""
+    return ahora().date()
@@ -0,0 +1,73 @@
+"""
+Sparse fieldsets para endpoints de listado
+Permite pedir solo las columnas necesarias: ?fields=id,nombre,precio,stock
+
+Con `fields` la consulta selecciona únicamente esas columnas (sin
+hidratar entidades ni cargar relaciones) y la respuesta contiene solo
+esas claves.
+"""
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Campos que siempre se incluyen (los clientes los usan como clave)
+CAMPOS_OBLIGATORIOS = ('id',)
+
+
+def campos_de_modelo(model) -> Tuple[str, ...]:
+    """Columnas propias del modelo que pueden pedirse en `fields`"""
+    return tuple(column.name for column in model.__table__.columns)
+
+
+def parse_fields(valor: Optional[str], permitidos: Iterable[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Interpreta el parámetro `fields`
+
+    Args:
+        valor: Texto del query param (p. ej. "id,nombre,precio")
+        permitidos: Campos que el endpoint acepta
+
+    Returns:
+        Tupla de campos (en el orden pedido, con `id` siempre incluido),
+        o None si no se pidió proyección
+
+    Raises:
+        ValueError: Si se piden campos desconocidos
+    """
+    if valor is None or not valor.strip():
+        return None
+
+    permitidos = set(permitidos)
+    campos = []
+    for campo in (c.strip() for c in valor.split(',')):
+        if campo and campo not in campos:
+            campos.append(campo)
+
+    desconocidos = [c for c in campos if c not in permitidos]
+    if desconocidos:
+        raise ValueError(
+            f"Campos no válidos en 'fields': {', '.join(desconocidos)}. "
+            f"Permitidos: {', '.join(sorted(permitidos))}"
+        )
+
+    faltantes = [c for c in CAMPOS_OBLIGATORIOS if c not in campos]
+    return tuple(faltantes + campos)
+
+
+def get_fields_param(request, permitidos: Iterable[str]) -> Optional[Tuple[str, ...]]:
+    """Obtener y validar `fields` desde el request"""
+    return parse_fields(request.args.get('fields'), permitidos)
+
+
+def serializar_valor(value: Any) -> Any:
+    """Convierte un valor de columna a JSON (fechas a ISO, Decimal a float)"""
+    if value is None:
+        return None
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if hasattr(value, '__float__') and not isinstance(value, (bool, int)):
+        return float(value)
+    return value
+
+
+def proyectar(fila, campos: Tuple[str, ...]) -> Dict[str, Any]:
+    """Diccionario con solo los campos pedidos de una fila o registro"""
+    return {campo: serializar_valor(getattr(fila, campo)) for campo in campos}
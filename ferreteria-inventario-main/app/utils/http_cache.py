@@ -0,0 +1,108 @@
+"""
+GET condicional (ETag / Last-Modified)
+Evita reenviar datos que el cliente ya tiene
+
+El ETag se deriva de la versión de las tablas de las que depende la
+respuesta (ver app/infrastructure/cache/change_tracker.py) y de la URL
+con sus parámetros. Si el cliente envía If-None-Match o
+If-Modified-Since y nada cambió, se responde 304 sin ejecutar la vista:
+no hay consulta ni serialización.
+
+Uso:
+    @producto_bp.route('', methods=['GET'])
+    @token_required
+    @conditional_get('productos', 'categorias')
+    def get_productos(current_user):
+        ...
+"""
+import hashlib
+import math
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Tuple
+
+from flask import make_response, request
+
+# Los clientes pueden guardar la respuesta pero deben revalidarla siempre
+CACHE_CONTROL = 'private, no-cache'
+
+
+def calcular_etag(tablas: Tuple[str, ...]) -> str:
+    """ETag fuerte a partir de las versiones de las tablas y de la URL pedida"""
+    from app.infrastructure.cache.change_tracker import change_tracker
+
+    versiones = ','.join(f'{tabla}={change_tracker.version(tabla)}' for tabla in tablas)
+    parametros = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+    firma = f'{request.path}?{parametros}|{versiones}'
+    return hashlib.sha1(firma.encode('utf-8')).hexdigest()
+
+
+def calcular_last_modified(tablas: Tuple[str, ...]) -> datetime:
+    """
+    Último commit sobre cualquiera de las tablas, redondeado hacia arriba al
+    segundo (resolución de HTTP): truncar haría que un commit en la misma
+    fracción de segundo pareciera anterior a la copia del cliente
+    """
+    from app.infrastructure.cache.change_tracker import change_tracker
+
+    ultima = max(change_tracker.ultima_modificacion(tabla) for tabla in tablas)
+    return datetime.fromtimestamp(math.ceil(ultima), tz=timezone.utc)
+
+
+def last_modified_enviable(last_modified: datetime) -> datetime:
+    """
+    Valor del header Last-Modified para una respuesta generada ahora.
+
+    Nunca posterior al segundo en curso: un commit posterior a la respuesta
+    pero dentro del mismo segundo tendría el mismo Last-Modified y el
+    cliente recibiría un 304 con datos viejos. Con un valor anterior, el
+    cliente solo revalida una vez más.
+    """
+    ahora = datetime.fromtimestamp(math.floor(time.time()), tz=timezone.utc)
+    return min(last_modified, ahora)
+
+
+def es_no_modificado(etag: str, last_modified: datetime) -> bool:
+    """
+    Evalúa las precondiciones del request (RFC 9110 §13.2.2):
+    si hay If-None-Match se ignora If-Modified-Since
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def conditional_get(*tablas: str):
+    """
+    Decorador que agrega ETag y Last-Modified a una vista GET y responde
+    304 Not Modified cuando el cliente ya tiene la versión vigente
+
+    Args:
+        tablas: Tablas de las que depende la respuesta
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return f(*args, **kwargs)
+
+            etag = calcular_etag(tablas)
+            last_modified = calcular_last_modified(tablas)
+
+            if es_no_modificado(etag, last_modified):
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.last_modified = last_modified_enviable(last_modified)
+            response.headers['Cache-Control'] = CACHE_CONTROL
+            return response
+
+        return decorated
+    return decorator
@@ -0,0 +1,92 @@
+"""
+Idempotency-Key para creaciones (POST)
+Evita registrar dos veces la misma venta o compra cuando el cliente reintenta
+
+Si la petición trae el header Idempotency-Key, la primera ejecución
+reserva la clave y guarda su respuesta; los reintentos con la misma clave
+reciben esa respuesta (con el header Idempotent-Replayed) sin ejecutar la
+vista, es decir, sin validar ni bloquear productos otra vez. Un duplicado
+que llega mientras la original se ejecuta espera a que termine.
+
+Las respuestas 5xx no se guardan: la clave se libera y el reintento se
+ejecuta de nuevo. Reutilizar la clave con otro cuerpo u otra ruta
+devuelve 422.
+
+Uso (debajo de token_required, que inyecta current_user):
+    @venta_bp.route('', methods=['POST'])
+    @token_required
+    @idempotente
+    def create_venta(current_user):
+        ...
+"""
+import hashlib
+import time
+from functools import wraps
+
+from flask import current_app, jsonify, make_response, request
+
+HEADER = 'Idempotency-Key'
+HEADER_REPETIDA = 'Idempotent-Replayed'
+LONGITUD_MAXIMA = 100
+
+
+def _error(mensaje: str, status_code: int):
+    return jsonify({'status': 'error', 'message': mensaje}), status_code
+
+
+def _repetir(fila: dict):
+    """Reconstruye la respuesta guardada"""
+    response = make_response(fila['respuesta'], fila['status_code'])
+    if fila['content_type']:
+        response.mimetype = fila['content_type']
+    response.headers[HEADER_REPETIDA] = 'true'
+    return response
+
+
+def idempotente(f):
+    """Decorador que aplica Idempotency-Key a una vista POST autenticada"""
+    @wraps(f)
+    def decorated(current_user, *args, **kwargs):
+        from app.infrastructure.cache import idempotency_store
+
+        clave = (request.headers.get(HEADER) or '').strip()
+        if not clave:
+            return f(current_user, *args, **kwargs)
+        if len(clave) > LONGITUD_MAXIMA:
+            return _error(f'{HEADER} admite hasta {LONGITUD_MAXIMA} caracteres', 400)
+
+        huella = hashlib.sha256(request.get_data()).hexdigest()
+        ttl = current_app.config.get('IDEMPOTENCY_TTL', 86400)
+        limite = time.monotonic() + current_app.config.get('IDEMPOTENCY_WAIT', 10)
+
+        while True:
+            reserva, fila = idempotency_store.reservar(current_user.id, clave, request.path,
+                                                       huella, ttl)
+            if reserva is not None:
+                break
+            if fila is None:
+                return _error('La petición con esta clave está en curso, reintente', 409)
+            if fila['ruta'] != request.path or fila['huella'] != huella:
+                return _error(f'{HEADER} ya fue usada con otra petición', 422)
+            if fila['estado'] != 'completada':
+                fila = idempotency_store.esperar(fila['id'], limite - time.monotonic())
+            if fila is not None and fila['estado'] == 'completada':
+                return _repetir(fila)
+            if fila is not None or time.monotonic() >= limite:
+                return _error('La petición con esta clave está en curso, reintente', 409)
+            # La petición original falló y liberó la clave: se intenta ejecutar
+
+        try:
+            response = make_response(f(current_user, *args, **kwargs))
+        except Exception:
+            idempotency_store.liberar(reserva)
+            raise
+
+        if response.status_code >= 500 or response.is_streamed:
+            idempotency_store.liberar(reserva)
+        else:
+            idempotency_store.completar(reserva, response.status_code, response.mimetype,
+                                        response.get_data(as_text=True))
+        return response
+
+    return decorated
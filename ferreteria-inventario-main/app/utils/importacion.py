@@ -0,0 +1,94 @@
+"""
+Utilidades para importación de datos
+Lectura incremental (streaming) de archivos CSV y NDJSON
+"""
+import io
+import csv
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+FORMATOS_IMPORTACION = ('csv', 'ndjson')
+
+# (número de fila, datos o None, error o None)
+FilaImportacion = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def detectar_formato(formato: Optional[str] = None, content_type: Optional[str] = None,
+                     filename: Optional[str] = None) -> str:
+    """
+    Determina el formato del archivo a importar
+
+    Prioridad: parámetro explícito, extensión del archivo, content type.
+    Por defecto CSV.
+    """
+    if formato:
+        formato = formato.lower()
+        if formato not in FORMATOS_IMPORTACION:
+            raise ValueError(f"Formato no soportado: {formato}. Use csv o ndjson")
+        return formato
+    if filename:
+        nombre = filename.lower()
+        if nombre.endswith(('.ndjson', '.jsonl')):
+            return 'ndjson'
+        if nombre.endswith('.csv'):
+            return 'csv'
+    if content_type and ('ndjson' in content_type or 'jsonlines' in content_type):
+        return 'ndjson'
+    return 'csv'
+
+
+def iter_filas(stream, formato: str = 'csv', encoding: str = 'utf-8-sig') -> Iterator[FilaImportacion]:
+    """
+    Lee un archivo fila por fila sin cargarlo completo en memoria
+
+    Args:
+        stream: Archivo binario o de texto (p. ej. request.stream)
+        formato: 'csv' (con encabezados) o 'ndjson' (un objeto JSON por línea)
+        encoding: Codificación si el stream es binario
+
+    Yields:
+        (número de fila, diccionario con los datos, error de lectura)
+    """
+    if isinstance(stream, io.TextIOBase):
+        texto = stream
+    else:
+        texto = io.TextIOWrapper(stream, encoding=encoding, newline='')
+
+    if formato == 'ndjson':
+        for numero, linea in enumerate(texto, start=1):
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                datos = json.loads(linea)
+            except json.JSONDecodeError as e:
+                yield numero, None, f"JSON inválido: {e.msg}"
+                continue
+            if not isinstance(datos, dict):
+                yield numero, None, "Cada línea debe ser un objeto JSON"
+                continue
+            yield numero, datos, None
+        return
+
+    lector = csv.DictReader(texto)
+    for datos in lector:
+        # La fila 1 es el encabezado
+        numero = lector.line_num
+        if not any((v or '').strip() for v in datos.values() if isinstance(v, str)):
+            continue
+        datos = {
+            (k or '').strip().lower(): (v.strip() if isinstance(v, str) else v)
+            for k, v in datos.items() if k is not None
+        }
+        yield numero, datos, None
+
+
+def en_lotes(iterable: Iterable, tamano: int) -> Iterator[List]:
+    """Agrupa un iterable en listas de `tamano` elementos"""
+    iterador = iter(iterable)
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield lote
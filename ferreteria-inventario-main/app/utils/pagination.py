@@ -2,7 +2,10 @@
 Sistema de Paginación para APIs
 Maneja grandes volúmenes de datos dividiéndolos en páginas
 """
-from typing import List, Dict, Any, TypeVar, Generic
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
 from math import ceil
 
 T = TypeVar('T')
@@ -71,6 +74,146 @@ class PaginatedResponse(Generic[T]):
         }
 
 
+class CursorPaginatedResponse(Generic[T]):
+    """
+    Respuesta paginada por cursor (keyset)
+    No usa OFFSET: cada página continúa desde el último ID entregado
+    """
+    
+    def __init__(
+        self,
+        items: List[T],
+        limit: int,
+        next_cursor: Optional[str] = None,
+        total_items: Optional[int] = None
+    ):
+        """
+        Args:
+            items: Lista de items de la página actual
+            limit: Cantidad máxima de items por página
+            next_cursor: Cursor opaco para la siguiente página (None si es la última)
+            total_items: Total de items (opcional, solo si se solicitó)
+        """
+        self.items = items
+        self.limit = limit
+        self.next_cursor = next_cursor
+        self.total_items = total_items
+        self.has_next = next_cursor is not None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convierte la respuesta a diccionario para JSON
+        
+        Returns:
+            {
+                "items": [...],
+                "pagination": {
+                    "limit": 20,
+                    "next_cursor": "eyJpZCI6IDIwfQ",
+                    "has_next": true,
+                    "total_items": null
+                }
+            }
+        """
+        return {
+            "items": self.items,
+            "pagination": {
+                "limit": self.limit,
+                "next_cursor": self.next_cursor,
+                "has_next": self.has_next,
+                "total_items": self.total_items
+            }
+        }
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Codifica el último ID entregado como cursor opaco
+    
+    Args:
+        last_id: ID del último item de la página
+    
+    Returns:
+        Cursor en base64 url-safe (sin relleno)
+    """
+    raw = json.dumps({'id': last_id}).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """
+    Decodifica un cursor generado por encode_cursor
+    
+    Args:
+        cursor: Cursor opaco recibido del cliente (vacío = primera página)
+    
+    Returns:
+        Último ID entregado, o None si es la primera página
+    
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    if not cursor:
+        return None
+    
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        last_id = int(data['id'])
+    except (ValueError, TypeError, KeyError, UnicodeError):
+        raise ValueError("Cursor de paginación inválido")
+    
+    if last_id < 0:
+        raise ValueError("Cursor de paginación inválido")
+    return last_id
+
+
+def encode_fecha_cursor(fecha: datetime, last_id: int) -> str:
+    """
+    Codifica la clave (fecha, id) del último item entregado como cursor opaco
+    
+    Para listados ordenados por fecha, donde el ID solo desempata.
+    
+    Args:
+        fecha: Fecha del último item de la página
+        last_id: ID del último item de la página
+    
+    Returns:
+        Cursor en base64 url-safe (sin relleno)
+    """
+    raw = json.dumps({'fecha': fecha.isoformat(), 'id': last_id}).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_fecha_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """
+    Decodifica un cursor generado por encode_fecha_cursor
+    
+    Args:
+        cursor: Cursor opaco recibido del cliente (vacío = primera página)
+    
+    Returns:
+        (fecha, id) del último item entregado, o None si es la primera página
+    
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    if not cursor:
+        return None
+    
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        fecha = datetime.fromisoformat(data['fecha'])
+        last_id = int(data['id'])
+    except (ValueError, TypeError, KeyError, UnicodeError):
+        raise ValueError("Cursor de paginación inválido")
+    
+    if last_id < 0:
+        raise ValueError("Cursor de paginación inválido")
+    return fecha, last_id
+
+
 def paginate_query(query, page: int = 1, per_page: int = 20, max_per_page: int = 100):
     """
     Pagina una query de SQLAlchemy
@@ -179,3 +322,61 @@ def get_pagination_params(request) -> tuple:
     per_page = max(1, min(per_page, 100))  # Máximo 100 por página
     
     return page, per_page
+
+
+def get_cursor_params(request) -> tuple:
+    """
+    Extrae parámetros de paginación por cursor de un Flask request
+    
+    Args:
+        request: Flask request object
+    
+    Returns:
+        (cursor, limit, include_total)
+    
+    Query params esperados:
+        - cursor: cursor opaco de la página anterior (vacío = primera página)
+        - limit: items por página (default: 20, max: 100)
+        - include_total: 'true'/'1' para calcular el total (costoso, opcional)
+    
+    Example:
+        GET /api/productos?cursor=eyJpZCI6IDIwfQ&limit=50
+        cursor, limit, include_total = get_cursor_params(request)
+    """
+    cursor = request.args.get('cursor', '')
+    
+    try:
+        limit = int(request.args.get('limit', request.args.get('per_page', 20)))
+    except (ValueError, TypeError):
+        limit = 20
+    limit = max(1, min(limit, 100))  # Máximo 100 por página
+    
+    include_total = request.args.get('include_total', 'false').lower() in ('true', '1')
+    
+    return cursor, limit, include_total
+
+
+def iter_json_array(items: Iterable[Any], dumps: Optional[Callable[[Any], str]] = None) -> Iterator[str]:
+    """
+    Escribe una secuencia como arreglo JSON, elemento por elemento
+    
+    Para respuestas en streaming (Response(stream_with_context(...))):
+    solo se mantiene en memoria el elemento que se está serializando.
+    
+    Args:
+        items: Iterable de elementos serializables
+        dumps: Serializador de un elemento (por defecto el proveedor JSON de Flask)
+    
+    Yields:
+        Fragmentos de texto que concatenados forman el arreglo
+    """
+    if dumps is None:
+        from flask import current_app
+        dumps = current_app.json.dumps
+    
+    yield '['
+    separador = ''
+    for item in items:
+        yield separador + dumps(item)
+        separador = ','
+    yield ']'
@@ -0,0 +1,85 @@
+"""
+Intervalos (buckets) de las series de tiempo de ventas
+
+Cada granularidad define cómo se trunca una fecha al inicio de su
+intervalo y cuál es el intervalo siguiente. Las semanas empiezan el lunes.
+"""
+import re
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+GRANULARIDADES = ('hour', 'day', 'week', 'month')
+
+# Rango por defecto de cada granularidad
+RANGO_POR_DEFECTO = {'hour': '24h', 'day': '30d', 'week': '12w', 'month': '12m'}
+
+_RANGO = re.compile(r'^(\d+)([hdwm])$')
+_UNIDAD = {'h': 'hour', 'd': 'day', 'w': 'week', 'm': 'month'}
+
+
+def inicio_bucket(fecha, granularidad: str) -> datetime:
+    """Inicio del intervalo que contiene la fecha"""
+    if not isinstance(fecha, datetime):
+        fecha = datetime.combine(fecha, datetime.min.time())
+    if granularidad == 'hour':
+        return fecha.replace(minute=0, second=0, microsecond=0)
+    dia = fecha.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularidad == 'day':
+        return dia
+    if granularidad == 'week':
+        return dia - timedelta(days=dia.weekday())
+    if granularidad == 'month':
+        return dia.replace(day=1)
+    raise ValueError(f"Granularidad inválida: {granularidad}")
+
+
+def siguiente_bucket(inicio: datetime, granularidad: str, pasos: int = 1) -> datetime:
+    """Inicio del intervalo `pasos` posiciones después (o antes si es negativo)"""
+    if granularidad == 'hour':
+        return inicio + timedelta(hours=pasos)
+    if granularidad == 'day':
+        return inicio + timedelta(days=pasos)
+    if granularidad == 'week':
+        return inicio + timedelta(weeks=pasos)
+    if granularidad == 'month':
+        meses = inicio.year * 12 + inicio.month - 1 + pasos
+        return inicio.replace(year=meses // 12, month=meses % 12 + 1)
+    raise ValueError(f"Granularidad inválida: {granularidad}")
+
+
+def parsear_rango(rango: str) -> Tuple[int, str]:
+    """
+    Interpreta un rango como '24h', '30d', '12w' o '6m'
+
+    Returns:
+        (cantidad, granularidad de la unidad)
+
+    Raises:
+        ValueError: Si el formato no es válido
+    """
+    coincidencia = _RANGO.match((rango or '').strip().lower())
+    if not coincidencia or int(coincidencia.group(1)) <= 0:
+        raise ValueError("El rango debe tener el formato <número><h|d|w|m>, por ejemplo 30d")
+    return int(coincidencia.group(1)), _UNIDAD[coincidencia.group(2)]
+
+
+def buckets_del_rango(ahora: datetime, granularidad: str, rango: str,
+                      maximo: Optional[int] = None) -> List[datetime]:
+    """
+    Inicios de los intervalos que cubren el rango hasta `ahora`, en orden;
+    el último es el intervalo en curso (abierto)
+
+    Raises:
+        ValueError: Si el rango es inválido o genera más de `maximo` intervalos
+    """
+    cantidad, unidad = parsear_rango(rango)
+    desde = siguiente_bucket(inicio_bucket(ahora, unidad), unidad, -(cantidad - 1))
+    actual = inicio_bucket(desde, granularidad)
+    final = inicio_bucket(ahora, granularidad)
+    buckets = []
+    while actual <= final:
+        if maximo is not None and len(buckets) >= maximo:
+            raise ValueError(f"El rango genera más de {maximo} intervalos, use una granularidad mayor")
+        buckets.append(actual)
+        actual = siguiente_bucket(actual, granularidad)
+    return buckets
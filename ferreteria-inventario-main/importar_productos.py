@@ -0,0 +1,73 @@
+"""
+Script para importar productos en lote desde un archivo CSV o NDJSON
+Pensado para listas de precios de proveedores (decenas de miles de filas)
+
+Uso:
+    python importar_productos.py lista_precios.csv
+    python importar_productos.py lista.ndjson --batch-size 1000 --no-actualizar
+    python importar_productos.py lista.csv --errores errores.json
+"""
+import sys
+import os
+import json
+import argparse
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import create_app
+from app.infrastructure.di import get_container
+from app.utils.importacion import detectar_formato, iter_filas
+
+
+def importar(ruta, formato=None, batch_size=None, actualizar=True, ruta_errores=None):
+    app = create_app()
+    with app.app_context():
+        formato = detectar_formato(formato, filename=ruta)
+        batch_size = batch_size or app.config.get('IMPORT_BATCH_SIZE', 500)
+        use_case = get_container().resolve('import_productos_use_case')
+
+        print(f"📥 Importando {ruta} ({formato}, lotes de {batch_size})...")
+        with open(ruta, 'rb') as archivo:
+            for evento in use_case.iter_progreso(
+                iter_filas(archivo, formato),
+                batch_size=batch_size,
+                actualizar_existentes=actualizar
+            ):
+                if evento['tipo'] == 'progreso':
+                    print(f"   {evento['procesadas']} filas "
+                          f"({evento['insertadas']} nuevas, {evento['actualizadas']} actualizadas, "
+                          f"{evento['con_errores']} con errores)")
+                else:
+                    resumen = evento
+
+        print("✅ Importación finalizada")
+        print(f"   Insertados:   {resumen['insertadas']}")
+        print(f"   Actualizados: {resumen['actualizadas']}")
+        print(f"   Con errores:  {resumen['con_errores']}")
+
+        if resumen['errores']:
+            if ruta_errores:
+                with open(ruta_errores, 'w', encoding='utf-8') as salida:
+                    json.dump(resumen['errores'], salida, ensure_ascii=False, indent=2)
+                print(f"📝 Reporte de errores guardado en {ruta_errores}")
+            else:
+                for error in resumen['errores'][:20]:
+                    print(f"   Fila {error['fila']}: {error['errores']}")
+                if len(resumen['errores']) > 20:
+                    print(f"   ... y {len(resumen['errores']) - 20} más (use --errores)")
+
+        return resumen
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Importar productos desde CSV o NDJSON')
+    parser.add_argument('archivo', help='Ruta del archivo a importar')
+    parser.add_argument('--formato', choices=['csv', 'ndjson'], help='Formato (por defecto según extensión)')
+    parser.add_argument('--batch-size', type=int, help='Filas por transacción')
+    parser.add_argument('--no-actualizar', action='store_true',
+                        help='Reportar como error los productos existentes en lugar de actualizarlos')
+    parser.add_argument('--errores', help='Guardar el reporte de errores en un archivo JSON')
+    args = parser.parse_args()
+
+    resumen = importar(args.archivo, args.formato, args.batch_size,
+                       not args.no_actualizar, args.errores)
+    sys.exit(1 if resumen['con_errores'] else 0)
@@ -0,0 +1,33 @@
+-- Cierre de caja por vendedor
+-- Fecha: 2026-10-17
+-- Descripción: ventas_diarias pasa a contar también las anulaciones de cada
+-- vendedor y día (resumen de caja). cierres_caja guarda una copia inmutable
+-- de ese resumen al cerrar la caja. Las anulaciones anteriores a esta
+-- migración no se pueden recuperar (las ventas anuladas se borran).
+
+USE ferreteria_db;
+
+ALTER TABLE ventas_diarias
+    ADD COLUMN anulaciones INT NOT NULL DEFAULT 0,
+    ADD COLUMN total_anulado DECIMAL(14, 2) NOT NULL DEFAULT 0;
+
+CREATE TABLE IF NOT EXISTS cierres_caja (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    fecha DATE NOT NULL,
+    usuario_id INT NOT NULL,
+    cantidad_ventas INT NOT NULL DEFAULT 0,
+    total DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    items INT NOT NULL DEFAULT 0,
+    anulaciones INT NOT NULL DEFAULT 0,
+    total_anulado DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    monto_declarado DECIMAL(14, 2) NULL,
+    observaciones VARCHAR(255) NULL,
+    cerrado_por INT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT uq_cierres_caja_fecha_usuario UNIQUE (fecha, usuario_id),
+    CONSTRAINT fk_cierres_caja_usuario FOREIGN KEY (usuario_id) REFERENCES usuarios(id),
+    CONSTRAINT fk_cierres_caja_cerrado_por FOREIGN KEY (cerrado_por) REFERENCES usuarios(id)
+);
+
+SELECT 'Migración completada exitosamente' AS resultado;
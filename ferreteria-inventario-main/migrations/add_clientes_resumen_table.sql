@@ -0,0 +1,22 @@
+-- Historial y resumen de compras por cliente
+-- Fecha: 2026-10-17
+-- Descripción: Índice para el historial de un cliente (paginado por fecha, id)
+-- y tabla de resumen que mantiene la aplicación al crear y anular ventas.
+-- Después de crear la tabla, cargar el historial con: python reconstruir_agregados.py
+
+USE ferreteria_db;
+
+CREATE INDEX IF NOT EXISTS idx_venta_cliente_fecha ON ventas(cliente_documento, fecha, id);
+
+CREATE TABLE IF NOT EXISTS clientes_resumen (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    cliente_documento VARCHAR(50) NOT NULL,
+    cantidad_ventas INT NOT NULL DEFAULT 0,
+    total DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    ultima_compra DATETIME NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT uq_clientes_resumen_documento UNIQUE (cliente_documento)
+);
+
+SELECT 'Migración completada exitosamente' AS resultado;
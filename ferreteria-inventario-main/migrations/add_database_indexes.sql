@@ -35,6 +35,9 @@ CREATE INDEX IF NOT EXISTS idx_venta_anulada ON ventas(anulada);
 -- Índice compuesto para reportes de ventas por período
 CREATE INDEX IF NOT EXISTS idx_venta_fecha_usuario ON ventas(fecha DESC, usuario_id);
 
+-- Historial de un cliente (filtro por documento, orden y cursor por fecha, id)
+CREATE INDEX IF NOT EXISTS idx_venta_cliente_fecha ON ventas(cliente_documento, fecha, id);
+
 -- Índices para tabla COMPRAS
 -- Mejora ordenamiento por fecha
 CREATE INDEX IF NOT EXISTS idx_compra_fecha ON compras(fecha DESC);
@@ -0,0 +1,31 @@
+-- ================================================
+-- ÍNDICE DE TEXTO COMPLETO PARA BÚSQUEDA DE PRODUCTOS
+-- ================================================
+-- Descripción: Reemplaza la búsqueda `nombre LIKE '%term%'` (que no puede
+-- usar idx_producto_nombre) por un índice FULLTEXT sobre nombre,
+-- descripción y código de barras. ProductoRepository.search_products lo
+-- detecta automáticamente y ordena los resultados por relevancia.
+
+USE ferreteria_db;
+
+-- MySQL / MariaDB (InnoDB)
+ALTER TABLE productos
+ADD FULLTEXT INDEX ft_producto_busqueda (nombre, descripcion, codigo_barras);
+
+-- Permitir búsquedas por prefijo de 2 caracteres (por defecto InnoDB usa 3).
+-- Requiere reiniciar el servidor y reconstruir el índice:
+--   [mysqld] innodb_ft_min_token_size = 2
+--   ALTER TABLE productos DROP INDEX ft_producto_busqueda;
+--   ALTER TABLE productos ADD FULLTEXT INDEX ft_producto_busqueda (nombre, descripcion, codigo_barras);
+
+-- ------------------------------------------------
+-- SQLite (instalaciones de un solo nodo)
+-- ------------------------------------------------
+-- db.create_all() crea la tabla virtual y los triggers automáticamente.
+-- Para una base de datos SQLite existente (crea la tabla FTS5, los triggers
+-- de sincronización e indexa las filas actuales):
+--
+--   from app import create_app, db
+--   from app.infrastructure.search import producto_fulltext
+--   with create_app().app_context(), db.engine.begin() as conn:
+--       producto_fulltext.crear(conn)
@@ -0,0 +1,26 @@
+-- Tabla de claves de idempotencia (header Idempotency-Key)
+-- Fecha: 2026-10-17
+-- Descripción: Guarda la respuesta de POST /api/ventas, /api/ventas/lote y
+-- /api/compras por usuario y clave para que los reintentos de las cajas no
+-- dupliquen ventas ni compras. Las filas vencidas las borra la aplicación.
+
+USE ferreteria_db;
+
+CREATE TABLE IF NOT EXISTS claves_idempotencia (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    usuario_id INT NOT NULL,
+    clave VARCHAR(100) NOT NULL,
+    ruta VARCHAR(200) NOT NULL,
+    huella VARCHAR(64) NOT NULL,
+    estado VARCHAR(20) NOT NULL DEFAULT 'en_proceso',
+    status_code INT NULL,
+    content_type VARCHAR(100) NULL,
+    respuesta MEDIUMTEXT NULL,
+    expira_en DATETIME NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT uq_idempotencia_usuario_clave UNIQUE (usuario_id, clave),
+    INDEX ix_claves_idempotencia_expira_en (expira_en)
+);
+
+SELECT 'Migración completada exitosamente' AS resultado;
@@ -0,0 +1,20 @@
+-- Ventas por día y producto (ranking de productos más vendidos)
+-- Fecha: 2026-10-17
+-- Descripción: Lo mantiene la aplicación al crear y anular ventas. Después de
+-- crear la tabla, cargar el historial con: python reconstruir_agregados.py
+
+USE ferreteria_db;
+
+CREATE TABLE IF NOT EXISTS productos_ventas_diarias (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    fecha DATE NOT NULL,
+    producto_id INT NOT NULL,
+    cantidad INT NOT NULL DEFAULT 0,
+    ingresos DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT uq_productos_ventas_diarias_fecha_producto UNIQUE (fecha, producto_id),
+    CONSTRAINT fk_productos_ventas_diarias_producto FOREIGN KEY (producto_id) REFERENCES productos(id)
+);
+
+SELECT 'Migración completada exitosamente' AS resultado;
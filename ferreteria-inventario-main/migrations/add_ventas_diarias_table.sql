@@ -0,0 +1,21 @@
+-- Resumen diario de ventas por usuario
+-- Fecha: 2026-10-17
+-- Descripción: Lo mantiene la aplicación al crear y anular ventas. Después de
+-- crear la tabla, cargar el historial con: python reconstruir_agregados.py
+
+USE ferreteria_db;
+
+CREATE TABLE IF NOT EXISTS ventas_diarias (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    fecha DATE NOT NULL,
+    usuario_id INT NOT NULL,
+    cantidad_ventas INT NOT NULL DEFAULT 0,
+    total DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    items INT NOT NULL DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT uq_ventas_diarias_fecha_usuario UNIQUE (fecha, usuario_id),
+    CONSTRAINT fk_ventas_diarias_usuario FOREIGN KEY (usuario_id) REFERENCES usuarios(id)
+);
+
+SELECT 'Migración completada exitosamente' AS resultado;
@@ -0,0 +1,103 @@
+"""
+Benchmark del autocompletado por prefijo
+Sistema de Inventario para Ferretería
+
+Construye el índice ordenado con N nombres sintéticos y mide la latencia
+de búsqueda (p50/p95/p99) para prefijos de 1 a 6 caracteres, además del
+costo de una actualización incremental.
+
+Uso:
+    python performance/benchmark_autocomplete.py
+    python performance/benchmark_autocomplete.py --productos 100000 --consultas 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.infrastructure.cache.catalog_snapshot import CatalogSnapshot, ProductoRecord
+from app.infrastructure.search.autocomplete_index import AutocompleteIndex
+
+TIPOS = ['Tornillo', 'Tuerca', 'Arandela', 'Clavo', 'Martillo', 'Llave', 'Destornillador',
+         'Alicate', 'Sierra', 'Taladro', 'Broca', 'Cable', 'Tubo', 'Codo', 'Válvula',
+         'Pintura', 'Brocha', 'Rodillo', 'Cinta', 'Pegamento', 'Manguera', 'Candado']
+ATRIBUTOS = ['galvanizado', 'inoxidable', 'eléctrico', 'de bronce', 'de acero', 'PVC',
+             'hexagonal', 'autorroscante', 'de goma', 'reforzado', 'industrial', 'esmaltado']
+
+
+def generar_snapshot(n: int, semilla: int = 42) -> CatalogSnapshot:
+    rnd = random.Random(semilla)
+    registros = tuple(
+        ProductoRecord(
+            id=i,
+            nombre=f"{rnd.choice(TIPOS)} {rnd.choice(ATRIBUTOS)} {rnd.randint(1, 999)}mm",
+            precio=round(rnd.uniform(0.5, 500), 2),
+            stock=rnd.randint(0, 1000),
+            stock_minimo=5,
+            categoria_id=1,
+            proveedor_id=None,
+            codigo_barras=None,
+            descripcion=None
+        )
+        for i in range(1, n + 1)
+    )
+    return CatalogSnapshot(1, registros, {r.id: r for r in registros})
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del índice de autocompletado')
+    parser.add_argument('--productos', type=int, default=100_000)
+    parser.add_argument('--consultas', type=int, default=20_000)
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"📦 Generando {args.productos} productos...")
+    snapshot = generar_snapshot(args.productos)
+
+    indice = AutocompleteIndex()
+    inicio = time.perf_counter()
+    indice.reconstruir(snapshot)
+    print(f"🏗️  Construcción del índice: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    # Prefijos realistas: inicios de nombres existentes de 1 a 6 caracteres
+    rnd = random.Random(7)
+    prefijos = []
+    for _ in range(args.consultas):
+        nombre = rnd.choice(snapshot.registros).nombre
+        prefijos.append(nombre[:rnd.randint(1, 6)])
+
+    tiempos = []
+    for prefijo in prefijos:
+        t0 = time.perf_counter()
+        ids = indice.buscar(prefijo, args.limit)
+        [snapshot.get(i) for i in ids]
+        tiempos.append((time.perf_counter() - t0) * 1_000_000)
+
+    print(f"🔎 {args.consultas} consultas (top {args.limit}):")
+    print(f"   p50: {percentil(tiempos, 50):.1f} µs")
+    print(f"   p95: {percentil(tiempos, 95):.1f} µs")
+    print(f"   p99: {percentil(tiempos, 99):.1f} µs")
+    print(f"   max: {max(tiempos):.1f} µs")
+
+    # Actualización incremental: renombrar 10 productos
+    ids = rnd.sample(range(1, args.productos + 1), 10)
+    registros = list(snapshot.registros)
+    for producto_id in ids:
+        registros[producto_id - 1] = registros[producto_id - 1]._replace(nombre=f"Nuevo {producto_id}")
+    nuevo = CatalogSnapshot(2, tuple(registros), {r.id: r for r in registros})
+    t0 = time.perf_counter()
+    indice.actualizar(nuevo, ids)
+    print(f"✏️  Actualización incremental de {len(ids)} productos: "
+          f"{(time.perf_counter() - t0) * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark de creación de ventas
+Sistema de Inventario para Ferretería
+
+Mide tickets por segundo de CreateVentaUseCase para tickets de 1, 10 y
+50 líneas, junto con las sentencias SQL y commits por ticket. Por
+defecto usa la configuración de testing (SQLite en memoria); con
+--config development se mide contra la base configurada en DATABASE_URL
+(las tablas deben existir y se crean productos de prueba en ella).
+
+Uso:
+    python performance/benchmark_ventas.py
+    python performance/benchmark_ventas.py --tickets 500 --lineas 1 10 50
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import event
+
+from app import create_app, db
+from app.infrastructure.di.container import get_container
+from app.models import Categoria, Producto, Usuario
+
+
+def preparar_datos(productos: int) -> tuple:
+    """Crea un usuario y productos con stock suficiente para todo el benchmark"""
+    usuario = Usuario(nombre='Benchmark', email='benchmark-ventas@test.com', rol='admin')
+    usuario.set_password('benchmark')
+    categoria = Categoria(nombre='Benchmark ventas')
+    db.session.add_all([usuario, categoria])
+    db.session.flush()
+
+    registros = [
+        Producto(nombre=f'Benchmark venta {i}', precio=10 + i % 90, stock=10_000_000,
+                 stock_minimo=0, categoria_id=categoria.id)
+        for i in range(productos)
+    ]
+    db.session.add_all(registros)
+    db.session.commit()
+    return usuario.id, [p.id for p in registros]
+
+
+def medir(use_case, usuario_id: int, producto_ids: list, lineas: int, tickets: int) -> dict:
+    """Crea `tickets` ventas de `lineas` líneas y devuelve las métricas"""
+    contadores = {'sentencias': 0, 'commits': 0}
+
+    def contar_sentencia(conn, cursor, statement, params, context, executemany):
+        contadores['sentencias'] += 1
+
+    def contar_commit(conn):
+        contadores['commits'] += 1
+
+    event.listen(db.engine, 'before_cursor_execute', contar_sentencia)
+    event.listen(db.engine, 'commit', contar_commit)
+    try:
+        inicio = time.perf_counter()
+        for n in range(tickets):
+            desde = (n * lineas) % (len(producto_ids) - lineas + 1)
+            use_case.execute({
+                'usuario_id': usuario_id,
+                'detalles': [{'producto_id': pid, 'cantidad': 1}
+                             for pid in producto_ids[desde:desde + lineas]],
+                'cliente_nombre': 'Benchmark'
+            })
+            db.session.remove()
+        duracion = time.perf_counter() - inicio
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', contar_sentencia)
+        event.remove(db.engine, 'commit', contar_commit)
+
+    return {
+        'tickets_por_segundo': tickets / duracion,
+        'ms_por_ticket': duracion * 1000 / tickets,
+        'sentencias_por_ticket': contadores['sentencias'] / tickets,
+        'commits_por_ticket': contadores['commits'] / tickets
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de creación de ventas')
+    parser.add_argument('--config', default='testing')
+    parser.add_argument('--tickets', type=int, default=300)
+    parser.add_argument('--lineas', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--productos', type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+    with app.app_context():
+        if args.config == 'testing':
+            db.create_all()
+        usuario_id, producto_ids = preparar_datos(max(args.productos, max(args.lineas)))
+        use_case = get_container().resolve('create_venta_use_case')
+
+        print(f"🧾 {args.tickets} tickets por tamaño ({args.config})")
+        print(f"{'líneas':>7} {'tickets/s':>10} {'ms/ticket':>10} {'SQL/ticket':>11} {'commits':>8}")
+        for lineas in args.lineas:
+            resultado = medir(use_case, usuario_id, producto_ids, lineas, args.tickets)
+            print(f"{lineas:>7} {resultado['tickets_por_segundo']:>10.1f} "
+                  f"{resultado['ms_por_ticket']:>10.2f} "
+                  f"{resultado['sentencias_por_ticket']:>11.1f} "
+                  f"{resultado['commits_por_ticket']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
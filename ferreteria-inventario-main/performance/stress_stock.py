@@ -0,0 +1,144 @@
+"""
+Prueba de estrés de descuentos de stock concurrentes
+Sistema de Inventario para Ferretería
+
+Varios hilos (cajas) descuentan stock de unos pocos productos "calientes"
+a la vez. Compara el UPDATE condicional atómico
+(ProductoRepository.ajustar_stock) con la lectura-modificación-escritura
+desde Python que se usaba antes, y reporta descuentos por segundo,
+ventas rechazadas por falta de stock y la sobreventa detectada
+(unidades vendidas de más respecto del stock inicial).
+
+Por defecto usa una base SQLite en un archivo temporal; con --database-url
+se puede apuntar a MySQL (las tablas deben existir).
+
+Uso:
+    python performance/stress_stock.py
+    python performance/stress_stock.py --hilos 16 --intentos 200 --productos 3 --stock 1000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app, db
+from app.config import config, TestingConfig
+from app.exceptions import StockError
+from app.models import Categoria, Producto
+from app.repositories.producto import ProductoRepository
+
+
+def descontar_atomico(producto_id: int):
+    ProductoRepository.ajustar_stock({producto_id: -1})
+
+
+def descontar_lectura_escritura(producto_id: int):
+    """Patrón anterior: leer el stock, validarlo y escribirlo desde Python"""
+    producto = db.session.get(Producto, producto_id)
+    if producto.stock < 1:
+        raise StockError("Stock insuficiente")
+    producto.stock -= 1
+    db.session.commit()
+
+
+MODOS = {'atomico': descontar_atomico, 'lectura-escritura': descontar_lectura_escritura}
+
+
+def preparar(productos: int, stock: int) -> list:
+    categoria = Categoria(nombre=f'Estrés {time.time_ns()}')
+    db.session.add(categoria)
+    db.session.flush()
+    registros = [Producto(nombre=f'Caliente {i}', precio=1, stock=stock, stock_minimo=0,
+                          categoria_id=categoria.id) for i in range(productos)]
+    db.session.add_all(registros)
+    db.session.commit()
+    return [p.id for p in registros]
+
+
+def ejecutar(app, modo: str, producto_ids: list, hilos: int, intentos: int) -> dict:
+    operacion = MODOS[modo]
+    contadores = {'ok': 0, 'sin_stock': 0, 'errores': 0}
+    candado = threading.Lock()
+    barrera = threading.Barrier(hilos)
+
+    def caja(semilla: int):
+        rnd = random.Random(semilla)
+        with app.app_context():
+            barrera.wait()
+            for _ in range(intentos):
+                try:
+                    operacion(rnd.choice(producto_ids))
+                    clave = 'ok'
+                except StockError:
+                    clave = 'sin_stock'
+                except Exception:
+                    db.session.rollback()
+                    clave = 'errores'
+                finally:
+                    db.session.remove()
+                with candado:
+                    contadores[clave] += 1
+
+    inicio = time.perf_counter()
+    trabajadores = [threading.Thread(target=caja, args=(i,)) for i in range(hilos)]
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+    contadores['segundos'] = time.perf_counter() - inicio
+    return contadores
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Estrés de descuentos de stock concurrentes')
+    parser.add_argument('--database-url', default=None)
+    parser.add_argument('--hilos', type=int, default=8)
+    parser.add_argument('--intentos', type=int, default=100)
+    parser.add_argument('--productos', type=int, default=2, help='Cantidad de productos calientes')
+    parser.add_argument('--stock', type=int, default=300, help='Stock inicial de cada producto')
+    args = parser.parse_args()
+
+    ruta_temporal = None
+    url = args.database_url
+    if url is None:
+        descriptor, ruta_temporal = tempfile.mkstemp(suffix='.db')
+        os.close(descriptor)
+        url = f'sqlite:///{ruta_temporal}'
+
+    class EstresConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = url
+        SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30}} if url.startswith('sqlite') else {}
+        CATALOG_PRELOAD = False
+
+    config['estres'] = EstresConfig
+    app = create_app('estres')
+    try:
+        with app.app_context():
+            if ruta_temporal:
+                db.create_all()
+
+            total = args.hilos * args.intentos
+            print(f"🔥 {args.hilos} hilos x {args.intentos} descuentos sobre {args.productos} "
+                  f"producto(s) con stock {args.stock}")
+            print(f"{'modo':>18} {'desc/s':>9} {'ok':>6} {'sin stock':>10} {'errores':>8} {'sobreventa':>11}")
+            for modo in MODOS:
+                producto_ids = preparar(args.productos, args.stock)
+                r = ejecutar(app, modo, producto_ids, args.hilos, args.intentos)
+                db.session.expire_all()
+                stock_final = sum(db.session.get(Producto, pid).stock for pid in producto_ids)
+                vendido_segun_stock = args.productos * args.stock - stock_final
+                sobreventa = r['ok'] - vendido_segun_stock
+                print(f"{modo:>18} {total / r['segundos']:>9.0f} {r['ok']:>6} {r['sin_stock']:>10} "
+                      f"{r['errores']:>8} {sobreventa:>11}")
+    finally:
+        if ruta_temporal:
+            os.remove(ruta_temporal)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Script para reconstruir los resúmenes de ventas (tablas ventas_diarias,
+productos_ventas_diarias y clientes_resumen)
+
+Los resúmenes se mantienen solo al crear y anular ventas; este script los
+recalcula desde ventas y detalle_venta. Usarlo al crear la tabla (para
+cargar el historial), después de importar ventas por fuera de la API o
+si se sospecha que quedó desalineado.
+
+Uso:
+    python reconstruir_agregados.py
+    python reconstruir_agregados.py --desde 2025-01-01 --hasta 2025-12-31
+"""
+import sys
+import os
+import argparse
+from datetime import date
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import create_app
+from app.repositories.venta_diaria import (
+    VentaDiariaRepository, ProductoVentaDiariaRepository, ClienteResumenRepository
+)
+
+
+def reconstruir(desde=None, hasta=None):
+    app = create_app()
+    with app.app_context():
+        rango = f"{desde or 'inicio'} a {hasta or 'hoy'}"
+        print(f"🔄 Reconstruyendo resumen diario de ventas ({rango})...")
+        filas = VentaDiariaRepository.reconstruir(desde, hasta)
+        filas_productos = ProductoVentaDiariaRepository.reconstruir(desde, hasta)
+        # El resumen por cliente no es por día: siempre se recalcula completo
+        clientes = ClienteResumenRepository.reconstruir()
+        totales = VentaDiariaRepository.totales(desde, hasta)
+        print("✅ Resumen reconstruido")
+        print(f"   Filas (día, usuario):  {filas}")
+        print(f"   Filas (día, producto): {filas_productos}")
+        print(f"   Clientes:              {clientes}")
+        print(f"   Ventas:                {totales['cantidad']}")
+        print(f"   Total:                 {totales['total']:.2f}")
+        return filas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Reconstruye los resúmenes diarios de ventas')
+    parser.add_argument('--desde', type=date.fromisoformat, help='Primer día (YYYY-MM-DD)')
+    parser.add_argument('--hasta', type=date.fromisoformat, help='Último día, inclusive (YYYY-MM-DD)')
+    args = parser.parse_args()
+    reconstruir(args.desde, args.hasta)
@@ -0,0 +1,112 @@
+"""
+Tests para la búsqueda tolerante a errores (índice de trigramas)
+"""
+import unittest
+import json
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria
+from app.infrastructure.search import trigram_index
+from app.infrastructure.search.trigram_index import TrigramIndex, trigramas
+
+class TestBusquedaFuzzy(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        db.session.add(self.admin_user)
+
+        categoria = Categoria(nombre='Ferretería')
+        db.session.add(categoria)
+        db.session.flush()
+        self.categoria_id = categoria.id
+
+        self.tornillo = Producto(nombre='Tornillo autorroscante', precio=1, stock=500,
+                                 categoria_id=categoria.id)
+        self.martillo = Producto(nombre='Martillo de goma', precio=30, stock=8,
+                                 categoria_id=categoria.id)
+        self.llave = Producto(nombre='Llave inglesa', precio=45, stock=4,
+                              categoria_id=categoria.id)
+        db.session.add_all([self.tornillo, self.martillo, self.llave])
+        db.session.commit()
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _buscar(self, query):
+        response = self.client.get(f'/api/productos/search?fuzzy=1&{query}', headers=self.headers)
+        return response, json.loads(response.data)
+
+    def test_trigramas(self):
+        """Test los trigramas incluyen relleno de inicio y fin"""
+        self.assertEqual(trigramas('sol'), {'  s', ' so', 'sol', 'ol '})
+
+    def test_errores_de_tipeo(self):
+        """Test se encuentran productos con nombres mal escritos"""
+        response, data = self._buscar('q=tornilo')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['id'] for p in data['data']], [self.tornillo.id])
+
+        _, data = self._buscar('q=martiyo goma')
+        self.assertEqual([p['id'] for p in data['data']], [self.martillo.id])
+
+    def test_umbral_configurable(self):
+        """Test un umbral alto descarta coincidencias lejanas"""
+        _, data = self._buscar('q=tornilo&threshold=0.9')
+        self.assertEqual(data['data'], [])
+
+        response, _ = self._buscar('q=tornilo&threshold=2')
+        self.assertEqual(response.status_code, 400)
+
+    def test_mantenimiento_incremental(self):
+        """Test altas, cambios y bajas actualizan el índice"""
+        self._buscar('q=tornilo')
+
+        nuevo = Producto(nombre='Destornillador plano', precio=12, stock=6,
+                         categoria_id=self.categoria_id)
+        db.session.add(nuevo)
+        self.llave.nombre = 'Llave francesa'
+        db.session.delete(self.martillo)
+        db.session.commit()
+
+        _, data = self._buscar('q=destornilador')
+        self.assertEqual([p['id'] for p in data['data']], [nuevo.id])
+        _, data = self._buscar('q=franceza')
+        self.assertEqual([p['id'] for p in data['data']], [self.llave.id])
+        _, data = self._buscar('q=martiyo')
+        self.assertEqual(data['data'], [])
+
+    def test_indice_incremental_equivale_a_reconstruido(self):
+        """Test actualizar incrementalmente produce el mismo resultado que reconstruir"""
+        from app.infrastructure.cache import catalog_store
+        catalog_store.obtener()
+        self.tornillo.nombre = 'Tornillo hexagonal'
+        db.session.commit()
+        snapshot = catalog_store.obtener()
+
+        reconstruido = TrigramIndex()
+        reconstruido.reconstruir(snapshot)
+        for termino in ('hexagonl', 'autorroscante', 'tornilo'):
+            self.assertEqual(trigram_index.buscar(termino), reconstruido.buscar(termino))
+
+if __name__ == '__main__':
+    unittest.main()
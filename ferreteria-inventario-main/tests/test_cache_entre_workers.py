@@ -0,0 +1,169 @@
+"""
+Tests de la caché compartida entre workers
+
+Dos instancias de la app sobre la misma base (SQLite en archivo) y el
+mismo backend de caché (FileSystemCache en un directorio temporal), como
+dos workers de gunicorn con Redis. Los avisos locales de commit se
+desactivan: un worker solo se entera de lo que escribió el otro a
+través de las versiones guardadas en la caché.
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from collections import defaultdict
+from datetime import datetime, timedelta
+from unittest import mock
+
+from app import create_app, db
+from app.config import config, TestingConfig
+from app.infrastructure.cache import catalog_store, change_tracker
+from app.models import Usuario, Producto, Categoria, Venta, DetalleVenta
+from app.repositories.venta_diaria import VentaDiariaRepository
+
+
+class TestCacheEntreWorkers(unittest.TestCase):
+    def setUp(self):
+        """Configurar dos apps que comparten base y caché"""
+        descriptor, self.ruta_db = tempfile.mkstemp(suffix='.db')
+        os.close(descriptor)
+        self.dir_cache = tempfile.mkdtemp()
+
+        class WorkerConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f'sqlite:///{self.ruta_db}'
+            CACHE_TYPE = 'FileSystemCache'
+            CACHE_DIR = self.dir_cache
+            CACHE_THRESHOLD = 0
+            CATALOG_PRELOAD = False
+
+        with mock.patch.dict(config, {'worker': WorkerConfig}):
+            self.app = create_app('worker')
+            self.app_b = create_app('worker')
+        self.client = self.app.test_client()
+        self.client_b = self.app_b.test_client()
+
+        # Sin avisos en el proceso: cada worker depende de la caché compartida
+        self.sin_avisos = mock.patch.object(change_tracker, '_suscriptores', defaultdict(list))
+        self.sin_avisos.start()
+        catalog_store.invalidar()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.admin_user = Usuario(nombre='Admin', email='admin@test.com', rol='admin')
+        self.admin_user.set_password('admin123')
+        self.categoria = Categoria(nombre='Herramientas')
+        db.session.add_all([self.admin_user, self.categoria])
+        db.session.flush()
+        self.producto = Producto(nombre='Martillo', precio=25, stock=10, stock_minimo=5,
+                                 categoria_id=self.categoria.id)
+        db.session.add(self.producto)
+        db.session.commit()
+        self.producto_id = self.producto.id
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        self.token = json.loads(login_response.data)['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+        self.app_context.pop()
+        with self.app_b.app_context():
+            db.engine.dispose()
+        self.sin_avisos.stop()
+        catalog_store.invalidar()
+        os.remove(self.ruta_db)
+        shutil.rmtree(self.dir_cache, ignore_errors=True)
+
+    def _vender_en_a(self, stock):
+        """Un commit sobre productos hecho por el primer worker"""
+        producto = db.session.get(Producto, self.producto_id)
+        producto.stock = stock
+        db.session.commit()
+
+    def test_version_compartida(self):
+        """Test un commit en un worker avanza la versión que ve el otro"""
+        with self.app_b.app_context():
+            anterior = change_tracker.version('productos')
+        self._vender_en_a(4)
+        with self.app_b.app_context():
+            self.assertGreater(change_tracker.version('productos'), anterior)
+
+    def test_catalogo_actualizado_por_ids_del_otro_worker(self):
+        """Test el catálogo del otro worker recarga solo el producto modificado"""
+        with self.app_b.app_context():
+            self.assertEqual(catalog_store.obtener().get(self.producto_id).stock, 10)
+        self._vender_en_a(4)
+        with self.app_b.app_context():
+            with mock.patch.object(catalog_store, '_construir_completo',
+                                   side_effect=AssertionError('reconstrucción completa')):
+                snapshot = catalog_store.obtener()
+            self.assertEqual(snapshot.get(self.producto_id).stock, 4)
+
+        response = self.client_b.get(f'/api/productos/{self.producto_id}', headers=self.headers)
+        self.assertEqual(json.loads(response.data)['data']['stock'], 4)
+
+    def test_etag_del_otro_worker(self):
+        """Test tras un commit en un worker el otro no responde 304 con datos viejos"""
+        url = f'/api/productos/{self.producto_id}'
+        etag = self.client_b.get(url, headers=self.headers).headers['ETag']
+        response = self.client_b.get(url, headers={**self.headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        self._vender_en_a(4)
+        response = self.client_b.get(url, headers={**self.headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['data']['stock'], 4)
+
+        last_modified = response.headers['Last-Modified']
+        self._vender_en_a(3)
+        response = self.client_b.get(url, headers={**self.headers,
+                                                   'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['data']['stock'], 3)
+
+    def test_stock_bajo_del_otro_worker(self):
+        """Test el índice de stock bajo del otro worker refleja el commit"""
+        def stock_bajo():
+            response = self.client_b.get('/api/productos/stock-bajo', headers=self.headers)
+            return [p['id'] for p in json.loads(response.data)['data']]
+
+        self.assertEqual(stock_bajo(), [])
+        self._vender_en_a(2)
+        self.assertEqual(stock_bajo(), [self.producto_id])
+        self._vender_en_a(50)
+        self.assertEqual(stock_bajo(), [])
+
+    def test_serie_tras_anulacion_en_el_otro_worker(self):
+        """Test una anulación en un worker descarta la serie guardada por el otro"""
+        hoy = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        venta = Venta(usuario_id=self.admin_user.id, total=30,
+                      fecha=hoy - timedelta(days=2, hours=-10))
+        db.session.add(venta)
+        db.session.flush()
+        db.session.add(DetalleVenta(venta_id=venta.id, producto_id=self.producto_id,
+                                    cantidad=1, precio_unitario=30, subtotal=30))
+        db.session.commit()
+        venta_id = venta.id
+        VentaDiariaRepository.reconstruir()
+
+        def cantidades():
+            response = self.client_b.get('/api/ventas/serie?granularity=day&range=7d',
+                                         headers=self.headers)
+            return sum(b['cantidad'] for b in json.loads(response.data)['data']['buckets'])
+
+        self.assertEqual(cantidades(), 1)
+        response = self.client.post('/api/ventas/anular', headers=self.headers,
+                                    json={'venta_ids': [venta_id]})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(cantidades(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+"""
+Tests para el snapshot versionado del catálogo de productos
+"""
+import unittest
+import json
+from unittest import mock
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria
+from app.infrastructure.cache import catalog_store, change_tracker
+from app.infrastructure.cache.catalog_snapshot import CatalogSnapshotStore
+
+class TestCatalogSnapshot(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        db.session.add(self.admin_user)
+
+        self.categoria = Categoria(nombre='Herramientas')
+        db.session.add(self.categoria)
+        db.session.flush()
+
+        self.martillo = Producto(nombre='Martillo', precio=25.5, stock=10,
+                                 categoria_id=self.categoria.id)
+        self.taladro = Producto(nombre='Taladro', precio=150, stock=3,
+                                categoria_id=self.categoria.id)
+        db.session.add_all([self.martillo, self.taladro])
+        db.session.commit()
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_lectura_expone_version(self):
+        """Test las lecturas incluyen la versión del catálogo"""
+        response = self.client.get(f'/api/productos/{self.martillo.id}', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)['data']
+        self.assertEqual(data['nombre'], 'Martillo')
+        self.assertEqual(data['precio'], 25.5)
+
+        version = int(response.headers['X-Catalog-Version'])
+        response = self.client.get('/api/productos/version', headers=self.headers)
+        self.assertEqual(json.loads(response.data)['data']['version'], version)
+
+    def test_snapshot_reutilizado_entre_lecturas(self):
+        """Test sin escrituras se reutiliza el mismo snapshot"""
+        primero = catalog_store.obtener()
+        segundo = catalog_store.obtener()
+        self.assertIs(primero, segundo)
+        self.assertEqual(len(primero), 2)
+
+    def test_commit_genera_nuevo_snapshot(self):
+        """Test un commit incrementa la versión y reconstruye copy-on-write"""
+        anterior = catalog_store.obtener()
+        version_anterior = catalog_store.version()
+
+        self.martillo.stock = 7
+        db.session.commit()
+
+        self.assertGreater(catalog_store.version(), version_anterior)
+        nuevo = catalog_store.obtener()
+        self.assertIsNot(nuevo, anterior)
+        self.assertEqual(nuevo.get(self.martillo.id).stock, 7)
+        # El snapshot publicado antes no se modifica
+        self.assertEqual(anterior.get(self.martillo.id).stock, 10)
+
+        response = self.client.get(f'/api/productos/{self.martillo.id}', headers=self.headers)
+        self.assertEqual(json.loads(response.data)['data']['stock'], 7)
+
+    def test_altas_y_bajas(self):
+        """Test crear y eliminar productos se refleja en el listado"""
+        catalog_store.obtener()
+
+        nuevo = Producto(nombre='Alicate', precio=12, stock=4,
+                         categoria_id=self.categoria.id)
+        db.session.add(nuevo)
+        db.session.delete(self.taladro)
+        db.session.commit()
+
+        response = self.client.get('/api/productos', headers=self.headers)
+        nombres = [p['nombre'] for p in json.loads(response.data)['data']['items']]
+        self.assertEqual(nombres, ['Martillo', 'Alicate'])
+
+        response = self.client.get(f'/api/productos/{self.taladro.id}', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_rollback_no_cambia_version(self):
+        """Test los cambios revertidos no invalidan el catálogo"""
+        version = catalog_store.version()
+        self.martillo.stock = 1
+        db.session.flush()
+        self.assertTrue(change_tracker.tiene_pendientes(db.session, 'productos'))
+        db.session.rollback()
+
+        self.assertEqual(catalog_store.version(), version)
+        self.assertEqual(catalog_store.obtener().get(self.martillo.id).stock, 10)
+
+    def _otro_worker(self):
+        """Store que no recibe avisos locales, como el de otro proceso"""
+        store = CatalogSnapshotStore()
+        change_tracker._suscriptores['productos'].remove(store._on_commit)
+        store.obtener()
+        return store
+
+    def test_cambios_de_otro_worker_se_aplican_por_ids(self):
+        """Test un commit ajeno recarga solo los ids publicados"""
+        store = self._otro_worker()
+        self.martillo.stock = 4
+        db.session.commit()
+
+        with mock.patch.object(store, '_construir_completo',
+                               side_effect=AssertionError('reconstrucción completa')):
+            snapshot = store.obtener()
+        self.assertEqual(snapshot.version, catalog_store.version())
+        self.assertEqual(snapshot.get(self.martillo.id).stock, 4)
+        self.assertEqual(snapshot.get(self.taladro.id).stock, 3)
+
+    def test_cambios_sin_ids_reconstruyen(self):
+        """Test una invalidación sin ids obliga a reconstruir el catálogo"""
+        store = self._otro_worker()
+        change_tracker.invalidar(['productos'])
+        with mock.patch.object(store, '_construir_completo',
+                               wraps=store._construir_completo) as completo:
+            store.obtener()
+        completo.assert_called_once()
+
+    def test_sesion_con_pendientes_parcha_el_publicado(self):
+        """Test una sesión con escrituras sin confirmar no reconstruye todo"""
+        catalog_store.obtener()
+        self.taladro.stock = 8
+        db.session.commit()
+        # El snapshot publicado quedó atrás y la sesión escribe otra vez
+        self.martillo.stock = 2
+        db.session.flush()
+
+        with mock.patch.object(catalog_store, '_construir_completo',
+                               side_effect=AssertionError('reconstrucción completa')):
+            propio = catalog_store.obtener()
+        self.assertEqual(propio.get(self.martillo.id).stock, 2)
+        self.assertEqual(propio.get(self.taladro.id).stock, 8)
+        db.session.rollback()
+
+        publicado = catalog_store.obtener()
+        self.assertIsNot(publicado, propio)
+        self.assertEqual(publicado.get(self.martillo.id).stock, 10)
+        self.assertEqual(publicado.get(self.taladro.id).stock, 8)
+
+if __name__ == '__main__':
+    unittest.main()
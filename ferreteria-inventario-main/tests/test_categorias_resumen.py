@@ -0,0 +1,129 @@
+"""
+Tests para las estadísticas agregadas por categoría
+"""
+import unittest
+import json
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria
+
+class TestCategoriasResumen(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        db.session.add(self.admin_user)
+
+        self.herramientas = Categoria(nombre='Herramientas')
+        self.vacia = Categoria(nombre='Vacía')
+        db.session.add_all([self.herramientas, self.vacia])
+        db.session.flush()
+
+        db.session.add_all([
+            Producto(nombre='Martillo', precio=10, stock=3, stock_minimo=5,
+                     categoria_id=self.herramientas.id),
+            Producto(nombre='Sierra', precio=25.5, stock=10, stock_minimo=5,
+                     categoria_id=self.herramientas.id),
+        ])
+        db.session.commit()
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _categorias(self):
+        response = self.client.get('/api/categorias?with_count=true', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return {c['nombre']: c for c in json.loads(response.data)['data']}
+
+    def _sentencias(self, funcion):
+        sentencias = []
+        def capturar(conn, cursor, statement, params, context, executemany):
+            sentencias.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capturar)
+        try:
+            funcion()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capturar)
+        return sentencias
+
+    def test_estadisticas(self):
+        """Test conteo, valor del stock y productos con stock bajo"""
+        categorias = self._categorias()
+        self.assertEqual(categorias['Herramientas']['productos_count'], 2)
+        self.assertAlmostEqual(categorias['Herramientas']['valor_stock'], 3 * 10 + 10 * 25.5)
+        self.assertEqual(categorias['Herramientas']['productos_stock_bajo'], 1)
+        self.assertEqual(categorias['Vacía']['productos_count'], 0)
+        self.assertEqual(categorias['Vacía']['valor_stock'], 0)
+
+        response = self.client.get(f'/api/categorias/{self.herramientas.id}', headers=self.headers)
+        self.assertEqual(json.loads(response.data)['data']['productos_count'], 2)
+
+    def test_sin_with_count(self):
+        """Test sin with_count no se incluyen las estadísticas"""
+        self._categorias()
+        categorias = []
+        def listar():
+            response = self.client.get('/api/categorias', headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+            categorias.extend(json.loads(response.data)['data'])
+        consultas = self._sentencias(listar)
+        self.assertEqual(sorted(c['nombre'] for c in categorias), ['Herramientas', 'Vacía'])
+        for categoria in categorias:
+            self.assertNotIn('productos_count', categoria)
+            self.assertNotIn('valor_stock', categoria)
+            self.assertNotIn('productos_stock_bajo', categoria)
+        # Misma consulta agregada cacheada que con with_count
+        self.assertEqual([s for s in consultas if 'categorias' in s or 'productos' in s], [])
+
+    def test_una_consulta_y_cache(self):
+        """Test una sola consulta agregada y ninguna en la lectura siguiente"""
+        sentencias = self._sentencias(self._categorias)
+        consultas = [s for s in sentencias if 'categorias' in s]
+        self.assertEqual(len(consultas), 1)
+        self.assertIn('GROUP BY', consultas[0])
+
+        sentencias = self._sentencias(self._categorias)
+        self.assertEqual([s for s in sentencias if 'categorias' in s or 'productos' in s], [])
+
+    def test_invalidacion_por_escritura(self):
+        """Test una escritura en productos invalida el resumen"""
+        self._categorias()
+        db.session.add(Producto(nombre='Taladro', precio=100, stock=0, stock_minimo=1,
+                                categoria_id=self.vacia.id))
+        db.session.commit()
+
+        categorias = self._categorias()
+        self.assertEqual(categorias['Vacía']['productos_count'], 1)
+        self.assertEqual(categorias['Vacía']['productos_stock_bajo'], 1)
+
+    def test_eliminar_con_productos(self):
+        """Test no se elimina una categoría con productos"""
+        response = self.client.delete(f'/api/categorias/{self.herramientas.id}', headers=self.headers)
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('2 producto(s)', json.loads(response.data)['message'])
+
+        response = self.client.delete(f'/api/categorias/{self.vacia.id}', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
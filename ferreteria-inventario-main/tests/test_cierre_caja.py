@@ -0,0 +1,217 @@
+"""
+Tests del resumen y cierre de caja por vendedor
+"""
+import unittest
+import json
+from datetime import date, timedelta
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria, Venta, VentaDiaria, CierreCaja
+from app.repositories.venta_diaria import VentaDiariaRepository
+
+
+class TestCierreCaja(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        self.vendedor = Usuario(nombre='Vendedor', email='vendedor@test.com', rol='vendedor')
+        self.vendedor.set_password('vendedor123')
+        self.otro = Usuario(nombre='Otro', email='otro@test.com', rol='vendedor')
+        self.otro.set_password('otro123')
+        self.categoria = Categoria(nombre='Ferretería')
+        db.session.add_all([self.admin_user, self.vendedor, self.otro, self.categoria])
+        db.session.flush()
+        self.producto = Producto(nombre='Martillo', precio=10, stock=1000, stock_minimo=1,
+                                 categoria_id=self.categoria.id)
+        db.session.add(self.producto)
+        db.session.commit()
+        self.producto_id = self.producto.id
+        self.vendedor_id, self.otro_id = self.vendedor.id, self.otro.id
+
+        self.admin = self._login('admin@test.com', 'admin123')
+        self.headers = self._login('vendedor@test.com', 'vendedor123')
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _login(self, email, password):
+        login_response = self.client.post('/api/auth/login', json={'email': email, 'password': password})
+        token = json.loads(login_response.data)['data']['token']
+        return {'Authorization': f'Bearer {token}'}
+
+    def _vender(self, cantidad, headers=None):
+        response = self.client.post('/api/ventas', headers=headers or self.headers, json={
+            'detalles': [{'producto_id': self.producto_id, 'cantidad': cantidad}]
+        })
+        self.assertEqual(response.status_code, 201, response.data)
+        return json.loads(response.data)['data']['id']
+
+    def _resumen(self, query='', headers=None):
+        db.session.expire_all()
+        response = self.client.get(f'/api/caja/resumen{query}', headers=headers or self.headers)
+        return response.status_code, json.loads(response.data).get('data')
+
+    def test_resumen_con_anulaciones(self):
+        """Test el resumen cuenta ventas, items y anulaciones del vendedor"""
+        self._vender(2)
+        anulada = self._vender(3)
+        self._vender(4)
+        self._vender(9, headers=self._login('otro@test.com', 'otro123'))
+        self.client.post('/api/ventas/anular', headers=self.admin, json={'venta_ids': [anulada]})
+
+        status, data = self._resumen()
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            (data['cantidad_ventas'], data['total'], data['items'],
+             data['anulaciones'], data['total_anulado'], data['cerrado']),
+            (2, 60.0, 6, 1, 30.0, False)
+        )
+
+        # El admin consulta la caja de otro vendedor; un vendedor no puede
+        status, data = self._resumen(f'?usuario_id={self.otro_id}', headers=self.admin)
+        self.assertEqual((status, data['total']), (200, 90.0))
+        status, _ = self._resumen(f'?usuario_id={self.otro_id}')
+        self.assertEqual(status, 403)
+
+    def test_cierre_inmutable(self):
+        """Test el cierre congela el resumen y no se puede repetir"""
+        self._vender(2)
+        self._vender(5)
+
+        response = self.client.post('/api/caja/cierre', headers=self.headers,
+                                    json={'monto_declarado': 65, 'observaciones': 'Sobran 5'})
+        self.assertEqual(response.status_code, 201, response.data)
+        cierre = json.loads(response.data)['data']
+        self.assertEqual((cierre['total'], cierre['cantidad_ventas'], cierre['diferencia']),
+                         (70.0, 2, -5.0))
+        self.assertEqual(cierre['cerrado_por'], self.vendedor_id)
+
+        status, data = self._resumen()
+        self.assertEqual((data['cerrado'], data['total'], data['anulaciones']), (True, 70.0, 0))
+        self.assertEqual(data['cierre']['monto_declarado'], 65.0)
+
+        response = self.client.post('/api/caja/cierre', headers=self.headers, json={})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(CierreCaja.query.count(), 1)
+
+    def test_dia_cerrado_no_admite_ventas(self):
+        """Test tras el cierre el vendedor no puede vender ese día; los demás sí"""
+        self._vender(2)
+        response = self.client.post('/api/caja/cierre', headers=self.headers, json={})
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.post('/api/ventas', headers=self.headers, json={
+            'detalles': [{'producto_id': self.producto_id, 'cantidad': 1}]
+        })
+        self.assertEqual(response.status_code, 409, response.data)
+        self.assertIn('ya está cerrada', json.loads(response.data)['message'])
+        response = self.client.post('/api/ventas/lote', headers=self.headers, json={
+            'ventas': [{'detalles': [{'producto_id': self.producto_id, 'cantidad': 1}]}]
+        })
+        self.assertEqual(response.status_code, 409, response.data)
+
+        # Ninguna venta se registró ni se sumó al resumen cerrado
+        db.session.expire_all()
+        self.assertEqual(Venta.query.count(), 1)
+        fila = VentaDiaria.query.filter_by(usuario_id=self.vendedor_id).one()
+        self.assertEqual((fila.cantidad_ventas, float(fila.total)), (1, 20.0))
+
+        self._vender(3, headers=self._login('otro@test.com', 'otro123'))
+
+    def test_dia_cerrado_no_admite_anulaciones(self):
+        """Test no se anula una venta de un día cerrado: el cierre quedaría sin conciliar"""
+        abierta = self._vender(1, headers=self._login('otro@test.com', 'otro123'))
+        cerrada = self._vender(2)
+        self.client.post('/api/caja/cierre', headers=self.headers, json={})
+
+        response = self.client.post('/api/ventas/anular', headers=self.admin,
+                                    json={'venta_ids': [abierta, cerrada]})
+        self.assertEqual(response.status_code, 409, response.data)
+        response = self.client.delete(f'/api/ventas/{cerrada}', headers=self.admin)
+        self.assertEqual(response.status_code, 409, response.data)
+
+        db.session.expire_all()
+        self.assertEqual(Venta.query.count(), 2)
+        self.assertEqual(db.session.get(Producto, self.producto_id).stock, 997)
+        self.assertEqual(VentaDiaria.query.filter_by(usuario_id=self.vendedor_id).one().anulaciones, 0)
+
+        # Las ventas de cajas abiertas se siguen anulando
+        response = self.client.delete(f'/api/ventas/{abierta}', headers=self.admin)
+        self.assertEqual(response.status_code, 200)
+
+    def test_resumen_lee_una_fila(self):
+        """Test el resumen y el cierre no consultan la tabla de ventas"""
+        for cantidad in (1, 2, 3):
+            self._vender(cantidad)
+        sentencias = []
+        def capturar(conn, cursor, statement, params, context, executemany):
+            sentencias.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capturar)
+        try:
+            status, _ = self._resumen()
+            response = self.client.post('/api/caja/cierre', headers=self.headers, json={})
+            self.client.get('/api/caja/cierres', headers=self.headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capturar)
+        self.assertEqual((status, response.status_code), (200, 201))
+        self.assertFalse([s for s in sentencias if 'FROM ventas ' in s or 'FROM ventas\n' in s])
+        self.assertFalse([s for s in sentencias if 'detalle_venta' in s])
+
+    def test_historial_de_cierres(self):
+        """Test historial por rango; cada vendedor ve solo los propios"""
+        hoy = date.today()
+        for dias in (3, 2, 1):
+            fecha = (hoy - timedelta(days=dias)).isoformat()
+            self.client.post('/api/caja/cierre', headers=self.headers, json={'fecha': fecha})
+        response = self.client.post('/api/caja/cierre', headers=self.admin,
+                                    json={'usuario_id': self.otro_id})
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.get(f'/api/caja/cierres?desde={(hoy - timedelta(days=2)).isoformat()}',
+                                   headers=self.headers)
+        fechas = [c['fecha'] for c in json.loads(response.data)['data']]
+        self.assertEqual(fechas, [(hoy - timedelta(days=d)).isoformat() for d in (1, 2)])
+
+        response = self.client.get('/api/caja/cierres', headers=self.admin)
+        self.assertEqual(json.loads(response.data)['count'], 4)
+        response = self.client.get(f'/api/caja/cierres?usuario_id={self.otro_id}', headers=self.headers)
+        self.assertEqual(response.status_code, 403)
+
+    def test_reconstruir_conserva_anulaciones(self):
+        """Test reconstruir el resumen diario no pierde las anulaciones"""
+        self._vender(1)
+        anulada = self._vender(2)
+        self.client.post('/api/ventas/anular', headers=self.admin, json={'venta_ids': [anulada]})
+        VentaDiariaRepository.reconstruir()
+
+        status, data = self._resumen()
+        self.assertEqual((data['cantidad_ventas'], data['anulaciones'], data['total_anulado']),
+                         (1, 1, 20.0))
+
+    def test_validaciones(self):
+        """Test fecha futura o inválida y monto negativo"""
+        manana = (date.today() + timedelta(days=1)).isoformat()
+        for cuerpo in ({'fecha': manana}, {'fecha': '17/10/2026'},
+                       {'monto_declarado': -1}, {'monto_declarado': 'mucho'}):
+            response = self.client.post('/api/caja/cierre', headers=self.headers, json=cuerpo)
+            self.assertEqual(response.status_code, 400, cuerpo)
+        self.assertEqual(self._resumen('?fecha=ayer')[0], 400)
+        self.assertEqual(CierreCaja.query.count(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+"""
+Tests del resumen de compras por cliente y del historial paginado por cursor
+"""
+import unittest
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria, Venta, DetalleVenta, ClienteResumen
+from app.repositories.venta_diaria import ClienteResumenRepository
+
+DOCUMENTO = '20304050'
+
+
+class TestClientesResumen(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        self.categoria = Categoria(nombre='Ferretería')
+        db.session.add_all([self.admin_user, self.categoria])
+        db.session.flush()
+        self.producto = Producto(nombre='Martillo', precio=10, stock=1000, stock_minimo=1,
+                                 categoria_id=self.categoria.id)
+        db.session.add(self.producto)
+        db.session.commit()
+        self.usuario_id, self.producto_id = self.admin_user.id, self.producto.id
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _vender(self, cantidad, documento=DOCUMENTO):
+        response = self.client.post('/api/ventas', headers=self.headers, json={
+            'cliente_documento': documento,
+            'detalles': [{'producto_id': self.producto_id, 'cantidad': cantidad}]
+        })
+        self.assertEqual(response.status_code, 201, response.data)
+        return json.loads(response.data)['data']
+
+    def _historial(self, fecha, total, documento=DOCUMENTO):
+        venta = Venta(usuario_id=self.usuario_id, total=total, fecha=fecha,
+                      cliente_documento=documento)
+        db.session.add(venta)
+        db.session.flush()
+        db.session.add(DetalleVenta(venta_id=venta.id, producto_id=self.producto_id,
+                                    cantidad=1, precio_unitario=total, subtotal=total))
+        db.session.commit()
+        return venta.id
+
+    def _resumen(self, documento=DOCUMENTO):
+        db.session.expire_all()
+        return self.client.get(f'/api/ventas/cliente/{documento}/resumen', headers=self.headers)
+
+    def test_resumen_incremental(self):
+        """Test crear, vender en lote y anular mantienen el resumen del cliente"""
+        primera = self._vender(2)
+        ultima = self._vender(3)
+        self._vender(1, documento='99999999')
+        self._vender(4, documento=None)
+        self.client.post('/api/ventas/lote', headers=self.headers, json={'ventas': [
+            {'cliente_documento': DOCUMENTO,
+             'detalles': [{'producto_id': self.producto_id, 'cantidad': 5}]},
+        ]})
+
+        response = self._resumen()
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)['data']
+        self.assertEqual((data['total'], data['cantidad_ventas'], data['ticket_promedio']),
+                         (100.0, 3, 33.33))
+        self.assertEqual(ClienteResumen.query.count(), 2)
+
+        # Anular la venta más reciente devuelve la última compra a la anterior
+        lote = Venta.query.filter_by(cliente_documento=DOCUMENTO).order_by(Venta.id.desc()).first()
+        self.client.post('/api/ventas/anular', headers=self.headers,
+                         json={'venta_ids': [lote.id]})
+        data = json.loads(self._resumen().data)['data']
+        self.assertEqual((data['total'], data['cantidad_ventas']), (50.0, 2))
+        self.assertEqual(data['ultima_compra'], ultima['fecha'])
+
+        self.client.delete(f"/api/ventas/{ultima['id']}", headers=self.headers)
+        self.client.delete(f"/api/ventas/{primera['id']}", headers=self.headers)
+        self.assertEqual(self._resumen().status_code, 404)
+
+    def test_reconstruir_coincide_con_incremental(self):
+        """Test reconstruir desde ventas da el mismo resumen"""
+        self._vender(2)
+        self._vender(1)
+        self._vender(7, documento='99999999')
+        incremental = {r.cliente_documento: r.to_dict() for r in ClienteResumen.query.all()}
+
+        self.assertEqual(ClienteResumenRepository.reconstruir(), 2)
+        db.session.expire_all()
+        self.assertEqual({r.cliente_documento: r.to_dict() for r in ClienteResumen.query.all()},
+                         incremental)
+
+    def test_resumen_lee_una_fila(self):
+        """Test el resumen no recorre las ventas del cliente"""
+        self._vender(2)
+        sentencias = []
+        def capturar(conn, cursor, statement, params, context, executemany):
+            sentencias.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capturar)
+        try:
+            response = self._resumen()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capturar)
+        self.assertEqual(response.status_code, 200)
+        sentencias = [s for s in sentencias if 'FROM usuarios' not in s]
+        self.assertEqual(len(sentencias), 1)
+        self.assertIn('FROM clientes_resumen', sentencias[0])
+
+    def test_historial_por_cursor(self):
+        """Test el historial del cliente se recorre por cursor sin repetir ni saltar"""
+        base = datetime(2026, 1, 1, 10)
+        esperadas = [self._historial(base + timedelta(days=i // 2), 10 + i) for i in range(7)]
+        self._historial(base + timedelta(days=1), 99, documento='99999999')
+        esperadas.reverse()
+
+        vistas, cursor = [], ''
+        while True:
+            response = self.client.get(f'/api/ventas/cliente/{DOCUMENTO}?cursor={cursor}&limit=3',
+                                       headers=self.headers)
+            self.assertEqual(response.status_code, 200, response.data)
+            data = json.loads(response.data)
+            vistas.extend(v['id'] for v in data['data'])
+            if not data['pagination']['has_next']:
+                break
+            cursor = data['pagination']['next_cursor']
+        self.assertEqual(vistas, esperadas)
+
+        response = self.client.get(f'/api/ventas/cliente/{DOCUMENTO}?cursor=xyz',
+                                   headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_indice_cliente(self):
+        """Test ventas tiene el índice (cliente_documento, fecha, id)"""
+        indices = {i.name: [c.name for c in i.columns] for i in Venta.__table__.indexes}
+        self.assertEqual(indices['idx_venta_cliente_fecha'], ['cliente_documento', 'fecha', 'id'])
+
+    def test_documento_invalido(self):
+        """Test documento corto devuelve 400"""
+        self.assertEqual(self._resumen('123').status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Tests para GET condicional (ETag / Last-Modified) en productos y categorías
+"""
+import unittest
+import json
+import time
+from unittest.mock import patch
+from email.utils import format_datetime
+from datetime import timedelta
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria
+
+class TestConditionalGet(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        db.session.add(self.admin_user)
+
+        self.categoria = Categoria(nombre='Herramientas')
+        db.session.add(self.categoria)
+        db.session.flush()
+        self.producto = Producto(nombre='Martillo', precio=25, stock=10, categoria_id=self.categoria.id)
+        db.session.add(self.producto)
+        db.session.commit()
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _get(self, url, **headers):
+        return self.client.get(url, headers={**self.headers, **headers})
+
+    def test_304_con_if_none_match(self):
+        """Test el ETag devuelto permite revalidar sin ejecutar la vista"""
+        response = self._get('/api/productos')
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        self.assertIn('Last-Modified', response.headers)
+        self.assertEqual(response.headers['Cache-Control'], 'private, no-cache')
+
+        with patch('app.application.use_cases.producto_use_cases.GetAllProductosUseCase.execute') as execute:
+            response = self._get('/api/productos', **{'If-None-Match': etag})
+            execute.assert_not_called()
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+
+    def test_etag_cambia_con_parametros_y_escrituras(self):
+        """Test el ETag depende de la URL y de la versión de las tablas"""
+        etag = self._get('/api/productos').headers['ETag']
+        self.assertNotEqual(self._get('/api/productos?per_page=5').headers['ETag'], etag)
+
+        # Un cambio de categoría invalida también el listado de productos
+        self.categoria.descripcion = 'Manuales'
+        db.session.commit()
+        response = self._get('/api/productos', **{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_if_modified_since(self):
+        """Test If-Modified-Since sin If-None-Match"""
+        # Último commit hace unos segundos: el Last-Modified enviado es el real
+        with patch('app.infrastructure.cache.change_tracker.change_tracker.ultima_modificacion',
+                   return_value=time.time() - 10.5):
+            response = self._get(f'/api/productos/{self.producto.id}')
+            last_modified = response.last_modified
+
+            response = self._get(f'/api/productos/{self.producto.id}',
+                                 **{'If-Modified-Since': response.headers['Last-Modified']})
+            self.assertEqual(response.status_code, 304)
+
+            anterior = format_datetime(last_modified - timedelta(seconds=5), usegmt=True)
+            response = self._get(f'/api/productos/{self.producto.id}', **{'If-Modified-Since': anterior})
+            self.assertEqual(response.status_code, 200)
+
+    def test_if_modified_since_commit_en_el_mismo_segundo(self):
+        """Test un commit posterior a la respuesta nunca se responde con 304"""
+        response = self._get(f'/api/productos/{self.producto.id}')
+        self.assertLessEqual(response.last_modified.timestamp(), time.time())
+
+        self.producto.stock = 4
+        db.session.commit()
+        response = self._get(f'/api/productos/{self.producto.id}',
+                             **{'If-Modified-Since': response.headers['Last-Modified']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['data']['stock'], 4)
+
+    def test_categorias(self):
+        """Test categorías: 304 hasta que cambia un producto (afecta productos_count)"""
+        etag = self._get('/api/categorias').headers['ETag']
+        response = self._get('/api/categorias', **{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        self.client.post('/api/productos', headers=self.headers, json={
+            'nombre': 'Sierra', 'precio': 40, 'stock': 3, 'categoria_id': self.categoria.id
+        })
+        response = self._get('/api/categorias', **{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_errores_sin_etag(self):
+        """Test las respuestas de error no llevan ETag"""
+        response = self._get('/api/productos/9999')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response.headers)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+"""
+Tests de las estadísticas del dashboard (consultas agregadas y caché)
+"""
+import threading
+import time
+import unittest
+import json
+from datetime import datetime, timedelta
+from unittest import mock
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria, Proveedor, Venta, DetalleVenta
+from app.repositories.venta_diaria import VentaDiariaRepository
+from app.infrastructure.cache import VersionedCache, change_tracker
+
+
+class TestDashboardStats(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        self.categoria = Categoria(nombre='Ferretería')
+        db.session.add_all([
+            self.admin_user, self.categoria,
+            Proveedor(nombre='Activo', contacto='Ana', estado='activo'),
+            Proveedor(nombre='Inactivo', contacto='Luis', estado='inactivo'),
+        ])
+        db.session.flush()
+
+        self.martillo = Producto(nombre='Martillo', precio=10, stock=100, stock_minimo=5,
+                                 categoria_id=self.categoria.id)
+        db.session.add_all([
+            self.martillo,
+            Producto(nombre='Sierra', precio=20, stock=2, stock_minimo=5, categoria_id=self.categoria.id),
+            Producto(nombre='Clavo', precio=1, stock=0, stock_minimo=5, categoria_id=self.categoria.id),
+        ])
+        db.session.flush()
+
+        # Ventas del mes anterior cargadas como historial
+        inicio_mes = datetime.now().replace(day=1, hour=12, minute=0, second=0, microsecond=0)
+        for _ in range(2):
+            venta = Venta(usuario_id=self.admin_user.id, total=50,
+                          fecha=inicio_mes - timedelta(days=3))
+            db.session.add(venta)
+            db.session.flush()
+            db.session.add(DetalleVenta(venta_id=venta.id, producto_id=self.martillo.id,
+                                        cantidad=5, precio_unitario=10, subtotal=50))
+        db.session.commit()
+        VentaDiariaRepository.reconstruir()
+        self.martillo_id = self.martillo.id
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _stats(self):
+        """Devuelve (estadísticas, sentencias ejecutadas fuera de la autenticación)"""
+        db.session.expire_all()
+        sentencias = []
+        def capturar(conn, cursor, statement, params, context, executemany):
+            sentencias.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capturar)
+        try:
+            response = self.client.get('/api/dashboard/stats', headers=self.headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capturar)
+        self.assertEqual(response.status_code, 200, response.data)
+        return json.loads(response.data), [s for s in sentencias if 'FROM usuarios' not in s]
+
+    def _vender(self):
+        response = self.client.post('/api/ventas', headers=self.headers, json={
+            'detalles': [{'producto_id': self.martillo_id, 'cantidad': 3}]
+        })
+        self.assertEqual(response.status_code, 201)
+
+    def test_valores_en_dos_consultas(self):
+        """Test las cifras se calculan con a lo sumo dos consultas"""
+        self._vender()
+        self.client.post('/api/compras', headers=self.headers, json={
+            'producto_id': self.martillo_id, 'cantidad': 10, 'precio_unitario': 4
+        })
+        stats, sentencias = self._stats()
+
+        self.assertLessEqual(len(sentencias), 2)
+        self.assertEqual(stats['total_productos'], 3)
+        self.assertEqual(stats['productos_stock_bajo'], 2)
+        self.assertEqual(stats['productos_sin_stock'], 1)
+        self.assertEqual(stats['proveedores_activos'], 1)
+        self.assertEqual(stats['ventas_mes'], 1)
+        self.assertEqual(stats['ventas_mes_anterior'], 2)
+        self.assertEqual(stats['cambio_ventas'], -50.0)
+        self.assertEqual(stats['ingresos_mes'], 30.0)
+        self.assertEqual(stats['ingresos_mes_anterior'], 100.0)
+        self.assertEqual(stats['compras_mes'], 1)
+        self.assertEqual(stats['gastos_mes'], 40.0)
+        self.assertEqual(stats['margen_mes'], -10.0)
+
+    def test_cache_e_invalidacion(self):
+        """Test las lecturas repetidas no consultan la base y las escrituras invalidan"""
+        primera, _ = self._stats()
+        segunda, sentencias = self._stats()
+        self.assertEqual(segunda, primera)
+        self.assertEqual(sentencias, [])
+
+        self._vender()
+        stats, sentencias = self._stats()
+        self.assertTrue(sentencias)
+        self.assertEqual(stats['ventas_mes'], primera['ventas_mes'] + 1)
+
+        self.client.post('/api/compras', headers=self.headers, json={
+            'producto_id': self.martillo_id, 'cantidad': 1, 'precio_unitario': 4
+        })
+        self.assertEqual(self._stats()[0]['compras_mes'], 1)
+
+        producto = db.session.get(Producto, self.martillo_id)
+        producto.stock = 0
+        db.session.commit()
+        self.assertEqual(self._stats()[0]['productos_sin_stock'], 2)
+
+    def test_tablas_rastreadas_al_iniciar(self):
+        """Test las tablas del dashboard publican versión sin haber leído el dashboard"""
+        from app.api_routes import _TABLAS_DASHBOARD
+        for tabla in _TABLAS_DASHBOARD:
+            self.assertTrue(change_tracker.rastreada(tabla), tabla)
+
+        version = change_tracker.version('proveedores')
+        db.session.add(Proveedor(nombre='Nuevo', contacto='Eva', estado='activo'))
+        db.session.commit()
+        self.assertEqual(change_tracker.version('proveedores'), version + 1)
+
+        with self.assertRaises(ValueError):
+            VersionedCache(change_tracker).obtener('prueba', ('sin_rastrear',), lambda: 1)
+
+    def test_ttl_corto(self):
+        """Test el valor se guarda con el TTL configurado"""
+        self.app.config['DASHBOARD_STATS_TTL'] = 7
+        with mock.patch('app.extensions.cache.set') as guardar:
+            self._stats()
+        self.assertTrue(any(llamada.kwargs.get('timeout') == 7 for llamada in guardar.call_args_list))
+
+
+class TestVersionedCacheConcurrente(unittest.TestCase):
+    """Fallos de caché simultáneos sobre la misma clave"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_un_solo_calculo(self):
+        """Test varios hilos que fallan a la vez comparten un único cálculo"""
+        versioned_cache = VersionedCache(change_tracker)
+        hilos_total = 8
+        barrera = threading.Barrier(hilos_total)
+        calculos, resultados = [], []
+
+        def calcular():
+            calculos.append(1)
+            time.sleep(0.1)
+            return {'valor': 42}
+
+        def leer():
+            with self.app.app_context():
+                barrera.wait()
+                resultados.append(versioned_cache.obtener('prueba:single-flight', ('productos',), calcular))
+
+        hilos = [threading.Thread(target=leer) for _ in range(hilos_total)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(len(calculos), 1)
+        self.assertEqual(resultados, [{'valor': 42}] * hilos_total)
+
+    def test_espera_a_otro_worker(self):
+        """Test si otro worker está calculando se espera su valor"""
+        from app.extensions import cache
+        versioned_cache = VersionedCache(change_tracker, espera=2, intervalo_espera=0.01)
+        clave = 'vcache:prueba:worker:productos={}'.format(change_tracker.version('productos'))
+        cache.add(clave + ':calculando', 1, timeout=2)
+
+        threading.Timer(0.1, lambda: cache.set(clave, 'de otro worker')).start()
+        valor = versioned_cache.obtener('prueba:worker', ('productos',), lambda: 'propio')
+        self.assertEqual(valor, 'de otro worker')
+
+if __name__ == '__main__':
+    unittest.main()
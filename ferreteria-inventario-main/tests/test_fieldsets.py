@@ -0,0 +1,132 @@
+"""
+Tests para sparse fieldsets (?fields=) en los endpoints de listado
+"""
+import unittest
+import json
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria, Proveedor, Venta, DetalleVenta, Compra
+from app.utils.fieldsets import parse_fields
+
+class TestFieldsets(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        db.session.add(self.admin_user)
+
+        categoria = Categoria(nombre='Herramientas')
+        proveedor = Proveedor(nombre='Proveedor Uno', contacto='Juan', telefono='555-0101')
+        db.session.add_all([categoria, proveedor])
+        db.session.flush()
+
+        self.martillo = Producto(nombre='Martillo', precio=25.5, stock=10, categoria_id=categoria.id,
+                                 proveedor_id=proveedor.id, descripcion='Mango de madera')
+        self.sierra = Producto(nombre='Sierra', precio=40, stock=3, categoria_id=categoria.id)
+        db.session.add_all([self.martillo, self.sierra])
+        db.session.flush()
+
+        for cantidad in (1, 2, 3):
+            venta = Venta(total=25.5 * cantidad, usuario_id=self.admin_user.id,
+                          cliente_nombre=f'Cliente {cantidad}')
+            venta.detalles.append(DetalleVenta(producto_id=self.martillo.id, cantidad=cantidad,
+                                               precio_unitario=25.5, subtotal=25.5 * cantidad))
+            db.session.add(venta)
+        db.session.add(Compra(producto_id=self.sierra.id, cantidad=5, precio_unitario=30, total=150,
+                              proveedor_id=proveedor.id, usuario_id=self.admin_user.id))
+        db.session.commit()
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _get(self, url):
+        response = self.client.get(url, headers=self.headers)
+        return response, json.loads(response.data)
+
+    def _capturar_sql(self, url):
+        sentencias = []
+        def capturar(conn, cursor, statement, params, context, executemany):
+            sentencias.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capturar)
+        try:
+            response, data = self._get(url)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capturar)
+        return response, data, sentencias
+
+    def test_parse_fields(self):
+        """Test id siempre incluido, orden y duplicados"""
+        self.assertIsNone(parse_fields(None, ['id', 'nombre']))
+        self.assertIsNone(parse_fields('  ', ['id', 'nombre']))
+        self.assertEqual(parse_fields('nombre,nombre', ['id', 'nombre']), ('id', 'nombre'))
+        with self.assertRaises(ValueError):
+            parse_fields('nombre,password_hash', ['id', 'nombre'])
+
+    def test_productos_desde_catalogo(self):
+        """Test proyección de productos servida por el snapshot del catálogo"""
+        response, data = self._get('/api/productos?fields=nombre,precio,stock')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['data']['items'], [
+            {'id': self.martillo.id, 'nombre': 'Martillo', 'precio': 25.5, 'stock': 10},
+            {'id': self.sierra.id, 'nombre': 'Sierra', 'precio': 40.0, 'stock': 3},
+        ])
+
+        _, data = self._get('/api/productos?cursor=&limit=1&fields=nombre')
+        self.assertEqual(data['data']['items'], [{'id': self.martillo.id, 'nombre': 'Martillo'}])
+        self.assertTrue(data['data']['pagination']['has_next'])
+
+    def test_productos_solo_columnas_pedidas(self):
+        """Test columnas fuera del snapshot se consultan sin JOIN a relaciones"""
+        response, data, sentencias = self._capturar_sql(
+            '/api/productos?cursor=&fields=nombre,created_at')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(data['data']['items'][0]), {'id', 'nombre', 'created_at'})
+
+        consulta = [s for s in sentencias if 'FROM productos' in s]
+        self.assertEqual(len(consulta), 1)
+        self.assertNotIn('proveedores', consulta[0])
+        self.assertNotIn('descripcion', consulta[0])
+
+    def test_campo_desconocido(self):
+        """Test un campo que no es columna devuelve 400"""
+        response, _ = self._get('/api/productos?fields=nombre,categoria')
+        self.assertEqual(response.status_code, 400)
+        response, _ = self._get('/api/ventas?fields=detalles')
+        self.assertEqual(response.status_code, 400)
+
+    def test_ventas_con_fields(self):
+        """Test ventas proyectadas, con límite en SQL y sin detalles"""
+        response, data, sentencias = self._capturar_sql('/api/ventas?fields=total,cliente_nombre&limit=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(data['data'][0], {'id': 1, 'total': 25.5, 'cliente_nombre': 'Cliente 1'})
+        self.assertFalse([s for s in sentencias if 'detalle_venta' in s or 'FROM usuarios' in s])
+
+    def test_compras_con_fields(self):
+        """Test compras proyectadas sin producto, proveedor ni usuario"""
+        response, data = self._get('/api/compras?fields=producto_id,total')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['data'], [{'id': 1, 'producto_id': self.sierra.id, 'total': 150.0}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+"""
+Tests de Idempotency-Key en la creación de ventas y compras
+"""
+import os
+import tempfile
+import threading
+import unittest
+import json
+from datetime import datetime, timedelta
+from unittest import mock
+from sqlalchemy import event
+from app import create_app, db
+from app.config import config, TestingConfig
+from app.models import Usuario, Producto, Categoria, Venta, Compra, ClaveIdempotencia
+
+
+class _BaseIdempotencia(unittest.TestCase):
+    def _crear_datos(self):
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        self.categoria = Categoria(nombre='Ferretería')
+        db.session.add_all([self.admin_user, self.categoria])
+        db.session.flush()
+
+        self.producto = Producto(nombre='Martillo', precio=10, stock=50, stock_minimo=1,
+                                 categoria_id=self.categoria.id)
+        db.session.add(self.producto)
+        db.session.commit()
+        self.producto_id = self.producto.id
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def _venta(self, clave=None, cantidad=2, client=None):
+        headers = dict(self.headers)
+        if clave:
+            headers['Idempotency-Key'] = clave
+        return (client or self.client).post('/api/ventas', headers=headers, json={
+            'detalles': [{'producto_id': self.producto_id, 'cantidad': cantidad}]
+        })
+
+    def _stock(self):
+        db.session.expire_all()
+        return db.session.get(Producto, self.producto_id).stock
+
+
+class TestIdempotencia(_BaseIdempotencia):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+        self._crear_datos()
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_reintento_devuelve_respuesta_original(self):
+        """Test el reintento no crea otra venta ni toca productos"""
+        primera = self._venta('caja1-0001')
+        self.assertEqual(primera.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', primera.headers)
+
+        sentencias = []
+        def capturar(conn, cursor, statement, params, context, executemany):
+            sentencias.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capturar)
+        try:
+            segunda = self._venta('caja1-0001')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capturar)
+
+        self.assertEqual(segunda.status_code, 201)
+        self.assertEqual(segunda.headers['Idempotent-Replayed'], 'true')
+        self.assertEqual(json.loads(segunda.data), json.loads(primera.data))
+        self.assertFalse([s for s in sentencias if 'productos' in s])
+        self.assertEqual(Venta.query.count(), 1)
+        self.assertEqual(self._stock(), 48)
+
+    def test_sin_clave_no_cambia_el_comportamiento(self):
+        """Test sin header cada POST crea una venta"""
+        self._venta()
+        self._venta()
+        self.assertEqual(Venta.query.count(), 2)
+        self.assertEqual(ClaveIdempotencia.query.count(), 0)
+
+    def test_clave_con_otro_cuerpo(self):
+        """Test reutilizar la clave con otro cuerpo devuelve 422"""
+        self._venta('caja1-0002', cantidad=1)
+        response = self._venta('caja1-0002', cantidad=3)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Venta.query.count(), 1)
+
+    def test_errores_de_negocio_se_repiten(self):
+        """Test un rechazo 4xx también se guarda y se devuelve igual"""
+        primera = self._venta('caja1-0003', cantidad=500)
+        self.assertEqual(primera.status_code, 400)
+        segunda = self._venta('caja1-0003', cantidad=500)
+        self.assertEqual(segunda.status_code, 400)
+        self.assertEqual(segunda.headers['Idempotent-Replayed'], 'true')
+
+    def test_error_de_servidor_libera_la_clave(self):
+        """Test una respuesta 5xx no se guarda y el reintento se ejecuta"""
+        with mock.patch('app.application.use_cases.venta_use_cases.CreateVentaUseCase.execute',
+                        side_effect=RuntimeError('caída')):
+            self.assertEqual(self._venta('caja1-0004').status_code, 500)
+        self.assertEqual(ClaveIdempotencia.query.count(), 0)
+        self.assertEqual(self._venta('caja1-0004').status_code, 201)
+        self.assertEqual(Venta.query.count(), 1)
+
+    def test_clave_vencida(self):
+        """Test una clave vencida se reemplaza y la petición se ejecuta"""
+        self._venta('caja1-0005')
+        ClaveIdempotencia.query.update({'expira_en': datetime.now() - timedelta(seconds=1)})
+        db.session.commit()
+        response = self._venta('caja1-0005')
+        self.assertNotIn('Idempotent-Replayed', response.headers)
+        self.assertEqual(Venta.query.count(), 2)
+
+    def test_compra_idempotente(self):
+        """Test la creación de compras también respeta la clave"""
+        headers = dict(self.headers, **{'Idempotency-Key': 'compra-0001'})
+        cuerpo = {'producto_id': self.producto_id, 'cantidad': 10, 'precio_unitario': 8}
+        primera = self.client.post('/api/compras', headers=headers, json=cuerpo)
+        segunda = self.client.post('/api/compras', headers=headers, json=cuerpo)
+        self.assertEqual(primera.status_code, 201)
+        self.assertEqual(json.loads(segunda.data), json.loads(primera.data))
+        self.assertEqual(Compra.query.count(), 1)
+        self.assertEqual(self._stock(), 60)
+
+    def test_clave_demasiado_larga(self):
+        """Test el header se valida"""
+        self.assertEqual(self._venta('x' * 101).status_code, 400)
+
+
+class TestIdempotenciaConcurrente(_BaseIdempotencia):
+    """Duplicados simultáneos, con una base en archivo compartida por los hilos"""
+
+    def setUp(self):
+        """Configurar test con una base en archivo"""
+        descriptor, self.ruta_db = tempfile.mkstemp(suffix='.db')
+        os.close(descriptor)
+
+        class ConcurrenciaConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f'sqlite:///{self.ruta_db}'
+            SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30}}
+            CATALOG_PRELOAD = False
+
+        with mock.patch.dict(config, {'concurrencia': ConcurrenciaConfig}):
+            self.app = create_app('concurrencia')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+        self._crear_datos()
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+        self.app_context.pop()
+        os.remove(self.ruta_db)
+
+    def test_duplicados_en_vuelo_esperan(self):
+        """Test reintentos simultáneos crean una sola venta y reciben la misma respuesta"""
+        hilos_total = 6
+        barrera = threading.Barrier(hilos_total)
+        respuestas = []
+        candado = threading.Lock()
+
+        def reintentar():
+            client = self.app.test_client()
+            barrera.wait()
+            response = self._venta('caja2-0001', client=client)
+            with candado:
+                respuestas.append((response.status_code, json.loads(response.data)))
+
+        hilos = [threading.Thread(target=reintentar) for _ in range(hilos_total)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual([status for status, _ in respuestas], [201] * hilos_total)
+        self.assertEqual(len({json.dumps(cuerpo, sort_keys=True) for _, cuerpo in respuestas}), 1)
+        self.assertEqual(Venta.query.count(), 1)
+        self.assertEqual(self._stock(), 48)
+
+if __name__ == '__main__':
+    unittest.main()
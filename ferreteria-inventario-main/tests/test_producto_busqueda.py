@@ -0,0 +1,96 @@
+"""
+Tests para la búsqueda de productos con índice de texto completo
+"""
+import unittest
+import json
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria
+from app.repositories.producto import ProductoRepository
+from app.infrastructure.search import producto_fulltext
+
+class TestProductoBusqueda(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        db.session.add(self.admin_user)
+
+        categoria = Categoria(nombre='Herramientas')
+        db.session.add(categoria)
+        db.session.flush()
+
+        self.productos = {
+            'martillo': Producto(nombre='Martillo de carpintero', precio=25, stock=10,
+                                 categoria_id=categoria.id, codigo_barras='7701234567890'),
+            'clavos': Producto(nombre='Caja de clavos', precio=5, stock=100,
+                               categoria_id=categoria.id,
+                               descripcion='Ideal para usar con martillo'),
+            'destornillador': Producto(nombre='Destornillador eléctrico', precio=80, stock=5,
+                                       categoria_id=categoria.id),
+        }
+        db.session.add_all(self.productos.values())
+        db.session.commit()
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _buscar(self, query):
+        response = self.client.get(f'/api/productos/search?{query}', headers=self.headers)
+        return response, json.loads(response.data)
+
+    def test_indice_disponible(self):
+        """Test create_all crea el índice FTS5"""
+        self.assertTrue(producto_fulltext.disponible(db.session))
+
+    def test_ranking_por_relevancia(self):
+        """Test coincidencia en el nombre antes que en la descripción"""
+        response, data = self._buscar('q=martillo')
+        self.assertEqual(response.status_code, 200)
+        nombres = [p['nombre'] for p in data['data']]
+        self.assertEqual(nombres, ['Martillo de carpintero', 'Caja de clavos'])
+
+    def test_prefijo_acentos_y_codigo_barras(self):
+        """Test búsqueda por prefijo, sin acentos y por código de barras"""
+        _, data = self._buscar('q=electri')
+        self.assertEqual([p['nombre'] for p in data['data']], ['Destornillador eléctrico'])
+
+        productos = ProductoRepository.search_products('7701234567890')
+        self.assertEqual([p.id for p in productos], [self.productos['martillo'].id])
+
+    def test_paginacion(self):
+        """Test los resultados se limitan y paginan"""
+        _, data = self._buscar('q=martillo&per_page=1&page=2')
+        self.assertEqual([p['nombre'] for p in data['data']], ['Caja de clavos'])
+
+    def test_indice_sincronizado(self):
+        """Test los triggers mantienen el índice al actualizar y eliminar"""
+        self.productos['clavos'].nombre = 'Caja de tornillos'
+        db.session.delete(self.productos['destornillador'])
+        db.session.commit()
+
+        self.assertEqual(ProductoRepository.search_products('clavos'), [])
+        self.assertEqual(ProductoRepository.search_products('destornillador'), [])
+        self.assertEqual(len(ProductoRepository.search_products('tornillos')), 1)
+
+if __name__ == '__main__':
+    unittest.main()
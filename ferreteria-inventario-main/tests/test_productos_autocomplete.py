@@ -0,0 +1,125 @@
+"""
+Tests para el autocompletado de productos por prefijo
+"""
+import unittest
+import json
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria
+from app.infrastructure.search.autocomplete_index import AutocompleteIndex
+from app.infrastructure.cache.catalog_snapshot import CatalogSnapshot, ProductoRecord
+
+def _snapshot(nombres):
+    registros = tuple(
+        ProductoRecord(i, nombre, 1.0, 1, 1, 1, None, None, None)
+        for i, nombre in enumerate(nombres, start=1)
+    )
+    return CatalogSnapshot(1, registros, {r.id: r for r in registros})
+
+class TestProductosAutocomplete(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        db.session.add(self.admin_user)
+
+        categoria = Categoria(nombre='Ferretería')
+        db.session.add(categoria)
+        db.session.flush()
+        self.categoria_id = categoria.id
+
+        self.martillo = Producto(nombre='Martillo de goma', precio=30, stock=8,
+                                 categoria_id=categoria.id)
+        self.masilla = Producto(nombre='Masilla', precio=12, stock=20, categoria_id=categoria.id)
+        self.electrico = Producto(nombre='Éléctrico cable 2mm', precio=5, stock=100,
+                                  categoria_id=categoria.id)
+        db.session.add_all([self.martillo, self.masilla, self.electrico])
+        db.session.commit()
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _autocompletar(self, query):
+        response = self.client.get(f'/api/productos/autocomplete?{query}', headers=self.headers)
+        return response, json.loads(response.data)
+
+    def test_prefijo_orden_y_limite(self):
+        """Test coincidencias por prefijo en orden alfabético, limitadas"""
+        response, data = self._autocompletar('prefix=ma')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['nombre'] for p in data['data']], ['Martillo de goma', 'Masilla'])
+        self.assertTrue({'id', 'nombre', 'precio', 'stock'} <= set(data['data'][0]))
+
+        _, data = self._autocompletar('prefix=ma&limit=1')
+        self.assertEqual([p['id'] for p in data['data']], [self.martillo.id])
+
+        _, data = self._autocompletar('prefix=martillo  DE')
+        self.assertEqual([p['id'] for p in data['data']], [self.martillo.id])
+
+    def test_sin_acentos_ni_mayusculas(self):
+        """Test el prefijo se normaliza igual que los nombres"""
+        _, data = self._autocompletar('prefix=ELEC')
+        self.assertEqual([p['id'] for p in data['data']], [self.electrico.id])
+
+    def test_prefijo_vacio(self):
+        """Test sin prefijo devuelve 400"""
+        response, _ = self._autocompletar('prefix=%20')
+        self.assertEqual(response.status_code, 400)
+
+    def test_sin_consultas_y_actualizacion_incremental(self):
+        """Test las lecturas no consultan la base y reflejan las escrituras"""
+        self._autocompletar('prefix=ma')
+        sentencias = []
+        def capturar(conn, cursor, statement, params, context, executemany):
+            sentencias.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capturar)
+        try:
+            self._autocompletar('prefix=mas')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capturar)
+        self.assertEqual([s for s in sentencias if 'productos' in s], [])
+
+        self.masilla.nombre = 'Pintura latex'
+        db.session.add(Producto(nombre='Manguera', precio=50, stock=2, categoria_id=self.categoria_id))
+        db.session.commit()
+
+        _, data = self._autocompletar('prefix=ma')
+        self.assertEqual([p['nombre'] for p in data['data']], ['Manguera', 'Martillo de goma'])
+        _, data = self._autocompletar('prefix=pint')
+        self.assertEqual([p['id'] for p in data['data']], [self.masilla.id])
+
+    def test_indice_actualizar(self):
+        """Test actualizar equivale a reconstruir"""
+        indice = AutocompleteIndex()
+        indice.reconstruir(_snapshot(['Sierra', 'Serrucho', 'Sellador']))
+        self.assertEqual(indice.buscar('se'), [3, 2])
+
+        nuevo = _snapshot(['Sierra', 'Segueta', 'Sellador', 'Sierra circular'])
+        indice.actualizar(nuevo, [2, 4])
+        esperado = AutocompleteIndex()
+        esperado.reconstruir(nuevo)
+        self.assertEqual(indice._entradas, esperado._entradas)
+        self.assertEqual(indice.buscar('sierra'), [1, 4])
+
+if __name__ == '__main__':
+    unittest.main()
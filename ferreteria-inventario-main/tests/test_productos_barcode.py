@@ -0,0 +1,99 @@
+"""
+Tests para la consulta de productos por código de barras
+"""
+import unittest
+import json
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria
+
+class TestProductosBarcode(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        db.session.add(self.admin_user)
+
+        categoria = Categoria(nombre='Herramientas')
+        db.session.add(categoria)
+        db.session.flush()
+
+        self.martillo = Producto(nombre='Martillo', precio=25.5, stock=10,
+                                 categoria_id=categoria.id, codigo_barras='7701234567890')
+        self.taladro = Producto(nombre='Taladro', precio=150, stock=3,
+                                categoria_id=categoria.id, codigo_barras='7709876543210')
+        self.sin_codigo = Producto(nombre='Clavos', precio=5, stock=100,
+                                   categoria_id=categoria.id)
+        db.session.add_all([self.martillo, self.taladro, self.sin_codigo])
+        db.session.commit()
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_buscar_por_codigo(self):
+        """Test escanear un código devuelve el resumen del producto"""
+        response = self.client.get('/api/productos/barcode/7701234567890', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)['data']
+        self.assertEqual(data['id'], self.martillo.id)
+        self.assertEqual(data['precio'], 25.5)
+        self.assertEqual(data['stock'], 10)
+
+    def test_codigo_inexistente(self):
+        """Test un código no registrado devuelve 404"""
+        response = self.client.get('/api/productos/barcode/0000000000000', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_lote_de_codigos(self):
+        """Test resolver varios códigos en una llamada"""
+        response = self.client.post('/api/productos/barcode/batch', headers=self.headers,
+            json={'codigos': ['7701234567890', '7709876543210', '123']})
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)['data']
+        self.assertEqual(set(data['encontrados']), {'7701234567890', '7709876543210'})
+        self.assertEqual(data['no_encontrados'], ['123'])
+
+        response = self.client.post('/api/productos/barcode/batch', headers=self.headers,
+            json={'codigos': []})
+        self.assertEqual(response.status_code, 400)
+
+    def test_indice_se_invalida_con_escrituras(self):
+        """Test cambios de código, stock y bajas se reflejan en el índice"""
+        self.client.get('/api/productos/barcode/7701234567890', headers=self.headers)
+
+        self.martillo.codigo_barras = '7700000000001'
+        self.martillo.stock = 4
+        self.sin_codigo.codigo_barras = '7700000000002'
+        db.session.delete(self.taladro)
+        db.session.commit()
+
+        response = self.client.get('/api/productos/barcode/7701234567890', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get('/api/productos/barcode/7700000000001', headers=self.headers)
+        self.assertEqual(json.loads(response.data)['data']['stock'], 4)
+        response = self.client.get('/api/productos/barcode/7700000000002', headers=self.headers)
+        self.assertEqual(json.loads(response.data)['data']['id'], self.sin_codigo.id)
+        response = self.client.get('/api/productos/barcode/7709876543210', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
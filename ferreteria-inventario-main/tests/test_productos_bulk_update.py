@@ -0,0 +1,128 @@
+"""
+Tests para el ajuste masivo de precios y stock mínimo
+"""
+import unittest
+import json
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria, Proveedor
+from app.models.auditoria import AuditoriaLog
+from app.infrastructure.cache import catalog_store
+
+class TestProductosBulkUpdate(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        db.session.add(self.admin_user)
+
+        self.herramientas = Categoria(nombre='Herramientas')
+        self.pinturas = Categoria(nombre='Pinturas')
+        self.proveedor = Proveedor(nombre='Proveedor Uno', contacto='Juan', telefono='555-0101')
+        db.session.add_all([self.herramientas, self.pinturas, self.proveedor])
+        db.session.flush()
+
+        self.martillo = Producto(nombre='Martillo', precio=100, stock=5, stock_minimo=2,
+                                 categoria_id=self.herramientas.id, proveedor_id=self.proveedor.id)
+        self.sierra = Producto(nombre='Sierra', precio=50, stock=5, stock_minimo=2,
+                               categoria_id=self.herramientas.id)
+        self.latex = Producto(nombre='Látex', precio=10, stock=5, stock_minimo=2,
+                              categoria_id=self.pinturas.id, proveedor_id=self.proveedor.id)
+        db.session.add_all([self.martillo, self.sierra, self.latex])
+        db.session.commit()
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _bulk(self, body):
+        response = self.client.patch('/api/productos/bulk', headers=self.headers, json=body)
+        return response, json.loads(response.data)
+
+    def _precios(self):
+        db.session.expire_all()
+        return {p.nombre: float(p.precio) for p in Producto.query.all()}
+
+    def test_porcentaje_por_categoria(self):
+        """Test aumento porcentual filtrado por categoría"""
+        response, data = self._bulk({
+            'filtro': {'categoria_id': self.herramientas.id},
+            'precio': {'tipo': 'porcentaje', 'valor': 10}
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['data']['actualizados'], 2)
+        self.assertEqual(self._precios(), {'Martillo': 110.0, 'Sierra': 55.0, 'Látex': 10.0})
+
+    def test_monto_y_stock_minimo_por_proveedor(self):
+        """Test ajuste absoluto de precio y stock mínimo fijo por proveedor"""
+        response, data = self._bulk({
+            'filtro': {'proveedor_id': self.proveedor.id},
+            'precio': {'tipo': 'monto', 'valor': -5},
+            'stock_minimo': {'tipo': 'fijo', 'valor': 7}
+        })
+        self.assertEqual(data['data']['actualizados'], 2)
+        self.assertEqual(self._precios(), {'Martillo': 95.0, 'Sierra': 50.0, 'Látex': 5.0})
+        self.assertEqual(db.session.get(Producto, self.latex.id).stock_minimo, 7)
+        self.assertEqual(db.session.get(Producto, self.sierra.id).stock_minimo, 2)
+
+    def test_un_solo_update_y_auditoria(self):
+        """Test se ejecuta un UPDATE set-based y una entrada de auditoría"""
+        sentencias = []
+        def capturar(conn, cursor, statement, params, context, executemany):
+            sentencias.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capturar)
+        try:
+            response, _ = self._bulk({
+                'filtro': {'ids': [self.martillo.id, self.latex.id]},
+                'precio': {'tipo': 'porcentaje', 'valor': -50}
+            })
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capturar)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len([s for s in sentencias if s.startswith('UPDATE productos')]), 1)
+
+        logs = AuditoriaLog.query.filter_by(accion='actualizacion_masiva_productos').all()
+        self.assertEqual(len(logs), 1)
+        self.assertEqual(logs[0].datos_nuevos['productos_afectados'], 2)
+
+        # El catálogo en memoria ve los nuevos precios
+        self.assertEqual(catalog_store.obtener().get(self.martillo.id).precio, 50.0)
+
+    def test_resultado_invalido_no_modifica_nada(self):
+        """Test si algún precio quedaría <= 0 no se actualiza ningún producto"""
+        antes = self._precios()
+        response, _ = self._bulk({
+            'filtro': {'proveedor_id': self.proveedor.id},
+            'precio': {'tipo': 'monto', 'valor': -20}
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self._precios(), antes)
+        self.assertEqual(AuditoriaLog.query.count(), 0)
+
+    def test_filtro_requerido(self):
+        """Test no se permite un ajuste sin filtro"""
+        response, _ = self._bulk({'precio': {'tipo': 'porcentaje', 'valor': 5}})
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
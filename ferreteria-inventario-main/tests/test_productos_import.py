@@ -0,0 +1,129 @@
+"""
+Tests para la importación masiva de productos (CSV / NDJSON)
+"""
+import io
+import unittest
+import json
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria
+
+class TestProductosImport(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        self.vendedor = Usuario(
+            nombre='Vendedor',
+            email='vendedor@test.com',
+            rol='vendedor'
+        )
+        self.vendedor.set_password('vendedor123')
+        db.session.add_all([self.admin_user, self.vendedor])
+
+        self.categoria = Categoria(nombre='Herramientas')
+        db.session.add(self.categoria)
+        db.session.flush()
+
+        self.martillo = Producto(nombre='Martillo', precio=20, stock=5,
+                                 categoria_id=self.categoria.id, codigo_barras='7700000000001')
+        db.session.add(self.martillo)
+        db.session.commit()
+
+        self.headers = self._login('admin@test.com', 'admin123')
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _login(self, email, password):
+        login_response = self.client.post('/api/auth/login',
+            json={'email': email, 'password': password})
+        token = json.loads(login_response.data)['data']['token']
+        return {'Authorization': f'Bearer {token}'}
+
+    def _importar(self, contenido, query='', nombre='lista.csv', headers=None):
+        return self.client.post(
+            f'/api/productos/import?{query}',
+            headers=headers or self.headers,
+            data={'archivo': (io.BytesIO(contenido.encode('utf-8')), nombre)},
+            content_type='multipart/form-data'
+        )
+
+    def test_importar_csv_con_reporte_de_errores(self):
+        """Test filas válidas se insertan/actualizan y las inválidas se reportan"""
+        cat = self.categoria.id
+        contenido = (
+            "nombre,categoria_id,precio,stock,codigo_barras\n"
+            f"Taladro,{cat},150.5,3,7700000000002\n"
+            f"Martillo,{cat},\"22,50\",8,\n"
+            f"Sierra,{cat},-1,2,\n"
+            f"Pinza,999,10,1,\n"
+            f"Taladro,{cat},140,1,\n"
+            f"Alicate,{cat},12,4,7700000000001\n"
+        )
+        response = self._importar(contenido, 'batch_size=2')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)['data']
+
+        self.assertEqual(data['procesadas'], 6)
+        self.assertEqual(data['insertadas'], 1)
+        self.assertEqual(data['actualizadas'], 1)
+        self.assertEqual(data['con_errores'], 4)
+        errores = {e['fila']: e['errores'] for e in data['errores']}
+        self.assertIn('precio', errores[4])
+        self.assertIn('categoria_id', errores[5])
+        self.assertIn('nombre', errores[6])
+        self.assertIn('codigo_barras', errores[7])
+
+        martillo = db.session.get(Producto, self.martillo.id)
+        self.assertEqual(float(martillo.precio), 22.5)
+        self.assertEqual(martillo.stock, 8)
+        taladro = Producto.query.filter_by(nombre='Taladro').one()
+        self.assertEqual(taladro.codigo_barras, '7700000000002')
+
+        # El catálogo en memoria refleja la importación
+        response = self.client.get('/api/productos/barcode/7700000000002', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+
+    def test_no_actualizar_existentes(self):
+        """Test con actualizar=false un producto existente es un error"""
+        contenido = f"nombre,categoria_id,precio\nMartillo,{self.categoria.id},30\n"
+        data = json.loads(self._importar(contenido, 'actualizar=false').data)['data']
+        self.assertEqual(data['actualizadas'], 0)
+        self.assertEqual(data['con_errores'], 1)
+
+    def test_ndjson_con_progreso(self):
+        """Test NDJSON con respuesta en streaming: un evento por lote y el resumen"""
+        lineas = [json.dumps({'nombre': f'Tornillo {i}', 'categoria_id': self.categoria.id,
+                              'precio': 1, 'stock': 100}) for i in range(5)]
+        lineas.insert(2, '{no es json')
+        response = self._importar('\n'.join(lineas), 'stream=1&batch_size=2', nombre='lista.ndjson')
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+
+        eventos = [json.loads(l) for l in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([e['tipo'] for e in eventos], ['progreso'] * 3 + ['resumen'])
+        self.assertEqual(eventos[-1]['insertadas'], 5)
+        self.assertEqual(eventos[-1]['errores'][0]['fila'], 3)
+        self.assertEqual(Producto.query.count(), 6)
+
+    def test_requiere_admin(self):
+        """Test solo el administrador puede importar"""
+        headers = self._login('vendedor@test.com', 'vendedor123')
+        response = self._importar('nombre,categoria_id,precio\n', headers=headers)
+        self.assertEqual(response.status_code, 403)
+
+if __name__ == '__main__':
+    unittest.main()
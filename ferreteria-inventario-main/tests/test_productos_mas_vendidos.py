@@ -0,0 +1,152 @@
+"""
+Tests del ranking de productos más vendidos (contadores diarios por producto)
+"""
+import unittest
+import json
+from datetime import date, datetime, timedelta
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria, Venta, DetalleVenta, ProductoVentaDiaria
+from app.repositories.venta_diaria import ProductoVentaDiariaRepository
+
+
+class TestProductosMasVendidos(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        self.categoria = Categoria(nombre='Ferretería')
+        db.session.add_all([self.admin_user, self.categoria])
+        db.session.flush()
+
+        self.productos = [
+            Producto(nombre=f'Producto {i}', precio=10 * (i + 1), stock=1000, stock_minimo=1,
+                     categoria_id=self.categoria.id)
+            for i in range(4)
+        ]
+        db.session.add_all(self.productos)
+        db.session.commit()
+        self.usuario_id = self.admin_user.id
+        self.ids = [p.id for p in self.productos]
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _vender(self, *lineas):
+        response = self.client.post('/api/ventas', headers=self.headers, json={
+            'detalles': [{'producto_id': self.ids[i], 'cantidad': cantidad} for i, cantidad in lineas]
+        })
+        self.assertEqual(response.status_code, 201, response.data)
+        return json.loads(response.data)['data']['id']
+
+    def _historial(self, dias_atras, indice, cantidad):
+        """Venta antigua insertada por fuera de la API (sin contadores)"""
+        precio = 10 * (indice + 1)
+        venta = Venta(usuario_id=self.usuario_id, total=precio * cantidad,
+                      fecha=datetime.now() - timedelta(days=dias_atras))
+        db.session.add(venta)
+        db.session.flush()
+        db.session.add(DetalleVenta(venta_id=venta.id, producto_id=self.ids[indice], cantidad=cantidad,
+                                    precio_unitario=precio, subtotal=precio * cantidad))
+        db.session.commit()
+
+    def _contadores(self):
+        db.session.expire_all()
+        return {(f.fecha, f.producto_id): (f.cantidad, float(f.ingresos))
+                for f in ProductoVentaDiaria.query.all()}
+
+    def test_ventas_y_anulaciones_actualizan_contadores(self):
+        """Test crear, vender en lote y anular mantienen los contadores por producto"""
+        self._vender((0, 2), (1, 1))
+        anulada = self._vender((0, 5))
+        self.client.post('/api/ventas/lote', headers=self.headers, json={'ventas': [
+            {'detalles': [{'producto_id': self.ids[2], 'cantidad': 3}]},
+        ]})
+        hoy = date.today()
+        self.assertEqual(self._contadores(), {
+            (hoy, self.ids[0]): (7, 70.0),
+            (hoy, self.ids[1]): (1, 20.0),
+            (hoy, self.ids[2]): (3, 90.0),
+        })
+
+        self.client.delete(f'/api/ventas/{anulada}', headers=self.headers)
+        self.assertEqual(self._contadores()[(hoy, self.ids[0])], (2, 20.0))
+
+    def test_ranking_por_ventana(self):
+        """Test el top de una ventana suma solo los días de la ventana"""
+        self._historial(40, 3, 100)   # fuera de los últimos 30 días
+        self._historial(10, 1, 6)
+        self._historial(2, 1, 4)
+        self._historial(5, 2, 9)
+        ProductoVentaDiariaRepository.reconstruir()
+        self._vender((0, 3))
+
+        response = self.client.get('/api/dashboard/productos-mas-vendidos?limit=3&dias=30',
+                                   headers=self.headers)
+        top = json.loads(response.data)
+        self.assertEqual([p['id'] for p in top], [self.ids[1], self.ids[2], self.ids[0]])
+        self.assertEqual(top[0], {'id': self.ids[1], 'nombre': 'Producto 1', 'stock': 1000,
+                                  'total_vendido': 10, 'ingresos': 200.0})
+
+        response = self.client.get('/api/reportes/productos-mas-vendidos?limit=1',
+                                   headers=self.headers)
+        self.assertEqual(json.loads(response.data), [
+            {'id': self.ids[3], 'nombre': 'Producto 3', 'total_vendido': 100, 'total_ingresos': 4000.0}
+        ])
+
+    def test_empates_y_anulados(self):
+        """Test los empates se ordenan por ingresos e id y los anulados no aparecen"""
+        self._vender((0, 2), (1, 2), (2, 1))
+        anulada = self._vender((3, 9))
+        self.client.delete(f'/api/ventas/{anulada}', headers=self.headers)
+
+        top = ProductoVentaDiariaRepository.top_productos(10)
+        self.assertEqual([p['id'] for p in top], [self.ids[1], self.ids[0], self.ids[2]])
+
+    def test_reconstruir_coincide_con_incremental(self):
+        """Test reconstruir desde detalle_venta da los mismos contadores"""
+        self._vender((0, 2), (1, 1))
+        self._vender((0, 1), (3, 4))
+        incremental = self._contadores()
+        self.assertEqual(ProductoVentaDiariaRepository.reconstruir(), 3)
+        self.assertEqual(self._contadores(), incremental)
+
+    def test_no_agrupa_detalle_venta(self):
+        """Test el ranking no consulta detalle_venta"""
+        self._vender((0, 2), (1, 1))
+        sentencias = []
+        def capturar(conn, cursor, statement, params, context, executemany):
+            sentencias.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capturar)
+        try:
+            self.client.get('/api/dashboard/productos-mas-vendidos', headers=self.headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capturar)
+        self.assertFalse([s for s in sentencias if 'detalle_venta' in s])
+        contadores = [s for s in sentencias if 'productos_ventas_diarias' in s]
+        self.assertTrue(contadores)
+        # La suma por producto la hace la base: llega una fila por producto
+        self.assertIn('GROUP BY', contadores[-1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Tests para la paginación por cursor (keyset) de productos
+"""
+import unittest
+import json
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria
+from app.utils.pagination import encode_cursor, decode_cursor
+
+class TestProductosPaginacionCursor(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        db.session.add(self.admin_user)
+
+        self.herramientas = Categoria(nombre='Herramientas')
+        self.pinturas = Categoria(nombre='Pinturas')
+        db.session.add_all([self.herramientas, self.pinturas])
+        db.session.flush()
+
+        for i in range(5):
+            db.session.add(Producto(
+                nombre=f'Herramienta {i}',
+                precio=10 + i,
+                stock=10,
+                categoria_id=self.herramientas.id
+            ))
+        for i in range(3):
+            db.session.add(Producto(
+                nombre=f'Pintura {i}',
+                precio=20 + i,
+                stock=10,
+                categoria_id=self.pinturas.id
+            ))
+        db.session.commit()
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _get(self, query):
+        response = self.client.get(f'/api/productos?{query}', headers=self.headers)
+        return response, json.loads(response.data)
+
+    def test_cursor_roundtrip(self):
+        """Test el cursor es opaco y reversible"""
+        cursor = encode_cursor(42)
+        self.assertNotIn('42', cursor)
+        self.assertEqual(decode_cursor(cursor), 42)
+        self.assertIsNone(decode_cursor(''))
+
+    def test_recorrer_todas_las_paginas(self):
+        """Test recorrer el catálogo completo siguiendo next_cursor"""
+        ids = []
+        cursor = ''
+        paginas = 0
+        while True:
+            response, data = self._get(f'cursor={cursor}&limit=3')
+            self.assertEqual(response.status_code, 200)
+            pagina = data['data']
+            ids.extend(item['id'] for item in pagina['items'])
+            paginas += 1
+            if not pagina['pagination']['has_next']:
+                break
+            cursor = pagina['pagination']['next_cursor']
+
+        self.assertEqual(paginas, 3)
+        self.assertEqual(len(ids), 8)
+        self.assertEqual(ids, sorted(ids))
+
+    def test_filtro_categoria_y_total(self):
+        """Test filtrar por categoría y pedir el total opcional"""
+        response, data = self._get(
+            f'cursor=&limit=2&categoria_id={self.pinturas.id}&include_total=true')
+        self.assertEqual(response.status_code, 200)
+        pagina = data['data']
+        self.assertEqual(len(pagina['items']), 2)
+        self.assertTrue(all(i['categoria_id'] == self.pinturas.id for i in pagina['items']))
+        self.assertEqual(pagina['pagination']['total_items'], 3)
+
+        response, data = self._get(
+            f"cursor={pagina['pagination']['next_cursor']}&limit=2&categoria_id={self.pinturas.id}")
+        pagina = data['data']
+        self.assertEqual(len(pagina['items']), 1)
+        self.assertFalse(pagina['pagination']['has_next'])
+        self.assertIsNone(pagina['pagination']['total_items'])
+
+    def test_cursor_invalido(self):
+        """Test un cursor manipulado devuelve 400"""
+        response, _ = self._get('cursor=no-es-un-cursor')
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
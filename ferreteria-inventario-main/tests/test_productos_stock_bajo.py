@@ -0,0 +1,143 @@
+"""
+Tests para el índice de productos con stock bajo
+"""
+import unittest
+import json
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria
+from app.infrastructure.cache.low_stock_index import LowStockIndex
+from app.infrastructure.cache.catalog_snapshot import CatalogSnapshot, ProductoRecord
+
+class TestProductosStockBajo(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        db.session.add(self.admin_user)
+
+        self.categoria = Categoria(nombre='Ferretería')
+        db.session.add(self.categoria)
+        db.session.flush()
+
+        self.agotado = Producto(nombre='Agotado', precio=10, stock=0, stock_minimo=5,
+                                categoria_id=self.categoria.id)
+        self.bajo = Producto(nombre='Bajo', precio=10, stock=3, stock_minimo=5,
+                             categoria_id=self.categoria.id)
+        self.justo = Producto(nombre='Justo', precio=10, stock=5, stock_minimo=5,
+                              categoria_id=self.categoria.id)
+        self.normal = Producto(nombre='Normal', precio=10, stock=50, stock_minimo=5,
+                               categoria_id=self.categoria.id)
+        db.session.add_all([self.agotado, self.bajo, self.justo, self.normal])
+        db.session.commit()
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _stock_bajo(self, query=''):
+        response = self.client.get(f'/api/productos/stock-bajo?{query}', headers=self.headers)
+        return [p['id'] for p in json.loads(response.data)['data']]
+
+    def test_orden_y_limite(self):
+        """Test los de menor stock primero, incluyendo stock == stock_minimo"""
+        self.assertEqual(self._stock_bajo(), [self.agotado.id, self.bajo.id, self.justo.id])
+        self.assertEqual(self._stock_bajo('limit=2'), [self.agotado.id, self.bajo.id])
+
+    def test_lectura_sin_recorrer_la_tabla(self):
+        """Test con el índice cargado no se consulta la tabla productos"""
+        self._stock_bajo()
+        sentencias = []
+        def capturar(conn, cursor, statement, params, context, executemany):
+            sentencias.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capturar)
+        try:
+            self._stock_bajo()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capturar)
+        self.assertEqual([s for s in sentencias if 'productos' in s], [])
+
+    def test_mutaciones_de_stock(self):
+        """Test ventas, compras, ediciones y ajustes masivos mantienen el índice"""
+        # Compra: el producto sale del conjunto
+        response = self.client.patch(f'/api/productos/{self.bajo.id}/stock', headers=self.headers,
+                                     json={'cantidad': 10, 'operacion': 'add'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._stock_bajo(), [self.agotado.id, self.justo.id])
+
+        # Venta (ORM): el producto entra al conjunto
+        self.normal.stock = 1
+        db.session.commit()
+        self.assertEqual(self._stock_bajo(), [self.agotado.id, self.normal.id, self.justo.id])
+
+        # Ajuste masivo de stock mínimo (SQL masivo)
+        response = self.client.patch('/api/productos/bulk', headers=self.headers, json={
+            'filtro': {'ids': [self.justo.id, self.normal.id]},
+            'stock_minimo': {'tipo': 'fijo', 'valor': 0}
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._stock_bajo(), [self.agotado.id])
+
+        # Eliminación
+        db.session.delete(self.agotado)
+        db.session.commit()
+        self.assertEqual(self._stock_bajo(), [])
+
+    def test_dashboard_y_exportacion(self):
+        """Test contadores, stock crítico y exportación leen el índice"""
+        response = self.client.get('/api/dashboard/stats', headers=self.headers)
+        data = json.loads(response.data)
+        self.assertEqual(data['productos_stock_bajo'], 3)
+        self.assertEqual(data['productos_sin_stock'], 1)
+
+        response = self.client.get('/api/dashboard/stock-critico', headers=self.headers)
+        data = json.loads(response.data)
+        self.assertEqual([p['id'] for p in data], [self.agotado.id, self.bajo.id, self.justo.id])
+        self.assertEqual(data[0]['categoria']['nombre'], 'Ferretería')
+
+        response = self.client.get('/api/export/stock-bajo', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        filas = response.data.decode('utf-8-sig').strip().splitlines()
+        self.assertEqual(len(filas), 4)
+        self.assertTrue(filas[1].startswith(f'{self.agotado.id},Agotado,Ferretería'))
+
+    def test_actualizar_equivale_a_reconstruir(self):
+        """Test la actualización incremental coincide con una reconstrucción"""
+        def snapshot(stocks):
+            registros = tuple(ProductoRecord(i, f'P{i}', 1.0, s, 5, 1, None, None, None)
+                              for i, s in enumerate(stocks, start=1))
+            return CatalogSnapshot(1, registros, {r.id: r for r in registros})
+
+        indice = LowStockIndex()
+        indice.reconstruir(snapshot([0, 9, 4, 2]))
+        self.assertEqual(indice.ids(), [1, 4, 3])
+
+        nuevo = snapshot([7, 1, 4, 2])
+        indice.actualizar(nuevo, [1, 2])
+        esperado = LowStockIndex()
+        esperado.reconstruir(nuevo)
+        self.assertEqual(indice.ids(), esperado.ids())
+        self.assertEqual(indice.contar_sin_stock(), 0)
+        self.assertIn(2, indice)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+"""
+Tests de concurrencia para el ajuste atómico de stock
+
+Usa una base SQLite en archivo (no en memoria) para que cada hilo tenga
+su propia conexión y las transacciones compitan de verdad.
+"""
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from app import create_app, db
+from app.config import config, TestingConfig
+from app.exceptions import StockError
+from app.infrastructure.di.container import get_container
+from app.models import Usuario, Producto, Categoria, Venta
+from app.repositories.producto import ProductoRepository
+
+HILOS = 8
+INTENTOS_POR_HILO = 25
+STOCK_INICIAL = 120  # menor que HILOS * INTENTOS_POR_HILO: hay ventas rechazadas
+
+
+class TestStockConcurrencia(unittest.TestCase):
+    def setUp(self):
+        """Configurar test con una base en archivo compartida por los hilos"""
+        descriptor, self.ruta_db = tempfile.mkstemp(suffix='.db')
+        os.close(descriptor)
+
+        class ConcurrenciaConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f'sqlite:///{self.ruta_db}'
+            SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30}}
+            CATALOG_PRELOAD = False
+
+        with mock.patch.dict(config, {'concurrencia': ConcurrenciaConfig}):
+            self.app = create_app('concurrencia')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        self.categoria = Categoria(nombre='Ferretería')
+        db.session.add_all([self.admin_user, self.categoria])
+        db.session.flush()
+
+        self.producto = Producto(nombre='Tornillo', precio=1, stock=STOCK_INICIAL,
+                                 stock_minimo=5, categoria_id=self.categoria.id)
+        db.session.add(self.producto)
+        db.session.commit()
+        self.producto_id = self.producto.id
+        self.usuario_id = self.admin_user.id
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+        self.app_context.pop()
+        os.remove(self.ruta_db)
+
+    def _en_paralelo(self, operacion):
+        """Ejecuta `operacion` INTENTOS_POR_HILO veces en cada hilo y cuenta los resultados"""
+        resultados = {'ok': 0, 'sin_stock': 0, 'errores': []}
+        candado = threading.Lock()
+        barrera = threading.Barrier(HILOS)
+
+        def trabajar():
+            with self.app.app_context():
+                barrera.wait()
+                for _ in range(INTENTOS_POR_HILO):
+                    try:
+                        operacion()
+                        clave = 'ok'
+                    except StockError:
+                        clave = 'sin_stock'
+                    except Exception as e:  # pragma: no cover - se reporta en el assert
+                        with candado:
+                            resultados['errores'].append(repr(e))
+                        continue
+                    finally:
+                        db.session.remove()
+                    with candado:
+                        resultados[clave] += 1
+
+        hilos = [threading.Thread(target=trabajar) for _ in range(HILOS)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        return resultados
+
+    def _stock_actual(self):
+        db.session.expire_all()
+        return db.session.get(Producto, self.producto_id).stock
+
+    def test_descuentos_concurrentes_sin_sobreventa(self):
+        """Test el stock nunca queda negativo y cada unidad se vende una sola vez"""
+        resultados = self._en_paralelo(
+            lambda: ProductoRepository.ajustar_stock({self.producto_id: -1})
+        )
+        self.assertEqual(resultados['errores'], [])
+        self.assertEqual(resultados['ok'], STOCK_INICIAL)
+        self.assertEqual(resultados['sin_stock'], HILOS * INTENTOS_POR_HILO - STOCK_INICIAL)
+        self.assertEqual(self._stock_actual(), 0)
+
+    def test_incrementos_concurrentes_sin_perdidas(self):
+        """Test ninguna compra concurrente pisa a otra"""
+        resultados = self._en_paralelo(
+            lambda: ProductoRepository.ajustar_stock({self.producto_id: 2})
+        )
+        self.assertEqual(resultados['errores'], [])
+        self.assertEqual(self._stock_actual(), STOCK_INICIAL + 2 * HILOS * INTENTOS_POR_HILO)
+
+    def test_ventas_concurrentes_sin_sobreventa(self):
+        """Test ventas completas en paralelo sobre el mismo producto"""
+        def vender():
+            get_container().resolve('create_venta_use_case').execute({
+                'usuario_id': self.usuario_id,
+                'detalles': [{'producto_id': self.producto_id, 'cantidad': 1}]
+            })
+
+        resultados = self._en_paralelo(vender)
+        self.assertEqual(resultados['errores'], [])
+        self.assertEqual(resultados['ok'], STOCK_INICIAL)
+        self.assertEqual(self._stock_actual(), 0)
+        self.assertEqual(Venta.query.count(), STOCK_INICIAL)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+"""
+Tests de anulación de ventas (individual y en lote)
+"""
+import unittest
+import json
+from datetime import date
+from unittest import mock
+from sqlalchemy import event, inspect
+from app import create_app, db
+from app.models import (
+    Usuario, Producto, Categoria, Venta, DetalleVenta, VentaDiaria, ProductoVentaDiaria
+)
+from app.models.auditoria import AuditoriaLog
+from app.repositories.venta import VentaRepository
+
+
+class TestVentasAnulacion(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        self.vendedor = Usuario(nombre='Vendedor', email='vendedor@test.com', rol='vendedor')
+        self.vendedor.set_password('vendedor123')
+        self.categoria = Categoria(nombre='Ferretería')
+        db.session.add_all([self.admin_user, self.vendedor, self.categoria])
+        db.session.flush()
+
+        self.productos = [
+            Producto(nombre=f'Producto {i}', precio=10, stock=100, stock_minimo=1,
+                     categoria_id=self.categoria.id)
+            for i in range(5)
+        ]
+        db.session.add_all(self.productos)
+        db.session.commit()
+        self.ids = [p.id for p in self.productos]
+
+        self.headers = self._login('admin@test.com', 'admin123')
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _login(self, email, password):
+        login_response = self.client.post('/api/auth/login', json={'email': email, 'password': password})
+        token = json.loads(login_response.data)['data']['token']
+        return {'Authorization': f'Bearer {token}'}
+
+    def _vender(self, lineas):
+        response = self.client.post('/api/ventas', headers=self.headers, json={
+            'detalles': [{'producto_id': self.ids[i], 'cantidad': c} for i, c in lineas]
+        })
+        self.assertEqual(response.status_code, 201, response.data)
+        return json.loads(response.data)['data']['id']
+
+    def _stocks(self):
+        db.session.expire_all()
+        return [db.session.get(Producto, pid).stock for pid in self.ids]
+
+    def _sentencias(self, funcion):
+        sentencias = []
+        def capturar(conn, cursor, statement, params, context, executemany):
+            sentencias.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capturar)
+        try:
+            resultado = funcion()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capturar)
+        return resultado, [s for s in sentencias if 'FROM usuarios' not in s]
+
+    def test_anular_una_venta(self):
+        """Test la ruta DELETE restaura stock, borra la venta y audita"""
+        venta_id = self._vender([(0, 3), (1, 2), (0, 1)])
+        otra = self._vender([(0, 5)])
+        self.assertEqual(self._stocks()[:2], [91, 98])
+
+        response = self.client.delete(f'/api/ventas/{venta_id}', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._stocks()[:2], [95, 100])
+        self.assertIsNone(db.session.get(Venta, venta_id))
+        self.assertEqual(DetalleVenta.query.filter_by(venta_id=venta_id).count(), 0)
+        self.assertIsNotNone(db.session.get(Venta, otra))
+
+        log = AuditoriaLog.query.filter_by(accion='ANULAR').one()
+        self.assertEqual(log.registro_id, str(venta_id))
+        self.assertEqual(log.datos_anteriores['total'], 60.0)
+
+        response = self.client.delete(f'/api/ventas/{venta_id}', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_anular_venta_vencida_en_la_sesion(self):
+        """Test anular una venta cuyo objeto quedó vencido en la sesión tras un commit"""
+        venta = Venta(usuario_id=self.admin_user.id, total=10)
+        db.session.add(venta)
+        db.session.commit()  # expire_on_commit: el objeto sigue en la sesión, vencido
+        venta_id = inspect(venta).identity[0]  # sin recargar el objeto
+        self.assertEqual(VentaRepository.anular([venta_id]), [venta_id])
+        self.assertIsNone(db.session.get(Venta, venta_id))
+
+    def test_anular_lote(self):
+        """Test el endpoint en lote anula todo en una transacción y reporta faltantes"""
+        ventas = [self._vender([(i % 5, 2), ((i + 1) % 5, 1)]) for i in range(6)]
+        conservar = self._vender([(4, 4)])
+
+        response = self.client.post('/api/ventas/anular', headers=self.headers,
+                                    json={'venta_ids': ventas + [999999]})
+        self.assertEqual(response.status_code, 200, response.data)
+        data = json.loads(response.data)['data']
+        self.assertEqual(data['anuladas'], sorted(ventas))
+        self.assertEqual(data['no_encontradas'], [999999])
+
+        self.assertEqual(self._stocks(), [100, 100, 100, 100, 96])
+        self.assertEqual([v.id for v in Venta.query.all()], [conservar])
+        self.assertEqual(AuditoriaLog.query.filter_by(accion='ANULAR').count(), 6)
+
+        hoy = date.today()
+        resumen = VentaDiaria.query.filter_by(fecha=hoy).one()
+        self.assertEqual((resumen.cantidad_ventas, float(resumen.total), resumen.items), (1, 40.0, 4))
+        por_producto = {f.producto_id: f.cantidad for f in ProductoVentaDiaria.query.all()}
+        self.assertEqual(por_producto, {self.ids[i]: (4 if i == 4 else 0) for i in range(5)})
+
+    def test_sentencias_constantes(self):
+        """Test la cantidad de sentencias no depende de las ventas ni las líneas"""
+        def anular(cantidad):
+            ventas = [self._vender([(i, 1) for i in range(5)]) for _ in range(cantidad)]
+            db.session.expire_all()
+            response, sentencias = self._sentencias(lambda: self.client.post(
+                '/api/ventas/anular', headers=self.headers, json={'venta_ids': ventas}))
+            self.assertEqual(response.status_code, 200)
+            return sentencias
+
+        pocas, muchas = anular(1), anular(8)
+        self.assertEqual(len([s for s in pocas if not s.startswith('INSERT INTO auditoria_logs')]),
+                         len([s for s in muchas if not s.startswith('INSERT INTO auditoria_logs')]))
+        self.assertEqual(len([s for s in muchas if s.startswith('UPDATE productos')]), 1)
+        self.assertEqual(len([s for s in muchas if s.startswith('DELETE FROM detalle_venta')]), 1)
+        self.assertEqual(len([s for s in muchas if s.startswith('SELECT') and 'FROM productos' in s]), 0)
+
+    def test_validaciones(self):
+        """Test lista vacía, valores inválidos y permisos"""
+        for cuerpo in ({}, {'venta_ids': []}, {'venta_ids': ['1']}, {'venta_ids': 5}):
+            response = self.client.post('/api/ventas/anular', headers=self.headers, json=cuerpo)
+            self.assertEqual(response.status_code, 400, cuerpo)
+
+        venta_id = self._vender([(0, 1)])
+        headers = self._login('vendedor@test.com', 'vendedor123')
+        response = self.client.post('/api/ventas/anular', headers=headers, json={'venta_ids': [venta_id]})
+        self.assertEqual(response.status_code, 403)
+        self.assertIsNotNone(db.session.get(Venta, venta_id))
+
+    def test_error_revierte_todo(self):
+        """Test si falla la auditoría no se restaura stock ni se borra nada"""
+        venta_id = self._vender([(0, 3)])
+        with mock.patch('app.models.auditoria.AuditoriaLog.registrar_accion', side_effect=RuntimeError('falla')):
+            response = self.client.post('/api/ventas/anular', headers=self.headers,
+                                        json={'venta_ids': [venta_id]})
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(self._stocks()[0], 97)
+        self.assertIsNotNone(db.session.get(Venta, venta_id))
+        self.assertEqual(VentaDiaria.query.one().cantidad_ventas, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+"""
+Tests de cantidad de consultas de los endpoints de ventas
+
+Cada endpoint debe ejecutar un número fijo de sentencias SQL, sin
+importar cuántas ventas, detalles o usuarios haya (sin consultas N+1),
+y los límites/offsets deben resolverse en SQL.
+"""
+import unittest
+import json
+from datetime import date, timedelta
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria, Venta, DetalleVenta
+
+DOCUMENTO = '12345678'
+
+
+class TestVentasConsultas(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        self.categoria = Categoria(nombre='Ferretería')
+        db.session.add_all([self.admin_user, self.categoria])
+        db.session.flush()
+
+        self.productos = [
+            Producto(nombre=f'Producto {i}', precio=10 + i, stock=1000, stock_minimo=1,
+                     categoria_id=self.categoria.id)
+            for i in range(5)
+        ]
+        db.session.add_all(self.productos)
+        db.session.commit()
+        self.usuario_id = self.admin_user.id
+        self.producto_ids = [p.id for p in self.productos]
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _crear_ventas(self, cantidad):
+        """Crea ventas de varios vendedores con dos líneas cada una"""
+        vendedores = []
+        for i in range(3):
+            vendedor = Usuario(nombre=f'Vendedor {i}', email=f'vendedor{i}-{cantidad}@test.com',
+                               rol='vendedor')
+            vendedor.set_password('vendedor123')
+            vendedores.append(vendedor)
+        db.session.add_all(vendedores)
+        db.session.flush()
+
+        for n in range(cantidad):
+            venta = Venta(usuario_id=vendedores[n % 3].id if n % 2 else self.usuario_id,
+                          total=25, cliente_documento=DOCUMENTO)
+            db.session.add(venta)
+            db.session.flush()
+            for k in range(2):
+                producto_id = self.producto_ids[(n + k) % len(self.producto_ids)]
+                db.session.add(DetalleVenta(venta_id=venta.id, producto_id=producto_id,
+                                            cantidad=1, precio_unitario=12.5, subtotal=12.5))
+        db.session.commit()
+        db.session.expunge_all()
+
+    def _sentencias(self, metodo, url, **kwargs):
+        """Ejecuta la petición y devuelve (respuesta, sentencias ejecutadas)"""
+        # Cada petición parte de una sesión sin objetos vigentes, como en producción
+        db.session.expire_all()
+        sentencias = []
+        def capturar(conn, cursor, statement, params, context, executemany):
+            sentencias.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capturar)
+        try:
+            response = getattr(self.client, metodo)(url, headers=self.headers, **kwargs)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capturar)
+        self.assertLess(response.status_code, 300, response.data)
+        return response, sentencias
+
+    def _urls(self):
+        hoy = date.today()
+        desde, hasta = (hoy - timedelta(days=1)).isoformat(), (hoy + timedelta(days=1)).isoformat()
+        venta_id = Venta.query.order_by(Venta.id.desc()).first().id
+        return [
+            '/api/ventas',
+            '/api/ventas?limit=5&offset=2',
+            f'/api/ventas/{venta_id}',
+            f'/api/ventas/fecha?fecha_inicio={desde}&fecha_fin={hasta}',
+            f'/api/ventas/fecha?fecha_inicio={desde}&fecha_fin={hasta}&limit=3',
+            f'/api/ventas/usuario/{self.usuario_id}',
+            f'/api/ventas/cliente/{DOCUMENTO}?limit=4&offset=1',
+            f'/api/ventas/estadisticas?fecha_inicio={desde}&fecha_fin={hasta}',
+        ]
+
+    def test_consultas_constantes_en_lecturas(self):
+        """Test los GET ejecutan las mismas sentencias con 3 o con 40 ventas"""
+        self._crear_ventas(3)
+        pocas = [len(self._sentencias('get', url)[1]) for url in self._urls()]
+
+        self._crear_ventas(37)
+        urls = self._urls()
+        muchas = [len(self._sentencias('get', url)[1]) for url in urls]
+
+        self.assertEqual(pocas, muchas)
+        # Autenticación + ventas con usuario (JOIN) + detalles con producto (IN)
+        for url, cantidad in zip(urls, muchas):
+            self.assertLessEqual(cantidad, 3, url)
+
+    def test_detalles_completos(self):
+        """Test la carga anticipada devuelve usuario, detalles y producto"""
+        self._crear_ventas(4)
+        response, _ = self._sentencias('get', '/api/ventas')
+        ventas = json.loads(response.data)['data']
+        self.assertEqual(len(ventas), 4)
+        for venta in ventas:
+            self.assertEqual(len(venta['detalles']), 2)
+            self.assertTrue(all(d['producto_nombre'] for d in venta['detalles']))
+            self.assertTrue(venta['usuario_nombre'])
+
+    def test_limite_y_offset_en_sql(self):
+        """Test limit y offset se aplican en la consulta y no en Python"""
+        self._crear_ventas(12)
+        response, sentencias = self._sentencias('get', '/api/ventas?limit=5&offset=2')
+        data = json.loads(response.data)
+        ids = [v['id'] for v in data['data']]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), 5)
+        primera = Venta.query.order_by(Venta.id).offset(2).first().id
+        self.assertEqual(ids[0], primera)
+        self.assertTrue(any('LIMIT' in s and 'OFFSET' in s for s in sentencias))
+
+        response, _ = self._sentencias('get', f'/api/ventas/cliente/{DOCUMENTO}?limit=4&offset=10')
+        self.assertEqual(json.loads(response.data)['count'], 2)
+
+        response, _ = self._sentencias('get', '/api/ventas?fields=id,total&limit=3&offset=1')
+        esperados = [v.id for v in Venta.query.order_by(Venta.id).offset(1).limit(3)]
+        self.assertEqual([v['id'] for v in json.loads(response.data)['data']], esperados)
+
+    def test_errores_de_consulta(self):
+        """Test parámetros inválidos devuelven 400 y ventas inexistentes 404"""
+        response = self.client.get('/api/ventas/fecha?fecha_inicio=ayer&fecha_fin=hoy',
+                                   headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/ventas/cliente/123', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/ventas/999999', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_consultas_constantes_en_escrituras(self):
+        """Test crear ventas no depende de la cantidad de líneas"""
+        def crear(lineas):
+            detalles = [{'producto_id': pid, 'cantidad': 1} for pid in self.producto_ids[:lineas]]
+            _, sentencias = self._sentencias('post', '/api/ventas', json={'detalles': detalles})
+            return len(sentencias)
+
+        self.assertEqual(crear(1), crear(5))
+
+        def lote(ventas):
+            _, sentencias = self._sentencias('post', '/api/ventas/lote', json={'ventas': [
+                {'detalles': [{'producto_id': pid, 'cantidad': 1} for pid in self.producto_ids]}
+                for _ in range(ventas)
+            ]})
+            return [s for s in sentencias if not s.startswith('INSERT INTO ventas ')]
+
+        # Solo los encabezados se insertan fila a fila (ver test_ventas_lote)
+        self.assertEqual(len(lote(2)), len(lote(20)))
+
+if __name__ == '__main__':
+    unittest.main()
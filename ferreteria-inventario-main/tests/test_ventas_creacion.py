@@ -0,0 +1,171 @@
+"""
+Tests para la creación de ventas en una sola transacción
+"""
+import unittest
+import json
+from sqlalchemy import event
+from app import create_app, db
+from app.exceptions import StockError
+from app.infrastructure.cache import change_tracker
+from app.models import Usuario, Producto, Categoria, Venta
+from app.repositories.producto import ProductoRepository
+
+class TestVentasCreacion(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        db.session.add(self.admin_user)
+
+        self.categoria = Categoria(nombre='Ferretería')
+        db.session.add(self.categoria)
+        db.session.flush()
+
+        self.productos = [
+            Producto(nombre=f'Producto {i}', precio=10 + i, stock=100, stock_minimo=5,
+                     categoria_id=self.categoria.id)
+            for i in range(30)
+        ]
+        db.session.add_all(self.productos)
+        db.session.commit()
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _vender(self, detalles):
+        return self.client.post('/api/ventas', headers=self.headers,
+                                json={'detalles': detalles, 'cliente_nombre': 'Cliente'})
+
+    def _medir(self, detalles):
+        """Ejecuta la venta contando sentencias SQL y commits"""
+        sentencias, commits = [], []
+        def capturar(conn, cursor, statement, params, context, executemany):
+            sentencias.append(statement)
+        def contar_commit(conn):
+            commits.append(1)
+        event.listen(db.engine, 'before_cursor_execute', capturar)
+        event.listen(db.engine, 'commit', contar_commit)
+        try:
+            response = self._vender(detalles)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capturar)
+            event.remove(db.engine, 'commit', contar_commit)
+        return response, sentencias, len(commits)
+
+    def test_crear_venta(self):
+        """Test la venta descuenta stock y devuelve los detalles"""
+        producto = self.productos[0]
+        response = self._vender([{'producto_id': producto.id, 'cantidad': 3}])
+        self.assertEqual(response.status_code, 201)
+        data = json.loads(response.data)['data']
+        self.assertEqual(data['usuario_id'], self.admin_user.id)
+        self.assertEqual(data['total'], 30.0)
+        self.assertEqual(data['detalles'][0]['producto_nombre'], 'Producto 0')
+        self.assertEqual(db.session.get(Producto, producto.id).stock, 97)
+
+    def test_consultas_constantes_y_un_commit(self):
+        """Test la cantidad de sentencias no depende de las líneas y hay un solo commit"""
+        response, sentencias_1, commits = self._medir(
+            [{'producto_id': self.productos[0].id, 'cantidad': 1}])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(commits, 1)
+
+        response, sentencias_30, commits = self._medir(
+            [{'producto_id': p.id, 'cantidad': 2} for p in self.productos])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(commits, 1)
+        self.assertEqual(len(sentencias_30), len(sentencias_1))
+
+        selects = [s for s in sentencias_30 if s.lstrip().upper().startswith('SELECT')
+                   and 'FROM productos' in s and 'JOIN' not in s]
+        self.assertEqual(len(selects), 1)
+        self.assertIn(' IN ', selects[0])
+        self.assertEqual(db.session.get(Producto, self.productos[-1].id).stock, 98)
+
+    def test_stock_insuficiente_no_modifica(self):
+        """Test si una línea falla no se guarda nada"""
+        response = self._vender([
+            {'producto_id': self.productos[0].id, 'cantidad': 5},
+            {'producto_id': self.productos[1].id, 'cantidad': 500}
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(db.session.get(Producto, self.productos[0].id).stock, 100)
+        self.assertEqual(Venta.query.count(), 0)
+
+    def test_ajuste_fallido_sin_commit_conserva_la_transaccion(self):
+        """Test con commit=False un ajuste rechazado solo deshace su propio UPDATE"""
+        pendiente = Categoria(nombre='Pinturas')
+        db.session.add(pendiente)
+        with self.assertRaises(StockError) as ctx:
+            ProductoRepository.ajustar_stock({
+                self.productos[0].id: -5,
+                self.productos[1].id: -500
+            }, commit=False)
+        self.assertIn('Producto 1', str(ctx.exception))
+        self.assertEqual(db.session.get(Producto, self.productos[0].id).stock, 100)
+
+        # La escritura del llamador sigue en la transacción y se confirma
+        db.session.commit()
+        self.assertIsNotNone(Categoria.query.filter_by(nombre='Pinturas').first())
+        self.assertEqual(db.session.get(Producto, self.productos[0].id).stock, 100)
+
+    def test_ajuste_sin_commit_publica_al_confirmar(self):
+        """Test el savepoint del ajuste no publica la versión antes del commit externo"""
+        version = change_tracker.version('productos')
+        producto = db.session.get(Producto, self.productos[1].id)
+        producto.precio = 20
+        db.session.add(Categoria(nombre='Pinturas'))
+        ProductoRepository.ajustar_stock({self.productos[0].id: -5}, commit=False)
+        self.assertEqual(change_tracker.version('productos'), version)
+        self.assertEqual(change_tracker.ids_pendientes(db.session, 'productos'),
+                         {self.productos[0].id, self.productos[1].id})
+
+        db.session.commit()
+        self.assertEqual(change_tracker.version('productos'), version + 1)
+        self.assertEqual(change_tracker.cambios('productos', version, version + 1),
+                         {self.productos[0].id, self.productos[1].id})
+
+    def test_ajuste_sin_commit_revertido_no_publica(self):
+        """Test si la transacción externa se revierte la versión no cambia"""
+        version = change_tracker.version('productos')
+        db.session.add(Categoria(nombre='Pinturas'))
+        ProductoRepository.ajustar_stock({self.productos[0].id: -5}, commit=False)
+        db.session.rollback()
+        self.assertEqual(change_tracker.version('productos'), version)
+        self.assertEqual(db.session.get(Producto, self.productos[0].id).stock, 100)
+
+    def test_lineas_repetidas_acumulan(self):
+        """Test un producto repetido se valida contra la cantidad total"""
+        producto = self.productos[0]
+        response = self._vender([
+            {'producto_id': producto.id, 'cantidad': 60},
+            {'producto_id': producto.id, 'cantidad': 60}
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(db.session.get(Producto, producto.id).stock, 100)
+
+        response = self._vender([{'producto_id': 999999, 'cantidad': 1}])
+        self.assertEqual(response.status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
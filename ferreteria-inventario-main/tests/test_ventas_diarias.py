@@ -0,0 +1,184 @@
+"""
+Tests del resumen diario de ventas (ventas_diarias)
+"""
+import unittest
+import json
+from datetime import date, datetime, timedelta
+from unittest import mock
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria, Venta, DetalleVenta, VentaDiaria
+from app.repositories.venta_diaria import VentaDiariaRepository
+
+
+class TestVentasDiarias(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        self.categoria = Categoria(nombre='Ferretería')
+        db.session.add_all([self.admin_user, self.categoria])
+        db.session.flush()
+
+        self.martillo = Producto(nombre='Martillo', precio=10, stock=100, stock_minimo=1,
+                                 categoria_id=self.categoria.id)
+        self.clavo = Producto(nombre='Clavo', precio=0.5, stock=1000, stock_minimo=1,
+                              categoria_id=self.categoria.id)
+        db.session.add_all([self.martillo, self.clavo])
+        db.session.commit()
+        self.usuario_id = self.admin_user.id
+        self.martillo_id, self.clavo_id = self.martillo.id, self.clavo.id
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _vender(self, martillos=1, clavos=0):
+        detalles = [{'producto_id': self.martillo_id, 'cantidad': martillos}]
+        if clavos:
+            detalles.append({'producto_id': self.clavo_id, 'cantidad': clavos})
+        response = self.client.post('/api/ventas', headers=self.headers, json={'detalles': detalles})
+        self.assertEqual(response.status_code, 201, response.data)
+        return json.loads(response.data)['data']['id']
+
+    def _resumen(self):
+        db.session.expire_all()
+        return {(f.fecha, f.usuario_id): (f.cantidad_ventas, float(f.total), f.items)
+                for f in VentaDiaria.query.all()}
+
+    def _insertar_historial(self, dias, ventas_por_dia):
+        """Ventas antiguas insertadas por fuera de la API (sin resumen)"""
+        inicio = datetime.now() - timedelta(days=dias)
+        for d in range(dias):
+            for _ in range(ventas_por_dia):
+                venta = Venta(usuario_id=self.usuario_id, total=20,
+                              fecha=inicio + timedelta(days=d))
+                db.session.add(venta)
+                db.session.flush()
+                db.session.add(DetalleVenta(venta_id=venta.id, producto_id=self.martillo_id,
+                                            cantidad=2, precio_unitario=10, subtotal=20))
+        db.session.commit()
+
+    def test_crear_y_anular_actualizan_resumen(self):
+        """Test el resumen se acumula al vender y se descuenta al anular"""
+        self._vender(martillos=2, clavos=10)
+        venta_id = self._vender(martillos=1)
+        hoy = date.today()
+        self.assertEqual(self._resumen(), {(hoy, self.usuario_id): (2, 35.0, 13)})
+
+        response = self.client.delete(f'/api/ventas/{venta_id}', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._resumen(), {(hoy, self.usuario_id): (1, 25.0, 12)})
+
+    def test_todas_las_rutas_usan_el_mismo_reloj(self):
+        """Test la ruta original y la nueva fechan con el reloj de la aplicación"""
+        cierre_del_dia = datetime(2026, 3, 31, 23, 59, 30)
+        with mock.patch('app.utils.fechas.datetime') as reloj:
+            reloj.now.return_value = cierre_del_dia
+            self._vender(martillos=1)
+
+            vista = self.app.view_functions['api.create_venta']
+            with self.app.test_request_context('/api/ventas', method='POST', headers=self.headers,
+                                               json={'detalles': [{'producto_id': self.clavo_id,
+                                                                   'cantidad': 2}]}):
+                response, status = vista()
+            self.assertEqual(status, 201, response.data)
+
+            resumen = json.loads(self.client.get('/api/caja/resumen', headers=self.headers).data)
+            self.assertEqual(resumen['data']['fecha'], '2026-03-31')
+            self.assertEqual(resumen['data']['cantidad_ventas'], 2)
+
+        self.assertEqual({v.fecha for v in Venta.query.all()}, {cierre_del_dia})
+        self.assertEqual(self._resumen(), {(date(2026, 3, 31), self.usuario_id): (2, 11.0, 3)})
+
+    def test_lote_actualiza_resumen(self):
+        """Test las ventas en lote se suman al resumen en la misma transacción"""
+        response = self.client.post('/api/ventas/lote', headers=self.headers, json={'ventas': [
+            {'detalles': [{'producto_id': self.clavo_id, 'cantidad': 4}]},
+            {'detalles': [{'producto_id': self.martillo_id, 'cantidad': 500}]},  # sin stock
+            {'detalles': [{'producto_id': self.martillo_id, 'cantidad': 3}]},
+        ]})
+        self.assertEqual(json.loads(response.data)['data']['creadas'], 2)
+        self.assertEqual(self._resumen(), {(date.today(), self.usuario_id): (2, 32.0, 7)})
+
+    def test_venta_rechazada_no_toca_resumen(self):
+        """Test una venta sin stock no deja rastro en el resumen"""
+        response = self.client.post('/api/ventas', headers=self.headers, json={
+            'detalles': [{'producto_id': self.martillo_id, 'cantidad': 500}]
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self._resumen(), {})
+
+    def test_reconstruir_coincide_con_incremental(self):
+        """Test reconstruir desde ventas da el mismo resumen que el mantenido al vender"""
+        self._vender(martillos=2, clavos=10)
+        self._vender(martillos=1)
+        incremental = self._resumen()
+
+        self.assertEqual(VentaDiariaRepository.reconstruir(), 1)
+        self.assertEqual(self._resumen(), incremental)
+
+    def test_reconstruir_rango(self):
+        """Test el backfill por rango solo reemplaza los días pedidos"""
+        self._insertar_historial(dias=5, ventas_por_dia=3)
+        self._vender()
+        desde = date.today() - timedelta(days=5)
+        self.assertEqual(VentaDiariaRepository.reconstruir(desde, desde + timedelta(days=1)), 2)
+
+        resumen = self._resumen()
+        self.assertEqual(len(resumen), 3)
+        self.assertEqual(resumen[(desde, self.usuario_id)], (3, 60.0, 6))
+        self.assertEqual(resumen[(date.today(), self.usuario_id)], (1, 10.0, 1))
+
+    def test_lecturas_no_dependen_de_las_ventas(self):
+        """Test estadísticas y ventas por día leen el resumen y no las ventas"""
+        self._insertar_historial(dias=6, ventas_por_dia=4)
+        VentaDiariaRepository.reconstruir()
+
+        sentencias = []
+        def capturar(conn, cursor, statement, params, context, executemany):
+            sentencias.append(statement)
+        desde = (date.today() - timedelta(days=10)).isoformat()
+        hasta = date.today().isoformat()
+        event.listen(db.engine, 'before_cursor_execute', capturar)
+        try:
+            estadisticas = self.client.get(
+                f'/api/ventas/estadisticas?fecha_inicio={desde}&fecha_fin={hasta}',
+                headers=self.headers)
+            por_dia = self.client.get('/api/dashboard/ventas-por-dia?dias=10', headers=self.headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capturar)
+
+        datos = json.loads(estadisticas.data)['data']
+        self.assertEqual(datos['cantidad_ventas'], 24)
+        self.assertEqual(datos['total_ventas'], 480.0)
+        self.assertEqual(datos['promedio_venta'], 20.0)
+
+        dias = json.loads(por_dia.data)
+        self.assertEqual(len(dias), 6)
+        self.assertTrue(all(d['cantidad'] == 4 and d['total'] == 80.0 for d in dias))
+
+        self.assertFalse([s for s in sentencias if 'FROM ventas ' in s or 'FROM ventas\n' in s])
+        self.assertTrue([s for s in sentencias if 'ventas_diarias' in s])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+"""
+Tests de paginación por cursor (fecha, id) y streaming del listado de ventas
+"""
+import unittest
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria, Venta, DetalleVenta
+from app.repositories.venta import VentaRepository
+
+TOTAL_VENTAS = 45
+
+
+class TestVentasKeyset(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        self.categoria = Categoria(nombre='Ferretería')
+        db.session.add_all([self.admin_user, self.categoria])
+        db.session.flush()
+
+        producto = Producto(nombre='Martillo', precio=10, stock=1000, stock_minimo=1,
+                            categoria_id=self.categoria.id)
+        db.session.add(producto)
+        db.session.flush()
+
+        # Varias ventas comparten fecha: el id desempata el orden
+        base = datetime(2026, 1, 1, 12, 0, 0)
+        for n in range(TOTAL_VENTAS):
+            venta = Venta(usuario_id=self.admin_user.id, total=10,
+                          fecha=base + timedelta(minutes=n // 4))
+            db.session.add(venta)
+            db.session.flush()
+            db.session.add(DetalleVenta(venta_id=venta.id, producto_id=producto.id,
+                                        cantidad=1, precio_unitario=10, subtotal=10))
+        db.session.commit()
+        self.esperado = [v.id for v in Venta.query.order_by(Venta.fecha.desc(), Venta.id.desc())]
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_recorrido_por_cursor(self):
+        """Test las páginas cubren todas las ventas sin repetir, más recientes primero"""
+        ids, cursor, paginas = [], '', 0
+        while True:
+            response = self.client.get(f'/api/ventas?cursor={cursor}&limit=10', headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+            data = json.loads(response.data)
+            ids.extend(v['id'] for v in data['data'])
+            self.assertTrue(all(len(v['detalles']) == 1 for v in data['data']))
+            paginas += 1
+            cursor = data['pagination']['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(ids, self.esperado)
+        self.assertEqual(paginas, 5)
+
+    def test_pagina_por_defecto(self):
+        """Test sin parámetros se devuelve la primera página, no todo el historial"""
+        response = self.client.get('/api/ventas', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual([v['id'] for v in data['data']], self.esperado[:20])
+        self.assertTrue(data['pagination']['has_next'])
+
+        response = self.client.get('/api/ventas?limit=1000', headers=self.headers)
+        self.assertEqual(len(json.loads(response.data)['data']), TOTAL_VENTAS)
+        self.assertEqual(json.loads(response.data)['pagination']['limit'], 100)
+
+    def test_listado_por_offset(self):
+        """Test con offset se mantiene el listado por limit/offset"""
+        response = self.client.get('/api/ventas?offset=5&limit=1000', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['count'], TOTAL_VENTAS - 5)
+        self.assertNotIn('pagination', data)
+
+    def test_cursor_invalido(self):
+        """Test un cursor mal formado devuelve 400"""
+        response = self.client.get('/api/ventas?cursor=no-es-un-cursor', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_streaming(self):
+        """Test stream=true escribe el arreglo completo leyendo páginas acotadas"""
+        sentencias = []
+        def capturar(conn, cursor, statement, params, context, executemany):
+            sentencias.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capturar)
+        try:
+            response = self.client.get('/api/ventas?stream=true', headers=self.headers)
+            self.assertTrue(response.is_streamed)
+            ventas = json.loads(response.get_data())
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capturar)
+
+        self.assertEqual([v['id'] for v in ventas], self.esperado)
+        self.assertEqual(ventas[0]['detalles'][0]['producto_nombre'], 'Martillo')
+        paginas = [s for s in sentencias if 'FROM ventas' in s]
+        self.assertTrue(paginas and all('LIMIT' in s for s in paginas))
+
+    def test_streaming_desde_cursor(self):
+        """Test el streaming puede continuar desde un cursor"""
+        response = self.client.get('/api/ventas?cursor=&limit=20', headers=self.headers)
+        cursor = json.loads(response.data)['pagination']['next_cursor']
+        response = self.client.get(f'/api/ventas?stream=1&cursor={cursor}', headers=self.headers)
+        self.assertEqual([v['id'] for v in json.loads(response.get_data())], self.esperado[20:])
+
+    def test_paginas_por_fecha_acotadas(self):
+        """Test el repositorio recorre el historial en páginas del tamaño pedido"""
+        paginas = list(VentaRepository.iter_paginas_por_fecha(tamano=10))
+        self.assertEqual([len(p) for p in paginas], [10, 10, 10, 10, 5])
+        self.assertEqual([v.id for p in paginas for v in p], self.esperado)
+
+    def test_ruta_original(self):
+        """Test la ruta original pagina por cursor por defecto y acota per_page"""
+        vista = self.app.view_functions['api.get_ventas']
+        with self.app.test_request_context('/api/ventas?per_page=1000', headers=self.headers):
+            response, status = vista()
+        self.assertEqual(status, 200)
+        data = response.get_json()
+        self.assertEqual([v['id'] for v in data['data']], self.esperado)
+        self.assertEqual(data['pagination']['limit'], 100)
+        self.assertFalse(data['pagination']['has_next'])
+
+        with self.app.test_request_context('/api/ventas?cursor=&per_page=30', headers=self.headers):
+            response, status = vista()
+        self.assertEqual(status, 200)
+        data = response.get_json()
+        self.assertEqual([v['id'] for v in data['data']], self.esperado[:30])
+        self.assertTrue(data['pagination']['has_next'])
+
+        cursor = data['pagination']['next_cursor']
+        with self.app.test_request_context(f'/api/ventas?stream=1&cursor={cursor}',
+                                           headers=self.headers):
+            response = vista()
+            cuerpo = ''.join(response.response)
+        self.assertEqual([v['id'] for v in json.loads(cuerpo)], self.esperado[30:])
+
+        with self.app.test_request_context('/api/ventas?page=2&per_page=30', headers=self.headers):
+            response, status = vista()
+        data = response.get_json()['data']
+        self.assertEqual([v['id'] for v in data['ventas']], self.esperado[30:])
+        self.assertEqual(data['total'], len(self.esperado))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Tests para el registro de ventas en lote (sincronización de cajas)
+"""
+import unittest
+import json
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria, Venta, DetalleVenta
+
+class TestVentasLote(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        db.session.add(self.admin_user)
+
+        self.categoria = Categoria(nombre='Ferretería')
+        db.session.add(self.categoria)
+        db.session.flush()
+
+        self.martillo = Producto(nombre='Martillo', precio=10, stock=5, stock_minimo=1,
+                                 categoria_id=self.categoria.id)
+        self.clavo = Producto(nombre='Clavo', precio=0.5, stock=1000, stock_minimo=1,
+                              categoria_id=self.categoria.id)
+        db.session.add_all([self.martillo, self.clavo])
+        db.session.commit()
+        self.martillo_id, self.clavo_id = self.martillo.id, self.clavo.id
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _lote(self, ventas):
+        return self.client.post('/api/ventas/lote', headers=self.headers, json={'ventas': ventas})
+
+    def _stock(self, producto_id):
+        db.session.expire_all()
+        return db.session.get(Producto, producto_id).stock
+
+    def test_fallas_parciales(self):
+        """Test cada venta se acepta o rechaza por separado"""
+        response = self._lote([
+            {'referencia': 'c1-1', 'detalles': [{'producto_id': self.martillo_id, 'cantidad': 3}]},
+            # Stock ya consumido por la venta anterior del lote
+            {'referencia': 'c1-2', 'detalles': [{'producto_id': self.martillo_id, 'cantidad': 3}]},
+            {'referencia': 'c1-3', 'detalles': [{'producto_id': 999999, 'cantidad': 1}]},
+            {'referencia': 'c1-4', 'detalles': []},
+            {'referencia': 'c1-5', 'detalles': [{'producto_id': self.martillo_id, 'cantidad': 2},
+                                                {'producto_id': self.clavo_id, 'cantidad': 100}],
+             'cliente_nombre': 'Cliente'}
+        ])
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)['data']
+        self.assertEqual((data['creadas'], data['rechazadas']), (2, 3))
+
+        resultados = data['resultados']
+        self.assertEqual([r['referencia'] for r in resultados], ['c1-1', 'c1-2', 'c1-3', 'c1-4', 'c1-5'])
+        self.assertEqual([r['status'] for r in resultados],
+                         ['success', 'error', 'error', 'error', 'success'])
+        self.assertIn('Stock insuficiente', resultados[1]['message'])
+        self.assertEqual(resultados[2]['status_code'], 404)
+        self.assertEqual(resultados[3]['status_code'], 400)
+        self.assertEqual(resultados[4]['total'], 70.0)
+
+        self.assertEqual(self._stock(self.martillo_id), 0)
+        self.assertEqual(self._stock(self.clavo_id), 900)
+        self.assertEqual(Venta.query.count(), 2)
+        self.assertEqual(DetalleVenta.query.count(), 3)
+        venta = db.session.get(Venta, resultados[4]['venta_id'])
+        self.assertEqual(venta.usuario_id, self.admin_user.id)
+        self.assertEqual(venta.cliente_nombre, 'Cliente')
+
+    def test_sentencias_acotadas(self):
+        """Test stock y detalles se escriben con una sentencia para todo el lote"""
+        sentencias = []
+        def capturar(conn, cursor, statement, params, context, executemany):
+            sentencias.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capturar)
+        try:
+            response = self._lote([
+                {'detalles': [{'producto_id': self.clavo_id, 'cantidad': 1}]}
+                for _ in range(200)
+            ])
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capturar)
+        self.assertEqual(json.loads(response.data)['data']['creadas'], 200)
+
+        def contar(prefijo):
+            return len([s for s in sentencias if s.startswith(prefijo)])
+        self.assertEqual(contar('SELECT productos.'), 1)
+        self.assertEqual(contar('UPDATE productos '), 1)
+        self.assertEqual(contar('INSERT INTO detalle_venta '), 1)
+        self.assertEqual(self._stock(self.clavo_id), 800)
+
+    def test_lote_invalido(self):
+        """Test el lote debe ser una lista no vacía y acotada"""
+        self.assertEqual(self._lote([]).status_code, 400)
+        response = self.client.post('/api/ventas/lote', headers=self.headers, json={})
+        self.assertEqual(response.status_code, 400)
+        ventas = [{'detalles': [{'producto_id': self.clavo_id, 'cantidad': 1}]}] * 501
+        self.assertEqual(self._lote(ventas).status_code, 400)
+        self.assertEqual(Venta.query.count(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
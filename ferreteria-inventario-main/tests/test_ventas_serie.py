@@ -0,0 +1,227 @@
+"""
+Tests de la serie de ventas por hora, día, semana y mes
+"""
+import unittest
+import json
+from datetime import datetime, timedelta
+from unittest import mock
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Usuario, Producto, Categoria, Venta, DetalleVenta
+from app.repositories.venta import VentaRepository
+from app.repositories.venta_diaria import VentaDiariaRepository
+from app.infrastructure.cache import serie_ventas_cache
+from app.infrastructure.di import get_container
+from app.utils.series_tiempo import buckets_del_rango, inicio_bucket, siguiente_bucket
+
+
+class TestBucketsSerie(unittest.TestCase):
+    """Cálculo de intervalos (sin base de datos)"""
+
+    def test_inicio_y_siguiente(self):
+        """Test truncado e incremento en cada granularidad"""
+        fecha = datetime(2026, 3, 18, 15, 42)  # miércoles
+        self.assertEqual(inicio_bucket(fecha, 'hour'), datetime(2026, 3, 18, 15))
+        self.assertEqual(inicio_bucket(fecha, 'day'), datetime(2026, 3, 18))
+        self.assertEqual(inicio_bucket(fecha, 'week'), datetime(2026, 3, 16))
+        self.assertEqual(inicio_bucket(fecha, 'month'), datetime(2026, 3, 1))
+        self.assertEqual(siguiente_bucket(datetime(2026, 12, 1), 'month'), datetime(2027, 1, 1))
+        self.assertEqual(siguiente_bucket(datetime(2026, 1, 1), 'month', -1), datetime(2025, 12, 1))
+
+    def test_rangos(self):
+        """Test el rango termina en el intervalo en curso"""
+        ahora = datetime(2026, 3, 18, 15, 42)
+        horas = buckets_del_rango(ahora, 'hour', '24h')
+        self.assertEqual(len(horas), 24)
+        self.assertEqual(horas[-1], datetime(2026, 3, 18, 15))
+        self.assertEqual(buckets_del_rango(ahora, 'month', '3m'),
+                         [datetime(2026, 1, 1), datetime(2026, 2, 1), datetime(2026, 3, 1)])
+        self.assertEqual(buckets_del_rango(ahora, 'week', '10d')[0], datetime(2026, 3, 9))
+        for rango in ('', '0d', '5x', 'd5'):
+            with self.assertRaises(ValueError):
+                buckets_del_rango(ahora, 'day', rango)
+        with self.assertRaises(ValueError):
+            buckets_del_rango(ahora, 'hour', '100d', maximo=1000)
+
+
+class TestVentasSerie(unittest.TestCase):
+    def setUp(self):
+        """Configurar test"""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.admin_user = Usuario(
+            nombre='Admin',
+            email='admin@test.com',
+            rol='admin'
+        )
+        self.admin_user.set_password('admin123')
+        self.categoria = Categoria(nombre='Ferretería')
+        db.session.add_all([self.admin_user, self.categoria])
+        db.session.flush()
+        self.producto = Producto(nombre='Martillo', precio=10, stock=1000, stock_minimo=1,
+                                 categoria_id=self.categoria.id)
+        db.session.add(self.producto)
+        db.session.commit()
+        self.usuario_id, self.producto_id = self.admin_user.id, self.producto.id
+
+        login_response = self.client.post('/api/auth/login',
+            json={'email': 'admin@test.com', 'password': 'admin123'})
+        response_data = json.loads(login_response.data)
+        self.token = response_data['data']['token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        """Limpiar después del test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _historial(self, fecha, total):
+        venta = Venta(usuario_id=self.usuario_id, total=total, fecha=fecha)
+        db.session.add(venta)
+        db.session.flush()
+        db.session.add(DetalleVenta(venta_id=venta.id, producto_id=self.producto_id,
+                                    cantidad=1, precio_unitario=total, subtotal=total))
+        db.session.commit()
+        return venta.id
+
+    def _serie(self, query):
+        db.session.expire_all()
+        sentencias = []
+        def capturar(conn, cursor, statement, params, context, executemany):
+            sentencias.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capturar)
+        try:
+            response = self.client.get(f'/api/ventas/serie?{query}', headers=self.headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capturar)
+        self.assertEqual(response.status_code, 200, response.data)
+        return (json.loads(response.data)['data'],
+                [s for s in sentencias if 'FROM usuarios' not in s])
+
+    def test_serie_diaria_con_cache(self):
+        """Test los días cerrados se calculan una vez y el día en curso siempre"""
+        hoy = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        anulada = self._historial(hoy - timedelta(days=2, hours=-10), 30)
+        self._historial(hoy - timedelta(days=2, hours=-11), 20)
+        self._historial(hoy - timedelta(days=5, hours=-9), 15)
+        VentaDiariaRepository.reconstruir()
+
+        serie, _ = self._serie('granularity=day&range=7d')
+        self.assertEqual(len(serie['buckets']), 7)
+        por_dia = {b['inicio']: (b['cantidad'], b['total']) for b in serie['buckets']}
+        self.assertEqual(por_dia[(hoy - timedelta(days=2)).isoformat()], (2, 50.0))
+        self.assertEqual(por_dia[(hoy - timedelta(days=5)).isoformat()], (1, 15.0))
+        self.assertEqual(sum(c for c, _ in por_dia.values()), 3)
+        self.assertEqual([b['cerrado'] for b in serie['buckets']], [True] * 6 + [False])
+
+        # Segunda lectura: solo se consulta el día en curso
+        self.client.post('/api/ventas', headers=self.headers, json={
+            'detalles': [{'producto_id': self.producto_id, 'cantidad': 2}]
+        })
+        serie, sentencias = self._serie('granularity=day&range=7d')
+        self.assertEqual(len(sentencias), 1)
+        self.assertEqual((serie['buckets'][-1]['cantidad'], serie['buckets'][-1]['total']), (1, 20.0))
+
+        # La anulación invalida el día (y semana, mes, hora) de la venta anulada
+        response = self.client.post('/api/ventas/anular', headers=self.headers,
+                                    json={'venta_ids': [anulada]})
+        self.assertEqual(response.status_code, 200)
+        serie, sentencias = self._serie('granularity=day&range=7d')
+        self.assertEqual(len(sentencias), 2)
+        por_dia = {b['inicio']: (b['cantidad'], b['total']) for b in serie['buckets']}
+        self.assertEqual(por_dia[(hoy - timedelta(days=2)).isoformat()], (1, 20.0))
+
+    def test_serie_por_hora(self):
+        """Test la serie horaria agrupa las ventas por hora"""
+        hora = datetime.now().replace(minute=0, second=0, microsecond=0)
+        self._historial(hora - timedelta(hours=3) + timedelta(minutes=5), 10)
+        self._historial(hora - timedelta(hours=3) + timedelta(minutes=50), 12.5)
+        self._historial(hora - timedelta(hours=30), 99)  # fuera del rango
+
+        serie, _ = self._serie('granularity=hour&range=6h')
+        self.assertEqual([b['cantidad'] for b in serie['buckets']], [0, 0, 2, 0, 0, 0])
+        self.assertEqual(serie['buckets'][2]['total'], 22.5)
+        self.assertEqual(serie['buckets'][-1]['inicio'], hora.isoformat())
+
+        _, sentencias = self._serie('granularity=hour&range=6h')
+        self.assertEqual(len(sentencias), 1)
+
+    def test_venta_en_intervalo_cerrado_invalida(self):
+        """Test una venta creada con fecha de una hora ya cerrada invalida esa hora"""
+        hora = datetime.now().replace(minute=0, second=0, microsecond=0)
+        serie, _ = self._serie('granularity=hour&range=6h')
+        self.assertEqual(sum(b['cantidad'] for b in serie['buckets']), 0)
+
+        VentaRepository.create_with_detalles(
+            {'usuario_id': self.usuario_id, 'total': 40,
+             'fecha': hora - timedelta(hours=2) + timedelta(minutes=59, seconds=59)},
+            [{'producto_id': self.producto_id, 'cantidad': 4,
+              'precio_unitario': 10, 'subtotal': 40}]
+        )
+        serie, _ = self._serie('granularity=hour&range=6h')
+        self.assertEqual([b['cantidad'] for b in serie['buckets']], [0, 0, 0, 1, 0, 0])
+        self.assertEqual(serie['buckets'][3]['total'], 40.0)
+
+        # Una venta de la hora en curso no toca la caché de las cerradas
+        self.client.post('/api/ventas', headers=self.headers, json={
+            'detalles': [{'producto_id': self.producto_id, 'cantidad': 1}]
+        })
+        _, sentencias = self._serie('granularity=hour&range=6h')
+        self.assertEqual(len(sentencias), 1)
+
+    def test_guardado_tras_anulacion_descartado(self):
+        """Test lo calculado antes de una anulación y guardado después no se lee"""
+        hoy = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        anulada = self._historial(hoy - timedelta(days=2, hours=-10), 30)
+        VentaDiariaRepository.reconstruir()
+        dia = hoy - timedelta(days=2)
+
+        # Una petición lee la generación y consulta; la anulación se confirma antes de guardar
+        generacion = serie_ventas_cache.generacion()
+        response = self.client.post('/api/ventas/anular', headers=self.headers,
+                                    json={'venta_ids': [anulada]})
+        self.assertEqual(response.status_code, 200)
+        serie_ventas_cache.guardar('day', {dia: {'cantidad': 1, 'total': 30.0}}, generacion)
+
+        self.assertEqual(serie_ventas_cache.obtener('day', [dia]), {})
+        serie, _ = self._serie('granularity=day&range=7d')
+        por_dia = {b['inicio']: b['cantidad'] for b in serie['buckets']}
+        self.assertEqual(por_dia[dia.isoformat()], 0)
+
+    def test_intervalos_con_vencimiento(self):
+        """Test los intervalos cerrados se guardan con SERIE_VENTAS_TTL"""
+        self.app.config['SERIE_VENTAS_TTL'] = 120
+        with mock.patch('app.extensions.cache.set_many') as guardar:
+            self._serie('granularity=day&range=7d')
+        self.assertEqual(guardar.call_args.kwargs['timeout'], 120)
+
+    def test_semanas_y_meses(self):
+        """Test semanas y meses suman los días del resumen diario"""
+        ahora = datetime(2026, 3, 18, 15, 0)
+        self._historial(datetime(2026, 2, 27, 10), 40)
+        self._historial(datetime(2026, 3, 2, 10), 25)
+        self._historial(datetime(2026, 3, 17, 10), 5)
+        VentaDiariaRepository.reconstruir()
+        use_case = get_container().resolve('get_serie_ventas_use_case')
+
+        meses = use_case.execute('month', '2m', ahora=ahora)['buckets']
+        self.assertEqual([(b['cantidad'], b['total']) for b in meses], [(1, 40.0), (2, 30.0)])
+        semanas = use_case.execute('week', '4w', ahora=ahora)['buckets']
+        self.assertEqual([b['inicio'][:10] for b in semanas],
+                         ['2026-02-23', '2026-03-02', '2026-03-09', '2026-03-16'])
+        self.assertEqual([b['cantidad'] for b in semanas], [1, 1, 0, 1])
+
+    def test_parametros_invalidos(self):
+        """Test granularidad o rango inválidos devuelven 400"""
+        for query in ('granularity=year', 'granularity=day&range=abc', 'granularity=hour&range=5000d'):
+            response = self.client.get(f'/api/ventas/serie?{query}', headers=self.headers)
+            self.assertEqual(response.status_code, 400, query)
+
+if __name__ == '__main__':
+    unittest.main()